@@ -0,0 +1,561 @@
+"""
+ABC Notation
+============
+
+Bulk import of ABC tune collections as assistant tabs.
+
+The corpus is streamed line by line and split into tunes at their `X:`
+field, and the tunes are converted in batches on a process pool. The
+parser covers the subset of ABC needed by monophonic melodies:
+
+- The `T:`, `L:`, `M:`, `Q:` and `K:` fields, the key signature with its
+  mode and explicit accidentals, and the inline `[K:]` and `[L:]` fields.
+- Notes with their accidentals, which last until the bar line, octave
+  marks and lengths, rests, and ties. Chords keep their highest note.
+- Repeats `|: ... :|` and `::`, a repeat without start going back to the
+  start of the tune or to the end of the previous repeat. Repeats without
+  endings are written as `( ... )xN` blocks on their own lines, repeats
+  with first and second endings are written out.
+
+Decorations, annotations, chord symbols, grace notes, slurs, tuplets and
+lyrics are skipped, the assistant plays one tab per gap anyway. Every line
+of the tune is a line of tabs.
+
+Like the MIDI importer the melody is fitted to the selected stylophone and
+the gap, the most frequent time between notes, is given by a `# Gap:`
+comment. The songs are added to the output directory without overwriting
+any of them, and its catalog is then updated, see library.py.
+
+`python abcnotation.py corpus.abc -o tabs`
+"""
+
+import os
+import re
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+from compiler import x1_scale
+from midi import base_note, melody_gap, fit_shift, fold
+from library import add_song, load_tabs, song_names
+
+batch_size = 512
+default_tempo = 120  # Quarter notes per minute
+min_notes = 4
+
+# Position of the natural notes on the circle of fifths
+natural_fifths = {'F': -1, 'C': 0, 'G': 1, 'D': 2, 'A': 3, 'E': 4, 'B': 5}
+mode_fifths = {
+    'maj': 0, 'ion': 0, 'min': -3, 'aeo': -3, 'm': -3,
+    'mix': -1, 'dor': -2, 'phr': -4, 'lyd': 1, 'loc': -5,
+}
+sharps_order = 'FCGDAEB'
+semitones = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+accidental_values = {'^': 1, '^^': 2, '_': -1, '__': -2, '=': 0}
+
+key_field = re.compile(r'^\s*([A-G][#b]?)\s*([A-Za-z]*)(.*)$')
+note_pattern = re.compile(r"(\^\^|\^|__|_|=)?([A-Ga-g])([',]*)(\d*)(/*)(\d*)")
+field_pattern = re.compile(r'^[A-Za-z]:')
+tuplet_pattern = re.compile(r'\(\d(?::\d*)*')
+length_pattern = re.compile(r'(\d*)(/*)(\d*)')
+bar_pattern = re.compile(r'\[\|[|:\]]*|[|:\]]+')
+rest_pattern = re.compile(r'[zxZX](\d*)(/*)(\d*)')
+tempo_pattern = re.compile(r'(\d+)/(\d+)\s*=\s*(\d+)')
+invalid_filename = re.compile(r'[\\/:*?"<>|]')
+
+
+# ----------------------------------------------------------------------
+def key_signature(value: str) -> dict:
+    """
+    Returns the accidentals of a key.
+
+    Parameters
+    ----------
+    value : str
+        The `K:` field, such as `G`, `Dm`, `A dor` or `D exp ^f _b`.
+
+    Returns
+    -------
+    dict
+        The semitones added to the natural notes, by upper case letter.
+    """
+    accidentals = {}
+    rest = value
+    match = key_field.match(value)
+    if match:
+        tonic, mode, rest = match.groups()
+        fifths = natural_fifths[tonic[0]] + {'#': 7, 'b': -7}.get(tonic[1:], 0)
+        mode = mode.lower()
+        fifths += mode_fifths.get(mode[:3], mode_fifths.get(mode, 0))
+        for letter in sharps_order[:fifths] if fifths > 0 else sharps_order[::-1][: -fifths]:
+            accidentals[letter] = 1 if fifths > 0 else -1
+    elif value.strip().lower().startswith('hp'):
+        # Highland bagpipe
+        accidentals = {'F': 1, 'C': 1}
+
+    # Explicit accidentals
+    for accidental, letter in re.findall(r'(\^\^|\^|__|_|=)([A-Ga-g])', rest):
+        accidentals[letter.upper()] = accidental_values[accidental]
+    return accidentals
+
+
+# ----------------------------------------------------------------------
+def note_length(number: str, slashes: str, denominator: str) -> float:
+    """The length of a note, in units of `L:`."""
+    length = int(number) if number else 1
+    if slashes:
+        return length / (int(denominator) if denominator else 2 ** len(slashes))
+    return length
+
+
+# ----------------------------------------------------------------------
+def fraction(value: str) -> float:
+    """Parses a fraction such as `1/8`."""
+    numerator, _, denominator = value.strip().partition('/')
+    return int(numerator) / int(denominator or 1)
+
+
+# ----------------------------------------------------------------------
+def unit_length(fields: dict) -> float:
+    """The length of the unit note, from the `L:` field or the meter."""
+    if 'L' in fields:
+        try:
+            return fraction(fields['L'])
+        except (ValueError, ZeroDivisionError):
+            pass
+    meter = fields.get('M', '').strip()
+    meter = {'C': '4/4', 'C|': '2/2'}.get(meter, meter)
+    try:
+        return 1 / 16 if fraction(meter) < 0.75 else 1 / 8
+    except (ValueError, ZeroDivisionError):
+        return 1 / 8
+
+
+# ----------------------------------------------------------------------
+def whole_note_ms(fields: dict, unit: float) -> float:
+    """The duration of a whole note, in milliseconds, from the `Q:` field."""
+    value = fields.get('Q', '')
+    if match := tempo_pattern.search(value):
+        beat, per, bpm = match.groups()
+        return 60000 / int(bpm) * int(per) / int(beat)
+    if value.strip().isdigit():
+        # Old form, unit notes per minute
+        return 60000 / int(value) / unit
+    return 60000 / default_tempo * 4
+
+
+########################################################################
+class Tune:
+    """The melody of a tune, as tabs items."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        """"""
+        # Pitches, line breaks and `(items, times)` repeats
+        self.items = []
+        self.repeat_start = 0
+        self.endings = None
+        self.tied = False
+        self.onsets = []
+        self.time = 0.0
+
+    # ----------------------------------------------------------------------
+    def note(self, pitch: int, length: float, whole: float) -> None:
+        """"""
+        if self.tied and self.last_pitch() == pitch:
+            self.tied = False
+        else:
+            self.tied = False
+            self.items.append(pitch)
+            self.onsets.append(self.time)
+        self.time += length * whole
+
+    # ----------------------------------------------------------------------
+    def rest(self, length: float, whole: float) -> None:
+        """"""
+        self.tied = False
+        self.time += length * whole
+
+    # ----------------------------------------------------------------------
+    def last_pitch(self):
+        """"""
+        for item in reversed(self.items):
+            if isinstance(item, int):
+                return item
+            if not isinstance(item, str):
+                return None
+        return None
+
+    # ----------------------------------------------------------------------
+    def line_break(self) -> None:
+        """"""
+        if self.items and self.items[-1] != '\n':
+            self.items.append('\n')
+
+    # ----------------------------------------------------------------------
+    def start_repeat(self) -> None:
+        """"""
+        self.repeat_start = len(self.items)
+        self.endings = None
+
+    # ----------------------------------------------------------------------
+    def ending(self, number: int) -> None:
+        """"""
+        if number == 1:
+            self.endings = len(self.items)
+
+    # ----------------------------------------------------------------------
+    def end_repeat(self, times: int = 2) -> None:
+        """"""
+        body = self.items[self.repeat_start :]
+        if self.endings is None:
+            if any(isinstance(item, int) for item in body):
+                self.items[self.repeat_start :] = [(body, times)]
+        else:
+            # Written out, the second ending follows
+            first = self.endings - self.repeat_start
+            self.items[self.repeat_start :] = body + ['\n'] + body[:first]
+        self.repeat_start = len(self.items)
+        self.endings = None
+
+
+# ----------------------------------------------------------------------
+def parse_tune(lines: list) -> tuple:
+    """
+    Parses a tune.
+
+    Parameters
+    ----------
+    lines : list
+        The lines of the tune, from its `X:` field.
+
+    Returns
+    -------
+    tuple
+        The header fields, by letter, and the `Tune`.
+    """
+    fields = {}
+    tune = Tune()
+    in_body = False
+    accidentals = {}
+    unit = 1 / 8
+    whole = 2000.0
+    bar = {}
+
+    for line in lines:
+        line = line.split('%', 1)[0].rstrip()
+        is_field = field_pattern.match(line)
+        if not in_body or is_field:
+            if is_field:
+                field, value = line[0], line[2:].strip()
+                if field == 'T' and 'T' in fields:
+                    continue
+                fields[field] = value
+                if field == 'K':
+                    accidentals = key_signature(value)
+                    if not in_body:
+                        unit = unit_length(fields)
+                        whole = whole_note_ms(fields, unit)
+                    in_body = True
+                elif field == 'L' and in_body:
+                    unit = unit_length(fields)
+            continue
+
+        position = 0
+        end = len(line)
+        while position < end:
+            char = line[position]
+
+            if char in '"!+{':
+                # Annotations, decorations and grace notes
+                closing = {'"': '"', '!': '!', '+': '+', '{': '}'}[char]
+                found = line.find(closing, position + 1)
+                position = end if found < 0 else found + 1
+
+            elif char == '[' and re.match(r'\[[A-Za-z]:', line[position:]):
+                found = line.find(']', position)
+                found = end if found < 0 else found
+                field, value = line[position + 1], line[position + 3 : found]
+                if field == 'K':
+                    accidentals = key_signature(value)
+                elif field == 'L':
+                    unit = unit_length({'L': value})
+                position = found + 1
+
+            elif char == '[' and position + 1 < end and line[position + 1].isdigit():
+                tune.ending(int(line[position + 1]))
+                position += 2
+
+            elif match := tuplet_pattern.match(line, position):
+                position = match.end()
+
+            elif char in '|:' or (char == '[' and line[position + 1 : position + 2] == '|'):
+                text = bar_pattern.match(line, position).group(0)
+                position += len(text)
+                bar = {}
+                if text.startswith(':'):
+                    # `::|` is played three times, `::` ends and starts a repeat
+                    colons = len(text) - len(text.lstrip(':'))
+                    tune.end_repeat(colons + 1 if '|' in text else 2)
+                if text.endswith(':') and text != ':':
+                    tune.start_repeat()
+                if position < end and line[position].isdigit():
+                    tune.ending(int(line[position]))
+                    position += 1
+
+            elif char == '[':
+                # Chord, its highest note is the melody
+                found = line.find(']', position)
+                found = end if found < 0 else found
+                notes = list(note_pattern.finditer(line, position + 1, found))
+                position = found + 1
+                if notes:
+                    pitches = [
+                        note_pitch(note, accidentals, bar) for note in notes
+                    ]
+                    tail = length_pattern.match(line, position)
+                    position += len(tail.group(0))
+                    length = note_length(*notes[0].groups()[3:]) * note_length(*tail.groups())
+                    tune.note(max(pitches), length * unit, whole)
+
+            elif match := note_pattern.match(line, position):
+                position = match.end()
+                tune.note(
+                    note_pitch(match, accidentals, bar),
+                    note_length(*match.groups()[3:]) * unit,
+                    whole,
+                )
+
+            elif match := rest_pattern.match(line, position):
+                position = match.end()
+                tune.rest(note_length(*match.groups()) * unit, whole)
+
+            elif char == '-':
+                tune.tied = True
+                position += 1
+
+            else:
+                # Slurs, tuplets, broken rhythms, spacers and decorations
+                position += 1
+
+        tune.line_break()
+
+    return fields, tune
+
+
+# ----------------------------------------------------------------------
+def note_pitch(match, accidentals: dict, bar: dict) -> int:
+    """
+    Returns the MIDI note of a parsed note.
+
+    Accidentals written in a bar apply to the same note until the bar line,
+    the key signature to the other ones.
+    """
+    accidental, letter, octaves = match.groups()[:3]
+    upper = letter.upper()
+    octave = 5 if letter.islower() else 4
+    octave += octaves.count("'") - octaves.count(',')
+    if accidental:
+        bar[(upper, octave)] = accidental_values[accidental]
+    shift = bar.get((upper, octave), accidentals.get(upper, 0))
+    return 12 * (octave + 1) + semitones[upper] + shift
+
+
+# ----------------------------------------------------------------------
+def render(items: list, tab) -> list:
+    """
+    Writes tabs items as lines of tabs.
+
+    Parameters
+    ----------
+    items : list
+        Pitches, line breaks and `(items, times)` repeats.
+    tab :
+        Maps a pitch to its tab.
+
+    Returns
+    -------
+    list
+        The lines, repeats on lines of their own.
+    """
+    lines = []
+    line = []
+    for item in items:
+        if isinstance(item, int):
+            line.append(tab(item))
+        elif item == '\n':
+            if line:
+                lines.append(' '.join(line))
+            line = []
+        else:
+            if line:
+                lines.append(' '.join(line))
+            line = []
+            body, times = item
+            block = render(body, tab)
+            if block:
+                block[0] = f'({block[0]}'
+                block[-1] = f'{block[-1]})x{times}'
+                lines += block
+    if line:
+        lines.append(' '.join(line))
+    return lines
+
+
+# ----------------------------------------------------------------------
+def abc_to_tabs(text: str, device: str = 'x1', source: str = '') -> tuple:
+    """
+    Converts a tune into assistant tabs.
+
+    Parameters
+    ----------
+    text : str
+        The tune, from its `X:` field.
+    device : str, optional
+        The stylophone the tabs are fitted to, one of
+        `compatibility.devices`. Defaults to 'x1'.
+    source : str, optional
+        The name of the corpus, for the header comment.
+
+    Returns
+    -------
+    tuple
+        The title and the tabs, or None if the tune has too few notes.
+    """
+    fields, tune = parse_tune(text.split('\n'))
+
+    def notes(items):
+        for item in items:
+            if isinstance(item, int):
+                yield item
+            elif isinstance(item, tuple):
+                yield from notes(item[0])
+
+    pitches = [note - base_note for note in notes(tune.items)]
+    if len(pitches) < min_notes:
+        return None
+
+    shift = fit_shift(pitches, device)
+    gap = melody_gap(tune.onsets)
+    tabs = {pitch: x1_scale[fold(pitch + shift, device)] for pitch in set(pitches)}
+    lines = render(tune.items, lambda note: tabs[note - base_note])
+
+    title = fields.get('T') or f"Tune {fields.get('X', '')}".strip()
+    origin = f", imported from {source} X:{fields.get('X', '')}" if source else ''
+    header = [f'# {title}{origin}']
+    header.append(f'# Gap: {gap / 1000:.1f} s' + (f', transposed {shift:+d} semitones' if shift else ''))
+    return title, '\n'.join(header + [''] + lines) + '\n'
+
+
+# ----------------------------------------------------------------------
+def iter_tunes(file):
+    """
+    Splits a corpus into tunes, streaming it.
+
+    Parameters
+    ----------
+    file :
+        The corpus, opened in text mode.
+
+    Yields
+    ------
+    str
+        The text of every tune, from its `X:` field.
+    """
+    tune = None
+    for line in file:
+        if line.startswith('X:'):
+            if tune:
+                yield ''.join(tune)
+            tune = [line]
+        elif tune is not None:
+            if line.strip():
+                tune.append(line)
+            else:
+                # A tune ends with an empty line, free text may follow
+                yield ''.join(tune)
+                tune = None
+    if tune:
+        yield ''.join(tune)
+
+
+# ----------------------------------------------------------------------
+def convert_tune(job: tuple):
+    """Converts a tune, in a worker of the pool, see `abc_to_tabs`."""
+    text, device, source = job
+    try:
+        return abc_to_tabs(text, device, source)
+    except (ValueError, KeyError, IndexError, ZeroDivisionError):
+        return None
+
+
+# ----------------------------------------------------------------------
+def import_corpus(
+    filename: str,
+    output: str,
+    device: str = 'x1',
+    workers: int = None,
+    build: bool = True,
+) -> dict:
+    """
+    Imports every tune of an ABC corpus as a `.txt` song.
+
+    Songs already in the output directory are never overwritten, a tune
+    whose title is taken is written with a numbered name, see
+    `library.add_song`.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the corpus.
+    output : str
+        The directory of the songs, such as `tabs`.
+    device : str, optional
+        See `abc_to_tabs`.
+    workers : int, optional
+        The processes of the pool, defaults to the number of CPUs.
+    build : bool, optional
+        Whether to update the catalog of the output directory afterwards.
+
+    Returns
+    -------
+    dict
+        The number of `imported` and `skipped` tunes.
+    """
+    os.makedirs(output, exist_ok=True)
+    source = os.path.basename(filename)
+    names = song_names(output)
+    imported = skipped = 0
+
+    with open(filename, 'r', encoding='utf-8', errors='replace') as corpus, ProcessPoolExecutor(workers) as pool:
+        tunes = ((text, device, source) for text in iter_tunes(corpus))
+        while batch := list(islice(tunes, batch_size)):
+            chunksize = max(1, len(batch) // ((workers or os.cpu_count() or 1) * 4))
+            for result in pool.map(convert_tune, batch, chunksize=chunksize):
+                if result is None:
+                    skipped += 1
+                    continue
+                title, tabs = result
+                name = invalid_filename.sub('-', title).strip(' .') or 'Tune'
+                add_song(output, name, tabs, names)
+                imported += 1
+
+    if build:
+        load_tabs(output)
+    return {'imported': imported, 'skipped': skipped}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from compatibility import devices
+
+    parser = argparse.ArgumentParser(description='Imports the tunes of an ABC corpus as assistant tabs.')
+    parser.add_argument('corpus')
+    parser.add_argument('-o', '--output', default='tabs')
+    parser.add_argument('--device', default='x1', choices=devices)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--no-build', action='store_true', help='do not update the catalog')
+    args = parser.parse_args()
+
+    result = import_corpus(args.corpus, args.output, args.device, args.workers, not args.no_build)
+    print(f"{result['imported']} tunes imported, {result['skipped']} skipped")
@@ -0,0 +1,233 @@
+"""
+Bundle
+======
+
+Packages the Brython modules actually imported by the application into a
+single `brython_modules.js` file.
+
+Without a bundle, Brython fetches `main.py` and every `radiant.framework`
+submodule with a separate HTTP request at startup. The bundle registers all
+of them in the Brython virtual file system in one cached request, and with
+the `cache` option of `brython-options` Brython keeps their compiled form in
+IndexedDB, keyed by the bundle timestamp, so repeat visits skip compilation.
+
+The import graph is resolved statically from the entry module, searching the
+same path as Brython. Modules that are never imported, such as
+`radiant.framework.sound`, are left out.
+"""
+
+import os
+import ast
+import json
+import hashlib
+import importlib
+
+
+# ----------------------------------------------------------------------
+def brython_path() -> list:
+    """
+    Returns the directories Brython searches for modules, in order.
+
+    Returns
+    -------
+    list
+        The application root and the Brython modules of Radiant Framework.
+    """
+    # `radiant.framework` is replaced by a fake module under CPython
+    server = importlib.import_module('radiant.framework.server')
+
+    return [
+        os.path.dirname(os.path.abspath(__file__)),
+        os.path.join(
+            os.path.dirname(os.path.realpath(server.__file__)),
+            'static',
+            'modules',
+            'brython',
+        ),
+    ]
+
+
+# ----------------------------------------------------------------------
+def find_module(name: str, path: list):
+    """
+    Finds the source file of a module the way Brython does.
+
+    Top-level modules are searched in `path`, submodules inside the directory
+    of their parent package.
+
+    Parameters
+    ----------
+    name : str
+        The dotted name of the module.
+    path : list
+        The directories to search for top-level modules.
+
+    Returns
+    -------
+    tuple or None
+        The path of the source file and whether it is a package, or None if
+        the module is not found (built-in and standard library modules).
+    """
+    *parents, module = name.split('.')
+
+    for directory in path:
+        for part in parents:
+            directory = os.path.join(directory, part)
+            if not os.path.isfile(os.path.join(directory, '__init__.py')):
+                break
+        else:
+            package = os.path.join(directory, module, '__init__.py')
+            if os.path.isfile(package):
+                return package, True
+            source = os.path.join(directory, f'{module}.py')
+            if os.path.isfile(source):
+                return source, False
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def imported_names(tree: ast.AST, name: str, is_package: bool) -> list:
+    """
+    Collects the absolute names of the modules imported by a module.
+
+    Imports inside `if __name__ == '__main__':` blocks are ignored, since
+    they never run in the browser.
+
+    Parameters
+    ----------
+    tree : ast.AST
+        The parsed source of the module.
+    name : str
+        The dotted name of the module, used to resolve relative imports.
+    is_package : bool
+        Whether the module is a package.
+
+    Returns
+    -------
+    list
+        The candidate module names, including `from x import y` names that
+        may be submodules.
+    """
+    package = name if is_package else name.rpartition('.')[0]
+    names = []
+
+    def visit(node):
+        for child in ast.iter_child_nodes(node):
+            if (
+                isinstance(child, ast.If)
+                and isinstance(child.test, ast.Compare)
+                and isinstance(child.test.left, ast.Name)
+                and child.test.left.id == '__name__'
+            ):
+                continue
+
+            if isinstance(child, ast.Import):
+                names.extend(alias.name for alias in child.names)
+
+            elif isinstance(child, ast.ImportFrom):
+                if child.level:
+                    base = package.split('.')[: len(package.split('.')) - child.level + 1]
+                    base = '.'.join(base + ([child.module] if child.module else []))
+                else:
+                    base = child.module
+                names.append(base)
+                names.extend(f'{base}.{alias.name}' for alias in child.names)
+
+            visit(child)
+
+    visit(tree)
+    return names
+
+
+# ----------------------------------------------------------------------
+def resolve_imports(entry: str, path: list) -> dict:
+    """
+    Resolves the import graph of the entry module.
+
+    Parameters
+    ----------
+    entry : str
+        The name of the entry module.
+    path : list
+        The directories to search for top-level modules.
+
+    Returns
+    -------
+    dict
+        Module names mapped to their source, whether they are packages and
+        the names of the bundled modules they import.
+    """
+    modules = {}
+    pending = [entry]
+
+    while pending:
+        name = pending.pop()
+        if name in modules:
+            continue
+
+        found = find_module(name, path)
+        if found is None:
+            continue
+        filename, is_package = found
+
+        with open(filename, 'r') as file:
+            source = file.read()
+
+        imports = imported_names(ast.parse(source, filename), name, is_package)
+
+        # Parent packages are executed on import as well
+        parents = name.split('.')
+        imports += ['.'.join(parents[:i]) for i in range(1, len(parents))]
+
+        modules[name] = (source, is_package, imports)
+        pending.extend(imports)
+
+    return {
+        name: (source, is_package, sorted(set(imports) & set(modules)))
+        for name, (source, is_package, imports) in modules.items()
+    }
+
+
+# ----------------------------------------------------------------------
+def make_bundle(
+    entry: str = 'main', output: str = 'brython_modules.js', path: list = None
+) -> list:
+    """
+    Writes the Brython modules bundle of the entry module.
+
+    The timestamp of the virtual file system is derived from the content, so
+    the IndexedDB cache of the browsers is only invalidated when a bundled
+    module changes.
+
+    Parameters
+    ----------
+    entry : str, optional
+        The name of the entry module. Defaults to 'main'.
+    output : str, optional
+        The path of the bundle. Defaults to 'brython_modules.js'.
+    path : list, optional
+        The directories to search for top-level modules. Defaults to
+        `brython_path()`.
+
+    Returns
+    -------
+    list
+        The names of the bundled modules.
+    """
+    modules = resolve_imports(entry, path or brython_path())
+
+    scripts = {}
+    for name in sorted(modules):
+        source, is_package, imports = modules[name]
+        scripts[name] = ['.py', source, imports] + ([1] if is_package else [])
+
+    digest = hashlib.sha1(json.dumps(scripts, sort_keys=True).encode('utf-8'))
+    scripts = {'$timestamp': int(digest.hexdigest()[:12], 16), **scripts}
+
+    with open(output, 'w') as file:
+        file.write('__BRYTHON__.use_VFS = true;\n')
+        file.write(f'var scripts = {json.dumps(scripts)}\n')
+        file.write('__BRYTHON__.update_VFS(scripts)\n')
+
+    return sorted(modules)
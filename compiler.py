@@ -0,0 +1,498 @@
+"""
+Compiler
+========
+
+Compilation of tabs into the S-1 and X-1 programs.
+
+The tabs are normalized (repeats `( ... )xN` expanded, comments and
+separators removed), split into S-1 tab tokens, and mapped to X-1 tabs with
+the note equivalence tables. Transposition shifts the tabs along the
+chromatic scale of the selected model.
+
+This module has no browser imports: the assistant compiles in the browser
+in time slices with these functions, and the server compiles whole songs
+with `compile_song`, see api.py.
+"""
+
+import re
+
+ignore_chars = ',-–—()<>'
+transpose_range = 12
+
+s1_scale = "1 1.5 2 3 3.5 4 4.5 5 6 6.5 7 7.5 8 8.5 9 10 10.5 11 11.5 12".split()
+x1_scale = (
+    "1 1.5 2 3 3.5 4 4.5 5 6 6.5 7 7.5 8 8.5 9 10 10.5 11 11.5 12 13 13.5 14 14.5 15 15.5 16"
+).split()
+
+
+# ----------------------------------------------------------------------
+# With the switch in position 2 on the S-1 and no octave modifier on the X-1
+# Assumes that the central octave of S-1 corresponds to the first octave of X-1
+note_equivalence_mode1 = {
+    # tab(S-1): (tab X-1, octave modifier)
+    # Notes from the 3rd octave (Require modifier as they are not present on X-1)
+    "1": ("8", "-1"),
+    "1.5": ("8.5", "-1"),
+    "2": ("9", "-1"),
+    # Notes from the 4th octave
+    "3": ("3", "0"),
+    "3.5": ("3.5", "0"),
+    "4": ("4", "0"),
+    "4.5": ("4.5", "0"),
+    "5": ("5", "0"),
+    "6": ("6", "0"),
+    "6.5": ("6.5", "0"),
+    "7": ("7", "0"),
+    "7.5": ("7.5", "0"),
+    "8": ("8", "0"),
+    "8.5": ("8.5", "0"),
+    "9": ("9", "0"),
+    # Notes from the 5th octave
+    "10": ("10", "0"),
+    "10.5": ("10.5", "0"),
+    "11": ("11", "0"),
+    "11.5": ("11.5", "0"),
+    "12": ("12", "0"),
+    # Notes from the 5th octave not present on S-1
+    "13": ("13", "0"),
+    "13.5": ("13.5", "0"),
+    "14": ("14", "0"),
+    "14.5": ("14.5", "0"),
+    "15": ("15", "0"),
+    "15.5": ("15.5", "0"),
+    "16": ("16", "0"),
+}
+
+# ----------------------------------------------------------------------
+# With the switch in position 2 on the S-1 and no octave modifier on the X-1
+# Assumes that the central octave of S-1 corresponds to the second octave of X-1
+# By default, this implies a modifier of -1
+note_equivalence_mode2 = {
+    # Notes from the 3rd octave
+    "1": ("1", "0"),
+    "1.5": ("1.5", "0"),
+    "2": ("2", "0"),
+    # Notes from the 4th octave
+    "3": ("3", "0"),
+    "3.5": ("3.5", "0"),
+    "4": ("4", "0"),
+    "4.5": ("4.5", "0"),
+    "5": ("5", "0"),
+    "6": ("6", "0"),
+    "6.5": ("6.5", "0"),
+    "7": ("7", "0"),
+    "7.5": ("7.5", "0"),
+    "8": ("8", "0"),
+    "8.5": ("8.5", "0"),
+    "9": ("9", "0"),
+    # Notes from the 5th octave not available in this X-1 configuration
+    "10": ("3", "-2"),
+    "10.5": ("3.5", "-2"),
+    "11": ("4", "-2"),
+    "11.5": ("4.5", "-2"),
+    "12": ("5", "-2"),
+}
+
+
+# ----------------------------------------------------------------------
+def convert_note(note: str, equivalence: dict, modifier: str) -> str:
+    """
+    Converts a single musical note based on a mapping of equivalences and an
+    octave modifier.
+
+    Parameters
+    ----------
+    note : str
+        The note to convert.
+    equivalence : dict
+        A dictionary where keys are note strings and values are tuples containing
+        the note's position and its octave.
+    modifier : str
+        A string representing the octave modification.
+
+    Returns
+    -------
+    str
+        The converted note, or the original note if it is not present in the
+        equivalence mapping.
+    """
+    if note not in equivalence:
+        # Notes not in equivalence are returned as they are
+        return note
+
+    position, octave = equivalence[note]
+
+    # Modify octave based on the given modifier
+    if modifier == '-1':
+        octave = str(int(octave) + int(modifier) - 1)  # PSS: Adjusted calculation logic
+
+    if octave == '0':
+        return f"{position}"
+    return f"({octave}:{position})"
+
+
+# ----------------------------------------------------------------------
+def convert_sequence(sequence: str, equivalence: dict, modifier: str) -> str:
+    """
+    Converts a sequence of musical notes into a modified format based on a mapping
+    of equivalences and an octave modifier.
+
+    Parameters
+    ----------
+    sequence : str
+        A string representing a sequence of musical notes separated by spaces.
+    equivalence : dict
+        A dictionary where keys are note strings and values are tuples containing
+        the note's position and its octave (e.g., {'C': ('1', '4')}).
+    modifier : str
+        A string representing the octave modification. For example, '-1' decreases
+        the octave by one.
+
+    Returns
+    -------
+    str
+        The converted sequence as a string where each note is replaced based on
+        the equivalence mapping and modified according to the octave.
+    """
+    return " ".join(
+        convert_note(note, equivalence, modifier) for note in sequence.split(' ')
+    )
+
+
+# ----------------------------------------------------------------------
+def iter_decompressed_lines(lines):
+    """
+    Lazily decompresses lines containing patterns in the form '(content)xN' or
+    '(content) xN', including cases where the content spans multiple lines.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The input lines containing patterns to be decompressed.
+
+    Yields
+    ------
+    str
+        The decompressed lines, produced as soon as each pattern is closed.
+    """
+    buffer = []  # Buffer to handle multiline content
+
+    for line in lines:
+        # Detect the start of a multiline pattern
+        if "(" in line and ")" not in line:
+            buffer.append(line.strip())
+            continue
+        elif buffer or ")" in line:
+            buffer.append(line.strip())
+
+            if ")" not in line:
+                continue
+
+            # Combine buffered lines
+            multiline_content = "\n".join(buffer)
+            buffer = []  # Clear buffer
+
+            # Find and expand multiline patterns
+            patterns = re.findall(r'\((.*?)\)\s*x(\d+)', multiline_content, re.DOTALL)
+            for content, repetitions in patterns:
+                content_lines = content.strip().split("\n")
+                for _ in range(int(repetitions)):
+                    if len(content.split('\n')) > 1 and (_ < int(repetitions) - 1):
+                        yield from content_lines + ['']
+                    else:
+                        yield from content_lines
+
+            # Remove processed patterns and add any extra text
+            remaining_text = re.sub(
+                r'\(.*?\)\s*x\d+', '', multiline_content, flags=re.DOTALL
+            ).strip()
+            if remaining_text:
+                yield remaining_text
+            continue
+
+        # Process single-line patterns '(...)xN'
+        patterns = re.findall(r'\((.*?)\)\s*x(\d+)', line)
+        if patterns:
+            for content, repetitions in patterns:
+                content_lines = content.strip().split("\n")
+                for _ in range(int(repetitions)):
+                    yield from content_lines
+
+            # Remove processed patterns and add any extra text
+            remaining_text = re.sub(r'\(.*?\)\s*x\d+', '', line).strip()
+            if remaining_text:
+                yield remaining_text
+        else:
+            # Add lines without patterns directly
+            yield line.strip()
+
+
+# ----------------------------------------------------------------------
+def decompress_multiline_text(text: str) -> str:
+    """
+    Decompresses text containing patterns in the form '(content)xN' or '(content) xN',
+    including cases where the content spans multiple lines.
+
+    Parameters
+    ----------
+    text : str
+        The input text containing patterns to be decompressed.
+
+    Returns
+    -------
+    str
+        The decompressed text with patterns expanded.
+    """
+    return "\n".join(iter_decompressed_lines(text.split("\n")))
+
+
+# ----------------------------------------------------------------------
+def iter_normalized_lines(lines):
+    """
+    Lazily normalizes tab lines by decompressing, removing comments, and
+    cleaning up unwanted characters and extra spaces.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The raw lines of tabs as written by the user.
+
+    Yields
+    ------
+    str
+        Normalized lines, one per decompressed input line.
+    """
+    for chunk in iter_decompressed_lines(lines):
+        for line in chunk.split('\n'):
+            # Exclude comments
+            if '#' in line:
+                line = line[: line.find('#')]
+
+            # Remove unwanted characters defined in `ignore_chars`
+            for char in ignore_chars:
+                line = line.replace(char, ' ')
+
+            # Normalize spaces
+            yield ' '.join(line.split())
+
+
+# ----------------------------------------------------------------------
+def iter_tabs_tokens(lines):
+    """
+    Lazily splits normalized lines into tab tokens.
+
+    The produced tokens are exactly those of
+    `'\\n'.join(lines).strip('\\n').split(' ')`, so the streamed program is
+    identical to the one compiled in a single pass.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        Normalized lines of tabs.
+
+    Yields
+    ------
+    str
+        The tab tokens in playing order.
+    """
+    token = ''
+    started = False
+    newlines = 0
+
+    for line in lines:
+        if not line:
+            # Empty lines only matter if they are followed by content
+            newlines += started
+            continue
+
+        parts = line.split(' ')
+        if started:
+            token += '\n' * (newlines + 1)
+        token += parts[0]
+        for part in parts[1:]:
+            yield token
+            token = part
+
+        started = True
+        newlines = 0
+
+    yield token
+
+
+# ----------------------------------------------------------------------
+def normalize_tabs(tabs: str) -> str:
+    """
+    Normalizes tabs as written by the user.
+
+    Parameters
+    ----------
+    tabs : str
+        The raw tabs.
+
+    Returns
+    -------
+    str
+        The normalized lines of tabs, see `iter_normalized_lines`.
+    """
+    return '\n'.join(iter_normalized_lines(tabs.split('\n'))).strip('\n')
+
+
+# ----------------------------------------------------------------------
+def transpose_tab(tab: str, value: int, scale: list) -> str:
+    """
+    Transposes a tab along a chromatic scale.
+
+    Parameters
+    ----------
+    tab : str
+        The tab to transpose.
+    value : int
+        The number of semitones.
+    scale : list
+        The tabs of the chromatic scale, `s1_scale` or `x1_scale`.
+
+    Returns
+    -------
+    str
+        The transposed tab, prefixed with `+1:` or `-1:` when it wraps to
+        another octave, or with `E:` when the tab is not in the scale.
+    """
+    if tab not in scale:
+        return f'E:{tab}' if tab else tab
+
+    index = scale.index(tab) + value
+    if index < 0:
+        # Wrap to the next octave up
+        return f'+1:{scale[index + 12]}'
+    elif index < len(scale):
+        return scale[index]
+    # Wrap to the next octave down
+    return f'-1:{scale[index - 12]}'
+
+
+# ----------------------------------------------------------------------
+def iter_transposed_lines(lines, value: int, x1_model: bool = True):
+    """
+    Lazily transposes normalized lines of tabs.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        Normalized lines of tabs, see `iter_normalized_lines`.
+    value : int
+        The number of semitones.
+    x1_model : bool, optional
+        Whether to transpose along the X-1 scale, which extends the S-1 one.
+        Defaults to True.
+
+    Yields
+    ------
+    str
+        The transposed lines, with their spaces normalized.
+    """
+    scale = x1_scale if x1_model else s1_scale
+    for line in lines:
+        tabs = (transpose_tab(tab, value, scale) for tab in line.split(' '))
+        yield ' '.join(' '.join(tabs).split())
+
+
+# ----------------------------------------------------------------------
+def transpose_tabs(normalized: str, value: int, x1_model: bool = True) -> str:
+    """
+    Transposes normalized tabs, line by line.
+
+    Parameters
+    ----------
+    normalized : str
+        The normalized tabs, see `normalize_tabs`.
+    value : int
+        The number of semitones.
+    x1_model : bool, optional
+        Whether to transpose along the X-1 scale, which extends the S-1 one.
+        Defaults to True.
+
+    Returns
+    -------
+    str
+        The transposed tabs, with the spaces of every line normalized.
+    """
+    lines = iter_transposed_lines(normalized.split('\n'), value, x1_model)
+    return '\n'.join(lines).strip('\n')
+
+
+# ----------------------------------------------------------------------
+def transposition_tables(tabs: list, x1_model: bool = True) -> dict:
+    """
+    Tabulates the transpositions of a set of tabs.
+
+    Parameters
+    ----------
+    tabs : list
+        The tabs, repeated tabs are tabulated once.
+    x1_model : bool, optional
+        Whether to transpose along the X-1 scale. Defaults to True.
+
+    Returns
+    -------
+    dict
+        For every shift from `-transpose_range` to `transpose_range`
+        semitones, the tabs of the scale mapped to their transposition.
+    """
+    scale = x1_scale if x1_model else s1_scale
+    used = sorted({tab for tab in tabs if tab in scale}, key=scale.index)
+    return {
+        value: {tab: transpose_tab(tab, value, scale) for tab in used}
+        for value in range(-transpose_range, transpose_range + 1)
+    }
+
+
+# ----------------------------------------------------------------------
+def compile_song(
+    tabs: str,
+    x1_octave: bool = False,
+    transpose: int = None,
+    x1_model: bool = True,
+) -> dict:
+    """
+    Compiles a whole song, as the assistant does in time slices.
+
+    Parameters
+    ----------
+    tabs : str
+        The raw tabs.
+    x1_octave : bool, optional
+        Whether the X-1 plays one octave lower, which selects
+        `note_equivalence_mode2`. Defaults to False.
+    transpose : int, optional
+        The number of semitones to transpose the tabs before compiling them,
+        None to compile them as they are.
+    x1_model : bool, optional
+        Whether to transpose along the X-1 scale. Defaults to True.
+
+    Returns
+    -------
+    dict
+        The `normalized` tabs, the `transposed` ones or None, the `s1` and
+        `x1` token arrays, and the `transpositions` tables of the tabs.
+    """
+    normalized = normalize_tabs(tabs)
+    if transpose is None:
+        transposed = None
+        lines = normalized.split('\n')
+    else:
+        transposed = transpose_tabs(normalized, transpose, x1_model)
+        lines = transposed.split('\n')
+
+    if x1_octave:
+        equivalence, modifier = note_equivalence_mode2, '-1'
+    else:
+        equivalence, modifier = note_equivalence_mode1, '0'
+
+    s1 = list(iter_tabs_tokens(lines))
+    return {
+        'normalized': normalized,
+        'transposed': transposed,
+        's1': s1,
+        'x1': [convert_note(tab, equivalence, modifier) for tab in s1],
+        'transpositions': transposition_tables(normalized.split(), x1_model),
+    }
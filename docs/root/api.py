@@ -0,0 +1,310 @@
+"""
+API
+===
+
+Server-side compilation and search of songs.
+
+`POST {domain}/api/compile` takes the raw `tabs` and the options of the
+assistant, and answers with the result of `compile_song`: the normalized
+and transposed tabs, the S-1 and X-1 token arrays and the transposition
+tables. Phones can then skip parsing long songs in Brython.
+
+The assistant itself calls `AssistantHandler` at `{domain}/api/python`,
+over the WebSocket of `transport.SocketInterpreter`: `compile` for long
+songs and `search` for the melody search, so the page neither parses long
+songs nor downloads the search index. Both calls share one connection.
+
+The calls run on the executor of the server, and compilations are kept in
+a bounded LRU cache keyed by the digest of the tabs and the options, so
+repeated compilations of the popular songs of the catalog are a lookup.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from tornado.web import RequestHandler, HTTPError
+
+from compiler import compile_song, transpose_range
+from library import tabs_path
+from search import SearchIndex, search_limit
+from executor import PythonHandler, blocking, call, python_websocket
+
+cache_size = 256
+compile_path = '/api/compile'
+python_path = '/api/python'
+
+
+########################################################################
+class CompileCache:
+    """Least recently used compilations, shared by the executor threads."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, size: int = cache_size):
+        """"""
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def key(tabs: str, options: dict) -> str:
+        """
+        Returns the cache key of a compilation.
+
+        Parameters
+        ----------
+        tabs : str
+            The raw tabs.
+        options : dict
+            The options of `compile_song`.
+
+        Returns
+        -------
+        str
+            The digest of the tabs and the options.
+        """
+        digest = hashlib.sha1(tabs.encode('utf-8'))
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    # ----------------------------------------------------------------------
+    def get(self, key: str):
+        """"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    # ----------------------------------------------------------------------
+    def put(self, key: str, result: dict) -> None:
+        """"""
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+cache = CompileCache()
+
+
+# ----------------------------------------------------------------------
+def form_options(x1_octave: str = '0', transpose: str = '', x1_model: str = '1') -> dict:
+    """
+    Returns the options of `compile_song` given as form fields.
+
+    Parameters
+    ----------
+    x1_octave : str, optional
+        '1' if the X-1 plays one octave lower. Defaults to '0'.
+    transpose : str, optional
+        The number of semitones to transpose, within `transpose_range`,
+        empty to compile the tabs as they are.
+    x1_model : str, optional
+        '1' to transpose along the X-1 scale, '0' along the S-1 one.
+        Defaults to '1'.
+
+    Returns
+    -------
+    dict
+        The `x1_octave`, `transpose` and `x1_model` options.
+
+    Raises
+    ------
+    ValueError
+        If `transpose` is not an integer within `transpose_range`.
+    """
+    if transpose.strip():
+        try:
+            transpose = int(transpose)
+        except ValueError:
+            # Reported as out of range by `check_transpose`
+            pass
+    else:
+        transpose = None
+    check_transpose(transpose)
+
+    return {
+        'x1_octave': x1_octave == '1',
+        'transpose': transpose,
+        'x1_model': x1_model == '1',
+    }
+
+
+# ----------------------------------------------------------------------
+def check_transpose(transpose) -> None:
+    """
+    Checks the `transpose` option of `compile_song`.
+
+    Raises
+    ------
+    ValueError
+        If `transpose` is neither None nor an integer within
+        `transpose_range`.
+    """
+    if transpose is None:
+        return
+    if type(transpose) is not int or abs(transpose) > transpose_range:
+        raise ValueError(
+            f'transpose must be an integer from {-transpose_range} to {transpose_range}'
+        )
+
+
+# ----------------------------------------------------------------------
+@blocking
+def cached_compile(
+    tabs: str,
+    x1_octave: bool = False,
+    transpose: int = None,
+    x1_model: bool = True,
+) -> dict:
+    """
+    Compiles a song with `compile_song`, or returns its cached compilation.
+
+    Parameters
+    ----------
+    tabs : str
+        The raw tabs.
+    x1_octave : bool, optional
+        Whether the X-1 plays one octave lower. Defaults to False.
+    transpose : int, optional
+        The number of semitones to transpose, None to compile the tabs as
+        they are.
+    x1_model : bool, optional
+        Whether to transpose along the X-1 scale. Defaults to True.
+
+    Returns
+    -------
+    dict
+        The result of `compile_song`.
+    """
+    options = {
+        'x1_octave': bool(x1_octave),
+        'transpose': transpose,
+        'x1_model': bool(x1_model),
+    }
+
+    key = cache.key(tabs, options)
+    result = cache.get(key)
+    if result is None:
+        result = compile_song(tabs, **options)
+        cache.put(key, result)
+    return result
+
+
+########################################################################
+class SearchIndexFile:
+    """The melody search index of the catalog, reloaded when it is rebuilt."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, filename: str = os.path.join(tabs_path, 'search.json')):
+        """"""
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.modified = None
+        self.index = None
+
+    # ----------------------------------------------------------------------
+    def get(self) -> SearchIndex:
+        """"""
+        modified = os.path.getmtime(self.filename)
+        with self.lock:
+            if modified != self.modified:
+                with open(self.filename, 'r') as file:
+                    self.index = SearchIndex(json.load(file))
+                self.modified = modified
+            return self.index
+
+
+search_index = SearchIndexFile()
+
+
+########################################################################
+class AssistantHandler(PythonHandler):
+    """Server calls of the assistant, see `transport.SocketInterpreter`."""
+
+    # ----------------------------------------------------------------------
+    @blocking
+    def compile(
+        self,
+        tabs: str,
+        x1_octave: bool = False,
+        transpose: int = None,
+        x1_model: bool = True,
+    ) -> dict:
+        """
+        Compiles a song, see `cached_compile`.
+
+        Raises
+        ------
+        ValueError
+            If `transpose` is invalid, see `check_transpose`.
+        """
+        check_transpose(transpose)
+        return cached_compile(tabs, x1_octave, transpose, x1_model)
+
+    # ----------------------------------------------------------------------
+    @blocking
+    def search(self, tabs: str, limit: int = search_limit) -> list:
+        """
+        Finds the songs of the catalog containing a fragment, in any key.
+
+        Returns
+        -------
+        list
+            `(name, score)` pairs, see `SearchIndex.search`.
+        """
+        return search_index.get().search(str(tabs), min(int(limit), search_limit))
+
+
+########################################################################
+class CompileHandler(RequestHandler):
+    """Answers `POST {domain}/api/compile` with `cached_compile`, and with
+    400 when the options are invalid."""
+
+    # ----------------------------------------------------------------------
+    async def post(self):
+        """"""
+        try:
+            options = form_options(
+                self.get_argument('x1_octave', '0'),
+                self.get_argument('transpose', ''),
+                self.get_argument('x1_model', '1'),
+            )
+        except ValueError as error:
+            raise HTTPError(400, reason=str(error))
+        tabs = self.get_argument('tabs', '')
+        response = await call(self, cached_compile, tabs, **options)
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps(response))
+
+
+# ----------------------------------------------------------------------
+def api_handlers(domain: str = '') -> list:
+    """
+    Returns the handlers of the endpoints.
+
+    Parameters
+    ----------
+    domain : str, optional
+        The URL prefix of the application.
+
+    Returns
+    -------
+    list
+        The URL patterns with their handlers, for the `handlers` of the
+        server.
+    """
+    return [
+        (rf'^{domain}{compile_path}$', CompileHandler),
+        (rf'^{domain}{python_path}$', AssistantHandler),
+        (rf'^{domain}{python_path}/ws$', python_websocket(AssistantHandler)),
+    ]
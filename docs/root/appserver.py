@@ -0,0 +1,521 @@
+"""
+App Server
+==========
+
+Serves the assistant with Radiant Framework, extending the application that
+`make_app` creates instead of modifying the framework:
+
+- The template variables, such as the prerendered shell, are added to the
+  settings of the application, which `RadiantHandler` renders along with
+  the environment.
+- Files under `root/` are served by `RootStaticFileHandler`, with immutable
+  caching for the versioned paths, the precompressed variants of the files
+  and the small and frequently requested ones kept in memory.
+- `environ.json` is serialized once and served from memory.
+- The blocking calls run on the `BoundedExecutor` of the application, see
+  `executor`, and the broadcast rooms of the classroom mode are served over
+  WebSockets, see `broadcast`.
+- The static export is written by `export_static_app`, on demand, instead
+  of by the handler of the page on every request, and it also copies the
+  files of the application listed in `export_files`, such as the service
+  worker.
+- With more than one worker, the listening socket is shared by forked
+  processes, see `prefork`.
+
+The rules added here are matched before the ones of `make_app`, so they
+replace the handlers of Radiant Framework for the same paths.
+"""
+
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import datetime
+import importlib
+import mimetypes
+
+from tornado import template
+from tornado.web import RequestHandler, StaticFileHandler, url
+from tornado.escape import json_encode
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+from tornado.httpserver import HTTPServer
+
+from prefork import serve_workers
+from broadcast import BroadcastHandler, broadcast_url
+from executor import BoundedExecutor, executor_workers, executor_queue, executor_timeout
+
+# `radiant.framework` is replaced by a fake module under CPython
+server = importlib.import_module('radiant.framework.server')
+
+root = os.path.dirname(os.path.abspath(__file__))
+hot_assets_interval = 1
+precompressed = (('br', '.br'), ('gzip', '.gz'))
+
+
+########################################################################
+class HotAsset:
+    """Immutable content of a file kept in memory, with precomputed headers."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, content: bytes, mime_type: str, modified=None, variants=None):
+        """"""
+        self.content = content
+        self.size = len(content)
+        self.etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        self.mime_type = mime_type
+        self.modified = modified
+        self.variants = variants or {}
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def from_file(cls, filename: str):
+        """Loads a file and its precompressed variants."""
+        with open(filename, 'rb') as file:
+            content = file.read()
+
+        variants = {}
+        for coding, extension in precompressed:
+            if os.path.isfile(filename + extension):
+                with open(filename + extension, 'rb') as file:
+                    variants[coding] = cls(file.read(), None)
+
+        mime_type, _ = mimetypes.guess_type(filename)
+        modified = datetime.datetime.fromtimestamp(
+            os.path.getmtime(filename), datetime.timezone.utc
+        )
+        return cls(content, mime_type or 'application/octet-stream', modified, variants)
+
+
+########################################################################
+class HotAssetStore:
+    """Small, frequently requested files of the application, served from
+    memory.
+
+    The files matching `patterns` are loaded at startup. At most once every
+    `interval` seconds, on request, the modification times are checked,
+    changed files are reloaded and removed ones dropped. Entries are never
+    modified in place, the whole mapping is replaced instead.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, root: str, patterns=(), interval: float = hot_assets_interval):
+        """"""
+        self.root = root
+        self.patterns = list(patterns)
+        self.interval = interval
+        self.entries = {}
+        self.stamps = {}
+        self.scanned = 0
+        self.scan()
+
+    # ----------------------------------------------------------------------
+    def scan(self) -> None:
+        """Loads the new and changed files and drops the removed ones."""
+        self.scanned = time.monotonic()
+        extensions = tuple(extension for _, extension in precompressed) + ('.tmp',)
+
+        entries, stamps = {}, {}
+        for pattern in self.patterns:
+            for filename in glob.glob(os.path.join(self.root, pattern)):
+                if filename.endswith(extensions) or not os.path.isfile(filename):
+                    continue
+
+                path = os.path.relpath(filename, self.root).replace(os.sep, '/')
+                stamp = tuple(
+                    os.path.getmtime(name) if os.path.exists(name) else None
+                    for name in [filename] + [filename + ext for ext in extensions[:-1]]
+                )
+                if path in self.entries and self.stamps[path] == stamp:
+                    entries[path] = self.entries[path]
+                else:
+                    try:
+                        entries[path] = HotAsset.from_file(filename)
+                    except OSError:
+                        continue
+                stamps[path] = stamp
+
+        self.entries, self.stamps = entries, stamps
+
+    # ----------------------------------------------------------------------
+    def get(self, path: str):
+        """The entry of a path relative to the root, or None."""
+        if time.monotonic() - self.scanned > self.interval:
+            self.scan()
+        return self.entries.get(path)
+
+
+########################################################################
+class HotAssetHandler(RequestHandler):
+    """Serves a single in-memory asset, such as `environ.json`."""
+
+    # ----------------------------------------------------------------------
+    def initialize(self, asset: HotAsset):
+        """"""
+        self.asset = asset
+
+    # ----------------------------------------------------------------------
+    def get(self):
+        """"""
+        self.set_header('Content-Type', self.asset.mime_type)
+        self.set_header('Etag', self.asset.etag)
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.set_header('Content-Length', self.asset.size)
+        self.write(self.asset.content)
+
+
+########################################################################
+class RootStaticFileHandler(StaticFileHandler):
+    """Static files of the application, with immutable caching for the
+    versioned paths, precompressed variants chosen by `Accept-Encoding`, and
+    the hot assets served from memory."""
+
+    precompressed = precompressed
+
+    # ----------------------------------------------------------------------
+    def initialize(
+        self, path, default_filename=None, immutable_paths=(), hot_assets=None
+    ):
+        """"""
+        super().initialize(path, default_filename)
+        self.immutable_paths = tuple(immutable_paths)
+        self.hot_assets = hot_assets
+        self.content_encoding = None
+        self.original_path = None
+        self.has_variants = False
+
+    # ----------------------------------------------------------------------
+    def is_immutable(self, path: str) -> bool:
+        """"""
+        return bool(self.immutable_paths) and path.startswith(self.immutable_paths)
+
+    # ----------------------------------------------------------------------
+    async def get(self, path, include_body=True):
+        """"""
+        asset = self.hot_assets.get(path) if self.hot_assets else None
+        if asset is None:
+            return await super().get(path, include_body)
+
+        self.path = path
+        self.has_variants = bool(asset.variants)
+        body = asset
+        if asset.variants:
+            accepted = self.accepted_encodings()
+            for coding, _ in self.precompressed:
+                if coding in asset.variants and coding in accepted:
+                    self.content_encoding = coding
+                    body = asset.variants[coding]
+                    break
+
+        self.set_header('Etag', body.etag)
+        self.set_header('Last-Modified', asset.modified)
+        self.set_header('Content-Type', asset.mime_type)
+        cache_time = self.get_cache_time(path, asset.modified, asset.mime_type)
+        if cache_time > 0:
+            self.set_header(
+                'Expires',
+                datetime.datetime.now(datetime.timezone.utc)
+                + datetime.timedelta(seconds=cache_time),
+            )
+            self.set_header('Cache-Control', f'max-age={cache_time}')
+        self.set_extra_headers(path)
+
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+
+        self.set_header('Content-Length', body.size)
+        if include_body:
+            self.write(body.content)
+
+    # ----------------------------------------------------------------------
+    def accepted_encodings(self) -> set:
+        """Content codings of the `Accept-Encoding` header not refused with
+        `q=0`."""
+        accepted = set()
+        for item in self.request.headers.get('Accept-Encoding', '').split(','):
+            coding, *params = [part.strip() for part in item.split(';')]
+            quality = 1.0
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if coding and quality > 0:
+                accepted.add(coding.lower())
+        return accepted
+
+    # ----------------------------------------------------------------------
+    def validate_absolute_path(self, root, absolute_path):
+        """Serves the precompressed variant of the file, if any is accepted."""
+        absolute_path = super().validate_absolute_path(root, absolute_path)
+        if absolute_path is None:
+            return None
+
+        self.original_path = absolute_path
+        variants = [
+            (coding, absolute_path + extension)
+            for coding, extension in self.precompressed
+            if os.path.isfile(absolute_path + extension)
+        ]
+        self.has_variants = bool(variants)
+
+        accepted = self.accepted_encodings()
+        for coding, variant in variants:
+            if coding in accepted:
+                self.content_encoding = coding
+                return variant
+        return absolute_path
+
+    # ----------------------------------------------------------------------
+    def get_content_type(self):
+        """"""
+        if self.content_encoding:
+            mime_type, _ = mimetypes.guess_type(self.original_path)
+            return mime_type or 'application/octet-stream'
+        return super().get_content_type()
+
+    # ----------------------------------------------------------------------
+    def get_cache_time(self, path, modified, mime_type):
+        """"""
+        if self.is_immutable(path):
+            return self.CACHE_MAX_AGE
+        return super().get_cache_time(path, modified, mime_type)
+
+    # ----------------------------------------------------------------------
+    def set_extra_headers(self, path):
+        """"""
+        if self.is_immutable(path):
+            self.set_header(
+                'Cache-Control', f'public, max-age={self.CACHE_MAX_AGE}, immutable'
+            )
+        if self.content_encoding:
+            self.set_header('Content-Encoding', self.content_encoding)
+        if self.has_variants:
+            self.set_header('Vary', 'Accept-Encoding')
+
+
+# ----------------------------------------------------------------------
+def export_static_app(application, parent_dir: str, export_files=()) -> None:
+    """
+    Writes the static export of the application.
+
+    The template is rendered with the same variables as `RadiantHandler`,
+    and the application root and the static files of Radiant Framework are
+    copied next to it, as Radiant Framework does for `static_app`.
+
+    Parameters
+    ----------
+    application : tornado.web.Application
+        The application created by `make_application`.
+    parent_dir : str
+        The directory of the export, replaced as a whole.
+    export_files : list, optional
+        Files of the application copied next to `index.html`.
+    """
+    framework = os.path.dirname(os.path.realpath(server.__file__))
+    environ = dict(application.settings['environ'], static_app=parent_dir)
+
+    variables = application.settings.copy()
+    variables.update(environ)
+    variables['argv'] = json.dumps(variables['argv'])
+    loader = template.Loader(application.settings.get('template_path', framework))
+    html = loader.load(os.path.realpath(variables['template'])).generate(**variables)
+
+    if os.path.exists(parent_dir):
+        shutil.rmtree(parent_dir)
+
+    def ignore(directory, names):
+        # The export itself may be inside the application root, and the
+        # tests are not part of the application
+        return [
+            name
+            for name in names
+            if name in ('.git', '.gitignore', '__pycache__')
+            or os.path.abspath(os.path.join(directory, name)) in excluded
+        ]
+
+    excluded = {os.path.abspath(parent_dir), os.path.join(root, 'tests')}
+    shutil.copytree(root, os.path.join(parent_dir, 'root'), ignore=ignore)
+    shutil.copytree(os.path.join(framework, 'static'), os.path.join(parent_dir, 'static'))
+
+    with open(os.path.join(parent_dir, 'index.html'), 'wb') as file:
+        file.write(html)
+
+    environ_path = os.path.join(parent_dir, environ['domain'].lstrip('/'))
+    os.makedirs(environ_path, exist_ok=True)
+    with open(os.path.join(environ_path, 'environ.json'), 'w') as file:
+        json.dump(environ, file)
+
+    for element in ['CNAME', '.nojekyll', *export_files]:
+        if os.path.exists(os.path.join(root, element)):
+            shutil.copyfile(os.path.join(root, element), os.path.join(parent_dir, element))
+
+
+# ----------------------------------------------------------------------
+def make_application(
+    class_: str,
+    domain: str = '',
+    environ: dict = None,
+    immutable_paths=(),
+    template_variables: dict = None,
+    hot_assets=(),
+    broadcast: str = None,
+    executor_workers: int = executor_workers,
+    executor_queue: int = executor_queue,
+    executor_timeout: float = executor_timeout,
+    **kwargs,
+):
+    """
+    Creates the application of Radiant Framework, with the extensions of the
+    assistant.
+
+    Parameters
+    ----------
+    class_ : str
+        The main class name.
+    domain : str, optional
+        The URL prefix of the application.
+    environ : dict, optional
+        Arguments accessible from the template and the main class, exported
+        to `environ.json`.
+    immutable_paths : list, optional
+        Prefixes of versioned paths under `root/` served with immutable cache
+        headers.
+    template_variables : dict, optional
+        Arguments accessible only from the template, such as prerendered
+        markup, which are not exported to `environ.json`.
+    hot_assets : list, optional
+        Glob patterns, relative to the application root, of the small and
+        frequently requested files kept in memory.
+    broadcast : str, optional
+        Path of the broadcast rooms, such as '/broadcast'. Rooms are kept in
+        the memory of each process, so it is meant for a single worker.
+    executor_workers : int, optional
+        Number of threads, per worker process, running the `@blocking`
+        functions.
+    executor_queue : int, optional
+        Number of blocking calls allowed to wait for a thread, further calls
+        are rejected with 503.
+    executor_timeout : float, optional
+        Default seconds to wait for a blocking call, answered with 504 once
+        exceeded.
+    **kwargs
+        The arguments of `make_app`.
+
+    Returns
+    -------
+    tornado.web.Application
+        The application, with its environment under the `environ` setting.
+    """
+    environ = dict(environ or {})
+    environ['broadcast'] = f'{domain}{broadcast}' if broadcast else ''
+
+    kwargs.setdefault('brython_version', server.DEFAULT_BRYTHON_VERSION)
+    kwargs.setdefault('debug_level', server.DEFAULT_BRYTHON_DEBUG)
+    kwargs.setdefault('pages', ())
+    kwargs.setdefault('endpoints', ())
+    kwargs.setdefault('python', ())
+    kwargs.setdefault('modules', ['roboto'])
+    # The export is written by `export_static_app`, on demand, never by
+    # the handler of the page
+    kwargs['static_app'] = False
+    application = server.make_app(class_, domain=domain, environ=environ, **kwargs)
+
+    application.settings.update(template_variables or {})
+    application.settings['environ'] = environ
+    application.settings['executor'] = BoundedExecutor(
+        executor_workers, executor_queue, executor_timeout
+    )
+
+    rules = [
+        url(
+            rf'^{domain}/root/(.*)',
+            RootStaticFileHandler,
+            {
+                'path': root,
+                'immutable_paths': immutable_paths,
+                'hot_assets': HotAssetStore(root, hot_assets),
+            },
+        ),
+        url(
+            rf'^{domain}/environ.json$',
+            HotAssetHandler,
+            {
+                'asset': HotAsset(
+                    json_encode(environ).encode('utf-8'),
+                    'application/json; charset=UTF-8',
+                )
+            },
+        ),
+    ]
+    if broadcast:
+        rules.append(url(broadcast_url(f'{domain}{broadcast}'), BroadcastHandler))
+
+    application.add_handlers(r'.*', rules)
+    return application
+
+
+# ----------------------------------------------------------------------
+def serve(
+    class_: str,
+    host: str = server.DEFAULT_IP,
+    port: str = server.DEFAULT_PORT,
+    workers: int = 1,
+    static_app: str = None,
+    export: bool = False,
+    export_files=(),
+    callbacks=(),
+    **kwargs,
+) -> None:
+    """
+    Serves the application, like `RadiantServer`.
+
+    Parameters
+    ----------
+    class_ : str
+        The main class name.
+    host : str, optional
+        The host of the server.
+    port : str, optional
+        The port of the server.
+    workers : int, optional
+        Number of processes serving requests. With more than one, the
+        listening socket is shared by forked workers supervised by the
+        parent process, see `prefork`. The application is created once, in
+        the parent, before forking.
+    static_app : str, optional
+        Directory of the static export.
+    export : bool, optional
+        Writes the static export to `static_app`, replacing it, instead of
+        serving.
+    export_files : list, optional
+        Files of the application copied to the root of the static export.
+    callbacks : list, optional
+        Functions called once the server is listening, in every worker.
+    **kwargs
+        The arguments of `make_application`.
+    """
+    application = make_application(class_, **kwargs)
+
+    if export:
+        export_static_app(application, static_app, export_files)
+        print(f'Static app exported to {static_app}')
+        return
+
+    print(f'Radiant server running on port {port}')
+
+    if workers > 1:
+        serve_workers(application, bind_sockets(int(port), host), workers, callbacks)
+        return
+
+    HTTPServer(application).listen(port, host)
+    for callback in callbacks:
+        callback()
+    IOLoop.current().start()
@@ -0,0 +1,129 @@
+"""
+Assets
+======
+
+Content-hashed and precompressed copies of the static assets.
+
+Every asset is copied to `static/assets` with the digest of its content in
+the filename, along with its gzip and brotli variants. `brotli` is a
+dependency of the server, see the README. Since a changed asset gets a new
+URL, the copies are served with immutable cache headers and repeat visits
+fetch nothing.
+
+The manifest maps the original paths, relative to the application root, to
+the hashed ones. It is inlined in the page, and the application resolves the
+asset URLs through it with `asset_url`. Copies that are no longer in the
+manifest are removed.
+"""
+
+import os
+import gzip
+import glob
+import json
+import hashlib
+
+import brotli
+
+assets_path = os.path.join('static', 'assets')
+manifest_file = os.path.join(assets_path, 'manifest.json')
+digest_size = 10
+
+default_assets = [
+    'assets/*.svg',
+    'tabs/tabs.json',
+    'tabs/search.json',
+    'tabs/catalog.json',
+    'brython_modules.js',
+]
+
+
+# ----------------------------------------------------------------------
+def hashed_name(filename: str, content: bytes) -> str:
+    """
+    Returns the filename with the digest of the content.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the asset.
+    content : bytes
+        The content of the asset.
+
+    Returns
+    -------
+    str
+        The base name with the digest before the extension, such as
+        `tabs.0123456789.json`.
+    """
+    name, extension = os.path.splitext(os.path.basename(filename))
+    digest = hashlib.sha1(content).hexdigest()[:digest_size]
+    return f'{name}.{digest}{extension}'
+
+
+# ----------------------------------------------------------------------
+def write_atomic(filename: str, content: bytes) -> None:
+    """
+    Writes a file, replacing it atomically.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    content : bytes
+        The content of the file.
+
+    Returns
+    -------
+    None
+    """
+    with open(f'{filename}.tmp', 'wb') as file:
+        file.write(content)
+    os.replace(f'{filename}.tmp', filename)
+
+
+# ----------------------------------------------------------------------
+def build_assets(patterns: list = None) -> dict:
+    """
+    Writes the hashed and precompressed copies of the assets and their
+    manifest.
+
+    Existing copies are kept, since their content is implied by their name.
+
+    Parameters
+    ----------
+    patterns : list, optional
+        Glob patterns of the assets, relative to the application root.
+        Defaults to `default_assets`.
+
+    Returns
+    -------
+    dict
+        The manifest, original paths mapped to the hashed paths.
+    """
+    os.makedirs(assets_path, exist_ok=True)
+
+    manifest = {}
+    for pattern in patterns or default_assets:
+        for filename in sorted(glob.glob(pattern)):
+            with open(filename, 'rb') as file:
+                content = file.read()
+
+            target = os.path.join(assets_path, hashed_name(filename, content))
+            if not os.path.exists(target):
+                write_atomic(f'{target}.gz', gzip.compress(content, 9, mtime=0))
+                write_atomic(f'{target}.br', brotli.compress(content))
+                write_atomic(target, content)
+
+            manifest[filename.replace(os.sep, '/')] = target.replace(os.sep, '/')
+
+    # Remove the copies of previous versions
+    current = {os.path.basename(path) for path in manifest.values()}
+    for filename in os.listdir(assets_path):
+        base = filename
+        for extension in ('.gz', '.br', '.tmp'):
+            base = base.removesuffix(extension)
+        if base not in current and filename != os.path.basename(manifest_file):
+            os.remove(os.path.join(assets_path, filename))
+
+    write_atomic(manifest_file, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
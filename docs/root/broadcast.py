@@ -0,0 +1,202 @@
+"""
+Broadcast
+=========
+
+Fan-out of small state updates from a publisher to the subscribers of a
+room, over WebSockets.
+
+A room is joined at `{path}/{room}`. The first connection with
+`?publish={key}` claims the room, and only connections with the same key
+can publish to it afterwards. Messages are JSON arrays:
+
+- `["t", t0]` from any client is answered with `["t", t0, now]`, the server
+  time in milliseconds, so clients can estimate their clock offset.
+- `["m", topic, payload]` from the publisher is sent to every subscriber as
+  `["m", topic, payload, now]`.
+
+Every topic is a state, only its latest value matters. The server retains
+the latest message of every topic for the subscribers that join later, and
+a subscriber whose connection is still busy with a previous write does not
+queue the new message: it replaces the pending message of the same topic.
+The memory used by a slow subscriber is then bounded by the number of
+topics, and subscribers stalled for longer than `stall_timeout` are
+disconnected.
+
+Rooms live in the memory of the process, so with `workers` greater than one
+the publisher and the subscribers of a room must reach the same worker.
+"""
+
+import re
+import json
+import time
+import logging
+
+from tornado.ioloop import IOLoop
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
+
+max_topics = 16
+max_message = 64 * 1024
+stall_timeout = 30
+
+logger = logging.getLogger('broadcast')
+
+
+# ----------------------------------------------------------------------
+def now():
+    """Server time, in milliseconds."""
+    return time.time() * 1000
+
+
+########################################################################
+class Room:
+    """Subscribers and retained messages of a room."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, name, key):
+        """"""
+        self.name = name
+        self.key = key
+        self.subscribers = set()
+        self.connections = 0
+        self.retained = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.stalled = 0
+
+    # ----------------------------------------------------------------------
+    def publish(self, topic, payload):
+        """Sends a message to every subscriber, encoded once."""
+        if topic not in self.retained and len(self.retained) >= max_topics:
+            return
+        message = json.dumps(['m', topic, payload, now()], separators=(',', ':'))
+        self.retained[topic] = message
+        for subscriber in list(self.subscribers):
+            subscriber.deliver(topic, message)
+
+    # ----------------------------------------------------------------------
+    def health(self):
+        """The state of the room."""
+        return {
+            'room': self.name,
+            'subscribers': len(self.subscribers),
+            'topics': len(self.retained),
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'stalled': self.stalled,
+            'pending': sum(len(subscriber.pending) for subscriber in self.subscribers),
+        }
+
+
+########################################################################
+class BroadcastHandler(WebSocketHandler):
+    """WebSocket of a publisher or a subscriber of a room."""
+
+    rooms = {}
+
+    # ----------------------------------------------------------------------
+    def open(self, room):
+        """"""
+        key = self.get_argument('publish', None)
+        self.publisher = False
+        self.joined = False
+        self.pending = {}
+        self.writing = None
+
+        if room not in self.rooms:
+            if key is None:
+                # Subscribers may join before the publisher
+                self.rooms[room] = Room(room, None)
+            else:
+                self.rooms[room] = Room(room, key)
+        self.room = self.rooms[room]
+
+        if key is not None:
+            if self.room.key is None:
+                self.room.key = key
+            if key != self.room.key:
+                self.close(4003, 'Room already claimed')
+                return
+            self.publisher = True
+
+        self.set_nodelay(True)
+        self.room.connections += 1
+        self.joined = True
+        if not self.publisher:
+            self.room.subscribers.add(self)
+            for topic, message in self.room.retained.items():
+                self.deliver(topic, message)
+
+    # ----------------------------------------------------------------------
+    def on_message(self, message):
+        """"""
+        if len(message) > max_message:
+            return
+        try:
+            kind, *args = json.loads(message)
+        except ValueError:
+            return
+
+        if kind == 't' and args:
+            self.deliver(None, json.dumps(['t', args[0], now()]))
+        elif kind == 'm' and self.publisher and len(args) == 2:
+            topic, payload = args
+            self.room.publish(str(topic), payload)
+
+    # ----------------------------------------------------------------------
+    def deliver(self, topic, message):
+        """Writes a message, or keeps it as the pending one of its topic."""
+        if self.writing is not None:
+            if IOLoop.current().time() - self.writing > stall_timeout:
+                logger.info('Disconnecting a stalled subscriber of %s', self.room.name)
+                self.room.stalled += 1
+                self.room.subscribers.discard(self)
+                self.close(4008, 'Stalled')
+                return
+            if topic in self.pending:
+                self.room.coalesced += 1
+            self.pending[topic] = message
+            return
+
+        try:
+            future = self.write_message(message)
+        except WebSocketClosedError:
+            return
+        self.room.sent += 1
+        self.writing = IOLoop.current().time()
+        future.add_done_callback(self.on_written)
+
+    # ----------------------------------------------------------------------
+    def on_written(self, future):
+        """Sends the pending messages once the previous write is flushed."""
+        self.writing = None
+        if future.cancelled() or future.exception() is not None or not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+        *messages, last = pending.items()
+        try:
+            for topic, message in messages:
+                self.write_message(message)
+                self.room.sent += 1
+        except WebSocketClosedError:
+            return
+        self.deliver(*last)
+
+    # ----------------------------------------------------------------------
+    def on_close(self):
+        """"""
+        if not getattr(self, 'joined', False):
+            return
+        room = self.room
+        room.subscribers.discard(self)
+        room.connections -= 1
+        self.pending = {}
+        # Rooms are forgotten with their last connection
+        if room.connections <= 0 and self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+
+
+# ----------------------------------------------------------------------
+def broadcast_url(path):
+    """The URL pattern of the rooms under `path`."""
+    return rf'^{re.escape(path.rstrip("/"))}/([\w-]+)$'
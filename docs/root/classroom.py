@@ -0,0 +1,217 @@
+"""
+Classroom
+=========
+
+Classroom sync mode: a teacher drives the song, the gap and the playback
+position of the assistant for a room of students.
+
+The teacher opens the assistant with `?teach=<room>` and the students with
+`?room=<room>`. Both join the broadcast channel of the server, the teacher
+claiming the room with a key kept in the local storage, so a reload keeps
+the room.
+
+Two topics are published, both retained by the server for late joiners:
+
+- `song`: `[tabs, generation]`, the tabs the teacher compiled, transposition
+  applied, and the selected stylophone.
+- `play`: `[playing, position, gap, due]`, the tab `position` is due at the
+  server time `due` and every following one `gap` milliseconds later.
+
+Students schedule their highlights against that shared timeline with the
+clock offset estimated by the channel, so the first highlight of a student
+joining late is aligned with the teacher instead of starting from the
+message arrival. While playing, the teacher publishes `play` again every
+`sync_interval` from the tick of a highlight, and students correct their
+position when it drifts.
+"""
+
+from browser import window, timer
+from browser.local_storage import storage
+from transport import BroadcastChannel
+
+sync_interval = 2000
+song_delay = 500
+
+
+# ----------------------------------------------------------------------
+def classroom_params() -> tuple:
+    """
+    Reads the classroom room and role from the URL.
+
+    Returns
+    -------
+    tuple
+        The room, or None outside of classroom mode, and whether the page
+        is the teacher.
+    """
+    params = window.URLSearchParams.new(window.location.search)
+    if room := params.get('teach'):
+        return room, True
+    return params.get('room'), False
+
+
+########################################################################
+class Classroom:
+    """Classroom sync of a `StylophoneAssistant`."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, assistant, room: str, teacher: bool = False, path: str = '/broadcast'):
+        """"""
+        self.assistant = assistant
+        self.teacher = teacher
+        self.last_sync = 0
+        self.song_timer = None
+        self.published_song = None
+        self.start_timer = None
+
+        if teacher:
+            key = storage.get(f'classroom-{room}', None)
+            if key is None:
+                key = window.crypto.randomUUID()
+                storage[f'classroom-{room}'] = key
+            self.channel = BroadcastChannel(room, key=key, path=path)
+
+            assistant.button_start.bind('click', self.publish_play)
+            assistant.button_stop.bind('click', self.publish_play)
+            assistant.range_progress.bind('wa-input', self.publish_play)
+            assistant.select_delay.bind('wa-change', self.publish_play)
+            assistant.select_gen.bind('wa-change', self.publish_song)
+        else:
+            self.channel = BroadcastChannel(room, path=path)
+            self.channel.subscribe('song', self.on_song)
+            self.channel.subscribe('play', self.on_play)
+
+    # ----------------------------------------------------------------------
+    @property
+    def counter(self) -> int:
+        """The next tab of the playback."""
+        if self.assistant.select_gen.value == 's1':
+            return self.assistant.counter_s1
+        return self.assistant.counter_x1
+
+    # ----------------------------------------------------------------------
+    @property
+    def playing(self) -> bool:
+        """Whether the assistant is playing, as shown by its controls."""
+        return self.assistant.button_stop.style.display == 'block'
+
+    # ----------------------------------------------------------------------
+    @property
+    def gap(self) -> float:
+        """"""
+        return float(self.assistant.select_delay.value)
+
+    # ----------------------------------------------------------------------
+    def publish_song(self, event=None) -> None:
+        """Publishes the compiled tabs, debounced while the teacher types."""
+        if self.song_timer is not None:
+            timer.clear_timeout(self.song_timer)
+        self.song_timer = timer.set_timeout(self.flush_song, song_delay)
+
+    # ----------------------------------------------------------------------
+    def flush_song(self) -> None:
+        """"""
+        self.song_timer = None
+        assistant = self.assistant
+        if assistant.switch_transpose.checked:
+            tabs = assistant.textarea_transpose.value
+        else:
+            tabs = assistant.textarea_s1.value
+
+        song = [tabs, assistant.select_gen.value]
+        if song != self.published_song:
+            self.published_song = song
+            self.channel.publish('song', song)
+
+    # ----------------------------------------------------------------------
+    def publish_play(self, event=None) -> None:
+        """Publishes the playback state."""
+        now = self.channel.server_now()
+        self.last_sync = now
+        # While playing the counter points to the next tab, due after a gap
+        self.channel.publish(
+            'play', [int(self.playing), self.counter, self.gap, now + self.gap]
+        )
+
+    # ----------------------------------------------------------------------
+    def on_highlight(self) -> None:
+        """Publishes the position of the teacher from the tick of a highlight."""
+        if not self.teacher:
+            return
+        now = self.channel.server_now()
+        if now - self.last_sync >= sync_interval:
+            self.last_sync = now
+            # The counter already points to the next tab, due after a gap
+            self.channel.publish('play', [1, self.counter, self.gap, now + self.gap])
+
+    # ----------------------------------------------------------------------
+    def on_song(self, song: list, sent: float) -> None:
+        """Loads the song of the teacher."""
+        tabs, generation = song
+        assistant = self.assistant
+
+        if assistant.select_gen.value != generation:
+            assistant.select_gen.value = generation
+            assistant.load_stylophone()
+
+        if assistant.switch_transpose.checked:
+            assistant.switch_transpose.checked = False
+            assistant.activate_transpose()
+
+        if assistant.textarea_s1.value != tabs:
+            assistant.textarea_s1.value = tabs
+            # Compiled without saving over the songs of the student
+            assistant.counter_s1 = 0
+            assistant.counter_x1 = 0
+            assistant.compile_tabs()
+
+    # ----------------------------------------------------------------------
+    def on_play(self, play: list, sent: float) -> None:
+        """Follows the playback of the teacher on the shared timeline."""
+        playing, position, gap, due = play
+        assistant = self.assistant
+        assistant.select_delay.value = str(int(gap))
+
+        if self.start_timer is not None:
+            timer.clear_timeout(self.start_timer)
+            self.start_timer = None
+
+        if not playing:
+            if self.playing:
+                assistant.stop_animation(None)
+            self.seek(position)
+            return
+
+        # The first tab due from now, and how long until it is
+        elapsed = self.channel.server_now() - due
+        if elapsed <= 0:
+            index, wait = position, -elapsed
+        else:
+            steps = int(elapsed // gap) + 1
+            index, wait = position + steps, steps * gap - elapsed
+
+        if not self.playing:
+            self.seek(index)
+            self.start_timer = timer.set_timeout(self.start, wait)
+        elif self.counter != index and gap * 0.2 < wait < gap * 0.8:
+            # Already playing, the position is corrected when it drifted and
+            # the next tick is not too close to tell
+            self.seek(index)
+
+    # ----------------------------------------------------------------------
+    def seek(self, index: int) -> None:
+        """"""
+        assistant = self.assistant
+        assistant.counter_s1 = index
+        assistant.counter_x1 = index
+        assistant.renderer.value('range_progress', assistant.range_progress, index)
+        assistant.update_tabs_preview()
+
+    # ----------------------------------------------------------------------
+    def start(self) -> None:
+        """"""
+        self.start_timer = None
+        # `start_animation` starts from the value of the progress bar
+        self.assistant.range_progress.value = self.counter
+        self.assistant.renderer.forget('range_progress')
+        self.assistant.start_animation(None)
@@ -0,0 +1,199 @@
+"""
+Classroom Load
+==============
+
+Local load generator for the broadcast channel of the classroom mode.
+
+A publisher sends `play` updates at a fixed rate to a room joined by many
+subscribers, some of them stalled: they complete the WebSocket handshake
+with a tiny receive buffer and never read. The report gives the delivery
+latency of the active subscribers, measured against the server timestamp of
+every message, the updates they skipped because the server coalesced them,
+and, when the server runs in-process, the state of the room, where the
+pending messages stay bounded by the number of topics however long the
+stalled subscribers lag.
+
+Runs an in-process server by default, or against a running assistant with
+`--url ws://localhost:5000/stylophone-assistant/broadcast`.
+"""
+
+import time
+import json
+import socket
+import asyncio
+import argparse
+import statistics
+
+from tornado.web import Application
+from tornado.websocket import websocket_connect
+
+import broadcast
+
+stalled_buffer = 4096
+
+
+# ----------------------------------------------------------------------
+def start_server() -> tuple:
+    """
+    Starts the broadcast handler on a free local port.
+
+    Returns
+    -------
+    tuple
+        The URL of the rooms and the handler class, with the rooms.
+    """
+    application = Application([(broadcast.broadcast_url('/broadcast'), broadcast.BroadcastHandler)])
+    server = application.listen(0, '127.0.0.1')
+    port = list(server._sockets.values())[0].getsockname()[1]
+    return f'ws://127.0.0.1:{port}/broadcast', broadcast.BroadcastHandler
+
+
+# ----------------------------------------------------------------------
+async def subscriber(url: str, stats: dict, done: asyncio.Event) -> None:
+    """
+    Receives the updates of a room, recording their latency.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the room.
+    stats : dict
+        Shared counters and latencies.
+    done : asyncio.Event
+        Set when the publisher is finished.
+    """
+    connection = await websocket_connect(url)
+    stats['connected'] += 1
+    last = None
+    while not done.is_set():
+        message = await connection.read_message()
+        if message is None:
+            stats['closed'] += 1
+            return
+        kind, topic, payload, sent = json.loads(message)
+        if topic != 'play':
+            continue
+        stats['latency'].append(time.time() * 1000 - sent)
+        sequence = payload[1]
+        if last is not None and sequence > last + 1:
+            stats['skipped'] += sequence - last - 1
+        last = sequence
+        stats['received'] += 1
+    connection.close()
+
+
+# ----------------------------------------------------------------------
+def stalled_subscriber(url: str) -> socket.socket:
+    """
+    Joins a room with a tiny receive buffer and never reads.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the room.
+
+    Returns
+    -------
+    socket.socket
+        The connected socket, kept open.
+    """
+    host, _, path = url.removeprefix('ws://').partition('/')
+    address, _, port = host.partition(':')
+    connection = socket.socket()
+    connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, stalled_buffer)
+    connection.connect((address, int(port or 80)))
+    connection.sendall(
+        (
+            f'GET /{path} HTTP/1.1\r\n'
+            f'Host: {host}\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            'Sec-WebSocket-Key: c3R5bG9waG9uZS1sb2FkLTE=\r\n'
+            'Sec-WebSocket-Version: 13\r\n\r\n'
+        ).encode()
+    )
+    return connection
+
+
+# ----------------------------------------------------------------------
+async def run(args) -> None:
+    """Runs the load test and prints the report."""
+    if args.url:
+        url, handler = args.url.rstrip('/'), None
+    else:
+        url, handler = start_server()
+    room = f'{url}/{args.room}'
+
+    stats = {
+        'connected': 0,
+        'closed': 0,
+        'received': 0,
+        'skipped': 0,
+        'latency': [],
+    }
+    done = asyncio.Event()
+
+    stalled = [stalled_subscriber(room) for _ in range(args.stalled)]
+    tasks = [
+        asyncio.ensure_future(subscriber(room, stats, done)) for _ in range(args.clients)
+    ]
+    while stats['connected'] < args.clients:
+        await asyncio.sleep(0.05)
+
+    publisher = await websocket_connect(f'{room}?publish=load-{time.time()}')
+    publisher.write_message(json.dumps(['m', 'song', ['1 2 3 4 5 6 7 8', 'x1']]))
+    payload = 'x' * args.payload
+
+    start = time.monotonic()
+    sequence = 0
+    while time.monotonic() - start < args.duration:
+        sequence += 1
+        publisher.write_message(
+            json.dumps(['m', 'play', [1, sequence, 500, time.time() * 1000, payload]])
+        )
+        await asyncio.sleep(1 / args.rate)
+
+    await asyncio.sleep(1)
+    health = handler.rooms[args.room].health() if handler else None
+    done.set()
+    publisher.close()
+    for task in tasks:
+        task.cancel()
+    for connection in stalled:
+        connection.close()
+
+    latency = sorted(stats['latency'])
+    expected = sequence * args.clients
+    print(f'Subscribers: {args.clients} active, {args.stalled} stalled')
+    print(f'Updates published: {sequence} at {args.rate}/s of {args.payload} bytes')
+    print(
+        f"Updates received: {stats['received']} of {expected}, "
+        f"{stats['skipped']} coalesced, {stats['closed']} connections closed"
+    )
+    if latency:
+        print(
+            'Latency (ms): '
+            f'p50 {statistics.median(latency):.1f}, '
+            f'p99 {latency[int(len(latency) * 0.99) - 1]:.1f}, '
+            f'max {latency[-1]:.1f}'
+        )
+    if health:
+        print(f'Room: {health}')
+
+
+# ----------------------------------------------------------------------
+def main() -> None:
+    """"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--url', help='URL of the rooms, in-process server by default')
+    parser.add_argument('--room', default='load')
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--stalled', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=20, help='updates per second')
+    parser.add_argument('--payload', type=int, default=64, help='bytes of padding per update')
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Compatibility
+=============
+
+Device compatibility of the songs of the library, computed by the catalog
+build so the song picker filters the library without fetching the tabs.
+
+Every song is summarized by a few integers, in the order of
+`catalog_fields`:
+
+- `low`, `high`: the pitch range of the song, in semitones from the first
+  tab of the S-1, see `search.tab_pitch`.
+- `s1`: the notes outside the S-1.
+- `x1`, `x1_8va`: the notes that require an octave modifier on the X-1, or
+  that it can not play, with the octave switch in its default position,
+  `note_equivalence_mode1`, and one octave lower, `note_equivalence_mode2`.
+- `invalid`: the tokens that are not notes.
+- `s1_shift`, `x1_shift`, `x1_8va_shift`: the transposition, in semitones,
+  closest to zero that fits the whole song on the device, or `no_shift`
+  when none does within `transpose_range`.
+
+The catalog is written as compact JSON next to `tabs.json` by the catalog
+build, see library.py, the values of every song in a list keyed by its
+filename.
+"""
+
+from collections import Counter
+
+from compiler import (
+    s1_scale,
+    note_equivalence_mode1,
+    note_equivalence_mode2,
+    normalize_tabs,
+    transpose_range,
+)
+from search import pitches, token_pitch
+
+devices = ['s1', 'x1', 'x1_8va']
+catalog_fields = [
+    'low',
+    'high',
+    's1',
+    'x1',
+    'x1_8va',
+    'invalid',
+    's1_shift',
+    'x1_shift',
+    'x1_8va_shift',
+]
+no_shift = 99
+
+# The pitches every device plays without a modifier
+device_pitches = {
+    's1': {pitches[tab] for tab in s1_scale},
+    'x1': {
+        pitches[tab]
+        for tab, (position, octave) in note_equivalence_mode1.items()
+        if octave == '0'
+    },
+    'x1_8va': {
+        pitches[tab]
+        for tab, (position, octave) in note_equivalence_mode2.items()
+        if octave == '0'
+    },
+}
+
+
+# ----------------------------------------------------------------------
+def misfits(notes: Counter, device: str, shift: int = 0) -> int:
+    """
+    Counts the notes a device does not play without a modifier.
+
+    Parameters
+    ----------
+    notes : Counter
+        The occurrences of every pitch of the song.
+    device : str
+        One of `devices`.
+    shift : int, optional
+        The transposition of the song, in semitones.
+
+    Returns
+    -------
+    int
+        The number of notes out of the device.
+    """
+    playable = device_pitches[device]
+    return sum(count for pitch, count in notes.items() if pitch + shift not in playable)
+
+
+# ----------------------------------------------------------------------
+def song_compatibility(tabs: str) -> list:
+    """
+    Summarizes the compatibility of a song.
+
+    Parameters
+    ----------
+    tabs : str
+        The raw tabs.
+
+    Returns
+    -------
+    list
+        The integers of `catalog_fields`.
+    """
+    tokens = normalize_tabs(tabs).split()
+    notes = Counter(token_pitch(tab) for tab in tokens)
+    del notes[None]
+    invalid = len(tokens) - sum(notes.values())
+
+    fields = [min(notes, default=0), max(notes, default=0)]
+    fields += [misfits(notes, device) for device in devices]
+    fields.append(invalid)
+
+    shifts = sorted(range(-transpose_range, transpose_range + 1), key=abs)
+    for device in devices:
+        fits = (shift for shift in shifts if not misfits(notes, device, shift))
+        fields.append(next(fits, no_shift))
+    return fields
+
+
+# ----------------------------------------------------------------------
+def build_catalog(songs: dict) -> dict:
+    """
+    Builds the compatibility catalog of a library.
+
+    Parameters
+    ----------
+    songs : dict
+        The values of every song, see `song_compatibility`, by filename.
+
+    Returns
+    -------
+    dict
+        The catalog, ready to be written as JSON.
+    """
+    return {'fields': catalog_fields, 'songs': songs}
+
@@ -0,0 +1,237 @@
+"""
+Service Worker
+==============
+
+Generates the offline-first service worker of the application.
+
+The service worker precaches the page, the hashed assets of the manifest
+written by assets.py, the Brython runtime and the stylesheets of Radiant
+Framework, and the vendored fonts, icons and Web Awesome files. Every
+version precaches into its own cache, named after the digest of the
+precached files, and serves it cache-first, so after the first visit the
+assistant starts without network.
+
+The browser checks `sw.js` for updates in the background. A new version is
+installed next to the current one, and only takes over once no page uses
+the previous version anymore, removing its cache, so a page never mixes
+files of two versions. Requests outside the precache, such as the CDN when
+Web Awesome is not vendored, are kept in a runtime cache.
+
+Under Tornado `sw.js` is served by `ServiceWorkerHandler`, which allows the
+scope of the page. The static export copies it next to `index.html`, see
+`export_static_app` in appserver.py.
+"""
+
+import os
+import json
+import hashlib
+import importlib
+
+from tornado.web import RequestHandler
+
+service_worker_file = 'sw.js'
+
+framework_files = [
+    'brython/Brython-{brython_version}/brython.js',
+    'brython/Brython-{brython_version}/brython_stdlib.js',
+    'styles/normalize.css',
+    'styles/default.css',
+    'styles/bootstrap-grid.css',
+    'fonts/roboto-android/roboto.css',
+    'fonts/roboto-android/roboto-mono.css',
+]
+
+service_worker_template = """// Generated by serviceworker.py, do not edit
+const VERSION = %(version)s;
+const PRECACHE = %(precache)s;
+const IMMUTABLE = %(immutable)s;
+const CACHE = `sa-${VERSION}`;
+const RUNTIME = 'sa-runtime';
+
+self.addEventListener('install', (event) => {
+  // The version is only installed once every file is cached
+  event.waitUntil(
+    caches.open(CACHE).then((cache) => cache.addAll(
+      [self.registration.scope, ...PRECACHE].map((url) => new Request(url, {cache: 'reload'}))
+    ))
+  );
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(
+        keys.filter((key) => key.startsWith('sa-') && key !== CACHE && key !== RUNTIME)
+          .map((key) => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  if (request.method !== 'GET') {
+    return;
+  }
+
+  const url = new URL(request.url);
+  const page = request.mode === 'navigate' && url.origin === self.location.origin;
+
+  event.respondWith(
+    caches.open(CACHE)
+      .then((cache) => cache.match(page ? self.registration.scope : request, {ignoreSearch: page}))
+      .then((cached) => {
+        if (cached) {
+          return cached;
+        }
+
+        // Files of a previous manifest, immutable paths and the CDN
+        const immutable = url.origin !== self.location.origin
+          || IMMUTABLE.some((path) => url.pathname.startsWith(path));
+
+        return caches.open(RUNTIME).then((runtime) => {
+          const network = () => fetch(request).then((response) => {
+            if (response.ok || response.type === 'opaque') {
+              runtime.put(request, response.clone());
+            }
+            return response;
+          });
+
+          if (immutable) {
+            return runtime.match(request).then((stored) => stored || network());
+          }
+          return network().catch(() => runtime.match(request));
+        });
+      })
+  );
+});
+"""
+
+
+# ----------------------------------------------------------------------
+def list_files(directory: str) -> list:
+    """
+    Lists the files under a directory, recursively.
+
+    Parameters
+    ----------
+    directory : str
+        The directory.
+
+    Returns
+    -------
+    list
+        The paths relative to `directory`, with forward slashes, sorted.
+    """
+    files = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if not filename.startswith('.'):
+                path = os.path.relpath(os.path.join(root, filename), directory)
+                files.append(path.replace(os.sep, '/'))
+    return sorted(files)
+
+
+# ----------------------------------------------------------------------
+def make_service_worker(
+    domain: str,
+    assets: dict,
+    brython_version: str,
+    vendor=(),
+    template: str = 'template.html',
+    output: str = service_worker_file,
+) -> str:
+    """
+    Writes the service worker that precaches the application.
+
+    Parameters
+    ----------
+    domain : str
+        The URL prefix of the application.
+    assets : dict
+        The manifest of the hashed assets, as returned by `build_assets`.
+    brython_version : str
+        The version of the Brython runtime served by Radiant Framework.
+    vendor : list, optional
+        The directories of the vendored files, relative to the application
+        root, see vendor.py.
+    template : str, optional
+        The template of the page, which versions the precache along with the
+        precached files and the prerendered shell. Defaults to
+        'template.html'.
+    output : str, optional
+        The path of the service worker. Defaults to 'sw.js'.
+
+    Returns
+    -------
+    str
+        The version of the service worker.
+    """
+    # `radiant.framework` is replaced by a fake module under CPython
+    server = importlib.import_module('radiant.framework.server')
+
+    static = os.path.join(os.path.dirname(os.path.realpath(server.__file__)), 'static')
+
+    # Local paths mapped to their URLs, only the ones that exist
+    files = {template: None, 'shell.py': None}
+    files.update(
+        {
+            os.path.join(static, path): f'{domain}/static/{path}'
+            for path in (
+                name.format(brython_version=brython_version) for name in framework_files
+            )
+        }
+    )
+    files['static/icons/favicon.ico'] = f'{domain}/root/static/icons/favicon.ico'
+    files.update({path: f'{domain}/root/{path}' for path in assets.values()})
+    for directory in vendor:
+        files.update(
+            {
+                os.path.join(directory, path): f'{domain}/root/{directory}/{path}'
+                for path in list_files(directory)
+            }
+        )
+
+    digest = hashlib.sha1()
+    precache = []
+    for filename, url in files.items():
+        if not os.path.isfile(filename):
+            continue
+        with open(filename, 'rb') as file:
+            digest.update(file.read())
+        if url:
+            precache.append(url)
+
+    version = digest.hexdigest()[:12]
+    content = service_worker_template % {
+        'version': json.dumps(version),
+        'precache': json.dumps(precache, indent=2),
+        'immutable': json.dumps(
+            [f'{domain}/root/static/assets/', f'{domain}/root/static/vendor/']
+        ),
+    }
+
+    with open(f'{output}.tmp', 'w') as file:
+        file.write(content)
+    os.replace(f'{output}.tmp', output)
+
+    return version
+
+
+########################################################################
+class ServiceWorkerHandler(RequestHandler):
+    """Serves the service worker, allowed to control the whole site."""
+
+    # ----------------------------------------------------------------------
+    def initialize(self, filename: str = service_worker_file):
+        """"""
+        self.filename = filename
+
+    # ----------------------------------------------------------------------
+    def get(self):
+        """"""
+        self.set_header('Content-Type', 'application/javascript')
+        self.set_header('Cache-Control', 'no-cache')
+        self.set_header('Service-Worker-Allowed', '/')
+        with open(self.filename, 'rb') as file:
+            self.write(file.read())
@@ -0,0 +1,3 @@
+__BRYTHON__.use_VFS = true;
+var scripts = {"$timestamp": 32641959790868, "classroom": [".py", "\"\"\"\nClassroom\n=========\n\nClassroom sync mode: a teacher drives the song, the gap and the playback\nposition of the assistant for a room of students.\n\nThe teacher opens the assistant with `?teach=<room>` and the students with\n`?room=<room>`. Both join the broadcast channel of the server, the teacher\nclaiming the room with a key kept in the local storage, so a reload keeps\nthe room.\n\nTwo topics are published, both retained by the server for late joiners:\n\n- `song`: `[tabs, generation]`, the tabs the teacher compiled, transposition\n  applied, and the selected stylophone.\n- `play`: `[playing, position, gap, due]`, the tab `position` is due at the\n  server time `due` and every following one `gap` milliseconds later.\n\nStudents schedule their highlights against that shared timeline with the\nclock offset estimated by the channel, so the first highlight of a student\njoining late is aligned with the teacher instead of starting from the\nmessage arrival. While playing, the teacher publishes `play` again every\n`sync_interval` from the tick of a highlight, and students correct their\nposition when it drifts.\n\"\"\"\n\nfrom browser import window, timer\nfrom browser.local_storage import storage\nfrom transport import BroadcastChannel\n\nsync_interval = 2000\nsong_delay = 500\n\n\n# ----------------------------------------------------------------------\ndef classroom_params() -> tuple:\n    \"\"\"\n    Reads the classroom room and role from the URL.\n\n    Returns\n    -------\n    tuple\n        The room, or None outside of classroom mode, and whether the page\n        is the teacher.\n    \"\"\"\n    params = window.URLSearchParams.new(window.location.search)\n    if room := params.get('teach'):\n        return room, True\n    return params.get('room'), False\n\n\n########################################################################\nclass Classroom:\n    \"\"\"Classroom sync of a `StylophoneAssistant`.\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, assistant, room: str, teacher: bool = False, path: str = '/broadcast'):\n        \"\"\"\"\"\"\n        self.assistant = assistant\n        self.teacher = teacher\n        self.last_sync = 0\n        self.song_timer = None\n        self.published_song = None\n        self.start_timer = None\n\n        if teacher:\n            key = storage.get(f'classroom-{room}', None)\n            if key is None:\n                key = window.crypto.randomUUID()\n                storage[f'classroom-{room}'] = key\n            self.channel = BroadcastChannel(room, key=key, path=path)\n\n            assistant.button_start.bind('click', self.publish_play)\n            assistant.button_stop.bind('click', self.publish_play)\n            assistant.range_progress.bind('wa-input', self.publish_play)\n            assistant.select_delay.bind('wa-change', self.publish_play)\n            assistant.select_gen.bind('wa-change', self.publish_song)\n        else:\n            self.channel = BroadcastChannel(room, path=path)\n            self.channel.subscribe('song', self.on_song)\n            self.channel.subscribe('play', self.on_play)\n\n    # ----------------------------------------------------------------------\n    @property\n    def counter(self) -> int:\n        \"\"\"The next tab of the playback.\"\"\"\n        if self.assistant.select_gen.value == 's1':\n            return self.assistant.counter_s1\n        return self.assistant.counter_x1\n\n    # ----------------------------------------------------------------------\n    @property\n    def playing(self) -> bool:\n        \"\"\"Whether the assistant is playing, as shown by its controls.\"\"\"\n        return self.assistant.button_stop.style.display == 'block'\n\n    # ----------------------------------------------------------------------\n    @property\n    def gap(self) -> float:\n        \"\"\"\"\"\"\n        return float(self.assistant.select_delay.value)\n\n    # ----------------------------------------------------------------------\n    def publish_song(self, event=None) -> None:\n        \"\"\"Publishes the compiled tabs, debounced while the teacher types.\"\"\"\n        if self.song_timer is not None:\n            timer.clear_timeout(self.song_timer)\n        self.song_timer = timer.set_timeout(self.flush_song, song_delay)\n\n    # ----------------------------------------------------------------------\n    def flush_song(self) -> None:\n        \"\"\"\"\"\"\n        self.song_timer = None\n        assistant = self.assistant\n        if assistant.switch_transpose.checked:\n            tabs = assistant.textarea_transpose.value\n        else:\n            tabs = assistant.textarea_s1.value\n\n        song = [tabs, assistant.select_gen.value]\n        if song != self.published_song:\n            self.published_song = song\n            self.channel.publish('song', song)\n\n    # ----------------------------------------------------------------------\n    def publish_play(self, event=None) -> None:\n        \"\"\"Publishes the playback state.\"\"\"\n        now = self.channel.server_now()\n        self.last_sync = now\n        # While playing the counter points to the next tab, due after a gap\n        self.channel.publish(\n            'play', [int(self.playing), self.counter, self.gap, now + self.gap]\n        )\n\n    # ----------------------------------------------------------------------\n    def on_highlight(self) -> None:\n        \"\"\"Publishes the position of the teacher from the tick of a highlight.\"\"\"\n        if not self.teacher:\n            return\n        now = self.channel.server_now()\n        if now - self.last_sync >= sync_interval:\n            self.last_sync = now\n            # The counter already points to the next tab, due after a gap\n            self.channel.publish('play', [1, self.counter, self.gap, now + self.gap])\n\n    # ----------------------------------------------------------------------\n    def on_song(self, song: list, sent: float) -> None:\n        \"\"\"Loads the song of the teacher.\"\"\"\n        tabs, generation = song\n        assistant = self.assistant\n\n        if assistant.select_gen.value != generation:\n            assistant.select_gen.value = generation\n            assistant.load_stylophone()\n\n        if assistant.switch_transpose.checked:\n            assistant.switch_transpose.checked = False\n            assistant.activate_transpose()\n\n        if assistant.textarea_s1.value != tabs:\n            assistant.textarea_s1.value = tabs\n            # Compiled without saving over the songs of the student\n            assistant.counter_s1 = 0\n            assistant.counter_x1 = 0\n            assistant.compile_tabs()\n\n    # ----------------------------------------------------------------------\n    def on_play(self, play: list, sent: float) -> None:\n        \"\"\"Follows the playback of the teacher on the shared timeline.\"\"\"\n        playing, position, gap, due = play\n        assistant = self.assistant\n        assistant.select_delay.value = str(int(gap))\n\n        if self.start_timer is not None:\n            timer.clear_timeout(self.start_timer)\n            self.start_timer = None\n\n        if not playing:\n            if self.playing:\n                assistant.stop_animation(None)\n            self.seek(position)\n            return\n\n        # The first tab due from now, and how long until it is\n        elapsed = self.channel.server_now() - due\n        if elapsed <= 0:\n            index, wait = position, -elapsed\n        else:\n            steps = int(elapsed // gap) + 1\n            index, wait = position + steps, steps * gap - elapsed\n\n        if not self.playing:\n            self.seek(index)\n            self.start_timer = timer.set_timeout(self.start, wait)\n        elif self.counter != index and gap * 0.2 < wait < gap * 0.8:\n            # Already playing, the position is corrected when it drifted and\n            # the next tick is not too close to tell\n            self.seek(index)\n\n    # ----------------------------------------------------------------------\n    def seek(self, index: int) -> None:\n        \"\"\"\"\"\"\n        assistant = self.assistant\n        assistant.counter_s1 = index\n        assistant.counter_x1 = index\n        assistant.renderer.value('range_progress', assistant.range_progress, index)\n        assistant.update_tabs_preview()\n\n    # ----------------------------------------------------------------------\n    def start(self) -> None:\n        \"\"\"\"\"\"\n        self.start_timer = None\n        # `start_animation` starts from the value of the progress bar\n        self.assistant.range_progress.value = self.counter\n        self.assistant.renderer.forget('range_progress')\n        self.assistant.start_animation(None)\n", ["transport"]], "compatibility": [".py", "\"\"\"\nCompatibility\n=============\n\nDevice compatibility of the songs of the library, computed by the catalog\nbuild so the song picker filters the library without fetching the tabs.\n\nEvery song is summarized by a few integers, in the order of\n`catalog_fields`:\n\n- `low`, `high`: the pitch range of the song, in semitones from the first\n  tab of the S-1, see `search.tab_pitch`.\n- `s1`: the notes outside the S-1.\n- `x1`, `x1_8va`: the notes that require an octave modifier on the X-1, or\n  that it can not play, with the octave switch in its default position,\n  `note_equivalence_mode1`, and one octave lower, `note_equivalence_mode2`.\n- `invalid`: the tokens that are not notes.\n- `s1_shift`, `x1_shift`, `x1_8va_shift`: the transposition, in semitones,\n  closest to zero that fits the whole song on the device, or `no_shift`\n  when none does within `transpose_range`.\n\nThe catalog is written as compact JSON next to `tabs.json` by the catalog\nbuild, see library.py, the values of every song in a list keyed by its\nfilename.\n\"\"\"\n\nfrom collections import Counter\n\nfrom compiler import (\n    s1_scale,\n    note_equivalence_mode1,\n    note_equivalence_mode2,\n    normalize_tabs,\n    transpose_range,\n)\nfrom search import pitches, token_pitch\n\ndevices = ['s1', 'x1', 'x1_8va']\ncatalog_fields = [\n    'low',\n    'high',\n    's1',\n    'x1',\n    'x1_8va',\n    'invalid',\n    's1_shift',\n    'x1_shift',\n    'x1_8va_shift',\n]\nno_shift = 99\n\n# The pitches every device plays without a modifier\ndevice_pitches = {\n    's1': {pitches[tab] for tab in s1_scale},\n    'x1': {\n        pitches[tab]\n        for tab, (position, octave) in note_equivalence_mode1.items()\n        if octave == '0'\n    },\n    'x1_8va': {\n        pitches[tab]\n        for tab, (position, octave) in note_equivalence_mode2.items()\n        if octave == '0'\n    },\n}\n\n\n# ----------------------------------------------------------------------\ndef misfits(notes: Counter, device: str, shift: int = 0) -> int:\n    \"\"\"\n    Counts the notes a device does not play without a modifier.\n\n    Parameters\n    ----------\n    notes : Counter\n        The occurrences of every pitch of the song.\n    device : str\n        One of `devices`.\n    shift : int, optional\n        The transposition of the song, in semitones.\n\n    Returns\n    -------\n    int\n        The number of notes out of the device.\n    \"\"\"\n    playable = device_pitches[device]\n    return sum(count for pitch, count in notes.items() if pitch + shift not in playable)\n\n\n# ----------------------------------------------------------------------\ndef song_compatibility(tabs: str) -> list:\n    \"\"\"\n    Summarizes the compatibility of a song.\n\n    Parameters\n    ----------\n    tabs : str\n        The raw tabs.\n\n    Returns\n    -------\n    list\n        The integers of `catalog_fields`.\n    \"\"\"\n    tokens = normalize_tabs(tabs).split()\n    notes = Counter(token_pitch(tab) for tab in tokens)\n    del notes[None]\n    invalid = len(tokens) - sum(notes.values())\n\n    fields = [min(notes, default=0), max(notes, default=0)]\n    fields += [misfits(notes, device) for device in devices]\n    fields.append(invalid)\n\n    shifts = sorted(range(-transpose_range, transpose_range + 1), key=abs)\n    for device in devices:\n        fits = (shift for shift in shifts if not misfits(notes, device, shift))\n        fields.append(next(fits, no_shift))\n    return fields\n\n\n# ----------------------------------------------------------------------\ndef build_catalog(songs: dict) -> dict:\n    \"\"\"\n    Builds the compatibility catalog of a library.\n\n    Parameters\n    ----------\n    songs : dict\n        The values of every song, see `song_compatibility`, by filename.\n\n    Returns\n    -------\n    dict\n        The catalog, ready to be written as JSON.\n    \"\"\"\n    return {'fields': catalog_fields, 'songs': songs}\n\n", ["compiler", "search"]], "compiler": [".py", "\"\"\"\nCompiler\n========\n\nCompilation of tabs into the S-1 and X-1 programs.\n\nThe tabs are normalized (repeats `( ... )xN` expanded, comments and\nseparators removed), split into S-1 tab tokens, and mapped to X-1 tabs with\nthe note equivalence tables. Transposition shifts the tabs along the\nchromatic scale of the selected model.\n\nThis module has no browser imports: the assistant compiles in the browser\nin time slices with these functions, and the server compiles whole songs\nwith `compile_song`, see api.py.\n\"\"\"\n\nimport re\n\nignore_chars = ',-\u2013\u2014()<>'\ntranspose_range = 12\n\ns1_scale = \"1 1.5 2 3 3.5 4 4.5 5 6 6.5 7 7.5 8 8.5 9 10 10.5 11 11.5 12\".split()\nx1_scale = (\n    \"1 1.5 2 3 3.5 4 4.5 5 6 6.5 7 7.5 8 8.5 9 10 10.5 11 11.5 12 13 13.5 14 14.5 15 15.5 16\"\n).split()\n\n\n# ----------------------------------------------------------------------\n# With the switch in position 2 on the S-1 and no octave modifier on the X-1\n# Assumes that the central octave of S-1 corresponds to the first octave of X-1\nnote_equivalence_mode1 = {\n    # tab(S-1): (tab X-1, octave modifier)\n    # Notes from the 3rd octave (Require modifier as they are not present on X-1)\n    \"1\": (\"8\", \"-1\"),\n    \"1.5\": (\"8.5\", \"-1\"),\n    \"2\": (\"9\", \"-1\"),\n    # Notes from the 4th octave\n    \"3\": (\"3\", \"0\"),\n    \"3.5\": (\"3.5\", \"0\"),\n    \"4\": (\"4\", \"0\"),\n    \"4.5\": (\"4.5\", \"0\"),\n    \"5\": (\"5\", \"0\"),\n    \"6\": (\"6\", \"0\"),\n    \"6.5\": (\"6.5\", \"0\"),\n    \"7\": (\"7\", \"0\"),\n    \"7.5\": (\"7.5\", \"0\"),\n    \"8\": (\"8\", \"0\"),\n    \"8.5\": (\"8.5\", \"0\"),\n    \"9\": (\"9\", \"0\"),\n    # Notes from the 5th octave\n    \"10\": (\"10\", \"0\"),\n    \"10.5\": (\"10.5\", \"0\"),\n    \"11\": (\"11\", \"0\"),\n    \"11.5\": (\"11.5\", \"0\"),\n    \"12\": (\"12\", \"0\"),\n    # Notes from the 5th octave not present on S-1\n    \"13\": (\"13\", \"0\"),\n    \"13.5\": (\"13.5\", \"0\"),\n    \"14\": (\"14\", \"0\"),\n    \"14.5\": (\"14.5\", \"0\"),\n    \"15\": (\"15\", \"0\"),\n    \"15.5\": (\"15.5\", \"0\"),\n    \"16\": (\"16\", \"0\"),\n}\n\n# ----------------------------------------------------------------------\n# With the switch in position 2 on the S-1 and no octave modifier on the X-1\n# Assumes that the central octave of S-1 corresponds to the second octave of X-1\n# By default, this implies a modifier of -1\nnote_equivalence_mode2 = {\n    # Notes from the 3rd octave\n    \"1\": (\"1\", \"0\"),\n    \"1.5\": (\"1.5\", \"0\"),\n    \"2\": (\"2\", \"0\"),\n    # Notes from the 4th octave\n    \"3\": (\"3\", \"0\"),\n    \"3.5\": (\"3.5\", \"0\"),\n    \"4\": (\"4\", \"0\"),\n    \"4.5\": (\"4.5\", \"0\"),\n    \"5\": (\"5\", \"0\"),\n    \"6\": (\"6\", \"0\"),\n    \"6.5\": (\"6.5\", \"0\"),\n    \"7\": (\"7\", \"0\"),\n    \"7.5\": (\"7.5\", \"0\"),\n    \"8\": (\"8\", \"0\"),\n    \"8.5\": (\"8.5\", \"0\"),\n    \"9\": (\"9\", \"0\"),\n    # Notes from the 5th octave not available in this X-1 configuration\n    \"10\": (\"3\", \"-2\"),\n    \"10.5\": (\"3.5\", \"-2\"),\n    \"11\": (\"4\", \"-2\"),\n    \"11.5\": (\"4.5\", \"-2\"),\n    \"12\": (\"5\", \"-2\"),\n}\n\n\n# ----------------------------------------------------------------------\ndef convert_note(note: str, equivalence: dict, modifier: str) -> str:\n    \"\"\"\n    Converts a single musical note based on a mapping of equivalences and an\n    octave modifier.\n\n    Parameters\n    ----------\n    note : str\n        The note to convert.\n    equivalence : dict\n        A dictionary where keys are note strings and values are tuples containing\n        the note's position and its octave.\n    modifier : str\n        A string representing the octave modification.\n\n    Returns\n    -------\n    str\n        The converted note, or the original note if it is not present in the\n        equivalence mapping.\n    \"\"\"\n    if note not in equivalence:\n        # Notes not in equivalence are returned as they are\n        return note\n\n    position, octave = equivalence[note]\n\n    # Modify octave based on the given modifier\n    if modifier == '-1':\n        octave = str(int(octave) + int(modifier) - 1)  # PSS: Adjusted calculation logic\n\n    if octave == '0':\n        return f\"{position}\"\n    return f\"({octave}:{position})\"\n\n\n# ----------------------------------------------------------------------\ndef convert_sequence(sequence: str, equivalence: dict, modifier: str) -> str:\n    \"\"\"\n    Converts a sequence of musical notes into a modified format based on a mapping\n    of equivalences and an octave modifier.\n\n    Parameters\n    ----------\n    sequence : str\n        A string representing a sequence of musical notes separated by spaces.\n    equivalence : dict\n        A dictionary where keys are note strings and values are tuples containing\n        the note's position and its octave (e.g., {'C': ('1', '4')}).\n    modifier : str\n        A string representing the octave modification. For example, '-1' decreases\n        the octave by one.\n\n    Returns\n    -------\n    str\n        The converted sequence as a string where each note is replaced based on\n        the equivalence mapping and modified according to the octave.\n    \"\"\"\n    return \" \".join(\n        convert_note(note, equivalence, modifier) for note in sequence.split(' ')\n    )\n\n\n# ----------------------------------------------------------------------\ndef iter_decompressed_lines(lines):\n    \"\"\"\n    Lazily decompresses lines containing patterns in the form '(content)xN' or\n    '(content) xN', including cases where the content spans multiple lines.\n\n    Parameters\n    ----------\n    lines : iterable of str\n        The input lines containing patterns to be decompressed.\n\n    Yields\n    ------\n    str\n        The decompressed lines, produced as soon as each pattern is closed.\n    \"\"\"\n    buffer = []  # Buffer to handle multiline content\n\n    for line in lines:\n        # Detect the start of a multiline pattern\n        if \"(\" in line and \")\" not in line:\n            buffer.append(line.strip())\n            continue\n        elif buffer or \")\" in line:\n            buffer.append(line.strip())\n\n            if \")\" not in line:\n                continue\n\n            # Combine buffered lines\n            multiline_content = \"\\n\".join(buffer)\n            buffer = []  # Clear buffer\n\n            # Find and expand multiline patterns\n            patterns = re.findall(r'\\((.*?)\\)\\s*x(\\d+)', multiline_content, re.DOTALL)\n            for content, repetitions in patterns:\n                content_lines = content.strip().split(\"\\n\")\n                for _ in range(int(repetitions)):\n                    if len(content.split('\\n')) > 1 and (_ < int(repetitions) - 1):\n                        yield from content_lines + ['']\n                    else:\n                        yield from content_lines\n\n            # Remove processed patterns and add any extra text\n            remaining_text = re.sub(\n                r'\\(.*?\\)\\s*x\\d+', '', multiline_content, flags=re.DOTALL\n            ).strip()\n            if remaining_text:\n                yield remaining_text\n            continue\n\n        # Process single-line patterns '(...)xN'\n        patterns = re.findall(r'\\((.*?)\\)\\s*x(\\d+)', line)\n        if patterns:\n            for content, repetitions in patterns:\n                content_lines = content.strip().split(\"\\n\")\n                for _ in range(int(repetitions)):\n                    yield from content_lines\n\n            # Remove processed patterns and add any extra text\n            remaining_text = re.sub(r'\\(.*?\\)\\s*x\\d+', '', line).strip()\n            if remaining_text:\n                yield remaining_text\n        else:\n            # Add lines without patterns directly\n            yield line.strip()\n\n\n# ----------------------------------------------------------------------\ndef decompress_multiline_text(text: str) -> str:\n    \"\"\"\n    Decompresses text containing patterns in the form '(content)xN' or '(content) xN',\n    including cases where the content spans multiple lines.\n\n    Parameters\n    ----------\n    text : str\n        The input text containing patterns to be decompressed.\n\n    Returns\n    -------\n    str\n        The decompressed text with patterns expanded.\n    \"\"\"\n    return \"\\n\".join(iter_decompressed_lines(text.split(\"\\n\")))\n\n\n# ----------------------------------------------------------------------\ndef iter_normalized_lines(lines):\n    \"\"\"\n    Lazily normalizes tab lines by decompressing, removing comments, and\n    cleaning up unwanted characters and extra spaces.\n\n    Parameters\n    ----------\n    lines : iterable of str\n        The raw lines of tabs as written by the user.\n\n    Yields\n    ------\n    str\n        Normalized lines, one per decompressed input line.\n    \"\"\"\n    for chunk in iter_decompressed_lines(lines):\n        for line in chunk.split('\\n'):\n            # Exclude comments\n            if '#' in line:\n                line = line[: line.find('#')]\n\n            # Remove unwanted characters defined in `ignore_chars`\n            for char in ignore_chars:\n                line = line.replace(char, ' ')\n\n            # Normalize spaces\n            yield ' '.join(line.split())\n\n\n# ----------------------------------------------------------------------\ndef iter_tabs_tokens(lines):\n    \"\"\"\n    Lazily splits normalized lines into tab tokens.\n\n    The produced tokens are exactly those of\n    `'\\\\n'.join(lines).strip('\\\\n').split(' ')`, so the streamed program is\n    identical to the one compiled in a single pass.\n\n    Parameters\n    ----------\n    lines : iterable of str\n        Normalized lines of tabs.\n\n    Yields\n    ------\n    str\n        The tab tokens in playing order.\n    \"\"\"\n    token = ''\n    started = False\n    newlines = 0\n\n    for line in lines:\n        if not line:\n            # Empty lines only matter if they are followed by content\n            newlines += started\n            continue\n\n        parts = line.split(' ')\n        if started:\n            token += '\\n' * (newlines + 1)\n        token += parts[0]\n        for part in parts[1:]:\n            yield token\n            token = part\n\n        started = True\n        newlines = 0\n\n    yield token\n\n\n# ----------------------------------------------------------------------\ndef normalize_tabs(tabs: str) -> str:\n    \"\"\"\n    Normalizes tabs as written by the user.\n\n    Parameters\n    ----------\n    tabs : str\n        The raw tabs.\n\n    Returns\n    -------\n    str\n        The normalized lines of tabs, see `iter_normalized_lines`.\n    \"\"\"\n    return '\\n'.join(iter_normalized_lines(tabs.split('\\n'))).strip('\\n')\n\n\n# ----------------------------------------------------------------------\ndef transpose_tab(tab: str, value: int, scale: list) -> str:\n    \"\"\"\n    Transposes a tab along a chromatic scale.\n\n    Parameters\n    ----------\n    tab : str\n        The tab to transpose.\n    value : int\n        The number of semitones.\n    scale : list\n        The tabs of the chromatic scale, `s1_scale` or `x1_scale`.\n\n    Returns\n    -------\n    str\n        The transposed tab, prefixed with `+1:` or `-1:` when it wraps to\n        another octave, or with `E:` when the tab is not in the scale.\n    \"\"\"\n    if tab not in scale:\n        return f'E:{tab}' if tab else tab\n\n    index = scale.index(tab) + value\n    if index < 0:\n        # Wrap to the next octave up\n        return f'+1:{scale[index + 12]}'\n    elif index < len(scale):\n        return scale[index]\n    # Wrap to the next octave down\n    return f'-1:{scale[index - 12]}'\n\n\n# ----------------------------------------------------------------------\ndef iter_transposed_lines(lines, value: int, x1_model: bool = True):\n    \"\"\"\n    Lazily transposes normalized lines of tabs.\n\n    Parameters\n    ----------\n    lines : iterable of str\n        Normalized lines of tabs, see `iter_normalized_lines`.\n    value : int\n        The number of semitones.\n    x1_model : bool, optional\n        Whether to transpose along the X-1 scale, which extends the S-1 one.\n        Defaults to True.\n\n    Yields\n    ------\n    str\n        The transposed lines, with their spaces normalized.\n    \"\"\"\n    scale = x1_scale if x1_model else s1_scale\n    for line in lines:\n        tabs = (transpose_tab(tab, value, scale) for tab in line.split(' '))\n        yield ' '.join(' '.join(tabs).split())\n\n\n# ----------------------------------------------------------------------\ndef transpose_tabs(normalized: str, value: int, x1_model: bool = True) -> str:\n    \"\"\"\n    Transposes normalized tabs, line by line.\n\n    Parameters\n    ----------\n    normalized : str\n        The normalized tabs, see `normalize_tabs`.\n    value : int\n        The number of semitones.\n    x1_model : bool, optional\n        Whether to transpose along the X-1 scale, which extends the S-1 one.\n        Defaults to True.\n\n    Returns\n    -------\n    str\n        The transposed tabs, with the spaces of every line normalized.\n    \"\"\"\n    lines = iter_transposed_lines(normalized.split('\\n'), value, x1_model)\n    return '\\n'.join(lines).strip('\\n')\n\n\n# ----------------------------------------------------------------------\ndef transposition_tables(tabs: list, x1_model: bool = True) -> dict:\n    \"\"\"\n    Tabulates the transpositions of a set of tabs.\n\n    Parameters\n    ----------\n    tabs : list\n        The tabs, repeated tabs are tabulated once.\n    x1_model : bool, optional\n        Whether to transpose along the X-1 scale. Defaults to True.\n\n    Returns\n    -------\n    dict\n        For every shift from `-transpose_range` to `transpose_range`\n        semitones, the tabs of the scale mapped to their transposition.\n    \"\"\"\n    scale = x1_scale if x1_model else s1_scale\n    used = sorted({tab for tab in tabs if tab in scale}, key=scale.index)\n    return {\n        value: {tab: transpose_tab(tab, value, scale) for tab in used}\n        for value in range(-transpose_range, transpose_range + 1)\n    }\n\n\n# ----------------------------------------------------------------------\ndef compile_song(\n    tabs: str,\n    x1_octave: bool = False,\n    transpose: int = None,\n    x1_model: bool = True,\n) -> dict:\n    \"\"\"\n    Compiles a whole song, as the assistant does in time slices.\n\n    Parameters\n    ----------\n    tabs : str\n        The raw tabs.\n    x1_octave : bool, optional\n        Whether the X-1 plays one octave lower, which selects\n        `note_equivalence_mode2`. Defaults to False.\n    transpose : int, optional\n        The number of semitones to transpose the tabs before compiling them,\n        None to compile them as they are.\n    x1_model : bool, optional\n        Whether to transpose along the X-1 scale. Defaults to True.\n\n    Returns\n    -------\n    dict\n        The `normalized` tabs, the `transposed` ones or None, the `s1` and\n        `x1` token arrays, and the `transpositions` tables of the tabs.\n    \"\"\"\n    normalized = normalize_tabs(tabs)\n    if transpose is None:\n        transposed = None\n        lines = normalized.split('\\n')\n    else:\n        transposed = transpose_tabs(normalized, transpose, x1_model)\n        lines = transposed.split('\\n')\n\n    if x1_octave:\n        equivalence, modifier = note_equivalence_mode2, '-1'\n    else:\n        equivalence, modifier = note_equivalence_mode1, '0'\n\n    s1 = list(iter_tabs_tokens(lines))\n    return {\n        'normalized': normalized,\n        'transposed': transposed,\n        's1': s1,\n        'x1': [convert_note(tab, equivalence, modifier) for tab in s1],\n        'transpositions': transposition_tables(normalized.split(), x1_model),\n    }\n", []], "main": [".py", "from radiant.framework.server import RadiantCore\nfrom radiant.framework import html, Element, select\nfrom browser import document, svg, ajax\nfrom browser import timer, window\nfrom radiant.framework import WebComponents\nfrom browser.local_storage import storage\nfrom tracing import trace\nfrom telemetry import PlaybackTelemetry\nfrom render import FrameRenderer, build_preview, preview_window\nfrom shell import build_shell, responsive_svg, panels\nfrom compiler import (\n    convert_note,\n    iter_normalized_lines,\n    iter_tabs_tokens,\n    iter_transposed_lines,\n    note_equivalence_mode1,\n    note_equivalence_mode2,\n    transpose_tabs,\n)\nfrom classroom import Classroom, classroom_params\nfrom transport import SocketInterpreter, RemoteError\nfrom search import SearchIndex\nfrom compatibility import no_shift\nimport tracing\nimport json\nfrom typing import Optional, Any\n\nwa = WebComponents('wa')\n\nbutton_base = '#B3B3B3'\nbutton_active = '#000000'\nmax_tabs = 5\ncompile_slice_ms = 8\nsave_delay = 500\nsearch_delay = 300\ndefault_song = 'Custom'\nstorage_prefix = 'lzw:'\nlzw_stop = 256\ndomain = '/stylophone-assistant'\nbroadcast_path = '/broadcast'\nremote_path = '/api/python'\ncompile_path = '/api/compile'\n# Songs with more lines are compiled by the server, when there is one\nremote_compile_lines = 200\nstartup_timeout = 5000\nweb_components = [\n    'wa-tab-group',\n    'wa-tab',\n    'wa-select',\n    'wa-option',\n    'wa-textarea',\n    'wa-switch',\n    'wa-range',\n    'wa-icon-button',\n]\n\ntunning_text = \"\"\"\n    <h1>Guide to Tuning Your Stylophone Device</h1>\n    <p>The following guide provides step-by-step instructions on how to properly tune your Stylophone (S1 or Gen X-1). This ensures optimal functionality and access to a balanced tonal range. Follow these steps carefully:</p>\n    <hr>\n\n    <h2>1. Prepare Your Stylophone</h2>\n    <ul>\n        <li>Power on the device.</li>\n        <li>Ensure the stylus and keys are clean for optimal electrical contact.</li>\n        <li>Place the device in a stable position, preferably on a flat surface, to avoid interference during adjustments.</li>\n    </ul>\n\n    <h2>2. Locate the Tuning Knob</h2>\n    <p>Both the <strong>Stylophone S1</strong> and <strong>Gen X-1</strong> models have a <strong>tuning knob located on the back panel</strong>. No tools are required; simply turn the knob with your fingers to make adjustments.</p>\n\n    <h2>3. Set the Base Scale</h2>\n    <ul>\n        <li>Play the <strong>fourth scale</strong> (middle C or equivalent, depending on the tuning standard you wish to use).</li>\n        <li>Adjust the tuning knob to ensure the note aligns with the desired pitch (e.g., A=440Hz if tuning to standard pitch).</li>\n    </ul>\n\n    <h2>4. Test Sub-Octave Modifiers</h2>\n    <ul>\n        <li>Engage the <strong>sub-octave modifiers</strong> (if using the Gen X-1 or an equivalent model).</li>\n        <li>Verify that the third octave below is accessible and aligns correctly with its respective pitch.</li>\n        <li>Confirm that the fifth octave above is also accessible when disabling the sub-octave modifiers.</li>\n    </ul>\n    <blockquote>\n        <strong>Tip:</strong> The goal is to leave the <strong>fourth scale</strong> in a central position so it provides flexibility for both downward and upward tonal adjustments.\n    </blockquote>\n\n    <h2>5. Fine-Tune the Pitch</h2>\n    <ul>\n        <li>Use a tuning application or chromatic tuner for precision.</li>\n        <li>\n            <strong>Tip for Precision Tuning:</strong> To achieve more accurate tuning, use <strong>both the tuning knob and the tuning control</strong> on the back panel:\n            <ol>\n                <li><strong>Adjust one octave</strong> using the tuning knob (the larger, finger-operated control).</li>\n                <li>Move to another octave and fine-tune it using the smaller tuning control, which requires a screwdriver.</li>\n                <li>Repeat this process alternately between the two controls until both octaves are accurately tuned.</li>\n            </ol>\n        </li>\n        <li>Continue making minor adjustments until the pitch is stable and all octaves align correctly.</li>\n    </ul>\n\n    <figure>\n        <img src=\"{diagram}\" alt=\"Stylophone tuning diagram\" style=\"max-width: 100%; height: auto;\">\n        <figcaption>Diagram showing the recommended tuning frequencies and sub-octave configurations for the Stylophone.</figcaption>\n    </figure>\n\n    <h2>6. Verify the Entire Range</h2>\n    <ul>\n        <li>Test the device by playing scales across its full range.</li>\n        <li>Ensure smooth transitions and accurate pitch representation.</li>\n    </ul>\n\n    <h2>Additional Notes</h2>\n    <ul>\n        <li>Always tune the device in a quiet environment to avoid misjudging the pitch.</li>\n        <li>Periodic retuning may be necessary depending on usage and environmental factors such as temperature or humidity.</li>\n        <li>Avoid over-adjusting the tuning knob, as it may damage the device's mechanism.</li>\n    </ul>\n\n    <p>By following these steps, your Stylophone will be perfectly tuned and ready for use in any musical context.</p>\n\"\"\"\n\ndefault_tabs = \"\"\"# Write tabs here\n\n\"\"\"\n\n\n# ----------------------------------------------------------------------\ndef load_assets() -> dict:\n    \"\"\"\n    Reads the manifest of the hashed assets inlined in the page.\n\n    Returns\n    -------\n    dict\n        Original paths mapped to the hashed paths, see assets.py. Empty when\n        the page has no manifest, or under CPython.\n    \"\"\"\n    try:\n        return json.loads(document['sa-assets'].text)\n    except (KeyError, AttributeError, TypeError, ValueError):\n        return {}\n\n\n# ----------------------------------------------------------------------\ndef asset_url(path: str) -> str:\n    \"\"\"\n    Returns the URL of an asset, resolved through the manifest.\n\n    Parameters\n    ----------\n    path : str\n        The path of the asset, relative to the application root.\n\n    Returns\n    -------\n    str\n        The URL of the hashed copy, or of the original file if the asset is\n        not in the manifest.\n    \"\"\"\n    return f'{domain}/root/{assets.get(path, path)}'\n\n\n# ----------------------------------------------------------------------\ndef compress_text(text: str) -> str:\n    \"\"\"\n    Compresses text with LZW into a compact string suitable for local storage.\n\n    The UTF-8 bytes of the text are encoded with variable-width LZW codes\n    terminated by a stop code, and the bits are packed 15 per character,\n    offset to stay in the printable, surrogate-free range of UTF-16.\n\n    Parameters\n    ----------\n    text : str\n        The text to compress.\n\n    Returns\n    -------\n    str\n        The compressed text, prefixed with `storage_prefix`.\n    \"\"\"\n    table = {}\n    next_code = lzw_stop + 1\n    buffer = 0\n    bits = 0\n    packed = []\n    code = None\n    count = 0\n\n    def emit(value):\n        nonlocal buffer, bits, count\n        width = max(9, (lzw_stop + count).bit_length())\n        count += 1\n        buffer = (buffer << width) | value\n        bits += width\n        while bits >= 15:\n            bits -= 15\n            packed.append(chr(((buffer >> bits) & 0x7FFF) + 32))\n        buffer &= (1 << bits) - 1\n\n    for byte in text.encode('utf-8'):\n        if code is None:\n            code = byte\n            continue\n        entry = table.get((code, byte))\n        if entry is not None:\n            code = entry\n            continue\n        emit(code)\n        table[(code, byte)] = next_code\n        next_code += 1\n        code = byte\n\n    if code is not None:\n        emit(code)\n    emit(lzw_stop)\n\n    if bits:\n        packed.append(chr(((buffer << (15 - bits)) & 0x7FFF) + 32))\n\n    return storage_prefix + ''.join(packed)\n\n\n# ----------------------------------------------------------------------\ndef decompress_text(data: str) -> str:\n    \"\"\"\n    Decompresses text produced by `compress_text`.\n\n    Values without the `storage_prefix` are returned unchanged, so plain text\n    written by previous versions is still readable.\n\n    Parameters\n    ----------\n    data : str\n        The compressed text.\n\n    Returns\n    -------\n    str\n        The original text.\n    \"\"\"\n    if not data.startswith(storage_prefix):\n        return data\n\n    table = [bytes([i]) for i in range(256)] + [b'']\n    output = []\n    previous = None\n    buffer = 0\n    bits = 0\n    count = 0\n\n    for char in data[len(storage_prefix) :]:\n        buffer = (buffer << 15) | (ord(char) - 32)\n        bits += 15\n\n        while True:\n            width = max(9, (lzw_stop + count).bit_length())\n            if bits < width:\n                break\n            bits -= width\n            code = (buffer >> bits) & ((1 << width) - 1)\n            buffer &= (1 << bits) - 1\n            count += 1\n\n            if code == lzw_stop:\n                return b''.join(output).decode('utf-8')\n\n            if code < len(table):\n                entry = table[code]\n            else:\n                # The code being defined by this very step (cScSc case)\n                entry = previous + previous[:1]\n\n            if previous is not None:\n                table.append(previous + entry[:1])\n            output.append(entry)\n            previous = entry\n\n    return b''.join(output).decode('utf-8')\n\n\n# Hashed asset manifest, inlined in the page by the server\nassets = load_assets()\n\n\n########################################################################\nclass StylophoneAssistant(RadiantCore):\n\n    stop = False\n\n    # ----------------------------------------------------------------------\n    def __init__(self, *args, **kwargs):\n        \"\"\"\"\"\"\n        super().__init__(*args, **kwargs)\n        self.loaded = False\n\n        # Builders of the panels materialized on first activation\n        self.lazy_panels = {}\n\n        # Compiled S-1 and X-1 programs and their precomputed previews\n        self.s1_tabs = ['']\n        self.x1_tabs = ['']\n        self.s1_preview = None\n        self.x1_preview = None\n        self.compile_id = 0\n        self.compile_transposed = None\n        self.compiling = False\n\n        # Pending debounced save of the custom song\n        self.save_timer = None\n        self.save_song = None\n        self.debug = False\n\n        # Batched DOM writes, committed once per animation frame\n        self.renderer = FrameRenderer()\n\n        # Playback scheduling telemetry\n        self.telemetry = PlaybackTelemetry()\n        self.scheduled_s1 = None\n        self.scheduled_x1 = None\n\n        # Classroom sync, see classroom.py\n        self.classroom = None\n\n        # Connection to the server calls, opened on first use\n        self.remote = None\n        # Whether `POST /api/compile` may answer, see `compile_http`\n        self.http_compile = True\n\n        # Melody search, the index is fetched on the first query\n        self.search_index = None\n        self.search_timer = None\n        self.trace_load_search = None\n        self.library_values = {}\n\n        # Compatibility of the library songs, their tabs are fetched on the\n        # first selection\n        self.catalog = {}\n        self.library = None\n        self.trace_load_library = None\n\n        # The hash is user input, only the names of the panels are kept\n        tab = window.location.href.partition('#')[2]\n        if tab not in panels:\n            tab = panels[0]\n\n        # The shell is prerendered by the server, see shell.py\n        self.prerendered = document.getElementById('sa-header') is not None\n        if not self.prerendered:\n            document.body.insertAdjacentHTML(\n                'afterbegin',\n                build_shell(\n                    default_song,\n                    window.sa_icons if hasattr(window, 'sa_icons') else None,\n                    tab=tab,\n                ),\n            )\n        self.hydrate(tab)\n\n        self.start()\n        self.auto_show(tab=f'sa-tab-{tab}', panel=tab)\n\n    # ----------------------------------------------------------------------\n    def hydrate(self, tab: str) -> None:\n        \"\"\"\n        Binds the controls of the page shell and their handlers.\n\n        The elements are looked up by their `id` in the prerendered markup\n        built by `build_shell`, so nothing is created again.\n\n        Parameters\n        ----------\n        tab : str\n            The active tab, from the URL hash.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        document['sa-toolbar'].attrs['active'] = tab\n        select('.sa-auto-show').bind('click', self.auto_show)\n\n        self.panel_tunning = document['sa-panel-tunning']\n        self.lazy_panels['tunning'] = self.build_tunning_panel\n\n        self.select_gen = document['sa-select-gen']\n        self.select_gen.bind(\"wa-change\", self.load_stylophone)\n\n        self.select_style = document['sa-select-style']\n        self.select_style.bind(\"wa-change\", self.load_stylophone)\n\n        self.select_tab = document['sa-select-tab']\n        self.select_tab.bind(\"wa-change\", self.load_tab_in_textarea)\n\n        self.button_new_song = document['sa-button-new-song']\n        self.button_new_song.bind(\"click\", self.new_song)\n\n        self.button_delete_song = document['sa-button-delete-song']\n        self.button_delete_song.bind(\"click\", self.delete_song)\n\n        self.textarea_search = document['sa-textarea-search']\n        self.textarea_search.bind(\"wa-input\", self.search_melody)\n\n        self.select_match = document['sa-select-match']\n        self.select_match.bind(\"wa-change\", self.load_match)\n\n        self.select_fit = document['sa-select-fit']\n        self.select_fit.bind(\"wa-change\", self.filter_library)\n\n        self.textarea_s1 = document['sa-textarea-tabs']\n        self.textarea_s1.bind(\"wa-input\", self.save_tabs)\n\n        self.switch_transpose = document['sa-switch-transpose']\n        self.switch_transpose.bind(\"wa-input\", self.activate_transpose)\n\n        self.range_transpose = document['sa-range-transpose']\n        self.range_transpose.bind(\"wa-input\", self.save_tabs)\n        self.range_transpose.tooltipFormatter = (\n            lambda value: f\"{'+' if value > 0 else ''}{value} semitone{'' if value in [1, 1 , 0] else 's'}\"\n        )\n\n        self.textarea_transpose = document['sa-textarea-transpose']\n        self.textarea_transpose.bind(\"wa-input\", self.save_tabs)\n\n        self.switch_transpose_model = document['sa-switch-transpose-model']\n        self.switch_transpose_model.bind(\"wa-input\", self.save_tabs)\n\n        self.switch_x1_8va = document['sa-switch-x1-8va']\n        self.switch_x1_8va.bind(\"wa-input\", self.load_stylophone)\n\n        self.svg_container = document['sa-stylophone']\n\n        self.span_tabs_pre = document['sa-tabs-pre']\n        self.span_tabs_current = document['sa-tabs-current']\n        self.span_tabs_post = document['sa-tabs-post']\n\n        self.button_start = document['sa-button-start']\n        self.button_start.bind(\"click\", self.start_animation)\n\n        self.button_stop = document['sa-button-stop']\n        self.button_stop.bind(\"click\", self.stop_animation)\n\n        self.range_progress = document['sa-range-progress']\n        self.range_progress.tooltipFormatter = lambda value: f\"Tab {value + 1}\"\n        self.range_progress.bind(\"wa-input\", self.range_progress_change)\n\n        self.select_delay = document['sa-select-delay']\n        self.select_delay.bind(\"wa-change\", self.load_stylophone)\n\n\n    # ----------------------------------------------------------------------\n    def auto_show(self, event: Optional[Any] = None, tab: Optional[str] = None, panel: Optional[str] = None) -> None:\n        \"\"\"\n        Handles tab and panel display in a web-based interface. Adjusts the URL hash\n        and updates the visibility of elements based on the provided or inferred\n        event. Panels registered in `lazy_panels` are built on their first\n        activation.\n\n        Parameters\n        ----------\n        event : Optional[Any], optional\n            An event object, typically from an event handler. Used to infer the `tab`\n            and `panel` values if not explicitly provided. Defaults to None.\n        tab : Optional[str], optional\n            The CSS class name of the tab to show. If None, it will be inferred\n            from the `event`. Defaults to None.\n        panel : Optional[str], optional\n            The panel identifier for the URL hash. If None, it will be inferred\n            from the `event`. Defaults to None.\n\n        Returns\n        -------\n        None\n            This function does not return a value.\n        \"\"\"\n        if event:\n            # PSS: Extract `tab` and `panel` values from the event if provided.\n            tab = event.target.attrs['sa-tab-to-show']\n            panel = event.target.attrs['panel']\n\n        # Build the panel on its first activation.\n        if builder := self.lazy_panels.pop(panel, None):\n            builder()\n\n        # Hide all tabs and display the selected one.\n        select('.sa-tabs').styles.display = 'none'\n        select(f'.{tab}').styles.display = 'block'\n\n        # Update the URL hash to reflect the current panel.\n        base_url = window.location.href.rstrip('/').split('#', 1)[0]\n        new_url = f\"{base_url}#{panel}\" if panel else f\"{base_url}#\"\n        window.history.pushState(None, \"\", new_url)\n\n\n    # ----------------------------------------------------------------------\n    def build_tunning_panel(self) -> None:\n        \"\"\"\n        Builds the content of the tunning panel.\n\n        The panel is built on its first activation, so its diagram is only\n        fetched when the panel is shown.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.panel_tunning <= html.SPAN(\n            tunning_text.format(\n                diagram=asset_url('assets/stylophone_both_tabs_tunning.svg')\n            ),\n            Class='sa-paragraph',\n        )\n\n    # ----------------------------------------------------------------------\n    def start(self) -> None:\n        \"\"\"\n        Issues the independent startup requests and waits for readiness.\n\n        The stylophone SVG and the tabs catalog are requested right away, and\n        the stored custom songs are read, in parallel with the definition of\n        the web components. `initialize` runs as soon as the components are\n        defined and the SVG is loaded, or after `startup_timeout` milliseconds\n        if any of them never arrives. The SVG is not requested when it is\n        already inline in the prerendered shell.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.startup_pending = {'components'}\n        self.startup_stylophone = None\n\n        # Independent startup requests\n        if not self.prerendered:\n            self.startup_pending.add('stylophone')\n            self.load_stylophone(generation='x1', style='tabs', x1_octave_modifier='')\n        self.load_tabs()\n        self.load_songs()\n        self.startup_tabs = self.read_song(default_song)\n\n        # Custom elements are upgraded once their definitions are loaded\n        window.Promise.all(\n            [window.customElements.whenDefined(tag) for tag in web_components]\n        ).then(lambda result: self.ready('components'))\n\n        self.startup_timer = timer.set_timeout(\n            lambda: self.ready(*self.startup_pending), startup_timeout\n        )\n\n    # ----------------------------------------------------------------------\n    def ready(self, *signals: str) -> None:\n        \"\"\"\n        Marks startup signals as ready and initializes the application once\n        all of them are.\n\n        Parameters\n        ----------\n        *signals : str\n            The ready signals, 'components' and/or 'stylophone'.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.loaded:\n            return\n\n        self.startup_pending.difference_update(signals)\n        if not self.startup_pending:\n            timer.clear_timeout(self.startup_timer)\n            self.initialize()\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def initialize(self) -> None:\n        \"\"\"\n        Initializes the application by setting up the initial state and loading necessary resources.\n\n        This method sets up the internal state variables, populates the textarea\n        with stored or default tabs, and injects the stylophone SVG loaded at\n        startup, or sets up the prerendered one, which compiles the tabs and\n        updates the preview.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Mark the application as loaded\n        self.loaded = True\n\n        # Initialize counters for S-1 and X-1\n        self.counter_s1 = 0\n        self.counter_x1 = 0\n\n        # Opt-in debug dumps, enabled with `localStorage.debug = 'true'`\n        self.debug = storage.get('debug', 'false') == 'true'\n\n        # Load the stored default song into the textarea\n        self.textarea_s1.value = self.startup_tabs\n        window.addEventListener('pagehide', self.flush_tabs)\n\n        self.select_gen.attrs['value'] = 'x1'\n\n        # Join the room of `?teach=` or `?room=`\n        room, teacher = classroom_params()\n        if room:\n            self.classroom = Classroom(self, room, teacher, f'{domain}{broadcast_path}')\n\n        # Inject the stylophone SVG, then compile the tabs\n        if self.startup_stylophone is not None:\n            self.on_complete_load_stylophone(self.startup_stylophone)\n        elif self.prerendered:\n            self.setup_stylophone()\n        else:\n            self.compile_tabs()\n\n        # Time to interactive, from the start of the navigation\n        if tracing.enabled:\n            tracing.record('time-to-interactive', 0, tracing.now(), 'startup')\n\n    # ----------------------------------------------------------------------\n    @property\n    def normalized_tabs(self) -> str:\n        \"\"\"\n        Normalizes the tabs from the textarea by decompressing, removing comments,\n        and cleaning up unwanted characters.\n\n        This method processes the tabs entered in `textarea_s1`, removing comments,\n        decompressing multiline patterns, and eliminating extra spaces or unwanted\n        characters. The result is a cleaned-up, normalized string of tabs.\n\n        Returns\n        -------\n        str\n            A normalized string of tabs, free of comments, unwanted characters,\n            and extra spaces.\n        \"\"\"\n        lines = iter_normalized_lines(self.textarea_s1.value.split('\\n'))\n\n        # Return the cleaned-up and normalized tabs\n        return '\\n'.join(lines).strip('\\n')\n\n    # ----------------------------------------------------------------------\n    @property\n    def equivalence_table(self) -> dict:\n        \"\"\"\n        Returns the appropriate note equivalence table based on the state\n        of the `switch_x1_8va`.\n\n        If the `switch_x1_8va` is checked, it uses `note_equivalence_mode2`.\n        Otherwise, it defaults to `note_equivalence_mode1`.\n\n        Returns\n        -------\n        dict\n            The selected note equivalence table (`note_equivalence_mode1` or\n            `note_equivalence_mode2`).\n        \"\"\"\n        if self.switch_x1_8va.checked:\n            return note_equivalence_mode2\n        else:\n            return note_equivalence_mode1\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def save_tabs(self, event=None):\n        \"\"\"\n        Saves the current tabs and updates the UI elements accordingly.\n\n        If a custom song is selected in the `select_tab` widget, it schedules a\n        debounced save of the `textarea_s1` widget into the `storage`.\n        Resets counters for S-1 and X-1 tabs and starts compiling the tabs,\n        which updates the preview and the range of the progress bar as the\n        program grows.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event, if applicable. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if song := self.current_song:\n            self.schedule_save(song)\n\n        # Reset counters\n        self.counter_s1 = 0\n        self.counter_x1 = 0\n\n        # Compile the tabs in time slices\n        self.compile_tabs()\n\n    # ----------------------------------------------------------------------\n    def compile_tabs(self) -> None:\n        \"\"\"\n        Starts compiling the current tabs into the S-1 and X-1 programs.\n\n        Long songs are compiled by the server, see `compile_remote`, or by\n        `POST /api/compile` when the WebSocket is not available, see\n        `compile_http`. The rest, and every song when there is no server,\n        are compiled in the browser, see `compile_local`. Any compilation in\n        progress is superseded.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.compile_id += 1\n        self.s1_tabs = []\n        self.x1_tabs = []\n        self.s1_preview = None\n        self.x1_preview = None\n        self.compiling = True\n\n        long_song = self.textarea_s1.value.count('\\n') >= remote_compile_lines\n        if long_song and not self.remote_interpreter().closed:\n            self.compile_remote(self.compile_id)\n        elif long_song and self.http_compile:\n            self.compile_http(self.compile_id)\n        else:\n            self.compile_local(self.compile_id)\n\n    # ----------------------------------------------------------------------\n    def compile_local(self, compile_id: int) -> None:\n        \"\"\"\n        Compiles the current tabs in the browser.\n\n        Compilation is cooperative: the input is processed in slices of at most\n        `compile_slice_ms` milliseconds, yielding to the event loop between\n        slices so the UI can repaint. The first slice runs immediately, so the\n        head of the program is playable while the tail is still being\n        processed.\n\n        Parameters\n        ----------\n        compile_id : int\n            The compilation to run.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        lines = self.textarea_s1.value.split('\\n')\n        normalized = iter_normalized_lines(self.track_compile_progress(lines))\n        if self.switch_transpose.checked:\n            # Transposed in the same slices, shown once the compilation ends\n            self.compile_transposed = []\n            normalized = self.collect_transposed(\n                iter_transposed_lines(\n                    normalized,\n                    int(self.range_transpose.value),\n                    self.switch_transpose_model.checked,\n                )\n            )\n        else:\n            self.compile_transposed = None\n\n        self.compile_total = len(lines)\n        self.compile_position = 0\n        self.compile_tokens = iter_tabs_tokens(normalized)\n        self.compile_equivalence = self.equivalence_table\n        self.compile_modifier = '-1' if self.switch_x1_8va.checked else '0'\n\n        self.compile_slice(compile_id)\n\n    # ----------------------------------------------------------------------\n    def compile_remote(self, compile_id: int) -> None:\n        \"\"\"\n        Sends the current tabs to the `compile` call of the server.\n\n        Parameters\n        ----------\n        compile_id : int\n            The compilation to run.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.range_progress.hint = 'Compiling tabs...'\n        self.remote_interpreter().compile(\n            self.textarea_s1.value, **self.compile_options()\n        )(lambda result: self.on_complete_compile_remote(compile_id, result))\n\n    # ----------------------------------------------------------------------\n    def compile_options(self) -> dict:\n        \"\"\"\n        Returns the options of `compile_song` set in the panel.\n\n        Returns\n        -------\n        dict\n            The `x1_octave`, `transpose` and `x1_model` options.\n        \"\"\"\n        if self.switch_transpose.checked:\n            transpose = int(self.range_transpose.value)\n        else:\n            transpose = None\n\n        return {\n            'x1_octave': self.switch_x1_8va.checked,\n            'transpose': transpose,\n            'x1_model': self.switch_transpose_model.checked,\n        }\n\n    # ----------------------------------------------------------------------\n    def on_complete_compile_remote(self, compile_id: int, result) -> None:\n        \"\"\"\n        Takes the programs compiled by the server, or compiles the tabs in\n        the browser when the call failed.\n\n        Parameters\n        ----------\n        compile_id : int\n            The compilation the result belongs to. Results of superseded\n            compilations are discarded.\n        result : dict or RemoteError\n            The result of `compile_song`.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if compile_id != self.compile_id:\n            return\n\n        if isinstance(result, RemoteError):\n            window.console.warn(f'The server failed to compile the tabs: {result}')\n            if self.http_compile:\n                self.compile_http(compile_id)\n            else:\n                self.compile_local(compile_id)\n            return\n\n        self.apply_compiled(result)\n\n    # ----------------------------------------------------------------------\n    def compile_http(self, compile_id: int) -> None:\n        \"\"\"\n        Sends the current tabs to `POST /api/compile`, see api.py.\n\n        Parameters\n        ----------\n        compile_id : int\n            The compilation to run.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.range_progress.hint = 'Compiling tabs...'\n        options = self.compile_options()\n\n        req = ajax.ajax()\n        req.bind('complete', lambda req: self.on_complete_compile_http(compile_id, req))\n        req.open('POST', f'{domain}{compile_path}', True)\n        req.set_header('content-type', 'application/x-www-form-urlencoded')\n        req.send(\n            {\n                'tabs': self.textarea_s1.value,\n                'x1_octave': '1' if options['x1_octave'] else '0',\n                'transpose': '' if options['transpose'] is None else str(options['transpose']),\n                'x1_model': '1' if options['x1_model'] else '0',\n            }\n        )\n\n    # ----------------------------------------------------------------------\n    def on_complete_compile_http(self, compile_id: int, req) -> None:\n        \"\"\"\n        Takes the programs compiled by `POST /api/compile`, or compiles the\n        tabs in the browser when the request failed.\n\n        A failed request, as in the static export where there is no server,\n        disables `compile_http` for the rest of the session.\n\n        Parameters\n        ----------\n        compile_id : int\n            The compilation the response belongs to. Responses of superseded\n            compilations are discarded.\n        req : object\n            The AJAX response object.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if compile_id != self.compile_id:\n            return\n\n        if req.status != 200:\n            window.console.warn(\n                f'Compiling in the browser, POST {compile_path} answered {req.status}'\n            )\n            self.http_compile = False\n            self.compile_local(compile_id)\n            return\n\n        self.apply_compiled(json.loads(req.text))\n\n    # ----------------------------------------------------------------------\n    def apply_compiled(self, result: dict) -> None:\n        \"\"\"\n        Takes the programs compiled by the server.\n\n        Parameters\n        ----------\n        result : dict\n            The result of `compile_song`.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if result['transposed'] is not None:\n            self.textarea_transpose.value = result['transposed']\n        self.s1_tabs = result['s1']\n        self.x1_tabs = result['x1']\n        self.finish_compile()\n\n    # ----------------------------------------------------------------------\n    def remote_interpreter(self) -> SocketInterpreter:\n        \"\"\"\n        Returns the connection to the server calls, see api.py.\n\n        The connection is opened on the first call. Without a server, as in\n        the static export, it is closed and its calls fail at once.\n\n        Returns\n        -------\n        SocketInterpreter\n            The connection.\n        \"\"\"\n        if self.remote is None:\n            self.remote = SocketInterpreter(f'{domain}{remote_path}')\n        return self.remote\n\n    # ----------------------------------------------------------------------\n    def track_compile_progress(self, lines: list):\n        \"\"\"\n        Yields the raw lines of tabs while recording the compilation position.\n\n        Parameters\n        ----------\n        lines : list\n            The raw lines of tabs being compiled.\n\n        Yields\n        ------\n        str\n            The raw lines, unchanged.\n        \"\"\"\n        for i, line in enumerate(lines):\n            self.compile_position = i\n            yield line\n\n    # ----------------------------------------------------------------------\n    def collect_transposed(self, lines):\n        \"\"\"\n        Yields the transposed lines of tabs while collecting them for\n        `textarea_transpose`.\n\n        Parameters\n        ----------\n        lines : iterable of str\n            The transposed lines being compiled.\n\n        Yields\n        ------\n        str\n            The transposed lines, unchanged.\n        \"\"\"\n        for line in lines:\n            self.compile_transposed.append(line)\n            yield line\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def compile_slice(self, compile_id: int) -> None:\n        \"\"\"\n        Compiles tab tokens until the time budget of the slice is exhausted.\n\n        Appends the compiled tokens to `s1_tabs` and `x1_tabs`, reports the\n        progress on `range_progress` and schedules the next slice, or finishes\n        the compilation when the input is exhausted.\n\n        Parameters\n        ----------\n        compile_id : int\n            The compilation this slice belongs to. Slices of superseded\n            compilations are discarded.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if compile_id != self.compile_id:\n            return\n\n        deadline = window.performance.now() + compile_slice_ms\n        done = True\n        for tab in self.compile_tokens:\n            self.s1_tabs.append(tab)\n            self.x1_tabs.append(\n                convert_note(tab, self.compile_equivalence, self.compile_modifier)\n            )\n            if window.performance.now() >= deadline:\n                done = False\n                break\n\n        if done:\n            if self.compile_transposed is not None:\n                self.textarea_transpose.value = '\\n'.join(self.compile_transposed).strip('\\n')\n            self.finish_compile()\n        else:\n            self.update_progress_range()\n            progress = 100 * self.compile_position // max(1, self.compile_total)\n            self.range_progress.hint = f'Compiling tabs... {progress}%'\n            self.update_tabs_preview()\n            timer.set_timeout(lambda: self.compile_slice(compile_id), 0)\n\n    # ----------------------------------------------------------------------\n    def update_progress_range(self) -> None:\n        \"\"\"\n        Adjusts the range of the progress bar to the compiled program.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.range_progress.min = 0\n        max_ = len(self.s1_tabs) - 1\n        if max_ > 0:\n            self.range_progress.max = max_\n        else:\n            self.range_progress.max = 100\n\n    # ----------------------------------------------------------------------\n    def finish_compile(self) -> None:\n        \"\"\"\n        Completes a compilation once `s1_tabs` and `x1_tabs` hold the whole\n        program.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.update_progress_range()\n        self.compiling = False\n        self.s1_preview = build_preview(self.s1_tabs)\n        self.x1_preview = build_preview(self.x1_tabs)\n        self.range_progress.hint = ''\n        self.update_tabs_preview()\n        self.on_complete_compile_tabs()\n\n    # ----------------------------------------------------------------------\n    def on_complete_compile_tabs(self) -> None:\n        \"\"\"\n        Handles the completion of the tabs compilation.\n\n        Publishes the song to the classroom when teaching, and dumps the input\n        and the compiled programs to the console when debug mode is enabled.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.classroom and self.classroom.teacher:\n            self.classroom.publish_song()\n\n        if not self.debug:\n            return\n\n        # Debug information\n        print(\"Input tabs:\", self.textarea_s1.value)\n        print(\"Normalized tabs:\", self.normalized_tabs)\n        print('S-1 tabs:', ' '.join(self.s1_tabs))\n        print('X-1 tabs:', ' '.join(self.x1_tabs))\n\n    # ----------------------------------------------------------------------\n    def range_progress_change(self, event) -> None:\n        \"\"\"\n        Handles the change event for the progress range slider.\n\n        Updates the `counter_s1` and `counter_x1` attributes based on the current\n        value of the slider, and refreshes the tabs preview accordingly.\n\n        Parameters\n        ----------\n        event : object\n            The event object containing the `target.value` attribute, which represents\n            the new slider position.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Update counters for S-1 and X-1 based on the slider's value\n        self.counter_s1 = event.target.value\n        self.counter_x1 = event.target.value\n\n        # The slider was moved outside of the renderer\n        self.renderer.forget('range_progress')\n\n        # Refresh the tabs preview\n        self.update_tabs_preview()\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def update_tabs_preview(self) -> None:\n        \"\"\"\n        Updates the preview of tabs based on the current state of switches,\n        counters, and user selections.\n\n        This method renders the preview content from the compiled S-1 and X-1\n        programs for the selected generator. It adjusts the pre-, current-, and\n        post-tab spans accordingly, through the frame renderer and from the\n        precomputed previews once the compilation is done.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Update tab spans based on the selected model\n        if self.select_gen.value == 's1':\n            tabs, preview, counter = self.s1_tabs, self.s1_preview, self.counter_s1\n        elif self.select_gen.value in ['both', 'x1']:\n            tabs, preview, counter = self.x1_tabs, self.x1_preview, self.counter_x1\n        else:\n            return\n\n        tab = tabs[counter] if counter < len(tabs) else ''\n        start = max(0, counter - max_tabs)\n        end = min(len(tabs), counter + max_tabs)\n\n        if preview:\n            # Slice the precomputed preview of the compiled program\n            pre = preview_window(preview, start, counter)\n            post = preview_window(preview, counter + 1, end)\n        else:\n            # The program is still being compiled\n            pre = ' - '.join(tabs[start:counter])\n            post = ' - '.join(tabs[counter + 1 : end])\n\n        self.renderer.text('span_tabs_pre', self.span_tabs_pre, pre)\n        self.renderer.text('span_tabs_current', self.span_tabs_current, f\" {tab.strip('()')} \")\n        self.renderer.text('span_tabs_post', self.span_tabs_post, post)\n\n    # ----------------------------------------------------------------------\n    def start_animation(self, event) -> None:\n        \"\"\"\n        Starts the animation based on the selected generator (S-1, X-1, or both).\n\n        This method initializes the animation by enabling/disabling buttons,\n        setting counters, updating the tab preview, and calling the appropriate\n        animation methods for the selected generator.\n\n        Parameters\n        ----------\n        event : object\n            The triggering event object, typically passed when the button is clicked.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Initialize the animation state\n        self.stop = False\n\n        # Disable the start button and enable the stop button\n        self.button_start.style.display = 'none'\n        self.button_stop.style.display = 'block'\n\n        # Set counters based on the current slider position\n        self.counter_s1 = self.range_progress.value\n        self.counter_x1 = self.range_progress.value\n\n        # Update the tab preview\n        self.update_tabs_preview()\n\n        # Start a new telemetry session, the first notes are due now\n        self.telemetry.start(float(self.select_delay.value))\n        self.scheduled_s1 = self.telemetry.schedule(0)\n        self.scheduled_x1 = self.scheduled_s1\n\n        # Start the animation based on the selected model\n        match self.select_gen.value:\n            case 's1':\n                self.animate_s1()\n            case 'x1':\n                self.animate_x1()\n            case 'both':\n                self.animate_s1()\n                self.animate_x1()\n\n    # ----------------------------------------------------------------------\n    def stop_animation(self, event) -> None:\n        \"\"\"\n        Stops the currently running animation.\n\n        This method sets the `stop` attribute to `True` to signal the\n        termination of the animation. It disables the stop button and\n        re-enables the start button to allow restarting the animation.\n\n        Parameters\n        ----------\n        event : object\n            The triggering event object, typically passed when the button is clicked.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Set the stop flag to True\n        self.stop = True\n\n        # Disable the stop button and enable the start button\n        self.button_stop.style.display = 'none'\n        self.button_start.style.display = 'block'\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def load_stylophone(\n        self, event=None, generation=None, style=None, x1_octave_modifier=None\n    ) -> None:\n        \"\"\"\n        Loads the appropriate Stylophone SVG based on the selected generation, style,\n        and octave modifier.\n\n        This method constructs the URL for the Stylophone asset and sends an AJAX\n        GET request to fetch it. If the `event` parameter is provided, the method\n        will determine the generation, style, and octave modifier from the respective\n        UI elements.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event object, if applicable. Defaults to None.\n        generation : str, optional\n            The generation to load ('s1', 'x1', or 'both'). Defaults to the value\n            of `select_gen` if `event` is provided.\n        style : str, optional\n            The style of the Stylophone. Defaults to the value of `select_style`\n            if `event` is provided.\n        x1_octave_modifier : str, optional\n            The octave modifier for X-1. Defaults to '-1' if the switch is checked,\n            or an empty string otherwise.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Ignore changes of the controls before the application is initialized\n        if event and not self.loaded:\n            return\n\n        # Retrieve parameters from UI elements if an event is provided\n        if event:\n            generation = self.select_gen.value\n            style = self.select_style.value\n            x1_octave_modifier = '-1' if self.switch_x1_8va.checked else ''\n\n        # Override X-1 octave modifier if the generation is 's1'\n        if generation == 's1':\n            x1_octave_modifier = ''\n\n        # Construct and send the AJAX request\n        self.trace_load_stylophone = tracing.begin('GET stylophone')\n        req = ajax.ajax()\n        req.bind('complete', self.on_complete_load_stylophone)\n        req.open(\n            'GET',\n            asset_url(f'assets/stylophone_{generation}_{style}{x1_octave_modifier}.svg'),\n            True,\n        )\n        req.send()\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def on_complete_load_stylophone(self, req) -> None:\n        \"\"\"\n        Handles the completion of the AJAX request to load the Stylophone SVG.\n\n        This method processes the SVG response, updates the UI elements, adjusts\n        the SVG's attributes for proper scaling, and highlights specific buttons\n        if they exist. If the X-1 octave switch is active, additional adjustments\n        are applied. When the request fails the error is shown in place of the\n        SVG and the tabs are compiled anyway.\n\n        Parameters\n        ----------\n        req : object\n            The AJAX response object containing the HTTP status and response text.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        tracing.end(self.trace_load_stylophone)\n\n        if not self.loaded:\n            # Injected by `initialize` once the web components are ready\n            self.startup_stylophone = req\n            self.ready('stylophone')\n            return\n\n        if req.status == 200:\n            # Inject the SVG into the container, scaled to its width\n            self.svg_container.innerHTML = responsive_svg(req.responseText)\n            self.setup_stylophone()\n        else:\n            # The tabs are still compiled, the animation just has no keys\n            window.console.warn(f'The stylophone failed to load: HTTP {req.status}')\n            self.svg_container.text = f'The stylophone failed to load (HTTP {req.status})'\n            self.save_tabs()\n\n    # ----------------------------------------------------------------------\n    def setup_stylophone(self) -> None:\n        \"\"\"\n        Sets up the stylophone SVG present in the container.\n\n        Highlights the octave modifier buttons, if they exist, and compiles\n        the tabs for the new stylophone.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # The keys of the previous SVG are gone\n        self.renderer.forget('fill:')\n\n        # Highlight specific buttons if they exist\n        self.renderer.fill(\"tab_sm2\", button_active)\n        self.renderer.fill(\"tab_xm1\", button_active)\n\n        # Save tabs after successful SVG load\n        self.save_tabs()\n\n    # ----------------------------------------------------------------------\n    def load_tabs(self) -> None:\n        \"\"\"\n        Initiates an AJAX request to load the catalog of the available tabs.\n\n        This method sends a GET request to fetch the `catalog.json` file from\n        the server, the names and the compatibility of the songs, without their\n        tabs. Upon completion, it triggers the `on_complete_load_tabs` method to\n        process the response.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.trace_load_tabs = tracing.begin('GET catalog.json')\n        req = ajax.ajax()\n        req.bind('complete', self.on_complete_load_tabs)\n        req.open('GET', asset_url('tabs/catalog.json'), True)\n        req.send()\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def on_complete_load_tabs(self, req) -> None:\n        \"\"\"\n        Processes the server's response to populate the tabs selection dropdown.\n\n        This method parses the JSON response containing the catalog, creates\n        `<option>` elements for each song, and appends them to the `select_tab`\n        element. The compatibility of every song is kept for `filter_library`.\n\n        Parameters\n        ----------\n        req : object\n            The AJAX response object containing the HTTP status and JSON data.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        tracing.end(self.trace_load_tabs)\n\n        if req.status == 200:\n            # Parse JSON response\n            catalog = req.json\n            fields = catalog['fields']\n\n            # Create and populate dropdown options\n            for i, tab in enumerate(catalog['songs']):\n                option = wa.option(\n                    tab.replace('.txt', ''),  # Remove the file extension for display\n                    value=f'tab-{i}',  # Unique value for each option\n                    id=f'id-tab-{i}',  # Unique ID for each option\n                )\n                option.attrs['file'] = tab  # Key of the tabs in `tabs.json`\n                self.select_tab <= option  # Append option to the dropdown\n                self.library_values[tab.replace('.txt', '')] = f'tab-{i}'\n                self.catalog[f'tab-{i}'] = dict(zip(fields, catalog['songs'][tab]))\n\n            self.filter_library()\n\n    # ----------------------------------------------------------------------\n    def filter_library(self, event=None) -> None:\n        \"\"\"\n        Shows only the library songs that fit the device selected in\n        `select_fit`, as they are or transposed.\n\n        Parameters\n        ----------\n        event : object, optional\n            The triggering event object. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        device = self.select_fit.value\n        for value, song in self.catalog.items():\n            fits = device == 'all' or song[f'{device}_shift'] != no_shift\n            document[f'id-{value}'].style.display = '' if fits else 'none'\n\n    # ----------------------------------------------------------------------\n    def load_library(self) -> None:\n        \"\"\"\n        Initiates an AJAX request to load the tabs of the library songs.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.trace_load_library is not None:\n            # Already loading\n            return\n        self.trace_load_library = tracing.begin('GET tabs.json')\n        req = ajax.ajax()\n        req.bind('complete', self.on_complete_load_library)\n        req.open('GET', asset_url('tabs/tabs.json'), True)\n        req.send()\n\n    # ----------------------------------------------------------------------\n    def on_complete_load_library(self, req) -> None:\n        \"\"\"\n        Keeps the tabs of the library songs and loads the selected one.\n\n        Parameters\n        ----------\n        req : object\n            The AJAX response object containing the HTTP status and JSON data.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        tracing.end(self.trace_load_library)\n        self.trace_load_library = None\n\n        if req.status == 200:\n            self.library = req.json\n            if self.current_song is None:\n                self.load_tab_in_textarea()\n\n    # ----------------------------------------------------------------------\n    def search_melody(self, event=None) -> None:\n        \"\"\"\n        Schedules a melody search with the fragment typed by the user.\n\n        Consecutive calls within `search_delay` milliseconds are coalesced into\n        a single search.\n\n        Parameters\n        ----------\n        event : object, optional\n            The triggering event object. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.search_timer is not None:\n            timer.clear_timeout(self.search_timer)\n        self.search_timer = timer.set_timeout(self.run_search, search_delay)\n\n    # ----------------------------------------------------------------------\n    def run_search(self) -> None:\n        \"\"\"\n        Lists the library songs matching the fragment, in any key.\n\n        The search runs on the server, or in the browser once the search\n        index is loaded. The index is fetched when the server is not\n        available, and the search runs again once it is loaded.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.search_timer = None\n        fragment = self.textarea_search.value.strip()\n        if not fragment:\n            self.show_matches([])\n        elif self.search_index is not None:\n            self.show_matches(self.search_index.search(fragment))\n        elif self.remote_interpreter().closed:\n            self.load_search_index()\n        else:\n            self.remote_interpreter().search(fragment)(\n                lambda matches: self.on_complete_remote_search(fragment, matches)\n            )\n\n    # ----------------------------------------------------------------------\n    def on_complete_remote_search(self, fragment: str, matches) -> None:\n        \"\"\"\n        Lists the matches found by the server, or searches in the browser\n        when the call failed.\n\n        Parameters\n        ----------\n        fragment : str\n            The searched fragment, results of outdated fragments are\n            discarded.\n        matches : list or RemoteError\n            The `(name, score)` pairs of the matches.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if fragment != self.textarea_search.value.strip():\n            return\n        if isinstance(matches, RemoteError):\n            self.load_search_index()\n        else:\n            self.show_matches(matches)\n\n    # ----------------------------------------------------------------------\n    def show_matches(self, matches: list) -> None:\n        \"\"\"\n        Lists the matching songs in `select_match`.\n\n        Parameters\n        ----------\n        matches : list\n            The `(name, score)` pairs of the matches.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.select_match.innerHTML = ''\n        for name, score in matches:\n            if name in self.library_values:\n                self.select_match <= wa.option(\n                    f'{name} ({score:.0%})',\n                    value=self.library_values[name],\n                )\n\n    # ----------------------------------------------------------------------\n    def load_search_index(self) -> None:\n        \"\"\"\n        Initiates an AJAX request to load the melody search index.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.trace_load_search is not None:\n            # Already loading\n            return\n        self.trace_load_search = tracing.begin('GET search.json')\n        req = ajax.ajax()\n        req.bind('complete', self.on_complete_load_search_index)\n        req.open('GET', asset_url('tabs/search.json'), True)\n        req.send()\n\n    # ----------------------------------------------------------------------\n    def on_complete_load_search_index(self, req) -> None:\n        \"\"\"\n        Builds the search index from the server's response and runs the\n        pending search.\n\n        Parameters\n        ----------\n        req : object\n            The AJAX response object containing the HTTP status and JSON data.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        tracing.end(self.trace_load_search)\n        self.trace_load_search = None\n\n        if req.status == 200:\n            self.search_index = SearchIndex(req.json)\n            self.run_search()\n\n    # ----------------------------------------------------------------------\n    def load_match(self, event=None) -> None:\n        \"\"\"\n        Loads the library song selected among the search matches.\n\n        Parameters\n        ----------\n        event : object, optional\n            The triggering event object. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.select_match.value:\n            self.select_tab.value = self.select_match.value\n            self.load_tab_in_textarea()\n\n    # ----------------------------------------------------------------------\n    def load_tab_in_textarea(self, event=None) -> None:\n        \"\"\"\n        Loads the selected tab content into the textarea for editing or display.\n\n        This method determines the selected tab, retrieves its content, and\n        populates the `textarea_s1` element. If a custom song is selected, it\n        loads it from the storage, otherwise from the library, which is fetched\n        on the first selection. Any pending save of the previous song is\n        flushed first. Additionally, it compiles the current tab content,\n        transposed if required, and by the transposition that fits the song on\n        the device selected in `select_fit`.\n\n        Parameters\n        ----------\n        event : object, optional\n            The triggering event object. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Persist the song being edited before replacing it\n        self.flush_tabs()\n\n        if song := self.current_song:\n            # Load custom tabs from storage or default value\n            self.textarea_s1.value = self.read_song(song)\n        elif self.library is None:\n            self.load_library()\n            return\n        else:\n            # Retrieve tab content from the library\n            option = document[f'id-{self.select_tab.value}']\n            self.textarea_s1.value = self.library[option.attrs['file']]\n\n            device = self.select_fit.value\n            if device != 'all':\n                shift = self.catalog[self.select_tab.value][f'{device}_shift']\n                if shift not in (0, no_shift):\n                    self.fit_transpose(shift, device != 's1')\n                    return\n\n        # Save and compile the current tab content, transposed if required\n        self.save_tabs()\n\n    # ----------------------------------------------------------------------\n    def fit_transpose(self, shift: int, x1_model: bool) -> None:\n        \"\"\"\n        Transposes the tabs to fit them on a device, and compiles them.\n\n        Parameters\n        ----------\n        shift : int\n            The number of semitones.\n        x1_model : bool\n            Whether to transpose along the X-1 scale.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.range_transpose.value = shift\n        self.switch_transpose_model.checked = x1_model\n        self.switch_transpose.checked = True\n        self.activate_transpose()\n\n    # ----------------------------------------------------------------------\n    @property\n    def current_song(self) -> Optional[str]:\n        \"\"\"\n        Returns the name of the custom song selected in `select_tab`.\n\n        Returns\n        -------\n        Optional[str]\n            The name of the selected custom song, or None if a tab from the\n            library is selected.\n        \"\"\"\n        value = self.select_tab.value\n        if value == 'custom' or value.startswith('custom-'):\n            return document[f'id-{value}'].attrs['song']\n        return None\n\n    # ----------------------------------------------------------------------\n    def load_songs(self) -> None:\n        \"\"\"\n        Populates the tabs selection dropdown with the custom songs stored in\n        the local storage.\n\n        The songs are listed, one name per line, under the 'songs' key. Each\n        song is stored compressed under the 'song:<name>' key.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        for name in storage.get('songs', default_song).split('\\n'):\n            if name and name != default_song:\n                self.add_song_option(name)\n\n    # ----------------------------------------------------------------------\n    def add_song_option(self, name: str) -> str:\n        \"\"\"\n        Appends a custom song to the tabs selection dropdown.\n\n        Parameters\n        ----------\n        name : str\n            The name of the custom song.\n\n        Returns\n        -------\n        str\n            The value of the created option.\n        \"\"\"\n        self.songs_count = getattr(self, 'songs_count', 0) + 1\n        value = f'custom-{self.songs_count}'\n        option = wa.option(name, value=value, id=f'id-{value}')\n        option.attrs['song'] = name\n\n        # Custom songs are listed before the tabs library\n        library = document.select('wa-option[id^=\"id-tab-\"]')\n        if library:\n            self.select_tab.insertBefore(option, library[0])\n        else:\n            self.select_tab <= option\n        return value\n\n    # ----------------------------------------------------------------------\n    def read_song(self, name: str) -> str:\n        \"\"\"\n        Reads a custom song from the local storage.\n\n        The tabs stored by previous versions under the 'tabs' key are used for\n        the default song if it has not been saved yet.\n\n        Parameters\n        ----------\n        name : str\n            The name of the custom song.\n\n        Returns\n        -------\n        str\n            The tabs of the song, or `default_tabs` if it is not stored.\n        \"\"\"\n        data = storage.get(f'song:{name}', None)\n        if data is None and name == default_song:\n            data = storage.get('tabs', None)\n        if data is None:\n            return default_tabs\n        return decompress_text(data)\n\n    # ----------------------------------------------------------------------\n    def write_song(self, name: str, tabs: str) -> None:\n        \"\"\"\n        Writes a compressed custom song to the local storage and registers it\n        in the songs index.\n\n        Parameters\n        ----------\n        name : str\n            The name of the custom song.\n        tabs : str\n            The tabs of the song.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        storage[f'song:{name}'] = compress_text(tabs)\n\n        songs = storage.get('songs', default_song).split('\\n')\n        if name not in songs:\n            storage['songs'] = '\\n'.join(songs + [name])\n\n        # Drop the uncompressed tabs of previous versions once migrated\n        if name == default_song and 'tabs' in storage:\n            del storage['tabs']\n\n    # ----------------------------------------------------------------------\n    def schedule_save(self, song: str) -> None:\n        \"\"\"\n        Schedules a debounced save of the textarea content.\n\n        Consecutive calls within `save_delay` milliseconds are coalesced into a\n        single write of the latest content.\n\n        Parameters\n        ----------\n        song : str\n            The name of the custom song being edited.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.save_timer is not None:\n            timer.clear_timeout(self.save_timer)\n\n        self.save_song = song\n        self.save_timer = timer.set_timeout(self.flush_tabs, save_delay)\n\n    # ----------------------------------------------------------------------\n    def flush_tabs(self, event=None) -> None:\n        \"\"\"\n        Writes the pending save of the textarea content, if any.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event, if applicable. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.save_song is None:\n            return\n\n        if self.save_timer is not None:\n            timer.clear_timeout(self.save_timer)\n\n        self.write_song(self.save_song, self.textarea_s1.value)\n        self.save_timer = None\n        self.save_song = None\n\n    # ----------------------------------------------------------------------\n    def new_song(self, event=None) -> None:\n        \"\"\"\n        Saves the textarea content as a new named custom song and selects it.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event, if applicable. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        name = window.prompt('Song name')\n        if not name or not name.strip():\n            return\n        name = ' '.join(name.split())\n\n        self.flush_tabs()\n        if name == default_song:\n            value = 'custom'\n        else:\n            options = [\n                option\n                for option in document.select('wa-option[id^=\"id-custom-\"]')\n                if option.attrs['song'] == name\n            ]\n            value = options[0].attrs['value'] if options else self.add_song_option(name)\n\n        self.write_song(name, self.textarea_s1.value)\n        self.select_tab.value = value\n\n    # ----------------------------------------------------------------------\n    def delete_song(self, event=None) -> None:\n        \"\"\"\n        Deletes the selected custom song from the local storage.\n\n        Deleting the default song resets it to `default_tabs`, other songs are\n        also removed from the tabs selection dropdown.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event, if applicable. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        song = self.current_song\n        if song is None or not window.confirm(f'Delete \"{song}\"?'):\n            return\n\n        # Discard any pending save of the deleted song\n        if self.save_timer is not None:\n            timer.clear_timeout(self.save_timer)\n        self.save_timer = None\n        self.save_song = None\n\n        for key in [f'song:{song}'] + (['tabs'] if song == default_song else []):\n            if key in storage:\n                del storage[key]\n\n        if song != default_song:\n            songs = storage.get('songs', default_song).split('\\n')\n            storage['songs'] = '\\n'.join(name for name in songs if name != song)\n            document[f'id-{self.select_tab.value}'].remove()\n\n        self.select_tab.value = 'custom'\n        self.load_tab_in_textarea()\n\n    # ----------------------------------------------------------------------\n    def clear(self, tab: str) -> None:\n        \"\"\"\n        Resets the style of the specified SVG element to its default state.\n\n        This method sets the `fill` style of the SVG element identified by the\n        `tab` parameter to the base button color on the next animation frame.\n\n        Parameters\n        ----------\n        tab : str\n            The identifier of the SVG element to reset.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.renderer.fill(tab, button_base)\n\n    # ----------------------------------------------------------------------\n    def release(self, tab: str, scheduled: Optional[float] = None) -> None:\n        \"\"\"\n        Releases a highlighted key and records the release in the telemetry.\n\n        Parameters\n        ----------\n        tab : str\n            The identifier of the SVG element to reset.\n        scheduled : Optional[float], optional\n            The timestamp the release was scheduled for. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.clear(tab)\n        if scheduled is not None:\n            # Measured once the release is actually committed to the DOM\n            self.renderer.after(lambda: self.telemetry.on_release(scheduled))\n\n    # ----------------------------------------------------------------------\n    def record_highlight(self, scheduled: Optional[float]) -> None:\n        \"\"\"\n        Records the highlight of a note in the telemetry once it is committed\n        to the DOM, and in the classroom timeline when teaching.\n\n        Parameters\n        ----------\n        scheduled : Optional[float]\n            The timestamp the note was scheduled for.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.classroom:\n            self.classroom.on_highlight()\n\n        if scheduled is None:\n            return\n        gap = float(self.select_delay.value)\n        self.renderer.after(lambda: self.telemetry.on_highlight(scheduled, gap))\n\n    # ----------------------------------------------------------------------\n    def active(self, tab: str) -> None:\n        \"\"\"\n        Sets the style of the specified SVG element to indicate an active state.\n\n        This method sets the `fill` style of the SVG element identified by the\n        `tab` parameter to the active button color on the next animation frame.\n\n        Parameters\n        ----------\n        tab : str\n            The identifier of the SVG element to activate.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.renderer.fill(tab, button_active)\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def animate_s1(self) -> None:\n        \"\"\"\n        Animates the S-1 tabs sequence, highlighting and clearing each tab in turn.\n\n        This method iterates through the `s1_tabs` sequence, updating the\n        visual representation on the SVG element and advancing the counter.\n        The animation stops if the `stop` flag is set or when the sequence ends.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        try:\n            # Retrieve the current tab based on the counter\n            tab = self.s1_tabs[self.counter_s1]\n        except IndexError:\n            # Wait for the tail of the program if it is still being compiled\n            if self.compiling and not self.stop:\n                self.scheduled_s1 = self.telemetry.schedule(float(self.select_delay.value))\n                timer.set_timeout(self.animate_s1, float(self.select_delay.value))\n            # Stop animation if the counter exceeds the sequence length\n            return\n\n        # Update the tab preview\n        self.update_tabs_preview()\n        self.counter_s1 += 1\n        self.renderer.value('range_progress', self.range_progress, self.counter_s1)\n\n        # Check if the tab is a valid number, highlight it if so\n        if tab.replace('.', '').isdigit():\n            self.active(f\"tab_s{tab.replace('.', '_')}\")\n        else:\n            # Skip invalid tabs and recursively call the animation\n            return self.animate_s1()\n\n        # With both generators the X-1 records the notes, see `animate_x1`\n        if self.select_gen.value == 's1':\n            self.record_highlight(self.scheduled_s1)\n            release_at = self.telemetry.schedule(float(self.select_delay.value) * 0.7)\n        else:\n            release_at = None\n\n        # Schedule a timeout to clear the tab after a delay\n        timer.set_timeout(\n            lambda: self.release(f\"tab_s{tab.replace('.', '_')}\", release_at),\n            float(self.select_delay.value) * 0.7,\n        )\n\n        # Continue animation if not stopped\n        if not self.stop:\n            self.scheduled_s1 = self.telemetry.schedule(float(self.select_delay.value))\n            timer.set_timeout(self.animate_s1, float(self.select_delay.value))\n        else:\n            # Reset the progress bar when animation stops\n            self.renderer.value('range_progress', self.range_progress, 0)\n\n    # ----------------------------------------------------------------------\n    @trace()\n    def animate_x1(self) -> None:\n        \"\"\"\n        Animates the X-1 tabs sequence, highlighting and clearing each tab in turn.\n\n        This method iterates through the `x1_tabs` sequence, updating the\n        visual representation on the SVG element and advancing the counter.\n        It handles octave modifiers (`-1`, `-2`) and ensures correct highlighting\n        and clearing of the respective elements. The animation stops if the\n        `stop` flag is set or when the sequence ends.\n\n        Returns\n        -------\n        None\n\n        Notes\n        -----\n        - Assumes the existence of attributes `x1_tabs`, `counter_x1`, `range_progress`,\n          and `stop`.\n        - Handles octave modifiers `-1` and `-2` separately.\n        - Uses `select_gen` to determine if X-1 is the active generator.\n        - Assumes methods like `clear` and `update_tabs_preview` exist and are functional.\n\n        Examples\n        --------\n        >>> obj = YourClass()\n        >>> obj.animate_x1()  # Starts animating the X-1 tabs sequence\n        \"\"\"\n        try:\n            # Retrieve the current tab based on the counter\n            tab = self.x1_tabs[self.counter_x1]\n        except IndexError:\n            # Wait for the tail of the program if it is still being compiled\n            if self.compiling and not self.stop:\n                self.scheduled_x1 = self.telemetry.schedule(float(self.select_delay.value))\n                timer.set_timeout(self.animate_x1, float(self.select_delay.value))\n            # Stop animation if the counter exceeds the sequence length\n            return\n\n        # Update preview and progress for X-1 generator\n        if self.select_gen.value == 'x1':\n            self.update_tabs_preview()\n            self.counter_x1 += 1\n            self.renderer.value('range_progress', self.range_progress, self.counter_x1)\n        else:\n            self.counter_x1 += 1\n\n        # Check if the tab is valid, accounting for octave modifiers\n        if (\n            tab.strip('()')\n            .replace('-1:', '')\n            .replace('-2:', '')\n            .replace('.', '')\n            .isdigit()\n        ):\n            if '-1' in tab:\n                # Handle octave -1\n                tab = tab.strip('()').replace('-1:', '')\n                self.active(\"tab_xm1\")\n                self.clear(\"tab_xm2\")\n\n            elif '-2' in tab:\n                # Handle octave -2\n                tab = tab.strip('()').replace('-2:', '')\n                self.active(\"tab_xm2\")\n                self.clear(\"tab_xm1\")\n\n            else:\n                # Handle normal tabs\n                tab = tab.strip('()')\n\n            # Highlight the current tab\n            self.active(f\"tab_x{tab.replace('.', '_')}\")\n        else:\n            # Skip invalid tabs and recursively call the animation\n            return self.animate_x1()\n\n        self.record_highlight(self.scheduled_x1)\n\n        # Schedule a timeout to clear the tab after a delay\n        release_at = self.telemetry.schedule(float(self.select_delay.value) * 0.7)\n        timer.set_timeout(\n            lambda: self.release(f\"tab_x{tab.replace('.', '_')}\", release_at),\n            float(self.select_delay.value) * 0.7,\n        )\n\n        # Clear octave indicators if the switch is not enabled\n        if not self.switch_x1_8va.checked:\n            timer.set_timeout(\n                lambda: self.clear(\"tab_xm1\"), float(self.select_delay.value)\n            )\n        timer.set_timeout(lambda: self.clear(\"tab_xm2\"), float(self.select_delay.value))\n\n        # Continue animation if not stopped\n        if not self.stop:\n            self.scheduled_x1 = self.telemetry.schedule(float(self.select_delay.value))\n            timer.set_timeout(self.animate_x1, float(self.select_delay.value))\n        else:\n            pass\n            # Reset the progress bar when animation stops\n            #self.range_progress.value = 0\n\n    # ----------------------------------------------------------------------\n    def activate_transpose(self, event=None) -> None:\n        \"\"\"\n        Toggles the visibility of transpose-related UI elements based on the state\n        of the transpose switch.\n\n        If the transpose switch is not checked, the transpose controls are hidden.\n        Otherwise, they are displayed, and the transposed tabs are updated.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event object. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if not self.switch_transpose.checked:\n            # Hide transpose controls\n            self.range_transpose.style.display = 'none'\n            self.textarea_transpose.style.display = 'none'\n            self.switch_transpose_model.style.display = 'none'\n        else:\n            # Show transpose controls and update transposed tabs\n            self.range_transpose.style.display = 'block'\n            self.textarea_transpose.style.display = 'block'\n            self.switch_transpose_model.style.display = 'block'\n\n        # Recompile the tabs with or without transposition\n        self.save_tabs()\n\n    # ----------------------------------------------------------------------\n    def update_transposed_tabs(self, event=None) -> None:\n        \"\"\"\n        Updates the transposed tabs based on the transpose range value and the selected model.\n\n        This method recalculates the tabs by shifting them up or down according\n        to the value of the transpose range slider and the selected scale model.\n        The results are displayed in the `textarea_transpose` element.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event object, if applicable. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        # Shift the tabs along the scale of the selected model\n        self.textarea_transpose.value = transpose_tabs(\n            self.normalized_tabs,\n            self.range_transpose.value,\n            self.switch_transpose_model.checked,\n        )\n\nif __name__ == '__main__':\n    import argparse\n    from bundle import make_bundle\n    from vendor import is_vendored, webawesome_path, webawesome_components, icons_path, fonts_path\n    from shell import prerender_shell\n    from assets import build_assets\n    from serviceworker import make_service_worker, ServiceWorkerHandler, service_worker_file\n    from radiant.framework.server import DEFAULT_BRYTHON_VERSION\n    from api import api_handlers\n    from appserver import serve\n    from duplicates import report_duplicates\n    from library import load_tabs\n\n    parser = argparse.ArgumentParser(description='Stylophone Assistant server')\n    parser.add_argument('--port', default='5000')\n    parser.add_argument('--workers', type=int, default=1, help='processes serving requests')\n    parser.add_argument('--export', action='store_true', help='write the static app to docs/ instead of serving')\n    args = parser.parse_args()\n\n    library = load_tabs()\n    if library['changed']:\n        report_duplicates(library['intervals'])\n    make_bundle()\n    hashed_assets = build_assets()\n    icons = f'{domain}/root/{icons_path}'\n    vendored = is_vendored()\n    make_service_worker(\n        domain,\n        hashed_assets,\n        DEFAULT_BRYTHON_VERSION,\n        vendor=[fonts_path, icons_path] + ([webawesome_path] if vendored else []),\n    )\n\n    serve(\n        'StylophoneAssistant',\n        host='0.0.0.0',\n        port=args.port,\n        workers=args.workers,\n        template='template.html',\n        static_app='docs',\n        export=args.export,\n        domain=domain,\n\n        page_title=\"Stylophone Assistant\",\n        page_favicon=f\"{domain}/root/static/icons/favicon.ico\",\n        page_description=\"Stylophone Assistant: Create custom tabs, generate dynamic animations, and practice seamlessly with your Stylophone S-1 or Gen X-1. Perfect for all skill levels!\",\n        #page_image=\"\",\n        page_url=\"yeisoncardona.github.io/stylophone-assistant\",\n        #page_summary_large_image=\"\",\n        page_site=\"Stylophone Assistant\",\n        page_author=\"Yeison Cardona\",\n        #page_copyright=\"\",\n\n        # Vendored offline by `python vendor.py`, the Web Awesome CDN is\n        # used until it is\n        environ={\n            'vendor': f'{domain}/root/{webawesome_path}' if vendored else '',\n            'vendor_components': webawesome_components,\n            'vendor_icons': icons,\n            'vendor_fonts': f'{domain}/root/{fonts_path}',\n        },\n        immutable_paths=['static/vendor/', 'static/assets/'],\n        template_variables={\n            'shell': prerender_shell(default_song, icons),\n            'assets': hashed_assets,\n        },\n        handlers=[\n            (rf'^{domain}/{service_worker_file}$', ServiceWorkerHandler),\n            *api_handlers(domain),\n        ],\n        export_files=[service_worker_file],\n        hot_assets=['assets/*.svg', 'tabs/*.json', 'static/assets/*'],\n        broadcast=broadcast_path,\n    )\n", ["classroom", "compatibility", "compiler", "radiant.framework", "radiant.framework.server", "render", "search", "shell", "telemetry", "tracing", "transport"]], "radiant": [".py", " \n", [], 1], "radiant.framework": [".py", "from .html_ import html, select, Element\nfrom .webcomponents import WebComponents", ["radiant", "radiant.framework.html_", "radiant.framework.webcomponents"], 1], "radiant.framework.html_": [".py", "from browser import html as html_\nfrom browser import document as document_\n\n\n########################################################################\nclass style_context:\n    \"\"\"\"\"\"\n    # ----------------------------------------------------------------------\n\n    def __init__(self, element):\n        \"\"\"\"\"\"\n        self.style = element.style\n\n    # # ----------------------------------------------------------------------\n    def __getattr__(self, attr):\n        \"\"\"\"\"\"\n        attr = attr.replace('_', '-')\n        return getattr(self.style, attr)\n\n    # ----------------------------------------------------------------------\n    def __setattr__(self, attr, value):\n        \"\"\"\"\"\"\n        if attr in ['style']:\n            return super().__setattr__(attr, value)\n\n        attr = attr.replace('_', '-')\n        return setattr(self.style, attr, value)\n\n\n########################################################################\nclass class_context(list):\n    \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, element, classes):\n        \"\"\"\"\"\"\n        super().__init__(filter(None, classes.split(' ')))\n        self.element = element\n\n    # ----------------------------------------------------------------------\n    def __setitem__(self, key, value):\n        \"\"\"\"\"\"\n        ret = super().__setitem__(key, value)\n        self.element.class_name = ' '.join(self)\n        return ret\n\n    # ----------------------------------------------------------------------\n    def append(self, item):\n        \"\"\"\"\"\"\n        ret = super().append(item.strip())\n        self.element.class_name = ' '.join(self)\n        return ret\n\n    # ----------------------------------------------------------------------\n    def extend(self, items):\n        \"\"\"\"\"\"\n        ret = super().extend([item.strip() for item in items])\n        self.element.class_name = ' '.join(self)\n        return ret\n\n    # ----------------------------------------------------------------------\n    def insert(self, index, item):\n        \"\"\"\"\"\"\n        ret = super().insert(index, item.strip())\n        self.element.class_name = ' '.join(self)\n        return ret\n\n    # ----------------------------------------------------------------------\n    def remove(self, value):\n        \"\"\"\"\"\"\n        if value in self:\n            ret = super().remove(value.strip())\n            self.element.class_name = ' '.join(self)\n            return ret\n\n\n########################################################################\nclass select(list):\n    \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, selector):\n        \"\"\"Constructor\"\"\"\n        super().__init__(document_.select(selector))\n\n    # ----------------------------------------------------------------------\n    def __getattr__(self, attr):\n        \"\"\"\"\"\"\n        if attr == 'style':\n            return self.style_()\n\n        if attr == 'styles':\n            return self.styles_()\n\n        if attr == 'classes':\n            return self.classes_()\n\n        if attr == 'bind':\n            return self.bind_()\n\n        def inset(*args, **kwargs):\n            return [getattr(element, attr)(*args, **kwargs) for element in self]\n\n        return inset\n\n    # ----------------------------------------------------------------------\n    def __setattr__(self, attr, value):\n        \"\"\"\"\"\"\n        for element in self:\n            setattr(element, attr, value)\n\n    # ----------------------------------------------------------------------\n    def style_(self):\n        \"\"\"\"\"\"\n        class Style:\n            def __setattr__(cls, attr, value):\n                \"\"\"\"\"\"\n                for element in self:\n                    setattr(element.style, attr, value)\n        return Style()\n\n    # ----------------------------------------------------------------------\n    def classes_(self):\n        \"\"\"\"\"\"\n        class Classes_:\n            def __getattr__(cls, attr):\n                \"\"\"\"\"\"\n                def inset(*args, **kwargs):\n                    [setattr(element, 'classes', class_context(\n                        element, element.class_name)) for element in self]\n                    return [getattr(element.classes, attr)(*args, **kwargs) for element in self]\n                return inset\n        return Classes_()\n\n    # ----------------------------------------------------------------------\n    def styles_(self):\n        \"\"\"\"\"\"\n        class Styles_:\n            def __getattr__(cls, attr):\n                \"\"\"\"\"\"\n                [setattr(element, 'styles', style_context(element))\n                 for element in self]\n                return [getattr(element.styles, attr) for element in self]\n\n            def __setattr__(cls, attr, value):\n                \"\"\"\"\"\"\n                [setattr(element, 'styles', style_context(element))\n                 for element in self]\n                [setattr(element.styles, attr, value) for element in self]\n\n        return Styles_()\n\n    # ----------------------------------------------------------------------\n    def bind_(self):\n        \"\"\"\"\"\"\n        class Bind_:\n            def __call__(cls, event, fn):\n                \"\"\"\"\"\"\n                return [element.bind(event, fn) for element in self]\n\n        return Bind_()\n\n\n    # ----------------------------------------------------------------------\n    def __le__(self, other):\n        \"\"\"\"\"\"\n        for element in self:\n            element <= other\n\n\n########################################################################\nclass html_context:\n    \"\"\"\"\"\"\n    _context = []\n\n    # ----------------------------------------------------------------------\n    def __init__(self, element):\n        self._element = element\n        self._parent = html_context._context[-1] if html_context._context else None\n\n    # ----------------------------------------------------------------------\n    def __enter__(self):\n        if hasattr(self._element, 'child_'):\n            self._element = self._element.child_\n\n        if self._parent:\n            self._parent <= self._element\n\n        html_context._context.append(self._element)\n        return self._element\n\n    # ----------------------------------------------------------------------\n    def __exit__(self, exc_type, exc_val, exc_tb):\n        html_context._context.pop()\n\n    # ----------------------------------------------------------------------\n    def __setattr__(self, attr, value):\n        \"\"\"\"\"\"\n        if attr.startswith('_'):\n            return super().__setattr__(attr, value)\n        if hasattr(self._element, attr):\n            setattr(self._element, attr, value)\n        else:\n            super().__setattr__(attr, value)\n\n    # ----------------------------------------------------------------------\n    def __call__(self, parent):\n        \"\"\"\"\"\"\n        self._parent = parent\n        self._parent <= self._element\n        return self\n\n\n########################################################################\nclass Element:\n    \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, element=None):\n        \"\"\"\"\"\"\n        self._element = element\n\n    # ----------------------------------------------------------------------\n    def __getattribute__(self, attr):\n        \"\"\"\"\"\"\n        if attr.startswith('_'):\n            return super().__getattribute__(attr)\n\n        def inset(*args, **kwargs):\n            kwargs_ = {k.removesuffix(\"_\").replace(\n                \"_\", \"-\"): kwargs[k] for k in kwargs}\n\n            if self._element:\n                html_e = self._element\n            else:\n                html_e = getattr(html_, attr)(*args, **kwargs_)\n\n            html_e.classes = class_context(html_e, kwargs_.get('Class', ''))\n            html_e.context = html_context(html_e)\n            try:\n                html_e.styles = style_context(html_e)\n            except:\n                html_e.styles = None\n\n            return html_e\n\n        return inset\n\n    # ----------------------------------------------------------------------\n    def __call__(self, element):\n        \"\"\"\"\"\"\n        cont = html.DIV(element)\n        cont.child_ = element\n        return cont\n\n\n\nhtml = Element()\n", ["radiant", "radiant.framework"]], "radiant.framework.server": [".py", "import os\n\nfrom browser import document, timer\nfrom .utils import LocalInterpreter\nfrom .html_ import select, html\nfrom browser.template import Template\nfrom interpreter import Interpreter\n\nRadiantServer = None\n\n\n########################################################################\nclass RadiantCore:\n    \"\"\"\"\"\"\n    endpoints = []\n\n    # ----------------------------------------------------------------------\n    def __init__(self, class_, python=[[None, None, None]], **kwargs):\n        \"\"\"\"\"\"\n        for module, class_, endpoint in python:\n            if module and module != 'None':\n                setattr(self, class_, LocalInterpreter(endpoint=endpoint))\n\n        self.body = select('body')\n        self.head = select('head')\n\n    # ----------------------------------------------------------------------\n    def add_css_file(self, file):\n        \"\"\"\"\"\"\n        document.select('head')[0] <= html.LINK(\n            href=os.path.join('root', file), type='text/css', rel='stylesheet')\n\n    # # ----------------------------------------------------------------------\n    # def on_load(self, callback, evt='DOMContentLoaded'):\n        # \"\"\"\"\"\"\n        # logging.warning('#' * 30)\n        # logging.warning('#' * 30)\n        # document.addEventListener('load', callback)\n        # logging.warning('#' * 30)\n        # logging.warning('#' * 30)\n\n    # ----------------------------------------------------------------------\n    def map_value(self, x, in_min, in_max, out_min, out_max):\n        return (x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min\n\n    # ----------------------------------------------------------------------\n    def welcome(self):\n        \"\"\"\"\"\"\n        parent = html.DIV(style={'width': '90vw', 'margin-left': '5vw', 'margin-right': '5vw'})\n\n        links_style = {\n            'color': '#28BDB8',\n            'text-decoration': 'none',\n            'font-weight': '400',\n        }\n\n        buttons_style = {\n            'background-color': '#28bdb8',\n            'border': 'none',\n            'padding': '10px 15px',\n            'color': 'white',\n        }\n\n        with parent.context as parent:\n            parent <= html.H1('Radiant Framework', style={'font-weight': '300', 'color': '#28bdb8'})\n            documentation = html.A(' documentation ', href='https://radiant-framework.readthedocs.io', style=links_style)\n            repository = html.A(' repository ', href='https://github.com/dunderlab/python-radiant_framework', style=links_style)\n            brython = html.A(' Brython ', href='https://brython.info/', style=links_style)\n\n            with html.SPAN().context as tagline:\n                tagline <= html.SPAN('Visit the')\n                tagline <= documentation\n                tagline <= html.SPAN('for more information or the')\n                tagline <= repository\n                tagline <= html.SPAN('to get the source code.')\n\n            with html.DIV(style={'padding': '20px 0px'}).context as container:\n                with html.BUTTON('Open Terminal', style=buttons_style).context as button:\n                    button.bind('click', lambda evt: Interpreter(title=\"Radiant Framework\", cols=80))\n\n            with html.IMG(src='https://radiant-framework.readthedocs.io/en/latest/_static/logo.svg').context as image:\n                image.style.width = '100vw'\n                image.style.height = '25vh'\n                image.style['background-color'] = '#F2F2F2'\n                image.style['border-top'] = '1px solid #cdcdcd'\n                image.style['margin-top'] = '5vh'\n                image.style['margin-left'] = '-5vw'\n\n            with html.DIV(style={'text-align': 'center', 'font-size': '110%', 'width': '100%', }).context as container:\n                container <= html.SPAN('Radiant Framework is running succesfully!<br>')\n\n                with html.SPAN().context as tagline:\n                    tagline <= brython\n                    tagline <= html.SPAN('powered!')\n\n        self.body.style = {\n            'background-color': '#F2F2F2',\n            'font-family': 'Roboto',\n            'font-weight': '300',\n            'margin': '0px',\n            'padding': '0px',\n\n        }\n        self.body <= parent\n\n    # ----------------------------------------------------------------------\n    def hide(self, selector):\n        \"\"\"\"\"\"\n        def inset(evt):\n            document.select_one(selector).style = {'display': 'none'}\n        return inset\n\n    # ----------------------------------------------------------------------\n    def show(self, selector):\n        \"\"\"\"\"\"\n        def inset(evt):\n            document.select_one(selector).style = {'display': 'block'}\n        return inset\n\n    # ----------------------------------------------------------------------\n    def toggle(self, selector):\n        \"\"\"\"\"\"\n        def inset(evt):\n            if document.select_one(selector).style['display'] == 'none':\n                document.select_one(selector).style['display'] = 'block'\n            else:\n                document.select_one(selector).style['display'] = 'none'\n        return inset\n\n\n\n########################################################################\nclass RadiantAPI(RadiantCore):\n    \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self):\n        \"\"\"Constructor\"\"\"\n        self.body = select('body')\n        self.head = select('head')\n\n\n    # ----------------------------------------------------------------------\n    @classmethod\n    def get(cls, url):\n        \"\"\"\"\"\"\n        def inset(fn):\n            RadiantCore.endpoints.append((url, fn.__name__))\n            def subinset(**arguments):\n                class Wrapped(RadiantCore):\n                    def __init__(self, *args, **kwargs):\n                        super().__init__(*args, **kwargs)\n                        fn(**{k:arguments[k][0] for k in arguments})\n                return Wrapped\n            return subinset\n        return inset\n\n    # ----------------------------------------------------------------------\n    @classmethod\n    def post(cls, url):\n        \"\"\"\"\"\"\n        def inset(fn):\n            RadiantCore.endpoints.append((url, fn.__name__))\n            def subinset(**arguments):\n                class Wrapped(RadiantCore):\n                    def __init__(self, *args, **kwargs):\n                        super().__init__(*args, **kwargs)\n                        fn(**{k:arguments[k][0] for k in arguments})\n                return Wrapped\n            return subinset\n        return inset\n\n\n\n\n# ----------------------------------------------------------------------\ndef render(template, context={}):\n    \"\"\"\"\"\"\n    placeholder = '#radiant-placeholder--templates'\n    parent = document.select_one(placeholder)\n    parent.attrs['b-include'] = f\"root/{template}\"\n    document.select_one('body') <= parent\n    Template(placeholder[1:]).render(**context)\n    document.select_one(placeholder).style = {'display': 'block'}\n    return document.select_one(placeholder).children\n\n", ["radiant", "radiant.framework", "radiant.framework.html_", "radiant.framework.utils"]], "radiant.framework.utils": [".py", "\"\"\"\nBrython MDCFramework: Radiant\n=============================\n\n\"\"\"\n\n# import random\nfrom browser import ajax, window, websocket, document, timer\nimport json\n\n\n########################################################################\nclass Environ_:\n    \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self):\n        \"\"\"\"\"\"\n        try:\n            self.environ = json.load(open('environ.json'))\n        except:\n            self.environ = {}\n\n    # ----------------------------------------------------------------------\n    def __call__(self, value, default=None):\n        \"\"\"\"\"\"\n        return self.environ.get(value, default)\n\n    # ----------------------------------------------------------------------\n\n    def __getattr__(self, value):\n        \"\"\"\"\"\"\n        return self.environ.get(value, None)\n\n\nenviron = Environ_()\n\n\n########################################################################\nclass LocalInterpreter:\n    \"\"\"AndroidMain\n\n    Connect with app\n    \"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, url=None, csrftoken=None, endpoint='/python_handler'):\n        \"\"\"Constructor\"\"\"\n\n        self.url_ = url\n\n        if csrftoken:\n            self.csrftoken = csrftoken\n\n        elif hasattr(window, 'csrftoken'):\n            self.csrftoken = window.csrftoken\n        else:\n            self.csrftoken = \"NO_CSRFTOKEN_PROVIDED\"\n\n        if url is None:\n            # try:\n            # self.url_ = '/'\n            # self.test()\n            # except:\n            self.url_ = endpoint\n            self.test()\n\n    # ----------------------------------------------------------------------\n    def __getattr__(self, attr):\n        \"\"\"\"\"\"\n        if attr.endswith('_async'):\n            attr = attr.replace('_async', '')\n            f = lambda *args, **kwargs: self.__request_async__(attr, *args, **kwargs)\n        else:\n            f = lambda *args, **kwargs: self.__request__(attr, *args, **kwargs)\n\n        f.__name__ = attr\n        return f\n\n    # ----------------------------------------------------------------------\n    def __request__(self, attr, *args, **kwargs):\n        \"\"\"\"\"\"\n        req = ajax.ajax()\n        req.open('POST', self.url_, False)\n        req.set_header('content-type', 'application/x-www-form-urlencoded')\n        req.send(\n            {\n                'name': attr,\n                'args': json.dumps(list(args)),\n                'kwargs': json.dumps(kwargs),\n                'csrfmiddlewaretoken': self.csrftoken,\n            }\n        )\n\n        try:\n            resp = json.loads(req.text)['__RDNT__']\n        except:\n            resp = req.text\n\n        return resp\n\n    # ----------------------------------------------------------------------\n    def __request_async__(self, attr, *args, **kwargs):\n        \"\"\"\"\"\"\n\n        def __ajax__(fn):\n            req = ajax.ajax()\n            req.bind('complete', fn)\n            req.open('POST', self.url_, True)\n            req.set_header('content-type', 'application/x-www-form-urlencoded')\n            req.send(\n                {\n                    'name': attr,\n                    'args': json.dumps(list(args)),\n                    'kwargs': json.dumps(kwargs),\n                    'csrfmiddlewaretoken': self.csrftoken,\n                }\n            )\n\n        return __ajax__\n\n\n########################################################################\nclass WebSocket:\n    \"\"\"WebSocket\n\n    COnnectt with app\n\n    \"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(cls, ip):\n        \"\"\"\"\"\"\n        if not websocket.supported:\n            print(\"WebSocket is not supported by your browser\")\n            return\n        cls.ip_ = ip\n        # open a web socket\n        # cls.ws = websocket.WebSocket(\"wss://192.168.1.20:8888\")\n        cls.ws = websocket.WebSocket(ip)\n        # bind functions to web socket events\n        cls.ws.bind('open', cls.on_open)\n        cls.ws.bind('error', cls.on_error)\n        cls.ws.bind('message', cls.on_message)\n        cls.ws.bind('close', cls.on_close)\n\n        port_ip = ip.replace('wss://', '').replace('ws://', '').replace('/ws', '')\n\n        # cls.ip = port_ip[:port_ip.find(\":\")]\n        # cls.port =  port_ip[port_ip.find(\":\")+1:]\n        cls.ip = port_ip\n        cls.protocol = 'wss' if 'wss' in ip else 'ws'\n\n    # ----------------------------------------------------------------------\n    def on_open(cls, evt):\n        \"\"\"\"\"\"\n        # print('ON OPEN')\n\n    # ----------------------------------------------------------------------\n    def on_error(cls, evt):\n        \"\"\"\"\"\"\n        # print('ON ERROR')\n\n    # ----------------------------------------------------------------------\n    def on_message(cls, evt):\n        \"\"\"\"\"\"\n        # print('ON MESSAGE')\n\n    # ----------------------------------------------------------------------\n    def on_close(cls, evt):\n        \"\"\"\"\"\"\n        # print('ON CLOSE')\n\n    # ----------------------------------------------------------------------\n    def send(cls, data):\n        \"\"\"\"\"\"\n        cls.wait_for_connection(cls._send, data)\n\n    # ----------------------------------------------------------------------\n    def wait_for_connection(cls, callback, data):\n        \"\"\"\"\"\"\n        if cls.ws.readyState == 1:\n            return callback(data)\n        else:\n            timer.set_timeout(lambda: cls.wait_for_connection(callback, data), 1000)\n\n    # ----------------------------------------------------------------------\n    def _send(cls, data):\n        \"\"\"\"\"\"\n        if not data:\n            return\n\n        if isinstance(data, (str, bytes)):\n            cls.ws.send(data)\n        else:\n            data = json.dumps(data)\n            cls.ws.send(data)\n\n    # ----------------------------------------------------------------------\n    def close_connection(cls, *args, **kwargs):\n        \"\"\"\"\"\"\n        cls.ws.close()\n\n\n# ########################################################################\n# class API:\n# \"\"\"\"\"\"\n\n# # ----------------------------------------------------------------------\n# def __init__(self, url, auth=None, token=None, csrftoken=None, append_slash=True):\n# \"\"\"Constructor\"\"\"\n# self.url_ = url\n# self.url_ = self.url_.strip('/')\n\n# self.token = token\n\n# if csrftoken:\n# self.csrftoken = csrftoken\n\n# elif hasattr(window, 'csrftoken'):\n# self.csrftoken = window.csrftoken\n# else:\n# self.csrftoken = None\n\n# self.append_slash = append_slash\n\n# # ----------------------------------------------------------------------\n# def head(self, endpoint):\n# \"\"\"\"\"\"\n# return self.__request__('HEAD', f'{self.url_}/{endpoint}')\n\n# # ----------------------------------------------------------------------\n# def get(self, endpoint, pk=None, data=None):\n# \"\"\"\"\"\"\n# if pk:\n# return self.__request__('GET', f'{self.url_}/{endpoint}/{pk}', data)\n# else:\n# return self.__request__('GET', f'{self.url_}/{endpoint}', data)\n\n# # ----------------------------------------------------------------------\n# def delete(self, endpoint, pk, data=None):\n# \"\"\"\"\"\"\n# return self.__request__('DELETE', f'{self.url_}/{endpoint}/{pk}', data)\n\n# # ----------------------------------------------------------------------\n# def post(self, endpoint, data=None):\n# \"\"\"\"\"\"\n# return self.__request__('POST', f'{self.url_}/{endpoint}', data)\n\n# # ----------------------------------------------------------------------\n# def patch(self, endpoint, pk, data=None):\n# \"\"\"\"\"\"\n# return self.__request__('PATCH', f'{self.url_}/{endpoint}/{pk}', data)\n\n# # ----------------------------------------------------------------------\n# def options(self, endpoint, data=None):\n# \"\"\"\"\"\"\n# return self.__request__('OPTIONS', f'{self.url_}/{endpoint}', data)\n\n# # ----------------------------------------------------------------------\n# def __request__(self, method, url, data=None):\n# \"\"\"\"\"\"\n# req = ajax.ajax()\n\n# if self.append_slash:\n# url = f'{url.strip(\"/\")}/'\n\n# req.open(method, url, False)\n\n# req.setRequestHeader('content-type', 'application/json')\n\n# if self.token:\n# req.set_header('Authorization', f\"JWT {self.token}\")\n\n# if self.csrftoken:\n# req.setRequestHeader('X-CSRFToken', self.csrftoken)\n\n# if data:\n# data = json.dumps(data)\n# req.send(data)\n# else:\n# req.send()\n\n# data = json.loads(req.text)\n# return data\n\n\n# # ----------------------------------------------------------------------\n# def get(url, method=\"GET\", csrftoken=None):\n# \"\"\"\"\"\"\n# if csrftoken:\n# csrftoken = csrftoken\n\n# elif hasattr(window, 'csrftoken'):\n# csrftoken = window.csrftoken\n# else:\n# csrftoken = None\n\n# req = ajax.ajax()\n# req.open(method, url, False)\n# req.set_header('content-type', 'application/x-www-form-urlencoded')\n# req.send({'csrfmiddlewaretoken': csrftoken})\n# return json.loads(req.text)\n\n\n# # ----------------------------------------------------------------------\n# def gen_id(length=8, charset='abcdefghijklmnopqrstuvwxyz123456789'):\n# \"\"\"\"\"\"\n# return ''.join([random.choice(charset) for n in range(length)])\n\n\n# ----------------------------------------------------------------------\ndef autoinit():\n    \"\"\"\"\"\"\n    if hasattr(window, 'mdc'):\n        window.mdc.autoInit()\n        try:\n            [\n                window.mdc.slider.MDCSlider.attachTo(slider)\n                for slider in document.select('.mdc-slider')\n            ]\n        except:\n            pass\n\n\n# ----------------------------------------------------------------------\ndef autoiframe(id_, parent):\n    \"\"\"\"\"\"\n    if iframe := document.select_one(f'#{id_}'):\n        if iframe.contentWindow.document.select_one(parent):\n            iframe.style.height = (\n                f\"{iframe.contentWindow.document.documentElement.scrollHeight}px\"\n            )\n            return timer.set_timeout(lambda: autoiframe(id_, parent), 2000)\n    timer.set_timeout(lambda: autoiframe(id_, parent), 500)\n\n\n# class fake:\n# def __getattr__(self, attr):\n# return None\n\n\nclass fake:\n    def __init__(self, *args, **kwargs):\n        \"\"\"\"\"\"\n\n    def __getattr__(self, attr):\n        if attr in globals():\n            return globals()[attr]\n        else:\n            return fake\n\n\nrun_script = fake()\n", ["radiant", "radiant.framework"]], "radiant.framework.webcomponents": [".py", "from browser import html\nfrom functools import cache\n#from .html_ import Element\n\nmaketag = cache(html.maketag)\n\n########################################################################\nclass WebComponents:\n    \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, root=''):\n        \"\"\"\"\"\"\n        self.root = root\n\n\n    # ----------------------------------------------------------------------\n    def __getattr__(self, attr):\n        \"\"\"\"\"\"\n        def element(*args, **kwargs):\n\n            if attr.startswith('_'):\n                tag = maketag(f'{attr[1:].removesuffix(\"_\").replace(\"_\", \"-\")}')\n            else:\n                tag = maketag(f'{self.root}-{attr.removesuffix(\"_\").replace(\"_\", \"-\")}')\n\n            kwargs = {k.rstrip('_'): v for k, v in kwargs.items()}\n            return tag(*args, **kwargs)\n        return element", ["radiant", "radiant.framework"]], "render": [".py", "\"\"\"\nRender\n======\n\nBatched DOM writes for the player.\n\nEvery write from Python to the DOM is a Brython to JavaScript crossing that\ncan invalidate the layout. `FrameRenderer` records the desired state of each\ntarget instead, and once per animation frame applies only the values that\ndiffer from the last committed state.\n\"\"\"\n\nfrom browser import window, document\n\nmissing = object()\n\n\n# ----------------------------------------------------------------------\ndef build_preview(tabs: list) -> tuple:\n    \"\"\"\n    Precomputes the preview string of a compiled program.\n\n    Parameters\n    ----------\n    tabs : list\n        The compiled tab tokens.\n\n    Returns\n    -------\n    tuple\n        The tokens joined with ' - ', and the start offset of every token in\n        that string followed by a sentinel offset for the end of the program.\n    \"\"\"\n    starts = []\n    position = 0\n    for tab in tabs:\n        starts.append(position)\n        position += len(tab) + 3\n    starts.append(position)\n    return ' - '.join(tabs), starts\n\n\n# ----------------------------------------------------------------------\ndef preview_window(preview: tuple, start: int, end: int) -> str:\n    \"\"\"\n    Returns the preview of a window of tokens without joining them.\n\n    Equivalent to `' - '.join(tabs[start:end])`.\n\n    Parameters\n    ----------\n    preview : tuple\n        The preview string and offsets returned by `build_preview`.\n    start : int\n        The index of the first token of the window.\n    end : int\n        The index after the last token of the window.\n\n    Returns\n    -------\n    str\n        The joined tokens of the window.\n    \"\"\"\n    joined, starts = preview\n    if end <= start:\n        return ''\n    return joined[starts[start] : starts[end] - 3]\n\n\n########################################################################\nclass FrameRenderer:\n    \"\"\"Coalesces DOM writes and commits them once per animation frame.\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self):\n        \"\"\"\"\"\"\n        self.pending = {}\n        self.committed = {}\n        self.callbacks = []\n        self.frame = None\n\n    # ----------------------------------------------------------------------\n    def write(self, key: str, apply, value) -> None:\n        \"\"\"\n        Sets the desired value of a target, overriding any pending write.\n\n        Parameters\n        ----------\n        key : str\n            The unique identifier of the target.\n        apply : callable\n            The function that writes the value to the DOM.\n        value : object\n            The desired value.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.pending[key] = (apply, value)\n        self.request_frame()\n\n    # ----------------------------------------------------------------------\n    def text(self, key: str, element, value: str) -> None:\n        \"\"\"\n        Sets the desired text of an element.\n\n        Parameters\n        ----------\n        key : str\n            The unique identifier of the element.\n        element : object\n            The element.\n        value : str\n            The desired text.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.write(key, lambda value: setattr(element, 'text', value), value)\n\n    # ----------------------------------------------------------------------\n    def value(self, key: str, element, value) -> None:\n        \"\"\"\n        Sets the desired value of a form control.\n\n        Parameters\n        ----------\n        key : str\n            The unique identifier of the control.\n        element : object\n            The control.\n        value : object\n            The desired value.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.write(key, lambda value: setattr(element, 'value', value), value)\n\n    # ----------------------------------------------------------------------\n    def fill(self, element_id: str, color: str) -> None:\n        \"\"\"\n        Sets the desired fill color of an SVG element.\n\n        Parameters\n        ----------\n        element_id : str\n            The identifier of the SVG element. Missing elements are ignored.\n        color : str\n            The desired fill color.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        def apply(value):\n            if element := document.getElementById(element_id):\n                element.style.fill = value\n\n        self.write(f'fill:{element_id}', apply, color)\n\n    # ----------------------------------------------------------------------\n    def after(self, callback) -> None:\n        \"\"\"\n        Calls `callback` right after the next commit.\n\n        Parameters\n        ----------\n        callback : callable\n            The function to call, without arguments.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.callbacks.append(callback)\n        self.request_frame()\n\n    # ----------------------------------------------------------------------\n    def forget(self, prefix: str = '') -> None:\n        \"\"\"\n        Forgets the committed state of the targets whose key starts with\n        `prefix`, so their next write is applied unconditionally.\n\n        Used when the DOM is changed outside of the renderer, for instance\n        when the SVG is replaced or a control is moved by the user.\n\n        Parameters\n        ----------\n        prefix : str, optional\n            The prefix of the keys to forget. Defaults to all of them.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.committed = {\n            key: value\n            for key, value in self.committed.items()\n            if not key.startswith(prefix)\n        }\n\n    # ----------------------------------------------------------------------\n    def request_frame(self) -> None:\n        \"\"\"\n        Schedules a commit on the next animation frame, if not scheduled yet.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.frame is None:\n            self.frame = window.requestAnimationFrame(self.commit)\n\n    # ----------------------------------------------------------------------\n    def commit(self, timestamp=None) -> None:\n        \"\"\"\n        Applies the pending writes that differ from the committed state.\n\n        Parameters\n        ----------\n        timestamp : float, optional\n            The frame timestamp passed by `requestAnimationFrame`.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.frame = None\n        pending, self.pending = self.pending, {}\n        callbacks, self.callbacks = self.callbacks, []\n\n        for key, (apply, value) in pending.items():\n            if self.committed.get(key, missing) != value:\n                apply(value)\n                self.committed[key] = value\n\n        for callback in callbacks:\n            callback()\n", []], "search": [".py", "\"\"\"\nSearch\n======\n\nTransposition-invariant melody search over the tabs library.\n\nEvery song is reduced to the sequence of intervals between its notes, in\nsemitones: the pitch of a tab is its position on the chromatic X-1 scale,\nshifted by the octave of the note equivalence table of the S-1, so S-1 tabs\nand X-1 tabs of the same note have the same pitch. A melody played in any\nkey has the same intervals.\n\nThe catalog build indexes the interval n-grams of every song in an inverted\nindex, written next to `tabs.json` by the catalog build, see library.py. A query is reduced the\nsame way, and the songs sharing its n-grams are ranked by the fraction of\nthe query they cover, every n-gram weighted by its rarity in the library.\nQueries shorter than an n-gram match the n-grams they start, and every\nsong containing them is a full match.\n\nThe index is compact JSON, so the browser loads it as is:\n\n- `songs`: the names of the songs, their position is their id.\n- `grams`: every n-gram, one character per interval, mapped to its\n  postings, the ids of the songs containing it, delta encoded, and the\n  number of occurrences, written as variable length integers of\n  `digits`. Postings are only decoded for the n-grams of a query.\n\nThis module has no browser imports, like compiler.py.\n\"\"\"\n\nimport math\nfrom collections import Counter\nfrom bisect import bisect_left\n\nfrom compiler import x1_scale, note_equivalence_mode1, normalize_tabs\n\nindex_version = 1\nngram_size = 4\nmax_interval = 24\nsearch_limit = 10\n\n# One character per interval, from -max_interval to +max_interval, none of\n# them escaped by JSON\ninterval_chars = ''.join(\n    chr(code) for code in range(40, 127) if chr(code) != '\\\\'\n)[: 2 * max_interval + 1]\n\n# Variable length integers, the 32 first digits end a number\ndigits = '0123456789abcdefghijklmnopqrstuvABCDEFGHIJKLMNOPQRSTUVWXYZ-_+*.~'\ndigit_values = {digit: value for value, digit in enumerate(digits)}\n\n\n# ----------------------------------------------------------------------\ndef tab_pitch(tab: str):\n    \"\"\"\n    Returns the pitch of a tab, in semitones.\n\n    Parameters\n    ----------\n    tab : str\n        An S-1 or X-1 tab.\n\n    Returns\n    -------\n    int or None\n        The position of the note on the chromatic X-1 scale, relative to the\n        first tab of the S-1, or None if the tab is not a note.\n    \"\"\"\n    if tab not in note_equivalence_mode1:\n        return None\n    position, octave = note_equivalence_mode1[tab]\n    return x1_scale.index(position) + 12 * int(octave)\n\n\npitches = {tab: tab_pitch(tab) for tab in note_equivalence_mode1}\ninterval_codes = {\n    interval: interval_chars[max(-max_interval, min(max_interval, interval)) + max_interval]\n    for interval in range(-len(x1_scale) - 12, len(x1_scale) + 13)\n}\n\n\n# ----------------------------------------------------------------------\ndef token_pitch(tab: str):\n    \"\"\"\n    Returns the pitch of a tab of the tabs, in semitones.\n\n    Unlike `tab_pitch`, the tab may carry the octave prefix of a\n    transposition, `+1:` for a tab shown one octave up and `-1:` for one\n    shown one octave down, see `compiler.transpose_tab`. `normalize_tabs`\n    drops the dashes, so `1:` is read as `-1:`.\n\n    Parameters\n    ----------\n    tab : str\n        A tab, possibly prefixed.\n\n    Returns\n    -------\n    int or None\n        The pitch of the note, or None if the tab is not a note.\n    \"\"\"\n    octave = 0\n    prefix, colon, shown = tab.partition(':')\n    if colon and prefix in ('+1', '-1', '1'):\n        # Shown one octave up, or down, to stay on the scale\n        octave = -12 if prefix == '+1' else 12\n        tab = shown\n    if tab not in pitches:\n        return None\n    return pitches[tab] + octave\n\n\n# ----------------------------------------------------------------------\ndef tabs_intervals(tabs: str) -> str:\n    \"\"\"\n    Reduces raw tabs to their intervals.\n\n    Parameters\n    ----------\n    tabs : str\n        The raw tabs, repeats are expanded.\n\n    Returns\n    -------\n    str\n        One character of `interval_chars` per interval between consecutive\n        notes, clamped to `max_interval`.\n    \"\"\"\n    # Line breaks are not notes, every token is split on whitespace\n    notes = [token_pitch(tab) for tab in normalize_tabs(tabs).split()]\n    notes = [pitch for pitch in notes if pitch is not None]\n    return ''.join(\n        interval_codes[pitch - previous] for previous, pitch in zip(notes, notes[1:])\n    )\n\n\n# ----------------------------------------------------------------------\ndef encode_numbers(numbers) -> str:\n    \"\"\"Writes non-negative integers as variable length integers.\"\"\"\n    encoded = []\n    for number in numbers:\n        if number < 32:\n            encoded.append(digits[number])\n            continue\n        while number >= 32:\n            encoded.append(digits[32 + number % 32])\n            number //= 32\n        encoded.append(digits[number])\n    return ''.join(encoded)\n\n\n# ----------------------------------------------------------------------\ndef decode_numbers(encoded: str) -> list:\n    \"\"\"Reads the integers written by `encode_numbers`.\"\"\"\n    numbers = []\n    number = 0\n    scale = 1\n    for digit in encoded:\n        value = digit_values[digit]\n        if value >= 32:\n            number += (value - 32) * scale\n            scale *= 32\n        else:\n            numbers.append(number + value * scale)\n            number = 0\n            scale = 1\n    return numbers\n\n\n# ----------------------------------------------------------------------\ndef build_index(intervals: dict, size: int = ngram_size) -> dict:\n    \"\"\"\n    Builds the search index of a library.\n\n    Parameters\n    ----------\n    intervals : dict\n        The intervals of every song, see `tabs_intervals`, by filename.\n    size : int, optional\n        The number of intervals of an n-gram.\n\n    Returns\n    -------\n    dict\n        The index, ready to be written as JSON.\n    \"\"\"\n    postings = {}\n    songs = []\n    for song_id, (name, song) in enumerate(intervals.items()):\n        songs.append(name.removesuffix('.txt'))\n        counts = Counter(song[start : start + size] for start in range(len(song) - size + 1))\n        for gram, count in counts.items():\n            postings.setdefault(gram, []).append((song_id, count))\n\n    grams = {}\n    for gram in sorted(postings):\n        numbers = []\n        previous = 0\n        for song_id, count in postings[gram]:\n            numbers += [song_id - previous, count]\n            previous = song_id\n        grams[gram] = encode_numbers(numbers)\n\n    return {\n        'version': index_version,\n        'size': size,\n        'songs': songs,\n        'grams': grams,\n    }\n\n\n########################################################################\nclass SearchIndex:\n    \"\"\"Ranked queries over an index built by `build_index`.\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, index: dict):\n        \"\"\"\"\"\"\n        self.size = index['size']\n        self.songs = index['songs']\n        self.grams = index['grams']\n        self.decoded = {}\n        self.keys = None\n\n    # ----------------------------------------------------------------------\n    def postings(self, gram: str) -> list:\n        \"\"\"The songs containing an n-gram, as `(song_id, count)` pairs.\"\"\"\n        if gram not in self.decoded:\n            numbers = decode_numbers(self.grams.get(gram, ''))\n            pairs = []\n            song_id = 0\n            for i in range(0, len(numbers), 2):\n                song_id += numbers[i]\n                pairs.append((song_id, numbers[i + 1]))\n            self.decoded[gram] = pairs\n        return self.decoded[gram]\n\n    # ----------------------------------------------------------------------\n    def prefixed(self, prefix: str) -> list:\n        \"\"\"The n-grams starting with the intervals of a short query.\"\"\"\n        if self.keys is None:\n            self.keys = sorted(self.grams)\n        grams = []\n        i = bisect_left(self.keys, prefix)\n        while i < len(self.keys) and self.keys[i].startswith(prefix):\n            grams.append(self.keys[i])\n            i += 1\n        return grams\n\n    # ----------------------------------------------------------------------\n    def search(self, tabs: str, limit: int = search_limit) -> list:\n        \"\"\"\n        Finds the songs containing a fragment, in any key.\n\n        Parameters\n        ----------\n        tabs : str\n            The fragment, as S-1 or X-1 tabs.\n        limit : int, optional\n            The maximum number of matches.\n\n        Returns\n        -------\n        list\n            `(name, score)` pairs by decreasing score, the score being the\n            weighted fraction of the n-grams of the fragment found in the\n            song, from 0 to 1.\n        \"\"\"\n        intervals = tabs_intervals(tabs)\n        if not intervals:\n            return []\n\n        if len(intervals) < self.size:\n            return self.search_prefix(intervals, limit)\n\n        query = {}\n        for start in range(len(intervals) - self.size + 1):\n            gram = intervals[start : start + self.size]\n            query[gram] = query.get(gram, 0) + 1\n\n        scores = {}\n        best = 0\n        for gram, count in query.items():\n            weight = self.weight(gram)\n            best += weight * count\n            for song_id, occurrences in self.postings(gram):\n                scores[song_id] = scores.get(song_id, 0) + weight * min(count, occurrences)\n        if not best:\n            return []\n\n        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.songs[item[0]]))\n        return [(self.songs[song_id], min(1, score / best)) for song_id, score in ranked[:limit]]\n\n    # ----------------------------------------------------------------------\n    def search_prefix(self, intervals: str, limit: int = search_limit) -> list:\n        \"\"\"\n        Finds the songs containing a fragment shorter than an n-gram.\n\n        Every song with an n-gram starting with the fragment contains the\n        whole fragment, so all of them score 1. The rarity of the rarest\n        n-gram matched in a song only breaks the ties, songs matched by\n        rarer n-grams come first.\n\n        Parameters\n        ----------\n        intervals : str\n            The intervals of the fragment, see `tabs_intervals`.\n        limit : int, optional\n            The maximum number of matches.\n\n        Returns\n        -------\n        list\n            `(name, 1)` pairs.\n        \"\"\"\n        rarity = {}\n        for gram in self.prefixed(intervals):\n            weight = self.weight(gram)\n            for song_id, _ in self.postings(gram):\n                rarity[song_id] = max(rarity.get(song_id, 0), weight)\n\n        ranked = sorted(rarity.items(), key=lambda item: (-item[1], self.songs[item[0]]))\n        return [(self.songs[song_id], 1) for song_id, _ in ranked[:limit]]\n\n    # ----------------------------------------------------------------------\n    def weight(self, gram: str) -> float:\n        \"\"\"The rarity of an n-gram in the library.\"\"\"\n        postings = self.postings(gram)\n        return math.log(1 + len(self.songs) / len(postings)) if postings else 0\n", ["compiler"]], "shell": [".py", "\"\"\"\nShell\n=====\n\nStatic markup of the assistant page.\n\nThe same markup is prerendered by the server into `index.html`, with the\ndefault X-1 stylophone inline, so the first paint does not wait for Brython\nto start. `StylophoneAssistant` then hydrates it: it looks the controls up by\ntheir `id` and binds the handlers to them instead of building them again.\nWhen the page is served without the prerendered shell, it is inserted from\nthe browser before hydration.\n\nThis module has no browser imports, so it runs under CPython and Brython.\n\"\"\"\n\nimport re\nfrom typing import Optional\n\ndefault_stylophone = 'assets/stylophone_x1_tabs.svg'\ngithub_url = 'https://github.com/YeisonCardona/stylophone-assistant'\n# The tabs of the toolbar with a panel, the first one is the default\npanels = ('assistant', 'tunning')\n\nheader_text = \"\"\"\n<strong>Stylophone Assistant</strong> is your go-to platform for enhancing your <strong>Stylophone</strong> practice. This tool allows you to input <strong>tabs</strong> for your favorite melodies and generates a dynamic <strong>animation</strong> compatible with both the <strong>S-1</strong> and <strong>Gen X-1</strong> models. Whether you're a <strong>beginner</strong> or an <strong>experienced player</strong>, the interactive interface helps you <strong>visualize</strong> and follow along with ease. Practice at your own pace, toggle <strong>octaves</strong>, and refine your <strong>skills</strong> while having fun with your <strong>Stylophone</strong>.\n\"\"\"\n\nsvg_prolog = re.compile(r'^\\s*(<\\?xml[^>]*\\?>\\s*)?(<!--.*?-->\\s*)*', re.DOTALL)\nsvg_tag = re.compile(r'<svg\\b[^>]*>', re.DOTALL)\nsvg_width = re.compile(r'\\swidth=\"[^\"]*\"')\n\n\n# ----------------------------------------------------------------------\ndef icon_source(name: str, icons: Optional[str] = None) -> str:\n    \"\"\"\n    Returns the attributes that load an icon in a Web Awesome component.\n\n    Parameters\n    ----------\n    name : str\n        The name of the icon.\n    icons : str, optional\n        The URL of the self-hosted icons, see vendor.py.\n\n    Returns\n    -------\n    str\n        The `src` of the self-hosted icon, or the `name` of the icon in the\n        default library.\n    \"\"\"\n    if icons:\n        return f'src=\"{icons}/{name}.svg\"'\n    return f'name=\"{name}\"'\n\n\n# ----------------------------------------------------------------------\ndef responsive_svg(svg: str) -> str:\n    \"\"\"\n    Prepares a stylophone SVG to be inlined in the page.\n\n    The XML prolog is dropped and the root element is scaled to the width\n    of its container, keeping its aspect ratio.\n\n    Parameters\n    ----------\n    svg : str\n        The content of the SVG file.\n\n    Returns\n    -------\n    str\n        The SVG markup.\n    \"\"\"\n    svg = svg_prolog.sub('', svg, count=1)\n\n    def scale(match):\n        tag = svg_width.sub('', match.group(0), count=1)\n        return tag.replace(\n            '<svg', '<svg width=\"100%\" preserveAspectRatio=\"xMidYMid meet\"', 1\n        )\n\n    return svg_tag.sub(scale, svg, count=1)\n\n\n# ----------------------------------------------------------------------\ndef build_shell(\n    song: str,\n    icons: Optional[str] = None,\n    stylophone: str = '',\n    tab: str = 'assistant',\n) -> str:\n    \"\"\"\n    Builds the markup of the assistant page.\n\n    Parameters\n    ----------\n    song : str\n        The name of the default custom song.\n    icons : str, optional\n        The URL of the self-hosted icons, see vendor.py.\n    stylophone : str, optional\n        The SVG markup of the initial stylophone, as returned by\n        `responsive_svg`. Defaults to an empty container.\n    tab : str, optional\n        The initially active tab, one of `panels`. Defaults to 'assistant',\n        which also replaces any other value.\n\n    Returns\n    -------\n    str\n        The HTML of the header, the panels and the footer.\n    \"\"\"\n    if tab not in panels:\n        tab = panels[0]\n\n    delays = ''.join(\n        f'<wa-option value=\"{i}\">Gap: {i / 1000 :.1f} s</wa-option>'\n        for i in range(100, 3001, 100)\n    )\n\n    return f\"\"\"\n<div class=\"container-fluid\" id=\"sa-header\">\n  <div class=\"row sa-header\">\n    <div class=\"col-sm-12\"><h1 class=\"header-title\">STYLOPHONE ASSISTANT</h1></div>\n    <div class=\"col-sm-12 sa-toolbar\">\n      <wa-tab-group id=\"sa-toolbar\" active=\"{tab}\">\n        <wa-tab class=\"sa-auto-show\" sa-tab-to-show=\"sa-tab-assistant\" slot=\"nav\" panel=\"assistant\">Assistant</wa-tab>\n        <wa-tab class=\"sa-auto-show\" sa-tab-to-show=\"sa-tab-tunning\" slot=\"nav\" panel=\"tunning\">Tunning</wa-tab>\n        <wa-tab slot=\"nav\"><a class=\"sa-tab-link\" href=\"{github_url}\">GitHub</a></wa-tab>\n      </wa-tab-group>\n    </div>\n  </div>\n</div>\n\n<div class=\"container sa-tabs sa-tab-tunning\" id=\"sa-panel-tunning\" style=\"display: none;\"></div>\n\n<div class=\"container sa-tabs sa-tab-assistant\">\n  <div class=\"row\">\n    <div class=\"col-md-12\">\n      <span class=\"sa-paragraph\">{header_text}</span>\n      <hr>\n    </div>\n    <div class=\"col-md-4\">\n      <wa-select id=\"sa-select-gen\" label=\"Stylophone\" value=\"x1\" style=\"margin-top: 15px;\">\n        <wa-option value=\"s1\">Gen S-1</wa-option>\n        <wa-option value=\"x1\">Gen X-1</wa-option>\n        <wa-option value=\"both\">Both</wa-option>\n      </wa-select>\n    </div>\n    <div class=\"col-md-4\">\n      <wa-select id=\"sa-select-style\" label=\"Style\" value=\"tabs\" style=\"margin-top: 15px;\">\n        <wa-option value=\"tabs\">Tabs</wa-option>\n        <wa-option value=\"solfege\">Solf\u00e8ge</wa-option>\n        <wa-option value=\"kids\">American</wa-option>\n      </wa-select>\n    </div>\n  </div>\n\n  <div class=\"row\">\n    <div class=\"col-md-4\">\n      <wa-select id=\"sa-select-tab\" label=\"Load tabs\" value=\"custom\" style=\"margin-top: 15px;\">\n        <wa-option value=\"custom\" id=\"id-custom\" song=\"{song}\">{song}</wa-option>\n      </wa-select>\n    </div>\n    <div class=\"col-md-4\">\n      <wa-select id=\"sa-select-fit\" label=\"Fits\" value=\"all\" style=\"margin-top: 15px;\">\n        <wa-option value=\"all\">Any stylophone</wa-option>\n        <wa-option value=\"s1\">Gen S-1</wa-option>\n        <wa-option value=\"x1\">Gen X-1</wa-option>\n        <wa-option value=\"x1_8va\">Gen X-1 -1 Octave</wa-option>\n      </wa-select>\n    </div>\n    <div class=\"col-md-4\" style=\"margin-top: 40px; display: flex;\">\n      <wa-icon-button id=\"sa-button-new-song\" {icon_source('plus', icons)} label=\"Save as new song\"></wa-icon-button>\n      <wa-icon-button id=\"sa-button-delete-song\" {icon_source('trash', icons)} label=\"Delete song\"></wa-icon-button>\n    </div>\n  </div>\n\n  <div class=\"row\">\n    <div class=\"col-md-8\" style=\"margin-top: 15px;\">\n      <wa-textarea id=\"sa-textarea-search\" label=\"Find by melody\" placeholder=\"Type a fragment in any key\" rows=\"1\" resize=\"none\" spellcheck=\"false\"></wa-textarea>\n    </div>\n    <div class=\"col-md-4\" style=\"margin-top: 15px;\">\n      <wa-select id=\"sa-select-match\" label=\"Matches\" placeholder=\"No matches\"></wa-select>\n    </div>\n  </div>\n\n  <div class=\"row\">\n    <div class=\"col-md-12\" style=\"margin-top: 15px;\">\n      <wa-textarea id=\"sa-textarea-tabs\" label=\"Tabs\" resize=\"auto\" spellcheck=\"false\"></wa-textarea>\n    </div>\n  </div>\n\n  <div class=\"row\" style=\"margin-top: 20px;\">\n    <div class=\"col-md-3\" style=\"margin-top: 15px;\">\n      <wa-switch id=\"sa-switch-transpose\">Transpose Tabs (Chromatic)</wa-switch>\n    </div>\n    <div class=\"col-md-9\" style=\"margin-top: -5px;\">\n      <wa-range id=\"sa-range-transpose\" min=\"-12\" max=\"+12\" step=\"1\" value=\"0\" style=\"--track-active-offset: 50%; margin-top: 20px; display: none;\"></wa-range>\n    </div>\n    <div class=\"col-md-12\" style=\"margin-top: 15px;\">\n      <wa-textarea id=\"sa-textarea-transpose\" label=\"Transposed Tabs\" resize=\"auto\" spellcheck=\"false\" style=\"display: none;\"></wa-textarea>\n      <wa-switch id=\"sa-switch-transpose-model\" checked style=\"margin-top: 10px; display: none;\">Transpose for X-1</wa-switch>\n      <hr>\n    </div>\n  </div>\n\n  <div class=\"row\">\n    <div class=\"col-md-12\" style=\"margin-top: 15px;\">\n      <wa-switch id=\"sa-switch-x1-8va\">Gen X-1 -1 Octave</wa-switch>\n    </div>\n    <div class=\"col-md-12\" style=\"margin-top: 15px;\">\n      <div id=\"sa-stylophone\" style=\"width: 100%;\">{stylophone}</div>\n    </div>\n  </div>\n\n  <div class=\"row tabs-line\">\n    <div class=\"col-5\" style=\"text-align: right; margin-top: 10px;\">\n      <span id=\"sa-tabs-pre\" class=\"--wa-font-sans\" style=\"flex: none\">...</span>\n    </div>\n    <div class=\"col-2\" style=\"text-align: center;\">\n      <span id=\"sa-tabs-current\" class=\"--wa-font-sans\" style=\"flex: none; color: var(--wa-color-primary-600); font-size: 2rem;\">#</span>\n    </div>\n    <div class=\"col-5\" style=\"text-align: left; margin-top: 10px;\">\n      <span id=\"sa-tabs-post\" class=\"--wa-font-sans\" style=\"flex: none\">...</span>\n    </div>\n  </div>\n\n  <div class=\"row sa-player\" style=\"margin-top: 30px;\">\n    <div class=\"col-2 col-sm-2 col-md-1 sa-icon-button\" style=\"display: flex;\">\n      <wa-icon-button id=\"sa-button-start\" {icon_source('play', icons)} style=\"font-size: 3rem;\"></wa-icon-button>\n      <wa-icon-button id=\"sa-button-stop\" {icon_source('stop', icons)} style=\"font-size: 3rem; display: none\"></wa-icon-button>\n    </div>\n    <div class=\"col-4 col-sm-7 col-md-9 sa-range-tabs\">\n      <wa-range id=\"sa-range-progress\" min=\"0\" max=\"100\" step=\"1\" value=\"0\"></wa-range>\n    </div>\n    <div class=\"col-6 col-sm-3 col-md-2 sa-gap\" style=\"margin-top: 4px;\">\n      <wa-select id=\"sa-select-delay\" pill value=\"500\">{delays}</wa-select>\n    </div>\n  </div>\n</div>\n\n<div class=\"container-fluid sa-footer\">\n  <span>\n    Made with <wa-icon {icon_source('heart', icons)}></wa-icon> by <a href='https://dunderlab.com/'>DunderLab</a><br>\n    This site has been built using <a href='https://radiant-framework.readthedocs.io/en/latest/'>Radiant Framework</a> technology<br>\n    \u00a92024. Some rights reserved under the Creative Commons Attribution-ShareAlike 4.0 International License (CC BY-SA 4.0)\n  </span>\n</div>\n\"\"\"\n\n\n# ----------------------------------------------------------------------\ndef prerender_shell(song: str, icons: Optional[str] = None) -> str:\n    \"\"\"\n    Prerenders the page with the default stylophone inline.\n\n    Runs on the server, which reads the SVG from the application root.\n\n    Parameters\n    ----------\n    song : str\n        The name of the default custom song.\n    icons : str, optional\n        The URL of the self-hosted icons, see vendor.py.\n\n    Returns\n    -------\n    str\n        The HTML of the page.\n    \"\"\"\n    with open(default_stylophone, 'r', encoding='utf-8') as file:\n        stylophone = responsive_svg(file.read())\n    return build_shell(song, icons, stylophone)\n", []], "telemetry": [".py", "\"\"\"\nTelemetry\n=========\n\nPlayback jitter and missed-deadline telemetry.\n\nFor every note the player records the time it was scheduled for against the\ntime the highlight was actually applied, and the same for the release of the\nkey. Jitter is accumulated in fixed-width histograms, so running percentiles\ncost constant memory regardless of the session length.\n\nTelemetry is enabled with `localStorage.telemetry = 'true'` and a page\nreload, which also shows an on-screen overlay with a link to download the\nsession report.\n\"\"\"\n\nfrom browser import window, document\nfrom browser.local_storage import storage\nfrom radiant.framework import html\nimport json\n\ntry:\n    enabled = storage.get('telemetry', 'false') == 'true'\nexcept AttributeError:\n    # Fake browser modules, when imported by the server under CPython\n    enabled = False\nbin_ms = 1\nbins = 2000\n\n\n########################################################################\nclass JitterHistogram:\n    \"\"\"Histogram of jitter values with running percentiles.\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self):\n        \"\"\"\"\"\"\n        self.reset()\n\n    # ----------------------------------------------------------------------\n    def reset(self) -> None:\n        \"\"\"\n        Discards all the recorded values.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        self.counts = [0] * (bins + 1)\n        self.count = 0\n        self.max = 0.0\n\n    # ----------------------------------------------------------------------\n    def add(self, value: float) -> None:\n        \"\"\"\n        Records a jitter value.\n\n        Parameters\n        ----------\n        value : float\n            The jitter in milliseconds. Negative values (early callbacks) are\n            recorded as zero, values beyond the last bin in the overflow bin.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        value = max(0.0, value)\n        self.counts[min(bins, int(value / bin_ms))] += 1\n        self.count += 1\n        self.max = max(self.max, value)\n\n    # ----------------------------------------------------------------------\n    def percentile(self, p: float) -> float:\n        \"\"\"\n        Returns the value below which `p` percent of the jitter values fall.\n\n        Parameters\n        ----------\n        p : float\n            The percentile, between 0 and 100.\n\n        Returns\n        -------\n        float\n            The upper bound of the bin containing the percentile, in\n            milliseconds, or 0 if nothing was recorded.\n        \"\"\"\n        if not self.count:\n            return 0.0\n\n        target = p / 100 * self.count\n        accumulated = 0\n        for i, count in enumerate(self.counts):\n            accumulated += count\n            if accumulated >= target:\n                return min(self.max, (i + 1) * bin_ms)\n        return self.max\n\n    # ----------------------------------------------------------------------\n    def summary(self) -> dict:\n        \"\"\"\n        Returns the percentiles of the recorded jitter.\n\n        Returns\n        -------\n        dict\n            The number of values, p50, p95, p99 and max jitter in milliseconds.\n        \"\"\"\n        return {\n            'count': self.count,\n            'p50': self.percentile(50),\n            'p95': self.percentile(95),\n            'p99': self.percentile(99),\n            'max': self.max,\n        }\n\n\n########################################################################\nclass PlaybackTelemetry:\n    \"\"\"Per-note scheduling telemetry of the player.\"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self):\n        \"\"\"\"\"\"\n        self.highlight = JitterHistogram()\n        self.release = JitterHistogram()\n        self.dropped = 0\n        self.gap = 0.0\n        self.overlay = None\n\n        if enabled:\n            self.overlay = html.DIV(\n                style='position: fixed; bottom: 10px; right: 10px; z-index: 100; '\n                'padding: 10px; background-color: rgba(0, 0, 0, 0.8); color: white; '\n                'font-family: monospace; font-size: 12px; white-space: pre;'\n            )\n            self.overlay_text = html.SPAN()\n            self.overlay <= self.overlay_text\n            link = html.A('Download report', href='#', style='color: white;')\n            link.bind('click', self.download)\n            self.overlay <= html.BR()\n            self.overlay <= link\n            document.select_one('body') <= self.overlay\n            self.render()\n\n    # ----------------------------------------------------------------------\n    def start(self, gap: float) -> None:\n        \"\"\"\n        Starts a new playback session.\n\n        Parameters\n        ----------\n        gap : float\n            The gap between notes in milliseconds.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if not enabled:\n            return\n\n        self.highlight.reset()\n        self.release.reset()\n        self.dropped = 0\n        self.gap = gap\n        self.render()\n\n    # ----------------------------------------------------------------------\n    def schedule(self, delay: float):\n        \"\"\"\n        Returns the time a callback scheduled now with `delay` is due.\n\n        Parameters\n        ----------\n        delay : float\n            The delay of the callback in milliseconds.\n\n        Returns\n        -------\n        float or None\n            The due timestamp in milliseconds, or None when disabled.\n        \"\"\"\n        if not enabled:\n            return None\n        return window.performance.now() + delay\n\n    # ----------------------------------------------------------------------\n    def on_highlight(self, scheduled, gap: float) -> None:\n        \"\"\"\n        Records the highlight of a note.\n\n        A note highlighted a full gap or more after its scheduled time is\n        counted as dropped, since its slot was taken by the next note.\n\n        Parameters\n        ----------\n        scheduled : float or None\n            The timestamp the note was scheduled for, as returned by\n            `schedule`.\n        gap : float\n            The gap between notes in milliseconds.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if scheduled is None:\n            return\n\n        jitter = window.performance.now() - scheduled\n        self.highlight.add(jitter)\n        if jitter >= gap:\n            self.dropped += 1\n        self.render()\n\n    # ----------------------------------------------------------------------\n    def on_release(self, scheduled) -> None:\n        \"\"\"\n        Records the release of a note.\n\n        Parameters\n        ----------\n        scheduled : float or None\n            The timestamp the release was scheduled for, as returned by\n            `schedule`.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if scheduled is None:\n            return\n        self.release.add(window.performance.now() - scheduled)\n\n    # ----------------------------------------------------------------------\n    def render(self) -> None:\n        \"\"\"\n        Updates the overlay with the current statistics.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if self.overlay is None:\n            return\n\n        highlight = self.highlight.summary()\n        release = self.release.summary()\n        self.overlay_text.text = (\n            f\"gap      {self.gap:.0f} ms\\n\"\n            f\"notes    {highlight['count']}  dropped {self.dropped}\\n\"\n            f\"jitter   p50 {highlight['p50']:.0f}  p95 {highlight['p95']:.0f}  \"\n            f\"max {highlight['max']:.1f} ms\\n\"\n            f\"release  p50 {release['p50']:.0f}  p95 {release['p95']:.0f}  \"\n            f\"max {release['max']:.1f} ms\"\n        )\n\n    # ----------------------------------------------------------------------\n    def report(self) -> dict:\n        \"\"\"\n        Returns the report of the current session.\n\n        Returns\n        -------\n        dict\n            The device information, gap, dropped notes, and the jitter\n            percentiles and histograms of highlights and releases.\n        \"\"\"\n        return {\n            'user_agent': window.navigator.userAgent,\n            'hardware_concurrency': window.navigator.hardwareConcurrency,\n            'gap': self.gap,\n            'dropped': self.dropped,\n            'bin_ms': bin_ms,\n            'highlight': self.highlight.summary(),\n            'release': self.release.summary(),\n            'highlight_histogram': self.highlight.counts,\n            'release_histogram': self.release.counts,\n        }\n\n    # ----------------------------------------------------------------------\n    def download(self, event=None) -> None:\n        \"\"\"\n        Downloads the report of the current session as a JSON file.\n\n        Parameters\n        ----------\n        event : optional\n            The triggering event, if applicable. Defaults to None.\n\n        Returns\n        -------\n        None\n        \"\"\"\n        if event:\n            event.preventDefault()\n\n        blob = window.Blob.new([json.dumps(self.report())], {'type': 'application/json'})\n        url = window.URL.createObjectURL(blob)\n        link = window.document.createElement('a')\n        link.href = url\n        link.download = 'stylophone-telemetry.json'\n        link.click()\n        window.URL.revokeObjectURL(url)\n", ["radiant.framework"]], "tracing": [".py", "\"\"\"\nTracing\n=======\n\nLightweight span tracing for the Brython application.\n\nSpans are measured with `performance.now()` and recorded into a fixed-size\nring buffer, then exported in the Chrome trace event format, which can be\nopened with `chrome://tracing` or https://ui.perfetto.dev.\n\nTracing is enabled with `localStorage.trace = 'true'` and a page reload.\nWhen disabled, `trace` returns the decorated functions untouched and `begin`\nreturns None, so instrumentation costs nothing.\n\"\"\"\n\nfrom browser import window\nfrom browser.local_storage import storage\nfrom functools import wraps\nimport json\n\ntry:\n    enabled = storage.get('trace', 'false') == 'true'\nexcept AttributeError:\n    # Fake browser modules, when imported by the server under CPython\n    enabled = False\ncapacity = 8192\n\nspans = [None] * capacity\nindex = 0\n\n\n# ----------------------------------------------------------------------\ndef now() -> float:\n    \"\"\"\n    Returns the current high resolution timestamp in milliseconds.\n\n    Returns\n    -------\n    float\n        The value of `performance.now()`.\n    \"\"\"\n    return window.performance.now()\n\n\n# ----------------------------------------------------------------------\ndef record(name: str, start: float, end: float, category: str = 'app') -> None:\n    \"\"\"\n    Records a span into the ring buffer, overwriting the oldest one when full.\n\n    Parameters\n    ----------\n    name : str\n        The name of the span.\n    start : float\n        The start timestamp in milliseconds.\n    end : float\n        The end timestamp in milliseconds.\n    category : str, optional\n        The category of the span. Defaults to 'app'.\n\n    Returns\n    -------\n    None\n    \"\"\"\n    global index\n    spans[index % capacity] = (name, category, start, end)\n    index += 1\n\n\n# ----------------------------------------------------------------------\ndef trace(name: str = None, category: str = 'app'):\n    \"\"\"\n    Decorator that records a span for every call of the decorated function.\n\n    Parameters\n    ----------\n    name : str, optional\n        The name of the span. Defaults to the qualified name of the function.\n    category : str, optional\n        The category of the span. Defaults to 'app'.\n\n    Returns\n    -------\n    callable\n        The decorator, which returns the function unchanged when tracing is\n        disabled.\n    \"\"\"\n    def decorator(fn):\n        if not enabled:\n            return fn\n\n        label = name or fn.__qualname__\n\n        @wraps(fn)\n        def wrapper(*args, **kwargs):\n            start = now()\n            try:\n                return fn(*args, **kwargs)\n            finally:\n                record(label, start, now(), category)\n\n        return wrapper\n\n    return decorator\n\n\n# ----------------------------------------------------------------------\ndef begin(name: str, category: str = 'ajax'):\n    \"\"\"\n    Starts a span that ends in a different call, such as an AJAX round trip.\n\n    Parameters\n    ----------\n    name : str\n        The name of the span.\n    category : str, optional\n        The category of the span. Defaults to 'ajax'.\n\n    Returns\n    -------\n    tuple or None\n        A token to pass to `end`, or None when tracing is disabled.\n    \"\"\"\n    if not enabled:\n        return None\n    return (name, category, now())\n\n\n# ----------------------------------------------------------------------\ndef end(token) -> None:\n    \"\"\"\n    Ends a span started with `begin`.\n\n    Parameters\n    ----------\n    token : tuple or None\n        The token returned by `begin`.\n\n    Returns\n    -------\n    None\n    \"\"\"\n    if token is None:\n        return\n    name, category, start = token\n    record(name, start, now(), category)\n\n\n# ----------------------------------------------------------------------\ndef export() -> str:\n    \"\"\"\n    Exports the recorded spans in the Chrome trace event format.\n\n    Returns\n    -------\n    str\n        A JSON document with the spans as complete ('X') events, timestamps\n        in microseconds.\n    \"\"\"\n    if index > capacity:\n        ordered = spans[index % capacity :] + spans[: index % capacity]\n    else:\n        ordered = spans[:index]\n\n    events = [\n        {\n            'name': name,\n            'cat': category,\n            'ph': 'X',\n            'ts': round(start * 1000),\n            'dur': round((end - start) * 1000),\n            'pid': 1,\n            'tid': 1,\n        }\n        for name, category, start, end in ordered\n    ]\n    return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})\n\n\n# ----------------------------------------------------------------------\ndef download(filename: str = 'stylophone-trace.json') -> None:\n    \"\"\"\n    Downloads the exported spans as a JSON file.\n\n    Parameters\n    ----------\n    filename : str, optional\n        The name of the downloaded file. Defaults to 'stylophone-trace.json'.\n\n    Returns\n    -------\n    None\n    \"\"\"\n    blob = window.Blob.new([export()], {'type': 'application/json'})\n    url = window.URL.createObjectURL(blob)\n    link = window.document.createElement('a')\n    link.href = url\n    link.download = filename\n    link.click()\n    window.URL.revokeObjectURL(url)\n\n\nif enabled:\n    # Accessible from the browser console as `saTraceDownload()`\n    window.saTraceDownload = download\n", []], "transport": [".py", "\"\"\"\nTransport\n=========\n\nClient side of the WebSocket endpoints of the server, see executor.py.\n\n`SocketInterpreter` calls the methods of a `PythonHandler` of the server\nmultiplexed over a single WebSocket: every call is tagged with an id and\nanswered in any order, so a long call does not hold back the others.\n`BroadcastChannel` joins a room of the broadcast channel of the classroom\nmode, see broadcast.py.\n\nBoth reopen their connection when it is lost. The static export has no\nserver, so a `SocketInterpreter` whose connection never opened gives up, and\nits calls fail at once with `RemoteError` for the caller to fall back to the\nlocal implementation.\n\"\"\"\n\nimport json\nfrom browser import window, websocket, timer\n\n\n# ----------------------------------------------------------------------\ndef socket_url(path: str) -> str:\n    \"\"\"\n    Returns the WebSocket URL of a path of the server of the page.\n\n    Parameters\n    ----------\n    path : str\n        The absolute path of the endpoint.\n\n    Returns\n    -------\n    str\n        The `ws:` or `wss:` URL, following the protocol of the page.\n    \"\"\"\n    protocol = 'wss:' if window.location.protocol == 'https:' else 'ws:'\n    return f'{protocol}//{window.location.host}{path}'\n\n\n########################################################################\nclass RemoteError(Exception):\n    \"\"\"The error of a remote call, given to its callback as the result.\"\"\"\n\n\n########################################################################\nclass Connection:\n    \"\"\"WebSocket reopened `reconnect` milliseconds after it is lost.\n\n    Messages sent before the connection is open are queued and sent once it\n    opens. Subclasses handle `on_open`, `on_message` and `on_close`.\n    \"\"\"\n\n    reconnect = 2000\n\n    # ----------------------------------------------------------------------\n    def __init__(self, url: str):\n        \"\"\"\"\"\"\n        self.url = url\n        self.socket = None\n        self.opened = False\n        self.closed = False\n        self.outbox = []\n        self.connect()\n\n    # ----------------------------------------------------------------------\n    def connect(self) -> None:\n        \"\"\"Opens the WebSocket.\"\"\"\n        if self.closed:\n            return\n        self.socket = websocket.WebSocket(self.url)\n        self.socket.bind('open', self.on_open)\n        self.socket.bind('message', self.on_message)\n        self.socket.bind('close', self.on_close)\n\n    # ----------------------------------------------------------------------\n    def ready(self) -> bool:\n        \"\"\"Whether the WebSocket is open.\"\"\"\n        return self.socket is not None and self.socket.readyState == 1\n\n    # ----------------------------------------------------------------------\n    def send(self, data) -> None:\n        \"\"\"Sends `data` as JSON, or queues it until the connection opens.\"\"\"\n        message = json.dumps(data)\n        if self.ready():\n            self.socket.send(message)\n        else:\n            self.outbox.append(message)\n\n    # ----------------------------------------------------------------------\n    def on_open(self, evt) -> None:\n        \"\"\"\"\"\"\n        self.opened = True\n        outbox, self.outbox = self.outbox, []\n        for message in outbox:\n            self.socket.send(message)\n\n    # ----------------------------------------------------------------------\n    def on_message(self, evt) -> None:\n        \"\"\"\"\"\"\n\n    # ----------------------------------------------------------------------\n    def on_close(self, evt) -> None:\n        \"\"\"\"\"\"\n        if self.reconnects(evt):\n            timer.set_timeout(self.connect, self.reconnect)\n\n    # ----------------------------------------------------------------------\n    def reconnects(self, evt) -> bool:\n        \"\"\"Whether the connection is reopened after `evt` closed it.\"\"\"\n        return not self.closed\n\n    # ----------------------------------------------------------------------\n    def close(self) -> None:\n        \"\"\"Closes the connection for good.\"\"\"\n        self.closed = True\n        if self.socket is not None:\n            self.socket.close()\n\n\n########################################################################\nclass SocketInterpreter(Connection):\n    \"\"\"Calls of the methods of a `PythonHandler` over a single WebSocket.\n\n    Like `LocalInterpreter`, methods are called by name, and every call\n    returns a function that takes the callback of its result::\n\n        remote = SocketInterpreter('/stylophone-assistant/python')\n        remote.transpose(tabs, 2)(show_tabs)\n\n    Several calls are sent in a single message with `remote.batch()`, see\n    `Batch`. A failed call gives a `RemoteError` to its callback, and so do\n    the calls pending when the connection is lost.\n    \"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, endpoint: str):\n        \"\"\"\"\"\"\n        self.callbacks = {}\n        self.next_id = 0\n        super().__init__(socket_url(f'{endpoint}/ws'))\n\n    # ----------------------------------------------------------------------\n    def __getattr__(self, attr):\n        \"\"\"\"\"\"\n\n        def f(*args, **kwargs):\n            def send(callback):\n                self.send_calls(\n                    [{'name': attr, 'args': list(args), 'kwargs': kwargs}],\n                    lambda results: callback(results[0]),\n                )\n\n            return send\n\n        f.__name__ = attr\n        return f\n\n    # ----------------------------------------------------------------------\n    def batch(self):\n        \"\"\"Collects calls to send them in a single message, see `Batch`.\"\"\"\n        return Batch(self)\n\n    # ----------------------------------------------------------------------\n    def send_calls(self, calls: list, callback) -> None:\n        \"\"\"\n        Sends calls and gives their results to `callback`, once all of them\n        are answered.\n\n        Parameters\n        ----------\n        calls : list\n            The `name`, `args` and `kwargs` of every call.\n        callback : callable\n            Takes the list of results, in the order of the calls, with a\n            `RemoteError` for every failed call.\n        \"\"\"\n        if self.closed or not calls:\n            callback([RemoteError('No connection') for _ in calls])\n            return\n\n        results = [None] * len(calls)\n        remaining = [len(calls)]\n        requests = []\n        for index, call in enumerate(calls):\n            self.next_id += 1\n\n            def collect(response, index=index):\n                if 'error' in response:\n                    results[index] = RemoteError(response['error'])\n                else:\n                    results[index] = response.get('result')\n                remaining[0] -= 1\n                if not remaining[0]:\n                    callback(results)\n\n            self.callbacks[self.next_id] = collect\n            requests.append(dict(call, id=self.next_id))\n\n        self.send(requests)\n\n    # ----------------------------------------------------------------------\n    def on_message(self, evt) -> None:\n        \"\"\"\"\"\"\n        response = json.loads(evt.data)\n        if collect := self.callbacks.pop(response.get('id'), None):\n            collect(response)\n\n    # ----------------------------------------------------------------------\n    def on_close(self, evt) -> None:\n        \"\"\"Fails the pending calls, they are not sent again.\"\"\"\n        if not self.opened:\n            # No server behind the page, such as the static export\n            self.closed = True\n\n        callbacks, self.callbacks = self.callbacks, {}\n        self.outbox = []\n        for collect in callbacks.values():\n            collect({'error': 'Connection closed'})\n        super().on_close(evt)\n\n\n########################################################################\nclass Batch:\n    \"\"\"Calls collected to be sent in a single message.\n\n    Calling a method records the call and returns its position in the\n    results::\n\n        calls = remote.batch()\n        calls.transpose(tabs, 2)\n        calls.transpose(tabs, -2)\n        calls.send(lambda results: ...)\n\n    Failed calls have a `RemoteError` as result.\n    \"\"\"\n\n    # ----------------------------------------------------------------------\n    def __init__(self, interpreter: SocketInterpreter):\n        \"\"\"\"\"\"\n        self.interpreter = interpreter\n        self.calls = []\n\n    # ----------------------------------------------------------------------\n    def __getattr__(self, attr):\n        \"\"\"\"\"\"\n\n        def f(*args, **kwargs):\n            self.calls.append({'name': attr, 'args': list(args), 'kwargs': kwargs})\n            return len(self.calls) - 1\n\n        f.__name__ = attr\n        return f\n\n    # ----------------------------------------------------------------------\n    def send(self, callback) -> None:\n        \"\"\"\"\"\"\n        self.interpreter.send_calls(self.calls, callback)\n\n\n########################################################################\nclass BroadcastChannel(Connection):\n    \"\"\"Room of the broadcast channel of the server.\n\n    Subscribers receive the messages published to the room, by topic::\n\n        channel = BroadcastChannel('room-1', path='/stylophone-assistant/broadcast')\n        channel.subscribe('position', lambda payload, sent: ...)\n\n    and the publisher, that claims the room with its `key`, sends them with\n    `channel.publish('position', payload)`. The offset of the local clock\n    to the server clock is estimated from the round trips with the lowest\n    latency, so `server_now()` gives a timeline shared by every client.\n    \"\"\"\n\n    clock_samples = 8\n    clock_interval = 30000\n\n    # ----------------------------------------------------------------------\n    def __init__(self, room: str, key: str = None, path: str = '/broadcast'):\n        \"\"\"\"\"\"\n        url = socket_url(f'{path}/{room}')\n        if key:\n            url += f'?publish={window.encodeURIComponent(key)}'\n\n        self.handlers = {}\n        self.offset = 0\n        self.rtt = None\n        self.clock_timer = None\n        super().__init__(url)\n\n    # ----------------------------------------------------------------------\n    def on_open(self, evt) -> None:\n        \"\"\"\"\"\"\n        super().on_open(evt)\n        self.sync_clock()\n        if self.clock_timer is None:\n            self.clock_timer = timer.set_interval(self.sync_clock, self.clock_interval)\n\n    # ----------------------------------------------------------------------\n    def on_message(self, evt) -> None:\n        \"\"\"\"\"\"\n        kind, *args = json.loads(evt.data)\n        if kind == 't':\n            sent, server = args\n            rtt = window.Date.now() - sent\n            # The sample with the lowest round trip is the most accurate\n            if self.rtt is None or rtt <= self.rtt:\n                self.rtt = rtt\n                self.offset = server - (sent + rtt / 2)\n        elif kind == 'm':\n            topic, payload, sent = args\n            if handler := self.handlers.get(topic):\n                handler(payload, sent)\n\n    # ----------------------------------------------------------------------\n    def reconnects(self, evt) -> bool:\n        \"\"\"\"\"\"\n        # 4003: the room is claimed by another publisher\n        return super().reconnects(evt) and evt.code != 4003\n\n    # ----------------------------------------------------------------------\n    def sync_clock(self) -> None:\n        \"\"\"Measures the clock offset again, keeping the best samples.\"\"\"\n        if not self.ready():\n            return\n        if self.rtt is not None:\n            # Let the estimate follow the drift of the local clock\n            self.rtt *= 1.5\n        for i in range(self.clock_samples):\n            timer.set_timeout(lambda: self.send(['t', window.Date.now()]), i * 100)\n\n    # ----------------------------------------------------------------------\n    def server_now(self) -> float:\n        \"\"\"The server time, in milliseconds.\"\"\"\n        return window.Date.now() + self.offset\n\n    # ----------------------------------------------------------------------\n    def subscribe(self, topic: str, handler) -> None:\n        \"\"\"Calls `handler(payload, sent)` with the messages of `topic`.\"\"\"\n        self.handlers[topic] = handler\n\n    # ----------------------------------------------------------------------\n    def publish(self, topic: str, payload) -> None:\n        \"\"\"\"\"\"\n        self.send(['m', topic, payload])\n\n    # ----------------------------------------------------------------------\n    def close(self) -> None:\n        \"\"\"\"\"\"\n        if self.clock_timer is not None:\n            timer.clear_interval(self.clock_timer)\n        super().close()\n", []]}
+__BRYTHON__.update_VFS(scripts)
@@ -0,0 +1,205 @@
+"""
+Tracing
+=======
+
+Lightweight span tracing for the Brython application.
+
+Spans are measured with `performance.now()` and recorded into a fixed-size
+ring buffer, then exported in the Chrome trace event format, which can be
+opened with `chrome://tracing` or https://ui.perfetto.dev.
+
+Tracing is enabled with `localStorage.trace = 'true'` and a page reload.
+When disabled, `trace` returns the decorated functions untouched and `begin`
+returns None, so instrumentation costs nothing.
+"""
+
+from browser import window
+from browser.local_storage import storage
+from functools import wraps
+import json
+
+try:
+    enabled = storage.get('trace', 'false') == 'true'
+except AttributeError:
+    # Fake browser modules, when imported by the server under CPython
+    enabled = False
+capacity = 8192
+
+spans = [None] * capacity
+index = 0
+
+
+# ----------------------------------------------------------------------
+def now() -> float:
+    """
+    Returns the current high resolution timestamp in milliseconds.
+
+    Returns
+    -------
+    float
+        The value of `performance.now()`.
+    """
+    return window.performance.now()
+
+
+# ----------------------------------------------------------------------
+def record(name: str, start: float, end: float, category: str = 'app') -> None:
+    """
+    Records a span into the ring buffer, overwriting the oldest one when full.
+
+    Parameters
+    ----------
+    name : str
+        The name of the span.
+    start : float
+        The start timestamp in milliseconds.
+    end : float
+        The end timestamp in milliseconds.
+    category : str, optional
+        The category of the span. Defaults to 'app'.
+
+    Returns
+    -------
+    None
+    """
+    global index
+    spans[index % capacity] = (name, category, start, end)
+    index += 1
+
+
+# ----------------------------------------------------------------------
+def trace(name: str = None, category: str = 'app'):
+    """
+    Decorator that records a span for every call of the decorated function.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the span. Defaults to the qualified name of the function.
+    category : str, optional
+        The category of the span. Defaults to 'app'.
+
+    Returns
+    -------
+    callable
+        The decorator, which returns the function unchanged when tracing is
+        disabled.
+    """
+    def decorator(fn):
+        if not enabled:
+            return fn
+
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, start, now(), category)
+
+        return wrapper
+
+    return decorator
+
+
+# ----------------------------------------------------------------------
+def begin(name: str, category: str = 'ajax'):
+    """
+    Starts a span that ends in a different call, such as an AJAX round trip.
+
+    Parameters
+    ----------
+    name : str
+        The name of the span.
+    category : str, optional
+        The category of the span. Defaults to 'ajax'.
+
+    Returns
+    -------
+    tuple or None
+        A token to pass to `end`, or None when tracing is disabled.
+    """
+    if not enabled:
+        return None
+    return (name, category, now())
+
+
+# ----------------------------------------------------------------------
+def end(token) -> None:
+    """
+    Ends a span started with `begin`.
+
+    Parameters
+    ----------
+    token : tuple or None
+        The token returned by `begin`.
+
+    Returns
+    -------
+    None
+    """
+    if token is None:
+        return
+    name, category, start = token
+    record(name, start, now(), category)
+
+
+# ----------------------------------------------------------------------
+def export() -> str:
+    """
+    Exports the recorded spans in the Chrome trace event format.
+
+    Returns
+    -------
+    str
+        A JSON document with the spans as complete ('X') events, timestamps
+        in microseconds.
+    """
+    if index > capacity:
+        ordered = spans[index % capacity :] + spans[: index % capacity]
+    else:
+        ordered = spans[:index]
+
+    events = [
+        {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round(start * 1000),
+            'dur': round((end - start) * 1000),
+            'pid': 1,
+            'tid': 1,
+        }
+        for name, category, start, end in ordered
+    ]
+    return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+
+# ----------------------------------------------------------------------
+def download(filename: str = 'stylophone-trace.json') -> None:
+    """
+    Downloads the exported spans as a JSON file.
+
+    Parameters
+    ----------
+    filename : str, optional
+        The name of the downloaded file. Defaults to 'stylophone-trace.json'.
+
+    Returns
+    -------
+    None
+    """
+    blob = window.Blob.new([export()], {'type': 'application/json'})
+    url = window.URL.createObjectURL(blob)
+    link = window.document.createElement('a')
+    link.href = url
+    link.download = filename
+    link.click()
+    window.URL.revokeObjectURL(url)
+
+
+if enabled:
+    # Accessible from the browser console as `saTraceDownload()`
+    window.saTraceDownload = download
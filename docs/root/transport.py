@@ -0,0 +1,354 @@
+"""
+Transport
+=========
+
+Client side of the WebSocket endpoints of the server, see executor.py.
+
+`SocketInterpreter` calls the methods of a `PythonHandler` of the server
+multiplexed over a single WebSocket: every call is tagged with an id and
+answered in any order, so a long call does not hold back the others.
+`BroadcastChannel` joins a room of the broadcast channel of the classroom
+mode, see broadcast.py.
+
+Both reopen their connection when it is lost. The static export has no
+server, so a `SocketInterpreter` whose connection never opened gives up, and
+its calls fail at once with `RemoteError` for the caller to fall back to the
+local implementation.
+"""
+
+import json
+from browser import window, websocket, timer
+
+
+# ----------------------------------------------------------------------
+def socket_url(path: str) -> str:
+    """
+    Returns the WebSocket URL of a path of the server of the page.
+
+    Parameters
+    ----------
+    path : str
+        The absolute path of the endpoint.
+
+    Returns
+    -------
+    str
+        The `ws:` or `wss:` URL, following the protocol of the page.
+    """
+    protocol = 'wss:' if window.location.protocol == 'https:' else 'ws:'
+    return f'{protocol}//{window.location.host}{path}'
+
+
+########################################################################
+class RemoteError(Exception):
+    """The error of a remote call, given to its callback as the result."""
+
+
+########################################################################
+class Connection:
+    """WebSocket reopened `reconnect` milliseconds after it is lost.
+
+    Messages sent before the connection is open are queued and sent once it
+    opens. Subclasses handle `on_open`, `on_message` and `on_close`.
+    """
+
+    reconnect = 2000
+
+    # ----------------------------------------------------------------------
+    def __init__(self, url: str):
+        """"""
+        self.url = url
+        self.socket = None
+        self.opened = False
+        self.closed = False
+        self.outbox = []
+        self.connect()
+
+    # ----------------------------------------------------------------------
+    def connect(self) -> None:
+        """Opens the WebSocket."""
+        if self.closed:
+            return
+        self.socket = websocket.WebSocket(self.url)
+        self.socket.bind('open', self.on_open)
+        self.socket.bind('message', self.on_message)
+        self.socket.bind('close', self.on_close)
+
+    # ----------------------------------------------------------------------
+    def ready(self) -> bool:
+        """Whether the WebSocket is open."""
+        return self.socket is not None and self.socket.readyState == 1
+
+    # ----------------------------------------------------------------------
+    def send(self, data) -> None:
+        """Sends `data` as JSON, or queues it until the connection opens."""
+        message = json.dumps(data)
+        if self.ready():
+            self.socket.send(message)
+        else:
+            self.outbox.append(message)
+
+    # ----------------------------------------------------------------------
+    def on_open(self, evt) -> None:
+        """"""
+        self.opened = True
+        outbox, self.outbox = self.outbox, []
+        for message in outbox:
+            self.socket.send(message)
+
+    # ----------------------------------------------------------------------
+    def on_message(self, evt) -> None:
+        """"""
+
+    # ----------------------------------------------------------------------
+    def on_close(self, evt) -> None:
+        """"""
+        if self.reconnects(evt):
+            timer.set_timeout(self.connect, self.reconnect)
+
+    # ----------------------------------------------------------------------
+    def reconnects(self, evt) -> bool:
+        """Whether the connection is reopened after `evt` closed it."""
+        return not self.closed
+
+    # ----------------------------------------------------------------------
+    def close(self) -> None:
+        """Closes the connection for good."""
+        self.closed = True
+        if self.socket is not None:
+            self.socket.close()
+
+
+########################################################################
+class SocketInterpreter(Connection):
+    """Calls of the methods of a `PythonHandler` over a single WebSocket.
+
+    Like `LocalInterpreter`, methods are called by name, and every call
+    returns a function that takes the callback of its result::
+
+        remote = SocketInterpreter('/stylophone-assistant/python')
+        remote.transpose(tabs, 2)(show_tabs)
+
+    Several calls are sent in a single message with `remote.batch()`, see
+    `Batch`. A failed call gives a `RemoteError` to its callback, and so do
+    the calls pending when the connection is lost.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, endpoint: str):
+        """"""
+        self.callbacks = {}
+        self.next_id = 0
+        super().__init__(socket_url(f'{endpoint}/ws'))
+
+    # ----------------------------------------------------------------------
+    def __getattr__(self, attr):
+        """"""
+
+        def f(*args, **kwargs):
+            def send(callback):
+                self.send_calls(
+                    [{'name': attr, 'args': list(args), 'kwargs': kwargs}],
+                    lambda results: callback(results[0]),
+                )
+
+            return send
+
+        f.__name__ = attr
+        return f
+
+    # ----------------------------------------------------------------------
+    def batch(self):
+        """Collects calls to send them in a single message, see `Batch`."""
+        return Batch(self)
+
+    # ----------------------------------------------------------------------
+    def send_calls(self, calls: list, callback) -> None:
+        """
+        Sends calls and gives their results to `callback`, once all of them
+        are answered.
+
+        Parameters
+        ----------
+        calls : list
+            The `name`, `args` and `kwargs` of every call.
+        callback : callable
+            Takes the list of results, in the order of the calls, with a
+            `RemoteError` for every failed call.
+        """
+        if self.closed or not calls:
+            callback([RemoteError('No connection') for _ in calls])
+            return
+
+        results = [None] * len(calls)
+        remaining = [len(calls)]
+        requests = []
+        for index, call in enumerate(calls):
+            self.next_id += 1
+
+            def collect(response, index=index):
+                if 'error' in response:
+                    results[index] = RemoteError(response['error'])
+                else:
+                    results[index] = response.get('result')
+                remaining[0] -= 1
+                if not remaining[0]:
+                    callback(results)
+
+            self.callbacks[self.next_id] = collect
+            requests.append(dict(call, id=self.next_id))
+
+        self.send(requests)
+
+    # ----------------------------------------------------------------------
+    def on_message(self, evt) -> None:
+        """"""
+        response = json.loads(evt.data)
+        if collect := self.callbacks.pop(response.get('id'), None):
+            collect(response)
+
+    # ----------------------------------------------------------------------
+    def on_close(self, evt) -> None:
+        """Fails the pending calls, they are not sent again."""
+        if not self.opened:
+            # No server behind the page, such as the static export
+            self.closed = True
+
+        callbacks, self.callbacks = self.callbacks, {}
+        self.outbox = []
+        for collect in callbacks.values():
+            collect({'error': 'Connection closed'})
+        super().on_close(evt)
+
+
+########################################################################
+class Batch:
+    """Calls collected to be sent in a single message.
+
+    Calling a method records the call and returns its position in the
+    results::
+
+        calls = remote.batch()
+        calls.transpose(tabs, 2)
+        calls.transpose(tabs, -2)
+        calls.send(lambda results: ...)
+
+    Failed calls have a `RemoteError` as result.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, interpreter: SocketInterpreter):
+        """"""
+        self.interpreter = interpreter
+        self.calls = []
+
+    # ----------------------------------------------------------------------
+    def __getattr__(self, attr):
+        """"""
+
+        def f(*args, **kwargs):
+            self.calls.append({'name': attr, 'args': list(args), 'kwargs': kwargs})
+            return len(self.calls) - 1
+
+        f.__name__ = attr
+        return f
+
+    # ----------------------------------------------------------------------
+    def send(self, callback) -> None:
+        """"""
+        self.interpreter.send_calls(self.calls, callback)
+
+
+########################################################################
+class BroadcastChannel(Connection):
+    """Room of the broadcast channel of the server.
+
+    Subscribers receive the messages published to the room, by topic::
+
+        channel = BroadcastChannel('room-1', path='/stylophone-assistant/broadcast')
+        channel.subscribe('position', lambda payload, sent: ...)
+
+    and the publisher, that claims the room with its `key`, sends them with
+    `channel.publish('position', payload)`. The offset of the local clock
+    to the server clock is estimated from the round trips with the lowest
+    latency, so `server_now()` gives a timeline shared by every client.
+    """
+
+    clock_samples = 8
+    clock_interval = 30000
+
+    # ----------------------------------------------------------------------
+    def __init__(self, room: str, key: str = None, path: str = '/broadcast'):
+        """"""
+        url = socket_url(f'{path}/{room}')
+        if key:
+            url += f'?publish={window.encodeURIComponent(key)}'
+
+        self.handlers = {}
+        self.offset = 0
+        self.rtt = None
+        self.clock_timer = None
+        super().__init__(url)
+
+    # ----------------------------------------------------------------------
+    def on_open(self, evt) -> None:
+        """"""
+        super().on_open(evt)
+        self.sync_clock()
+        if self.clock_timer is None:
+            self.clock_timer = timer.set_interval(self.sync_clock, self.clock_interval)
+
+    # ----------------------------------------------------------------------
+    def on_message(self, evt) -> None:
+        """"""
+        kind, *args = json.loads(evt.data)
+        if kind == 't':
+            sent, server = args
+            rtt = window.Date.now() - sent
+            # The sample with the lowest round trip is the most accurate
+            if self.rtt is None or rtt <= self.rtt:
+                self.rtt = rtt
+                self.offset = server - (sent + rtt / 2)
+        elif kind == 'm':
+            topic, payload, sent = args
+            if handler := self.handlers.get(topic):
+                handler(payload, sent)
+
+    # ----------------------------------------------------------------------
+    def reconnects(self, evt) -> bool:
+        """"""
+        # 4003: the room is claimed by another publisher
+        return super().reconnects(evt) and evt.code != 4003
+
+    # ----------------------------------------------------------------------
+    def sync_clock(self) -> None:
+        """Measures the clock offset again, keeping the best samples."""
+        if not self.ready():
+            return
+        if self.rtt is not None:
+            # Let the estimate follow the drift of the local clock
+            self.rtt *= 1.5
+        for i in range(self.clock_samples):
+            timer.set_timeout(lambda: self.send(['t', window.Date.now()]), i * 100)
+
+    # ----------------------------------------------------------------------
+    def server_now(self) -> float:
+        """The server time, in milliseconds."""
+        return window.Date.now() + self.offset
+
+    # ----------------------------------------------------------------------
+    def subscribe(self, topic: str, handler) -> None:
+        """Calls `handler(payload, sent)` with the messages of `topic`."""
+        self.handlers[topic] = handler
+
+    # ----------------------------------------------------------------------
+    def publish(self, topic: str, payload) -> None:
+        """"""
+        self.send(['m', topic, payload])
+
+    # ----------------------------------------------------------------------
+    def close(self) -> None:
+        """"""
+        if self.clock_timer is not None:
+            timer.clear_interval(self.clock_timer)
+        super().close()
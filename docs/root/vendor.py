@@ -0,0 +1,239 @@
+"""
+Vendor
+======
+
+Self-hosts the fonts, icons and Web Awesome components used by the
+application, so the page loads without requests to third-party hosts.
+
+- Fonts: the Latin subset of Roboto Condensed, the family of the page, as a
+  single variable WOFF2 limited to the weights in use, with its `@font-face`
+  rule in `fonts.css`. Built with fontTools from `fontpkg-roboto-condensed`.
+- Icons: the SVGs of `icons`, copied from the Font Awesome Free package
+  `fontawesomefree`.
+- Web Awesome: only the component modules in `webawesome_components`, along
+  with the modules and stylesheets they import, downloaded from the CDN so
+  the page no longer pulls the whole library through the autoloader.
+
+Every vendored set is placed under a versioned directory, which makes it
+safe to serve with immutable cache headers. A `.complete` marker is written
+once every Web Awesome file is present, so a partial download never
+replaces the CDN.
+
+Vendoring is a build step, run with `python vendor.py`, and its output in
+`static/vendor` is committed. The server never downloads: it only checks the
+marker, see `is_vendored`, and keeps the Web Awesome CDN when it is missing.
+The build dependencies are listed in the README.
+"""
+
+import os
+import re
+import shutil
+import posixpath
+import urllib.request
+
+webawesome_version = '3.0.0-alpha.4'
+webawesome_cdn = f'https://early.webawesome.com/webawesome@{webawesome_version}/dist'
+fontawesome_version = '6.6.0'
+roboto_condensed_version = '3.8'
+
+vendor_path = os.path.join('static', 'vendor')
+webawesome_path = os.path.join(vendor_path, f'webawesome-{webawesome_version}')
+icons_path = os.path.join(vendor_path, f'fontawesome-{fontawesome_version}')
+fonts_path = os.path.join(vendor_path, f'roboto-condensed-{roboto_condensed_version}')
+
+webawesome_components = [
+    'tab-group',
+    'tab',
+    'select',
+    'option',
+    'textarea',
+    'switch',
+    'range',
+    'icon-button',
+    'icon',
+]
+icons = ['play', 'stop', 'heart', 'plus', 'trash']
+
+# Regular, bold and the `lighter` footer, which resolves to 100
+font_weights = (100, 700)
+# The 'latin' subset of Google Fonts
+font_unicodes = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, '
+    'U+0304, U+0308, U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, '
+    'U+2212, U+2215, U+FEFF, U+FFFD'
+)
+font_file = 'roboto-condensed-latin.woff2'
+font_face = '''/* Roboto Condensed {version}, SIL Open Font License 1.1, see OFL.txt */
+@font-face {{
+  font-family: "Roboto Condensed";
+  font-style: normal;
+  font-weight: {weights};
+  font-display: swap;
+  src: url("{file}") format("woff2");
+  unicode-range: {unicodes};
+}}
+'''
+
+import_pattern = re.compile(
+    r'''(?:\bfrom\s*|\bimport\s*\(?\s*|@import\s+(?:url\()?\s*)["'](\.{1,2}/[^"']+)["']'''
+)
+
+
+# ----------------------------------------------------------------------
+def download(url: str, filename: str) -> bytes:
+    """
+    Downloads a file, unless it is already present.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the file.
+    filename : str
+        The local path of the file.
+
+    Returns
+    -------
+    bytes
+        The content of the file.
+    """
+    if os.path.exists(filename):
+        with open(filename, 'rb') as file:
+            return file.read()
+
+    with urllib.request.urlopen(url, timeout=30) as response:
+        content = response.read()
+
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(f'{filename}.tmp', 'wb') as file:
+        file.write(content)
+    os.replace(f'{filename}.tmp', filename)
+    return content
+
+
+# ----------------------------------------------------------------------
+def is_vendored() -> bool:
+    """Whether `vendor_webawesome` completed, without downloading."""
+    return os.path.exists(os.path.join(webawesome_path, '.complete'))
+
+
+# ----------------------------------------------------------------------
+def vendor_fonts() -> None:
+    """
+    Builds the Latin subset of Roboto Condensed and its `fonts.css`.
+
+    The variable font is limited to `font_weights`, subset to
+    `font_unicodes` and compressed as WOFF2.
+    """
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    from fontTools.varLib import instancer
+    import fontpkg_roboto_condensed
+
+    font = TTFont(fontpkg_roboto_condensed.ROOT / 'files' / 'RobotoCondensed[wght].ttf')
+
+    options = subset.Options()
+    options.layout_features = ['*']
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=subset.parse_unicodes(font_unicodes.replace(' ', '')))
+    subsetter.subset(font)
+
+    font = instancer.instantiateVariableFont(font, {'wght': font_weights})
+
+    os.makedirs(fonts_path, exist_ok=True)
+    font.flavor = 'woff2'
+    font.save(os.path.join(fonts_path, font_file))
+    shutil.copyfile(
+        fontpkg_roboto_condensed.ROOT / 'LICENSE', os.path.join(fonts_path, 'OFL.txt')
+    )
+
+    with open(os.path.join(fonts_path, 'fonts.css'), 'w') as file:
+        file.write(
+            font_face.format(
+                version=roboto_condensed_version,
+                weights=' '.join(map(str, font_weights)),
+                file=font_file,
+                unicodes=font_unicodes,
+            )
+        )
+
+
+# ----------------------------------------------------------------------
+def vendor_icons() -> None:
+    """Copies the SVGs of `icons` from the Font Awesome Free package."""
+    import fontawesomefree
+
+    svgs = os.path.join(
+        os.path.dirname(fontawesomefree.__file__),
+        'static',
+        'fontawesomefree',
+        'svgs',
+        'solid',
+    )
+
+    os.makedirs(icons_path, exist_ok=True)
+    for name in icons:
+        with open(os.path.join(svgs, f'{name}.svg'), 'rb') as file:
+            content = file.read()
+
+        # Inherit the text color like the icons of the default library
+        with open(os.path.join(icons_path, f'{name}.svg'), 'wb') as file:
+            file.write(content.replace(b'<svg ', b'<svg fill="currentColor" ', 1))
+
+
+# ----------------------------------------------------------------------
+def vendor_webawesome() -> bool:
+    """
+    Downloads the used Web Awesome components with their imports and the
+    default theme.
+
+    Returns
+    -------
+    bool
+        True if all the files are vendored, False if any download failed, in
+        which case the template keeps loading them from the CDN.
+    """
+    if is_vendored():
+        return True
+
+    pending = ['themes/default.css'] + [
+        f'components/{name}/{name}.js' for name in webawesome_components
+    ]
+    visited = set()
+
+    try:
+        while pending:
+            path = pending.pop()
+            if path in visited:
+                continue
+            visited.add(path)
+
+            content = download(
+                f'{webawesome_cdn}/{path}',
+                os.path.join(webawesome_path, *path.split('/')),
+            )
+
+            # Follow the relative imports of modules and stylesheets
+            for specifier in import_pattern.findall(content.decode('utf-8')):
+                pending.append(
+                    posixpath.normpath(
+                        posixpath.join(posixpath.dirname(path), specifier)
+                    )
+                )
+
+    except OSError as error:
+        print(f'Web Awesome could not be vendored, using the CDN: {error}')
+        return False
+
+    with open(os.path.join(webawesome_path, '.complete'), 'w') as file:
+        file.write(webawesome_version)
+    return True
+
+
+if __name__ == '__main__':
+    vendor_fonts()
+    print(f'Roboto Condensed {roboto_condensed_version} vendored in {fonts_path}')
+    vendor_icons()
+    print(f'Font Awesome {fontawesome_version} icons vendored in {icons_path}')
+    if not vendor_webawesome():
+        raise SystemExit(1)
+    print(f'Web Awesome {webawesome_version} vendored in {webawesome_path}')
@@ -0,0 +1,98 @@
+// Generated by serviceworker.py, do not edit
+const VERSION = "3edc0735c929";
+const PRECACHE = [
+  "/stylophone-assistant/static/brython/Brython-3.11.3/brython.js",
+  "/stylophone-assistant/static/styles/normalize.css",
+  "/stylophone-assistant/static/styles/default.css",
+  "/stylophone-assistant/static/styles/bootstrap-grid.css",
+  "/stylophone-assistant/static/fonts/roboto-android/roboto.css",
+  "/stylophone-assistant/static/fonts/roboto-android/roboto-mono.css",
+  "/stylophone-assistant/root/static/icons/favicon.ico",
+  "/stylophone-assistant/root/static/assets/stylophone_both_kids.4a227c5c90.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_both_solfege.f83420c5be.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_both_tabs-1.de4b2b357c.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_both_tabs.5a165a7d04.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_both_tabs_tunning.9e5191f4da.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_s1_kids.0f30bc9d8c.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_s1_solfege.8f15e8ffd6.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_s1_tabs.4086493ba3.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_x1_kids-1.eba3825974.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_x1_kids.3262d27141.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_x1_solfege-1.a1639c2390.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_x1_solfege.005e209be0.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_x1_tabs-1.98134026b1.svg",
+  "/stylophone-assistant/root/static/assets/stylophone_x1_tabs.70d5ef637c.svg",
+  "/stylophone-assistant/root/static/assets/tabs.c90f72a674.json",
+  "/stylophone-assistant/root/static/assets/search.e1a7d3977a.json",
+  "/stylophone-assistant/root/static/assets/catalog.5ac3b03aa8.json",
+  "/stylophone-assistant/root/static/assets/brython_modules.6d8aa31a2a.js",
+  "/stylophone-assistant/root/static/vendor/roboto-condensed-3.8/OFL.txt",
+  "/stylophone-assistant/root/static/vendor/roboto-condensed-3.8/fonts.css",
+  "/stylophone-assistant/root/static/vendor/roboto-condensed-3.8/roboto-condensed-latin.woff2",
+  "/stylophone-assistant/root/static/vendor/fontawesome-6.6.0/heart.svg",
+  "/stylophone-assistant/root/static/vendor/fontawesome-6.6.0/play.svg",
+  "/stylophone-assistant/root/static/vendor/fontawesome-6.6.0/plus.svg",
+  "/stylophone-assistant/root/static/vendor/fontawesome-6.6.0/stop.svg",
+  "/stylophone-assistant/root/static/vendor/fontawesome-6.6.0/trash.svg"
+];
+const IMMUTABLE = ["/stylophone-assistant/root/static/assets/", "/stylophone-assistant/root/static/vendor/"];
+const CACHE = `sa-${VERSION}`;
+const RUNTIME = 'sa-runtime';
+
+self.addEventListener('install', (event) => {
+  // The version is only installed once every file is cached
+  event.waitUntil(
+    caches.open(CACHE).then((cache) => cache.addAll(
+      [self.registration.scope, ...PRECACHE].map((url) => new Request(url, {cache: 'reload'}))
+    ))
+  );
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(
+        keys.filter((key) => key.startsWith('sa-') && key !== CACHE && key !== RUNTIME)
+          .map((key) => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  if (request.method !== 'GET') {
+    return;
+  }
+
+  const url = new URL(request.url);
+  const page = request.mode === 'navigate' && url.origin === self.location.origin;
+
+  event.respondWith(
+    caches.open(CACHE)
+      .then((cache) => cache.match(page ? self.registration.scope : request, {ignoreSearch: page}))
+      .then((cached) => {
+        if (cached) {
+          return cached;
+        }
+
+        // Files of a previous manifest, immutable paths and the CDN
+        const immutable = url.origin !== self.location.origin
+          || IMMUTABLE.some((path) => url.pathname.startsWith(path));
+
+        return caches.open(RUNTIME).then((runtime) => {
+          const network = () => fetch(request).then((response) => {
+            if (response.ok || response.type === 'opaque') {
+              runtime.put(request, response.clone());
+            }
+            return response;
+          });
+
+          if (immutable) {
+            return runtime.match(request).then((stored) => stored || network());
+          }
+          return network().catch(() => runtime.match(request));
+        });
+      })
+  );
+});
@@ -0,0 +1,213 @@
+"""
+Duplicates
+==========
+
+Near-duplicate detection over the tabs library, a stage of the catalog
+build.
+
+Community tabs often copy each other with small edits, in another key, or
+with the repeats written out instead of compressed with `( ... )xN`. Every
+song is normalized, repeats expanded, and reduced to the intervals between
+its notes, see search.py, so neither the key nor the way repeats are
+written matters. Its shingles, the runs of `shingle_size` intervals, are
+summarized by a MinHash signature.
+
+Signatures are computed with one hash per shingle: the hash picks one of
+`signature_size` bins and the signature keeps the minimum of every bin,
+empty bins borrowing the value of the next filled one. Songs sharing any
+band of `band_size` values of their signatures land in the same LSH bucket,
+and only these candidates are compared, with the exact Jaccard similarity
+of their shingles. The library is processed in near linear time instead of
+comparing all the pairs of songs.
+
+Runs from the catalog build when the library changed, see library.py, or
+alone with `python duplicates.py`.
+"""
+
+import zlib
+
+from search import tabs_intervals
+
+shingle_size = 5
+signature_size = 64
+band_size = 4
+similarity_threshold = 0.5
+
+empty_bin = 1 << 32
+
+
+# ----------------------------------------------------------------------
+def song_shingles(intervals: str) -> set:
+    """
+    Returns the interval shingles of a song.
+
+    Parameters
+    ----------
+    intervals : str
+        The intervals of the song, see `search.tabs_intervals`.
+
+    Returns
+    -------
+    set
+        The hashes of the runs of `shingle_size` intervals, empty for songs
+        shorter than a shingle.
+    """
+    encoded = intervals.encode('latin-1')
+    return {
+        zlib.crc32(encoded[start : start + shingle_size])
+        for start in range(len(encoded) - shingle_size + 1)
+    }
+
+
+# ----------------------------------------------------------------------
+def minhash(shingles: set) -> tuple:
+    """
+    Returns the MinHash signature of a set of shingles.
+
+    Parameters
+    ----------
+    shingles : set
+        The hashes of the shingles, see `song_shingles`.
+
+    Returns
+    -------
+    tuple
+        `signature_size` values, the minimum hash of every bin.
+    """
+    bins = [empty_bin] * signature_size
+    for shingle in shingles:
+        index = shingle % signature_size
+        value = shingle // signature_size
+        if value < bins[index]:
+            bins[index] = value
+
+    # Densification, so similar sets agree on their empty bins as well
+    for index in range(signature_size):
+        if bins[index] == empty_bin:
+            for offset in range(1, signature_size):
+                value = bins[(index + offset) % signature_size]
+                if value != empty_bin:
+                    bins[index] = value + offset * empty_bin
+                    break
+    return tuple(bins)
+
+
+# ----------------------------------------------------------------------
+def jaccard(a: set, b: set) -> float:
+    """The Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+# ----------------------------------------------------------------------
+def find_duplicates(intervals: dict, threshold: float = similarity_threshold) -> list:
+    """
+    Finds the clusters of near-duplicate songs.
+
+    Parameters
+    ----------
+    intervals : dict
+        The intervals of every song, see `search.tabs_intervals`, by
+        filename.
+    threshold : float, optional
+        The Jaccard similarity of the shingles above which two songs are
+        near-duplicates.
+
+    Returns
+    -------
+    list
+        The clusters, largest first. Every cluster is a list of
+        `(name, similarity)` pairs, the similarity being the one of the
+        song with the first of the cluster.
+    """
+    names = []
+    shingles = []
+    buckets = {}
+    for name, song_intervals in intervals.items():
+        song = song_shingles(song_intervals)
+        if not song:
+            continue
+        song_id = len(names)
+        names.append(name)
+        shingles.append(song)
+        signature = minhash(song)
+        for band in range(0, signature_size, band_size):
+            key = (band, signature[band : band + band_size])
+            buckets.setdefault(key, []).append(song_id)
+
+    parent = list(range(len(names)))
+
+    def root(song_id):
+        while parent[song_id] != song_id:
+            parent[song_id] = parent[parent[song_id]]
+            song_id = parent[song_id]
+        return song_id
+
+    for members in buckets.values():
+        # Every member is compared with the members before it in the bucket,
+        # but not with those already in its cluster, so each cluster of the
+        # bucket is joined as soon as one of its songs is similar
+        for position, song_id in enumerate(members):
+            for previous in members[:position]:
+                a, b = root(previous), root(song_id)
+                if a != b and jaccard(shingles[previous], shingles[song_id]) >= threshold:
+                    parent[max(a, b)] = min(a, b)
+
+    clusters = {}
+    for song_id in range(len(names)):
+        clusters.setdefault(root(song_id), []).append(song_id)
+
+    report = []
+    for first, members in clusters.items():
+        if len(members) < 2:
+            continue
+        report.append(
+            [(names[song_id], jaccard(shingles[first], shingles[song_id])) for song_id in members]
+        )
+    report.sort(key=lambda cluster: (-len(cluster), cluster[0][0]))
+    return report
+
+
+# ----------------------------------------------------------------------
+def report_duplicates(intervals: dict, threshold: float = similarity_threshold) -> list:
+    """
+    Prints the clusters of near-duplicate songs.
+
+    Parameters
+    ----------
+    intervals : dict
+        The intervals of every song, by filename.
+    threshold : float, optional
+        See `find_duplicates`.
+
+    Returns
+    -------
+    list
+        The clusters, see `find_duplicates`.
+    """
+    clusters = find_duplicates(intervals, threshold)
+    if clusters:
+        print(f'Near-duplicate songs in tabs: {len(clusters)} clusters')
+    for cluster in clusters:
+        print('  ' + ', '.join(f'{name} ({similarity:.0%})' for name, similarity in cluster))
+    return clusters
+
+
+if __name__ == '__main__':
+    import os
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Reports the near-duplicate songs of a tabs directory.')
+    parser.add_argument('path', nargs='?', default='tabs')
+    parser.add_argument('--threshold', type=float, default=similarity_threshold)
+    args = parser.parse_args()
+
+    library = {}
+    for filename in sorted(os.listdir(args.path)):
+        if filename.endswith('.txt'):
+            with open(os.path.join(args.path, filename), 'r') as file:
+                library[filename] = tabs_intervals(file.read())
+
+    if not report_duplicates(library, args.threshold):
+        print('No near-duplicate songs')
@@ -0,0 +1,393 @@
+"""
+Executor
+========
+
+Runs the server-side functions of the assistant without stalling the IOLoop.
+
+Every function declares how it runs:
+
+- Coroutine functions, `async def`, are awaited on the IOLoop.
+- Functions decorated with `@blocking` run on the `BoundedExecutor` of the
+  application, a thread pool with a limited number of calls waiting for a
+  thread. When it is full the request is rejected with 503 and a
+  `Retry-After` header instead of queueing without bound, and calls that
+  exceed their timeout are answered with 504.
+- Any other function is called directly on the IOLoop, so it should return
+  quickly.
+
+A timed out call can not be interrupted once its thread is running it, so
+it keeps its place in the executor until it returns. The back-pressure then
+accounts for the threads that are really busy.
+
+`PythonHandler` extends the handler of Radiant Framework with these rules,
+with batches of calls in a single request and, through `python_websocket`,
+with calls multiplexed over a WebSocket. Radiant Framework itself is left
+untouched, the executor is kept in the settings of the application.
+"""
+
+import json
+import asyncio
+import inspect
+import traceback
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+from tornado.ioloop import IOLoop
+from tornado.web import HTTPError, Finish
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
+
+# `radiant.framework` is replaced by a fake module under CPython
+server = importlib.import_module('radiant.framework.server')
+
+executor_workers = 8
+executor_queue = 32
+executor_timeout = 30
+retry_after = 1
+max_batch = 64
+
+
+########################################################################
+class ExecutorFull(Exception):
+    """Raised when the executor has no room for another call."""
+
+
+# ----------------------------------------------------------------------
+def blocking(fn=None, /, timeout: float = None):
+    """
+    Declares a function as blocking, to be run on the executor.
+
+    Can be used as `@blocking` or `@blocking(timeout=5)`.
+
+    Parameters
+    ----------
+    fn : callable
+        The function.
+    timeout : float, optional
+        Seconds to wait for the result, defaults to the timeout of the
+        executor.
+    """
+
+    def wrap(fn):
+        fn.__blocking__ = True
+        fn.__timeout__ = timeout
+        return fn
+
+    if fn is None:
+        return wrap
+    return wrap(fn)
+
+
+########################################################################
+class BoundedExecutor:
+    """Thread pool with a bounded number of pending calls."""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        workers: int = executor_workers,
+        queue: int = executor_queue,
+        timeout: float = executor_timeout,
+    ):
+        """
+        Parameters
+        ----------
+        workers : int, optional
+            Number of threads.
+        queue : int, optional
+            Number of calls allowed to wait for a thread.
+        timeout : float, optional
+            Default seconds to wait for the result of a call.
+        """
+        self.workers = workers
+        self.queue = queue
+        self.timeout = timeout
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        # Threads are started on the first call, so the pool can be created
+        # before forking the workers
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='executor')
+
+    # ----------------------------------------------------------------------
+    async def run(self, fn, *args, timeout: float = None, **kwargs):
+        """Runs `fn` on a thread and waits for its result."""
+        if self.pending >= self.workers + self.queue:
+            self.rejected += 1
+            raise ExecutorFull()
+
+        io_loop = IOLoop.current()
+        self.pending += 1
+        future = self.pool.submit(fn, *args, **kwargs)
+        # Done callbacks run on the thread of the call
+        future.add_done_callback(lambda future: io_loop.add_callback(self.release))
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # A call still queued is cancelled on timeout
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    # ----------------------------------------------------------------------
+    def release(self) -> None:
+        """"""
+        self.pending -= 1
+
+    # ----------------------------------------------------------------------
+    def health(self) -> dict:
+        """The state of the executor."""
+        return {
+            'workers': self.workers,
+            'queue': self.queue,
+            'pending': self.pending,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+        }
+
+
+# ----------------------------------------------------------------------
+def application_executor(application) -> BoundedExecutor:
+    """
+    Returns the executor of an application, creating the default one.
+
+    Parameters
+    ----------
+    application : tornado.web.Application
+        The application, its settings keep the executor.
+
+    Returns
+    -------
+    BoundedExecutor
+        The executor under the `executor` setting.
+    """
+    if 'executor' not in application.settings:
+        application.settings['executor'] = BoundedExecutor()
+    return application.settings['executor']
+
+
+# ----------------------------------------------------------------------
+async def dispatch(handler, fn, *args, **kwargs):
+    """
+    Calls a handler function according to its declaration.
+
+    Parameters
+    ----------
+    handler : tornado.web.RequestHandler
+        The handler serving the call, its application provides the executor.
+    fn : callable
+        The function, coroutine function or `@blocking` function.
+
+    Raises
+    ------
+    ExecutorFull
+        If the executor has no room for a blocking call.
+    asyncio.TimeoutError
+        If the call exceeds its timeout.
+    """
+    timeout = getattr(fn, '__timeout__', None)
+
+    if inspect.iscoroutinefunction(fn):
+        return await asyncio.wait_for(fn(*args, **kwargs), timeout)
+
+    if getattr(fn, '__blocking__', False):
+        executor = application_executor(handler.application)
+        return await executor.run(fn, *args, timeout=timeout, **kwargs)
+
+    return fn(*args, **kwargs)
+
+
+# ----------------------------------------------------------------------
+async def call(handler, fn, *args, **kwargs):
+    """
+    Calls a handler function, answering with 400 when it rejects its
+    arguments with `ValueError`, with 503 when the executor is full and with
+    504 when the call times out.
+    """
+    try:
+        return await dispatch(handler, fn, *args, **kwargs)
+    except ValueError as error:
+        raise HTTPError(400, reason=str(error))
+    except ExecutorFull:
+        # `HTTPError` would clear the headers
+        handler.set_status(503)
+        handler.set_header('Retry-After', retry_after)
+        raise Finish('Executor full')
+    except asyncio.TimeoutError:
+        raise HTTPError(504, 'Call timed out')
+
+
+########################################################################
+class PythonHandler(server.PythonHandler):
+    """`PythonHandler` whose methods run according to their declaration.
+
+    Besides the single calls of `LocalInterpreter`, a `batch` argument with
+    a list of calls, in the format of `call_one`, runs them concurrently and
+    answers with all their results in a single response.
+
+    Malformed requests are answered with 400 and unknown names with 404.
+    """
+
+    # ----------------------------------------------------------------------
+    def method(self, name: str):
+        """
+        Returns the method called by a request.
+
+        Parameters
+        ----------
+        name : str
+            The name of the method.
+
+        Raises
+        ------
+        AttributeError
+            If the name is private or it is not a method of the handler.
+        """
+        fn = None if name.startswith('_') else getattr(self, name, None)
+        if not callable(fn):
+            raise AttributeError(f'Unknown call: {name}')
+        return fn
+
+    # ----------------------------------------------------------------------
+    def json_argument(self, name: str, default: str, type_: type):
+        """Decodes a JSON argument, answering with 400 if it is malformed."""
+        try:
+            value = json.loads(self.get_argument(name, default))
+        except ValueError:
+            raise HTTPError(400, reason=f'Invalid JSON in `{name}`')
+        if not isinstance(value, type_):
+            raise HTTPError(400, reason=f'Invalid `{name}`')
+        return value
+
+    # ----------------------------------------------------------------------
+    async def post(self):
+        """"""
+        if 'batch' in self.request.arguments:
+            calls = self.json_argument('batch', '[]', list)
+            if not all(isinstance(request, dict) for request in calls):
+                raise HTTPError(400, reason='Every call of a batch must be an object')
+            if len(calls) > max_batch:
+                raise HTTPError(400, reason=f'Batches are limited to {max_batch} calls')
+            responses = await asyncio.gather(*map(self.call_one, calls))
+            self.write(json.dumps({'__RDNT__': responses}))
+            return
+
+        try:
+            fn = self.method(self.get_argument('name'))
+        except AttributeError as error:
+            raise HTTPError(404, reason=str(error))
+        args = tuple(self.json_argument('args', '[]', list))
+        kwargs = self.json_argument('kwargs', '{}', dict)
+
+        value = await call(self, fn, *args, **kwargs)
+        self.write(json.dumps({'__RDNT__': 0 if value is None else value}))
+
+    # ----------------------------------------------------------------------
+    async def call_one(self, request: dict) -> dict:
+        """
+        Runs a call of a batch or of the WebSocket transport.
+
+        Errors are returned along with the `id` of the call instead of
+        failing the other calls.
+
+        Parameters
+        ----------
+        request : dict
+            The `id`, `name`, `args` and `kwargs` of the call.
+
+        Returns
+        -------
+        dict
+            The `id` of the call with its `result`, or with its `error`.
+        """
+        id_ = request.get('id')
+        try:
+            args = request.get('args', [])
+            kwargs = request.get('kwargs', {})
+            if not isinstance(args, list) or not isinstance(kwargs, dict):
+                raise TypeError('`args` must be a list and `kwargs` an object')
+            result = await dispatch(
+                self, self.method(str(request.get('name', ''))), *args, **kwargs
+            )
+            return {'id': id_, 'result': result}
+        except ExecutorFull:
+            return {'id': id_, 'error': 'Executor full'}
+        except asyncio.TimeoutError:
+            return {'id': id_, 'error': 'Call timed out'}
+        except Exception as error:
+            traceback.print_exc()
+            return {'id': id_, 'error': f'{type(error).__name__}: {error}'}
+
+
+########################################################################
+class PythonWebSocketHandler(WebSocketHandler):
+    """Multiplexes the calls of a `PythonHandler` over a WebSocket.
+
+    Every message is a call, or a list of calls, with the format of
+    `PythonHandler.call_one`. The calls of a connection run concurrently
+    and every response is sent as soon as it is ready, tagged with the `id`
+    of its call.
+    """
+
+    # ----------------------------------------------------------------------
+    def open(self):
+        """"""
+        self.pending = 0
+
+    # ----------------------------------------------------------------------
+    def on_message(self, message):
+        """Malformed messages and calls are answered with an error, without
+        an `id` if the call has none."""
+        try:
+            calls = json.loads(message)
+        except ValueError:
+            self.respond({'id': None, 'error': 'Invalid JSON'})
+            return
+        if isinstance(calls, dict):
+            calls = [calls]
+        elif not isinstance(calls, list):
+            self.respond({'id': None, 'error': 'A message must be a call or a list of calls'})
+            return
+
+        for request in calls:
+            if not isinstance(request, dict):
+                self.respond({'id': None, 'error': 'A call must be an object'})
+            elif self.pending >= max_batch:
+                self.respond({'id': request.get('id'), 'error': 'Too many calls'})
+            else:
+                self.pending += 1
+                IOLoop.current().spawn_callback(self.answer, request)
+
+    # ----------------------------------------------------------------------
+    async def answer(self, request: dict) -> None:
+        """"""
+        try:
+            self.respond(await self.call_one(request))
+        finally:
+            self.pending -= 1
+
+    # ----------------------------------------------------------------------
+    def respond(self, response: dict) -> None:
+        """"""
+        try:
+            self.write_message(json.dumps(response))
+        except WebSocketClosedError:
+            pass
+
+
+# ----------------------------------------------------------------------
+def python_websocket(handler: type) -> type:
+    """
+    Returns the WebSocket transport of a `PythonHandler` subclass.
+
+    Parameters
+    ----------
+    handler : type
+        The `PythonHandler` subclass, its methods are the calls.
+
+    Returns
+    -------
+    type
+        The handler of the WebSocket, to be served at `{endpoint}/ws`.
+    """
+    return type(f'{handler.__name__}WebSocket', (PythonWebSocketHandler, handler), {})
@@ -0,0 +1,269 @@
+"""
+Export
+======
+
+Export of compiled songs as Standard MIDI and MusicXML files, to check them
+in other tools or keep them as regression fixtures.
+
+A song is compiled with `compile_song`, and its S-1 program is reduced to
+an array of pitches, in semitones from the first tab of the S-1: tabs
+joined by a line break are both notes, and the tabs wrapped to another
+octave by a transposition, `+1:` and `-1:`, are moved back to their octave.
+The writers stream that array in a single pass, one note per gap, as the
+assistant plays it: a quarter note at the tempo of the gap, held for 70%
+of it.
+
+`python export.py` exports every song of `tabs` into `exports` on a process
+pool. The gap is the one selected with `--gap`, in milliseconds like the
+gap select of the assistant, or the one given by a `# Gap: 0.3 s` comment of
+the song, as written by the MIDI importer, or `default_gap`.
+"""
+
+import os
+import re
+import struct
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+
+from compiler import compile_song
+from midi import base_note
+from search import token_pitch
+
+default_gap = 500
+division = 480
+release = 0.7
+program = 80  # Lead 1 (square)
+beats = 4
+
+step_names = [
+    ('C', 0), ('C', 1), ('D', 0), ('D', 1), ('E', 0), ('F', 0),
+    ('F', 1), ('G', 0), ('G', 1), ('A', 0), ('A', 1), ('B', 0),
+]
+gap_comment = re.compile(r'^#\s*Gap:\s*([\d.]+)\s*s', re.MULTILINE)
+
+
+# ----------------------------------------------------------------------
+def song_pitches(song: dict) -> list:
+    """
+    Reduces a compiled song to its pitches.
+
+    Parameters
+    ----------
+    song : dict
+        The result of `compile_song`.
+
+    Returns
+    -------
+    list
+        The pitch of every note, in semitones from the first tab of the S-1.
+    """
+    notes = (token_pitch(tab) for token in song['s1'] for tab in token.split())
+    return [pitch for pitch in notes if pitch is not None]
+
+
+# ----------------------------------------------------------------------
+def varlen(value: int) -> bytes:
+    """Encodes a variable length quantity."""
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(encoded))
+
+
+# ----------------------------------------------------------------------
+def write_midi(file, notes, gap: float = default_gap, title: str = '') -> None:
+    """
+    Writes a Standard MIDI file, format 0.
+
+    Parameters
+    ----------
+    file :
+        The output, opened in binary mode.
+    notes : iterable of int
+        The pitches, see `song_pitches`.
+    gap : float, optional
+        The time between notes, in milliseconds.
+    title : str, optional
+        The name of the track.
+    """
+    held = round(division * release)
+    name = title.encode('utf-8')
+    track = bytearray()
+    track += b'\x00\xff\x03' + varlen(len(name)) + name
+    track += b'\x00\xff\x51\x03' + round(gap * 1000).to_bytes(3, 'big')
+    track += bytes([0x00, 0xC0, program])
+
+    wait = 0
+    for pitch in notes:
+        note = min(max(base_note + pitch, 0), 127)
+        track += varlen(wait) + bytes([0x90, note, 100])
+        track += varlen(held) + bytes([0x80, note, 0])
+        wait = division - held
+    track += varlen(wait) + b'\xff\x2f\x00'
+
+    file.write(b'MThd' + struct.pack('>IHHH', 6, 0, 1, division))
+    file.write(b'MTrk' + struct.pack('>I', len(track)))
+    file.write(track)
+
+
+# ----------------------------------------------------------------------
+def write_musicxml(file, notes, gap: float = default_gap, title: str = '') -> None:
+    """
+    Writes a MusicXML score, partwise.
+
+    Parameters
+    ----------
+    file :
+        The output, opened in text mode.
+    notes : iterable of int
+        The pitches, see `song_pitches`.
+    gap : float, optional
+        The time between notes, in milliseconds.
+    title : str, optional
+        The title of the score.
+    """
+    tempo = f'{60000 / gap:g}'
+    file.write(
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+        '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" '
+        '"http://www.musicxml.org/dtds/partwise.dtd">\n'
+        '<score-partwise version="4.0">\n'
+        f'  <work><work-title>{escape(title)}</work-title></work>\n'
+        '  <part-list><score-part id="P1"><part-name>Stylophone</part-name></score-part></part-list>\n'
+        '  <part id="P1">\n'
+        '    <measure number="1">\n'
+        '      <attributes><divisions>1</divisions><key><fifths>0</fifths></key>'
+        f'<time><beats>{beats}</beats><beat-type>4</beat-type></time>'
+        '<clef><sign>G</sign><line>2</line></clef></attributes>\n'
+        '      <direction placement="above"><direction-type><metronome>'
+        f'<beat-unit>quarter</beat-unit><per-minute>{tempo}</per-minute>'
+        f'</metronome></direction-type><sound tempo="{tempo}"/></direction>\n'
+    )
+
+    count = 0
+    for pitch in notes:
+        if count and not count % beats:
+            file.write(f'    </measure>\n    <measure number="{count // beats + 1}">\n')
+        note = base_note + pitch
+        step, alter = step_names[note % 12]
+        file.write(
+            f'      <note><pitch><step>{step}</step>'
+            + (f'<alter>{alter}</alter>' if alter else '')
+            + f'<octave>{note // 12 - 1}</octave></pitch>'
+            '<duration>1</duration><type>quarter</type></note>\n'
+        )
+        count += 1
+
+    # The last measure is completed with rests
+    for _ in range(-count % beats if count else beats):
+        file.write('      <note><rest/><duration>1</duration><type>quarter</type></note>\n')
+    file.write('    </measure>\n  </part>\n</score-partwise>\n')
+
+
+# ----------------------------------------------------------------------
+def song_gap(tabs: str) -> float:
+    """The gap given by a `# Gap:` comment of the tabs, or `default_gap`."""
+    match = gap_comment.search(tabs)
+    return float(match.group(1)) * 1000 if match else default_gap
+
+
+# ----------------------------------------------------------------------
+def export_file(job: tuple) -> tuple:
+    """
+    Exports a `.txt` song, in a worker of the pool.
+
+    Parameters
+    ----------
+    job : tuple
+        The path of the song, the output directory, the formats, `midi` and
+        `musicxml`, and the gap, None for the one of the song, see
+        `song_gap`.
+
+    Returns
+    -------
+    tuple
+        The path of the song and the written files.
+    """
+    filename, output, formats, gap = job
+    with open(filename, 'r') as file:
+        tabs = file.read()
+    name = os.path.splitext(os.path.basename(filename))[0]
+    notes = song_pitches(compile_song(tabs))
+    gap = gap or song_gap(tabs)
+
+    written = []
+    for kind, extension, mode, writer in (
+        ('midi', 'mid', 'wb', write_midi),
+        ('musicxml', 'musicxml', 'w', write_musicxml),
+    ):
+        if kind in formats:
+            target = os.path.join(output, f'{name}.{extension}')
+            with open(f'{target}.tmp', mode) as file:
+                writer(file, notes, gap, name)
+            os.replace(f'{target}.tmp', target)
+            written.append(target)
+    return filename, written
+
+
+# ----------------------------------------------------------------------
+def export_directory(
+    path: str,
+    output: str,
+    formats=('midi', 'musicxml'),
+    workers: int = None,
+    gap: float = None,
+) -> list:
+    """
+    Exports every song of a directory on a process pool.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the `.txt` songs.
+    output : str
+        The directory of the exported files.
+    formats : tuple, optional
+        `midi`, `musicxml` or both.
+    workers : int, optional
+        The processes of the pool, defaults to the number of CPUs.
+    gap : float, optional
+        The time between notes of every song, in milliseconds, defaults to
+        the one of each song, see `song_gap`.
+
+    Returns
+    -------
+    list
+        The results of `export_file`.
+    """
+    os.makedirs(output, exist_ok=True)
+    jobs = [
+        (os.path.join(path, name), output, tuple(formats), gap)
+        for name in sorted(os.listdir(path))
+        if name.endswith('.txt')
+    ]
+    with ProcessPoolExecutor(workers) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(export_file, jobs, chunksize=chunksize))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Exports the songs of a tabs directory as MIDI and MusicXML.')
+    parser.add_argument('path', nargs='?', default='tabs')
+    parser.add_argument('-o', '--output', default='exports')
+    parser.add_argument('--format', nargs='+', default=['midi', 'musicxml'], choices=['midi', 'musicxml'])
+    parser.add_argument(
+        '--gap',
+        type=int,
+        choices=range(100, 3001, 100),
+        metavar='{100,200,...,3000}',
+        help='the gap of every song, in milliseconds, as in the assistant',
+    )
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    for source, written in export_directory(args.path, args.output, args.format, args.workers, args.gap):
+        print(f'{source}: {", ".join(written)}')
@@ -0,0 +1,234 @@
+"""
+Library
+=======
+
+Incremental build of the catalog of the tabs library.
+
+`load_tabs` writes, from the `.txt` files of the `tabs` directory:
+
+- `tabs.json`: the tabs of every song, by filename.
+- `search.json`: the melody search index, see search.py.
+- `catalog.json`: the compatibility of every song, see compatibility.py.
+
+The results of every song, its intervals and its compatibility, are kept in
+`.manifest.json` along with the modification time, the size and the digest
+of its file. Files whose modification time and size are unchanged are not
+read again, and a file touched but not modified is not processed again.
+When no song was added, removed or modified, and the outputs exist, nothing
+is written, so the server starts right away.
+
+The changed files are read and processed on a process pool when there are
+enough of them. Every output is written to a temporary file first and then
+replaced, so the server never serves a partial file, and the manifest is
+written last, so an interrupted build is resumed on the next start.
+"""
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from assets import write_atomic
+from compatibility import build_catalog, song_compatibility
+from search import build_index, tabs_intervals
+
+tabs_path = 'tabs'
+manifest_name = '.manifest.json'
+manifest_version = 1
+output_names = ['tabs.json', 'search.json', 'catalog.json']
+parallel_threshold = 64
+
+
+# ----------------------------------------------------------------------
+def process_song(filename: str) -> tuple:
+    """
+    Reads and processes a song, in a worker of the pool.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the `.txt` file.
+
+    Returns
+    -------
+    tuple
+        The manifest entry of the song, `[mtime_ns, size, digest, intervals,
+        fields]`, and its tabs.
+    """
+    stat = os.stat(filename)
+    with open(filename, 'rb') as file:
+        content = file.read()
+    # As read in text mode, with universal newlines
+    tabs = content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    entry = [
+        stat.st_mtime_ns,
+        stat.st_size,
+        hashlib.sha1(content).hexdigest(),
+        tabs_intervals(tabs),
+        song_compatibility(tabs),
+    ]
+    return entry, tabs
+
+
+# ----------------------------------------------------------------------
+def read_json(filename: str, default=None):
+    """Reads a JSON file, or returns `default` if it is missing or invalid."""
+    try:
+        with open(filename, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
+
+
+# ----------------------------------------------------------------------
+def write_json(filename: str, data) -> None:
+    """Writes compact JSON, replacing the file atomically."""
+    write_atomic(filename, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+# ----------------------------------------------------------------------
+def song_names(path: str = tabs_path) -> set:
+    """
+    Returns the names of the songs of a directory, lowercased.
+
+    Names are compared like case-insensitive file systems do, so a new song
+    never replaces an existing one that only differs in case.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory of the `.txt` files.
+
+    Returns
+    -------
+    set
+        The names, without the `.txt` extension.
+    """
+    if not os.path.isdir(path):
+        return set()
+    return {os.path.splitext(name)[0].lower() for name in os.listdir(path) if name.endswith('.txt')}
+
+
+# ----------------------------------------------------------------------
+def add_song(path: str, name: str, tabs: str, names: set) -> str:
+    """
+    Writes a new song, never overwriting an existing one.
+
+    A song whose name is taken, by an existing song or by a song added
+    before, is written with a numbered name, such as `Tetris Theme (2)`.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the `.txt` files.
+    name : str
+        The name of the song, without the extension.
+    tabs : str
+        The tabs of the song.
+    names : set
+        The taken names, see `song_names`, the new one is added to them.
+
+    Returns
+    -------
+    str
+        The path of the written file.
+    """
+    unique, number = name, 1
+    while unique.lower() in names:
+        number += 1
+        unique = f'{name} ({number})'
+    names.add(unique.lower())
+
+    filename = os.path.join(path, f'{unique}.txt')
+    write_atomic(filename, tabs.encode('utf-8'))
+    return filename
+
+
+# ----------------------------------------------------------------------
+def load_tabs(path: str = tabs_path, workers: int = None) -> dict:
+    """
+    Builds the catalog of the tabs library, processing only the changed
+    songs.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory of the `.txt` files and of the outputs.
+    workers : int, optional
+        The processes of the pool, defaults to the number of CPUs.
+
+    Returns
+    -------
+    dict
+        The `intervals` of every song, by filename, whether the library
+        `changed` since the previous build, and the number of songs
+        `processed`.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the directory does not exist.
+    """
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"The '{path}' directory does not exist.")
+
+    manifest_file = os.path.join(path, manifest_name)
+    manifest = read_json(manifest_file, {})
+    previous = manifest.get('songs', {}) if manifest.get('version') == manifest_version else {}
+
+    # Songs whose file is unchanged keep their entry
+    entries = {}
+    stale = []
+    with os.scandir(path) as scan:
+        files = sorted(
+            (file for file in scan if file.name.endswith('.txt') and file.is_file()),
+            key=lambda file: file.name,
+        )
+    for file in files:
+        stat = file.stat()
+        entry = previous.get(file.name)
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            entries[file.name] = entry
+        else:
+            entries[file.name] = None
+            stale.append(file.name)
+
+    filenames = [os.path.join(path, name) for name in stale]
+    if len(stale) >= parallel_threshold and workers != 1:
+        with ProcessPoolExecutor(workers) as pool:
+            chunksize = max(1, len(stale) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(process_song, filenames, chunksize=chunksize))
+    else:
+        results = [process_song(filename) for filename in filenames]
+
+    changed = entries.keys() != previous.keys()
+    contents = {}
+    for name, (entry, tabs) in zip(stale, results):
+        if name not in previous or previous[name][2] != entry[2]:
+            changed = True
+        entries[name] = entry
+        contents[name] = tabs
+
+    outputs = [os.path.join(path, name) for name in output_names]
+    if changed or not all(map(os.path.exists, outputs)):
+        # The tabs of the unchanged songs are in the previous build
+        tabs = read_json(outputs[0], {})
+        for name in entries:
+            if name in contents:
+                tabs[name] = contents[name]
+            elif name not in tabs:
+                tabs[name] = process_song(os.path.join(path, name))[1]
+        tabs = {name: tabs[name] for name in entries}
+
+        write_json(outputs[0], tabs)
+        write_json(outputs[1], build_index({name: entry[3] for name, entry in entries.items()}))
+        write_json(outputs[2], build_catalog({name: entry[4] for name, entry in entries.items()}))
+
+    if stale or entries.keys() != previous.keys():
+        write_json(manifest_file, {'version': manifest_version, 'songs': entries})
+
+    return {
+        'intervals': {name: entry[3] for name, entry in entries.items()},
+        'changed': changed,
+        'processed': len(stale),
+    }
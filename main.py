@@ -1,10 +1,28 @@
-from radiant.framework.server import RadiantCore, RadiantServer
+from radiant.framework.server import RadiantCore
 from radiant.framework import html, Element, select
 from browser import document, svg, ajax
 from browser import timer, window
 from radiant.framework import WebComponents
 from browser.local_storage import storage
-import re
+from tracing import trace
+from telemetry import PlaybackTelemetry
+from render import FrameRenderer, build_preview, preview_window
+from shell import build_shell, responsive_svg, panels
+from compiler import (
+    convert_note,
+    iter_normalized_lines,
+    iter_tabs_tokens,
+    iter_transposed_lines,
+    note_equivalence_mode1,
+    note_equivalence_mode2,
+    transpose_tabs,
+)
+from classroom import Classroom, classroom_params
+from transport import SocketInterpreter, RemoteError
+from search import SearchIndex
+from compatibility import no_shift
+import tracing
+import json
 from typing import Optional, Any
 
 wa = WebComponents('wa')
@@ -12,14 +30,31 @@ wa = WebComponents('wa')
 button_base = '#B3B3B3'
 button_active = '#000000'
 max_tabs = 5
-ignore_chars = ',-–—()<>'
+compile_slice_ms = 8
+save_delay = 500
+search_delay = 300
+default_song = 'Custom'
+storage_prefix = 'lzw:'
+lzw_stop = 256
 domain = '/stylophone-assistant'
-
-header_text = """
-<strong>Stylophone Assistant</strong> is your go-to platform for enhancing your <strong>Stylophone</strong> practice. This tool allows you to input <strong>tabs</strong> for your favorite melodies and generates a dynamic <strong>animation</strong> compatible with both the <strong>S-1</strong> and <strong>Gen X-1</strong> models. Whether you're a <strong>beginner</strong> or an <strong>experienced player</strong>, the interactive interface helps you <strong>visualize</strong> and follow along with ease. Practice at your own pace, toggle <strong>octaves</strong>, and refine your <strong>skills</strong> while having fun with your <strong>Stylophone</strong>.
-"""
-
-tunning_text = f"""
+broadcast_path = '/broadcast'
+remote_path = '/api/python'
+compile_path = '/api/compile'
+# Songs with more lines are compiled by the server, when there is one
+remote_compile_lines = 200
+startup_timeout = 5000
+web_components = [
+    'wa-tab-group',
+    'wa-tab',
+    'wa-select',
+    'wa-option',
+    'wa-textarea',
+    'wa-switch',
+    'wa-range',
+    'wa-icon-button',
+]
+
+tunning_text = """
     <h1>Guide to Tuning Your Stylophone Device</h1>
     <p>The following guide provides step-by-step instructions on how to properly tune your Stylophone (S1 or Gen X-1). This ensures optimal functionality and access to a balanced tonal range. Follow these steps carefully:</p>
     <hr>
@@ -65,7 +100,7 @@ tunning_text = f"""
     </ul>
 
     <figure>
-        <img src="{domain}/root/assets/stylophone_both_tabs_tunning.svg" alt="Stylophone tuning diagram" style="max-width: 100%; height: auto;">
+        <img src="{diagram}" alt="Stylophone tuning diagram" style="max-width: 100%; height: auto;">
         <figcaption>Diagram showing the recommended tuning frequencies and sub-octave configurations for the Stylophone.</figcaption>
     </figure>
 
@@ -89,230 +124,164 @@ default_tabs = """# Write tabs here
 
 """
 
-# ----------------------------------------------------------------------
-# With the switch in position 2 on the S-1 and no octave modifier on the X-1
-# Assumes that the central octave of S-1 corresponds to the first octave of X-1
-note_equivalence_mode1 = {
-    # tab(S-1): (tab X-1, octave modifier)
-    # Notes from the 3rd octave (Require modifier as they are not present on X-1)
-    "1": ("8", "-1"),
-    "1.5": ("8.5", "-1"),
-    "2": ("9", "-1"),
-    # Notes from the 4th octave
-    "3": ("3", "0"),
-    "3.5": ("3.5", "0"),
-    "4": ("4", "0"),
-    "4.5": ("4.5", "0"),
-    "5": ("5", "0"),
-    "6": ("6", "0"),
-    "6.5": ("6.5", "0"),
-    "7": ("7", "0"),
-    "7.5": ("7.5", "0"),
-    "8": ("8", "0"),
-    "8.5": ("8.5", "0"),
-    "9": ("9", "0"),
-    # Notes from the 5th octave
-    "10": ("10", "0"),
-    "10.5": ("10.5", "0"),
-    "11": ("11", "0"),
-    "11.5": ("11.5", "0"),
-    "12": ("12", "0"),
-    # Notes from the 5th octave not present on S-1
-    "13": ("13", "0"),
-    "13.5": ("13.5", "0"),
-    "14": ("14", "0"),
-    "14.5": ("14.5", "0"),
-    "15": ("15", "0"),
-    "15.5": ("15.5", "0"),
-    "16": ("16", "0"),
-}
 
 # ----------------------------------------------------------------------
-# With the switch in position 2 on the S-1 and no octave modifier on the X-1
-# Assumes that the central octave of S-1 corresponds to the second octave of X-1
-# By default, this implies a modifier of -1
-note_equivalence_mode2 = {
-    # Notes from the 3rd octave
-    "1": ("1", "0"),
-    "1.5": ("1.5", "0"),
-    "2": ("2", "0"),
-    # Notes from the 4th octave
-    "3": ("3", "0"),
-    "3.5": ("3.5", "0"),
-    "4": ("4", "0"),
-    "4.5": ("4.5", "0"),
-    "5": ("5", "0"),
-    "6": ("6", "0"),
-    "6.5": ("6.5", "0"),
-    "7": ("7", "0"),
-    "7.5": ("7.5", "0"),
-    "8": ("8", "0"),
-    "8.5": ("8.5", "0"),
-    "9": ("9", "0"),
-    # Notes from the 5th octave not available in this X-1 configuration
-    "10": ("3", "-2"),
-    "10.5": ("3.5", "-2"),
-    "11": ("4", "-2"),
-    "11.5": ("4.5", "-2"),
-    "12": ("5", "-2"),
-}
+def load_assets() -> dict:
+    """
+    Reads the manifest of the hashed assets inlined in the page.
+
+    Returns
+    -------
+    dict
+        Original paths mapped to the hashed paths, see assets.py. Empty when
+        the page has no manifest, or under CPython.
+    """
+    try:
+        return json.loads(document['sa-assets'].text)
+    except (KeyError, AttributeError, TypeError, ValueError):
+        return {}
 
 
 # ----------------------------------------------------------------------
-def convert_sequence(sequence: str, equivalence: dict, modifier: str) -> str:
+def asset_url(path: str) -> str:
     """
-    Converts a sequence of musical notes into a modified format based on a mapping
-    of equivalences and an octave modifier.
+    Returns the URL of an asset, resolved through the manifest.
 
     Parameters
     ----------
-    sequence : str
-        A string representing a sequence of musical notes separated by spaces.
-    equivalence : dict
-        A dictionary where keys are note strings and values are tuples containing
-        the note's position and its octave (e.g., {'C': ('1', '4')}).
-    modifier : str
-        A string representing the octave modification. For example, '-1' decreases
-        the octave by one.
+    path : str
+        The path of the asset, relative to the application root.
 
     Returns
     -------
     str
-        The converted sequence as a string where each note is replaced based on
-        the equivalence mapping and modified according to the octave.
+        The URL of the hashed copy, or of the original file if the asset is
+        not in the manifest.
     """
-    notes = sequence.split(' ')
-    converted_sequence = []
-
-    for note in notes:
-        if note in equivalence:
-            position, octave = equivalence[note]
+    return f'{domain}/root/{assets.get(path, path)}'
 
-            # Modify octave based on the given modifier
-            if modifier == '-1':
-                octave = str(
-                    int(octave) + int(modifier) - 1
-                )  # PSS: Adjusted calculation logic
 
-            if octave == '0':
-                converted_sequence.append(f"{position}")
-            else:
-                converted_sequence.append(f"({octave}:{position})")
-        else:
-            # Append notes not in equivalence as they are
-            converted_sequence.append(note)
+# ----------------------------------------------------------------------
+def compress_text(text: str) -> str:
+    """
+    Compresses text with LZW into a compact string suitable for local storage.
 
-    return " ".join(converted_sequence)
+    The UTF-8 bytes of the text are encoded with variable-width LZW codes
+    terminated by a stop code, and the bits are packed 15 per character,
+    offset to stay in the printable, surrogate-free range of UTF-16.
 
+    Parameters
+    ----------
+    text : str
+        The text to compress.
 
-# ----------------------------------------------------------------------
-def load_tabs() -> None:
-    """
-    Loads all `.txt` files from the 'tabs' directory, reads their content,
-    and stores them in a dictionary. The dictionary is then saved as a
-    JSON file named `tabs.json` in the same directory.
-
-    Raises
-    ------
-    FileNotFoundError
-        If the 'tabs' directory does not exist.
-
-    Notes
-    -----
-    The resulting JSON file will have filenames as keys and their respective
-    file contents as values.
+    Returns
+    -------
+    str
+        The compressed text, prefixed with `storage_prefix`.
     """
-    import os
-    import json
-
-    # Ensure the 'tabs' directory exists
-    if not os.path.exists('tabs'):
-        raise FileNotFoundError("The 'tabs' directory does not exist.")
+    table = {}
+    next_code = lzw_stop + 1
+    buffer = 0
+    bits = 0
+    packed = []
+    code = None
+    count = 0
+
+    def emit(value):
+        nonlocal buffer, bits, count
+        width = max(9, (lzw_stop + count).bit_length())
+        count += 1
+        buffer = (buffer << width) | value
+        bits += width
+        while bits >= 15:
+            bits -= 15
+            packed.append(chr(((buffer >> bits) & 0x7FFF) + 32))
+        buffer &= (1 << bits) - 1
+
+    for byte in text.encode('utf-8'):
+        if code is None:
+            code = byte
+            continue
+        entry = table.get((code, byte))
+        if entry is not None:
+            code = entry
+            continue
+        emit(code)
+        table[(code, byte)] = next_code
+        next_code += 1
+        code = byte
 
-    # Retrieve and sort all files in the 'tabs' directory
-    files = sorted(os.listdir('tabs'))
+    if code is not None:
+        emit(code)
+    emit(lzw_stop)
 
-    tabs = {}
-    for filename in filter(lambda f: f.endswith('.txt'), files):
-        # Read the content of each `.txt` file and store it in the dictionary
-        with open(os.path.join('tabs', filename), 'r') as file:
-            tabs[filename] = file.read()
+    if bits:
+        packed.append(chr(((buffer << (15 - bits)) & 0x7FFF) + 32))
 
-    # Write the dictionary to `tabs.json` with pretty formatting
-    with open(os.path.join('tabs', 'tabs.json'), 'w') as file:
-        json.dump(tabs, file, indent=2)
+    return storage_prefix + ''.join(packed)
 
 
 # ----------------------------------------------------------------------
-def decompress_multiline_text(text: str) -> str:
+def decompress_text(data: str) -> str:
     """
-    Decompresses text containing patterns in the form '(content)xN' or '(content) xN',
-    including cases where the content spans multiple lines.
+    Decompresses text produced by `compress_text`.
+
+    Values without the `storage_prefix` are returned unchanged, so plain text
+    written by previous versions is still readable.
 
     Parameters
     ----------
-    text : str
-        The input text containing patterns to be decompressed.
+    data : str
+        The compressed text.
 
     Returns
     -------
     str
-        The decompressed text with patterns expanded.
+        The original text.
     """
-    lines = text.split("\n")
-    result = []
-    buffer = []  # Buffer to handle multiline content
-
-    for line in lines:
-        # Detect the start of a multiline pattern
-        if "(" in line and ")" not in line:
-            buffer.append(line.strip())
-            continue
-        elif buffer or ")" in line:
-            buffer.append(line.strip())
-
-            if ")" not in line:
-                continue
-
-            # Combine buffered lines
-            multiline_content = "\n".join(buffer)
-            buffer = []  # Clear buffer
-
-            # Find and expand multiline patterns
-            patterns = re.findall(r'\((.*?)\)\s*x(\d+)', multiline_content, re.DOTALL)
-            for content, repetitions in patterns:
-                content_lines = content.strip().split("\n")
-                for _ in range(int(repetitions)):
-                    if len(content.split('\n')) > 1 and (_ < int(repetitions) - 1):
-                        result.extend(content_lines + [''])
-                    else:
-                        result.extend(content_lines)
-
-            # Remove processed patterns and add any extra text
-            remaining_text = re.sub(
-                r'\(.*?\)\s*x\d+', '', multiline_content, flags=re.DOTALL
-            ).strip()
-            if remaining_text:
-                result.append(remaining_text)
-            continue
+    if not data.startswith(storage_prefix):
+        return data
+
+    table = [bytes([i]) for i in range(256)] + [b'']
+    output = []
+    previous = None
+    buffer = 0
+    bits = 0
+    count = 0
+
+    for char in data[len(storage_prefix) :]:
+        buffer = (buffer << 15) | (ord(char) - 32)
+        bits += 15
+
+        while True:
+            width = max(9, (lzw_stop + count).bit_length())
+            if bits < width:
+                break
+            bits -= width
+            code = (buffer >> bits) & ((1 << width) - 1)
+            buffer &= (1 << bits) - 1
+            count += 1
+
+            if code == lzw_stop:
+                return b''.join(output).decode('utf-8')
+
+            if code < len(table):
+                entry = table[code]
+            else:
+                # The code being defined by this very step (cScSc case)
+                entry = previous + previous[:1]
 
-        # Process single-line patterns '(...)xN'
-        patterns = re.findall(r'\((.*?)\)\s*x(\d+)', line)
-        if patterns:
-            for content, repetitions in patterns:
-                content_lines = content.strip().split("\n")
-                for _ in range(int(repetitions)):
-                    result.extend(content_lines)
-
-            # Remove processed patterns and add any extra text
-            remaining_text = re.sub(r'\(.*?\)\s*x\d+', '', line).strip()
-            if remaining_text:
-                result.append(remaining_text)
-        else:
-            # Add lines without patterns directly
-            result.append(line.strip())
+            if previous is not None:
+                table.append(previous + entry[:1])
+            output.append(entry)
+            previous = entry
+
+    return b''.join(output).decode('utf-8')
 
-    return "\n".join(result)
+
+# Hashed asset manifest, inlined in the page by the server
+assets = load_assets()
 
 
 ########################################################################
@@ -326,263 +295,167 @@ class StylophoneAssistant(RadiantCore):
         super().__init__(*args, **kwargs)
         self.loaded = False
 
-        with html.DIV(Class='container-fluid').context(self.body) as container:
-            with html.DIV(Class='row sa-header').context(container) as header:
-
-                with html.DIV(Class='col-sm-12').context(header) as col:
-                    col <= html.H1('STYLOPHONE ASSISTANT', Class='header-title')
-
-                with html.DIV(Class='col-sm-12 sa-toolbar').context(header) as col:
-                    try:
-                        tab = window.location.href.split('#')[1]
-                    except:
-                        tab = 'assistant'
-                    with html(wa.tab_group(active=tab)).context(col) as toolbar:
-                        toolbar <= wa.tab('Assistant', Class='sa-auto-show', sa_tab_to_show="sa-tab-assistant", slot='nav', panel="assistant")
-                        toolbar <= wa.tab('Tunning', Class='sa-auto-show', sa_tab_to_show="sa-tab-tunning", slot='nav', panel="tunning")
-                        toolbar <= wa.tab(html.A('GitHub', Class='sa-tab-link', href='https://github.com/YeisonCardona/stylophone-assistant'), slot='nav')
-                        select('.sa-auto-show').bind('click', self.auto_show)
-                    self.auto_show(tab=f'sa-tab-{tab}', panel=tab)
-
-        with html.DIV(Class='container sa-tabs sa-tab-tunning', style='display: none;').context(self.body) as container:
-            container <= html.SPAN(tunning_text, Class='sa-paragraph')
-
-        with html.DIV(Class='container sa-tabs sa-tab-assistant').context(self.body) as container:
-
-            with html.DIV(Class='row').context(container) as row:
-
-                with html.DIV(Class='col-md-12').context(row) as col:
-
-                    col <= html.SPAN(header_text, Class='sa-paragraph')
-                    col <= html.HR()
-
-                with html.DIV(Class='col-md-4').context(row) as col:
-                    with html(
-                        wa.select(
-                            label="Stylophone",
-                            value="x1",
-                            style="margin-top: 15px;",
-                        )
-                    ).context(col) as self.select_gen:
-                        self.select_gen <= wa.option("Gen S-1", value='s1')
-                        self.select_gen <= wa.option("Gen X-1", value='x1')
-                        self.select_gen <= wa.option("Both", value='both')
-                        self.select_gen.bind("wa-change", self.load_stylophone)
-
-                with html.DIV(Class='col-md-4').context(row) as col:
-                    with html(
-                        wa.select(
-                            label="Style",
-                            value="tabs",
-                            style="margin-top: 15px;",
-                        )
-                    ).context(col) as self.select_style:
-                        self.select_style <= wa.option("Tabs", value='tabs')
-                        self.select_style <= wa.option("Solfège", value='solfege')
-                        self.select_style <= wa.option("American", value='kids')
-                        self.select_style.bind("wa-change", self.load_stylophone)
-
-            with html.DIV(Class='row').context(container) as row:
-
-                with html.DIV(Class='col-md-4').context(row) as col:
-                    with html(
-                        wa.select(
-                            label="Load tabs",
-                            value="custom",
-                            style="margin-top: 15px;",
-                        )
-                    ).context(col) as self.select_tab:
-                        self.select_tab <= wa.option("Custom", value='custom')
-                        self.select_tab.bind("wa-change", self.load_tab_in_textarea)
-
-            with html.DIV(Class='row').context(container) as row:
-
-                with html.DIV(Class='col-md-12', style='margin-top: 15px;').context(
-                    row
-                ) as col:
-                    with html(
-                        wa.textarea(label="Tabs", resize="auto", spellcheck="false")
-                    ).context(col) as self.textarea_s1:
-                        self.textarea_s1.bind("wa-input", self.save_tabs)
-
-            with html.DIV(Class='row', style='margin-top: 20px;').context(
-                container
-            ) as row:
-
-                with html.DIV(Class='col-md-3', style='margin-top: 15px;').context(
-                    row
-                ) as col:
-                    self.switch_transpose = wa.switch("Transpose Tabs (Chromatic)")
-                    col <= self.switch_transpose
-                    self.switch_transpose.bind("wa-input", self.activate_transpose)
-
-                with html.DIV(Class='col-md-9', style='margin-top: -5px;').context(
-                    row
-                ) as col:
-
-                    self.range_transpose = wa.range(
-                        min="-12",
-                        max="+12",
-                        step=1,
-                        value="0",
-                        style="--track-active-offset: 50%; margin-top: 20px;",
-                    )
-                    col <= self.range_transpose
-                    self.range_transpose.bind("wa-input", self.update_transposed_tabs)
-                    self.range_transpose.tooltipFormatter = (
-                        lambda value: f"{'+' if value > 0 else ''}{value} semitone{'' if value in [1, 1 , 0] else 's'}"
-                    )
-                    self.range_transpose.style.display = 'none'
-
-                with html.DIV(Class='col-md-12', style='margin-top: 15px;').context(
-                    row
-                ) as col:
-
-                    with html(
-                        wa.textarea(
-                            label="Transposed Tabs",
-                            resize="auto",
-                            spellcheck="false",
-                        )
-                    ).context(col) as self.textarea_transpose:
-                        self.textarea_transpose.bind("wa-input", self.save_tabs)
-                        self.textarea_transpose.style.display = 'none'
-
-                    self.switch_transpose_model = wa.switch(
-                        "Transpose for X-1", checked=True, style='margin-top: 10px;'
-                    )
-                    col <= self.switch_transpose_model
-                    self.switch_transpose_model.style.display = 'none'
-                    self.switch_transpose_model.bind(
-                        "wa-input", self.update_transposed_tabs
-                    )
-
-                    col <= html.HR()
-
-            with html.DIV(Class='row').context(container) as row:
-
-                with html.DIV(Class='col-md-12', style='margin-top: 15px;').context(
-                    row
-                ) as col:
-                    self.switch_x1_8va = wa.switch("Gen X-1 -1 Octave")
-                    col <= self.switch_x1_8va
-                    self.switch_x1_8va.bind("wa-input", self.load_stylophone)
-
-                with html.DIV(Class='col-md-12', style='margin-top: 15px;').context(
-                    row
-                ) as col:
-                    self.svg_container = html.DIV()
-                    col <= self.svg_container
-
-            with html.DIV(Class='row tabs-line').context(container) as row:
-
-                with html.DIV(
-                    Class='col-5',
-                    style='text-align: right; margin-top: 10px;',
-                ).context(row) as col:
-
-                    self.span_tabs_pre = html.SPAN(
-                        '...',
-                        Class='--wa-font-sans',
-                        style='flex: none',
-                    )
-                    col <= self.span_tabs_pre
-
-                with html.DIV(
-                    Class='col-2',
-                    style='text-align: center;',
-                ).context(row) as col:
-
-                    self.span_tabs_current = html.SPAN(
-                        '#',
-                        Class='--wa-font-sans',
-                        style=f'flex: none; color: var(--wa-color-primary-600); font-size: 2rem;',
-                    )
-                    col <= self.span_tabs_current
-
-                with html.DIV(
-                    Class='col-5',
-                    style='text-align: left; margin-top: 10px;',
-                ).context(row) as col:
-
-                    self.span_tabs_post = html.SPAN(
-                        '...',
-                        Class='--wa-font-sans',
-                        style='flex: none',
-                    )
-                    col <= self.span_tabs_post
-
-            with html.DIV(Class='row sa-player', style='margin-top: 30px;').context(
-                container
-            ) as row:
-
-                with html.DIV(
-                    Class='col-2 col-sm-2 col-md-1 sa-icon-button', style="display: flex;"
-                ).context(row) as col:
-
-                    with html(
-                        wa.icon_button(name="play", style="font-size: 3rem;")
-                    ).context(col) as self.button_start:
-                        self.button_start.bind("click", self.start_animation)
-
-                    with html(
-                        wa.icon_button(name="stop", style="font-size: 3rem; display: none")
-                    ).context(col) as self.button_stop:
-                        self.button_stop.bind("click", self.stop_animation)
-
-                with html.DIV(Class='col-4 col-sm-7 col-md-9 sa-range-tabs').context(
-                    row
-                ) as col:
-
-                    with html(
-                        wa.range(
-                            min="0",
-                            max="100",
-                            step=1,
-                            value="0",
-                        )
-                    ).context(col) as self.range_progress:
-                        self.range_progress.tooltipFormatter = (
-                            lambda value: f"Tab {value + 1}"
-                        )
-                        self.range_progress.bind("wa-input", self.range_progress_change)
-
-                with html.DIV(Class='col-6 col-sm-3 col-md-2 sa-gap', style="margin-top: 4px;").context(
-                    row
-                ) as col:
-                    with html(wa.select(pill=True, value="500")).context(
-                        col
-                    ) as self.select_delay:
-                        for i in range(100, 3001, 100):
-                            self.select_delay <= wa.option(
-                                f"Gap: {i / 1000 :.1f} s", value=f"{i}"
-                            )
-                        self.select_delay.bind("wa-change", self.load_stylophone)
-
-
-        with html.DIV(Class='container-fluid sa-footer').context(self.body) as container:
-            container <= html.SPAN("""
-            Made with <wa-icon name="heart"></wa-icon> by <a href='https://dunderlab.com/'>DunderLab</a><br>
-            This site has been built using <a href='https://radiant-framework.readthedocs.io/en/latest/'>Radiant Framework</a> technology<br>
-            ©2024. Some rights reserved under the Creative Commons Attribution-ShareAlike 4.0 International License (CC BY-SA 4.0)
-            """)
-
-
-        timer.set_timeout(self.initialize, 500)
+        # Builders of the panels materialized on first activation
+        self.lazy_panels = {}
+
+        # Compiled S-1 and X-1 programs and their precomputed previews
+        self.s1_tabs = ['']
+        self.x1_tabs = ['']
+        self.s1_preview = None
+        self.x1_preview = None
+        self.compile_id = 0
+        self.compile_transposed = None
+        self.compiling = False
+
+        # Pending debounced save of the custom song
+        self.save_timer = None
+        self.save_song = None
+        self.debug = False
+
+        # Batched DOM writes, committed once per animation frame
+        self.renderer = FrameRenderer()
+
+        # Playback scheduling telemetry
+        self.telemetry = PlaybackTelemetry()
+        self.scheduled_s1 = None
+        self.scheduled_x1 = None
+
+        # Classroom sync, see classroom.py
+        self.classroom = None
+
+        # Connection to the server calls, opened on first use
+        self.remote = None
+        # Whether `POST /api/compile` may answer, see `compile_http`
+        self.http_compile = True
+
+        # Melody search, the index is fetched on the first query
+        self.search_index = None
+        self.search_timer = None
+        self.trace_load_search = None
+        self.library_values = {}
+
+        # Compatibility of the library songs, their tabs are fetched on the
+        # first selection
+        self.catalog = {}
+        self.library = None
+        self.trace_load_library = None
+
+        # The hash is user input, only the names of the panels are kept
+        tab = window.location.href.partition('#')[2]
+        if tab not in panels:
+            tab = panels[0]
+
+        # The shell is prerendered by the server, see shell.py
+        self.prerendered = document.getElementById('sa-header') is not None
+        if not self.prerendered:
+            document.body.insertAdjacentHTML(
+                'afterbegin',
+                build_shell(
+                    default_song,
+                    window.sa_icons if hasattr(window, 'sa_icons') else None,
+                    tab=tab,
+                ),
+            )
+        self.hydrate(tab)
 
-        try:
-            tab = window.location.href.split('#', 1)[1] or 'assistant'
-        except IndexError:
-            tab = 'assistant'
+        self.start()
         self.auto_show(tab=f'sa-tab-{tab}', panel=tab)
 
+    # ----------------------------------------------------------------------
+    def hydrate(self, tab: str) -> None:
+        """
+        Binds the controls of the page shell and their handlers.
+
+        The elements are looked up by their `id` in the prerendered markup
+        built by `build_shell`, so nothing is created again.
+
+        Parameters
+        ----------
+        tab : str
+            The active tab, from the URL hash.
+
+        Returns
+        -------
+        None
+        """
+        document['sa-toolbar'].attrs['active'] = tab
+        select('.sa-auto-show').bind('click', self.auto_show)
+
+        self.panel_tunning = document['sa-panel-tunning']
+        self.lazy_panels['tunning'] = self.build_tunning_panel
+
+        self.select_gen = document['sa-select-gen']
+        self.select_gen.bind("wa-change", self.load_stylophone)
+
+        self.select_style = document['sa-select-style']
+        self.select_style.bind("wa-change", self.load_stylophone)
+
+        self.select_tab = document['sa-select-tab']
+        self.select_tab.bind("wa-change", self.load_tab_in_textarea)
+
+        self.button_new_song = document['sa-button-new-song']
+        self.button_new_song.bind("click", self.new_song)
+
+        self.button_delete_song = document['sa-button-delete-song']
+        self.button_delete_song.bind("click", self.delete_song)
+
+        self.textarea_search = document['sa-textarea-search']
+        self.textarea_search.bind("wa-input", self.search_melody)
+
+        self.select_match = document['sa-select-match']
+        self.select_match.bind("wa-change", self.load_match)
+
+        self.select_fit = document['sa-select-fit']
+        self.select_fit.bind("wa-change", self.filter_library)
+
+        self.textarea_s1 = document['sa-textarea-tabs']
+        self.textarea_s1.bind("wa-input", self.save_tabs)
+
+        self.switch_transpose = document['sa-switch-transpose']
+        self.switch_transpose.bind("wa-input", self.activate_transpose)
+
+        self.range_transpose = document['sa-range-transpose']
+        self.range_transpose.bind("wa-input", self.save_tabs)
+        self.range_transpose.tooltipFormatter = (
+            lambda value: f"{'+' if value > 0 else ''}{value} semitone{'' if value in [1, 1 , 0] else 's'}"
+        )
+
+        self.textarea_transpose = document['sa-textarea-transpose']
+        self.textarea_transpose.bind("wa-input", self.save_tabs)
+
+        self.switch_transpose_model = document['sa-switch-transpose-model']
+        self.switch_transpose_model.bind("wa-input", self.save_tabs)
+
+        self.switch_x1_8va = document['sa-switch-x1-8va']
+        self.switch_x1_8va.bind("wa-input", self.load_stylophone)
+
+        self.svg_container = document['sa-stylophone']
+
+        self.span_tabs_pre = document['sa-tabs-pre']
+        self.span_tabs_current = document['sa-tabs-current']
+        self.span_tabs_post = document['sa-tabs-post']
+
+        self.button_start = document['sa-button-start']
+        self.button_start.bind("click", self.start_animation)
+
+        self.button_stop = document['sa-button-stop']
+        self.button_stop.bind("click", self.stop_animation)
+
+        self.range_progress = document['sa-range-progress']
+        self.range_progress.tooltipFormatter = lambda value: f"Tab {value + 1}"
+        self.range_progress.bind("wa-input", self.range_progress_change)
+
+        self.select_delay = document['sa-select-delay']
+        self.select_delay.bind("wa-change", self.load_stylophone)
+
 
     # ----------------------------------------------------------------------
     def auto_show(self, event: Optional[Any] = None, tab: Optional[str] = None, panel: Optional[str] = None) -> None:
         """
         Handles tab and panel display in a web-based interface. Adjusts the URL hash
         and updates the visibility of elements based on the provided or inferred
-        event.
+        event. Panels registered in `lazy_panels` are built on their first
+        activation.
 
         Parameters
         ----------
@@ -606,6 +479,10 @@ class StylophoneAssistant(RadiantCore):
             tab = event.target.attrs['sa-tab-to-show']
             panel = event.target.attrs['panel']
 
+        # Build the panel on its first activation.
+        if builder := self.lazy_panels.pop(panel, None):
+            builder()
+
         # Hide all tabs and display the selected one.
         select('.sa-tabs').styles.display = 'none'
         select(f'.{tab}').styles.display = 'block'
@@ -617,13 +494,93 @@ class StylophoneAssistant(RadiantCore):
 
 
     # ----------------------------------------------------------------------
+    def build_tunning_panel(self) -> None:
+        """
+        Builds the content of the tunning panel.
+
+        The panel is built on its first activation, so its diagram is only
+        fetched when the panel is shown.
+
+        Returns
+        -------
+        None
+        """
+        self.panel_tunning <= html.SPAN(
+            tunning_text.format(
+                diagram=asset_url('assets/stylophone_both_tabs_tunning.svg')
+            ),
+            Class='sa-paragraph',
+        )
+
+    # ----------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        Issues the independent startup requests and waits for readiness.
+
+        The stylophone SVG and the tabs catalog are requested right away, and
+        the stored custom songs are read, in parallel with the definition of
+        the web components. `initialize` runs as soon as the components are
+        defined and the SVG is loaded, or after `startup_timeout` milliseconds
+        if any of them never arrives. The SVG is not requested when it is
+        already inline in the prerendered shell.
+
+        Returns
+        -------
+        None
+        """
+        self.startup_pending = {'components'}
+        self.startup_stylophone = None
+
+        # Independent startup requests
+        if not self.prerendered:
+            self.startup_pending.add('stylophone')
+            self.load_stylophone(generation='x1', style='tabs', x1_octave_modifier='')
+        self.load_tabs()
+        self.load_songs()
+        self.startup_tabs = self.read_song(default_song)
+
+        # Custom elements are upgraded once their definitions are loaded
+        window.Promise.all(
+            [window.customElements.whenDefined(tag) for tag in web_components]
+        ).then(lambda result: self.ready('components'))
+
+        self.startup_timer = timer.set_timeout(
+            lambda: self.ready(*self.startup_pending), startup_timeout
+        )
+
+    # ----------------------------------------------------------------------
+    def ready(self, *signals: str) -> None:
+        """
+        Marks startup signals as ready and initializes the application once
+        all of them are.
+
+        Parameters
+        ----------
+        *signals : str
+            The ready signals, 'components' and/or 'stylophone'.
+
+        Returns
+        -------
+        None
+        """
+        if self.loaded:
+            return
+
+        self.startup_pending.difference_update(signals)
+        if not self.startup_pending:
+            timer.clear_timeout(self.startup_timer)
+            self.initialize()
+
+    # ----------------------------------------------------------------------
+    @trace()
     def initialize(self) -> None:
         """
         Initializes the application by setting up the initial state and loading necessary resources.
 
         This method sets up the internal state variables, populates the textarea
-        with stored or default tabs, updates the tabs preview, and loads the
-        stylophone and tabs for the application.
+        with stored or default tabs, and injects the stylophone SVG loaded at
+        startup, or sets up the prerendered one, which compiles the tabs and
+        updates the preview.
 
         Returns
         -------
@@ -636,18 +593,31 @@ class StylophoneAssistant(RadiantCore):
         self.counter_s1 = 0
         self.counter_x1 = 0
 
-        # Load stored tabs into the textarea or use default tabs
-        self.textarea_s1.value = storage.get('tabs', default_tabs)
-
-        # Update the tabs preview
-        self.update_tabs_preview()
+        # Opt-in debug dumps, enabled with `localStorage.debug = 'true'`
+        self.debug = storage.get('debug', 'false') == 'true'
 
-        # Load the stylophone SVG and tabs
-        self.load_stylophone(generation='x1', style='tabs', x1_octave_modifier='')
-        self.load_tabs()
+        # Load the stored default song into the textarea
+        self.textarea_s1.value = self.startup_tabs
+        window.addEventListener('pagehide', self.flush_tabs)
 
         self.select_gen.attrs['value'] = 'x1'
 
+        # Join the room of `?teach=` or `?room=`
+        room, teacher = classroom_params()
+        if room:
+            self.classroom = Classroom(self, room, teacher, f'{domain}{broadcast_path}')
+
+        # Inject the stylophone SVG, then compile the tabs
+        if self.startup_stylophone is not None:
+            self.on_complete_load_stylophone(self.startup_stylophone)
+        elif self.prerendered:
+            self.setup_stylophone()
+        else:
+            self.compile_tabs()
+
+        # Time to interactive, from the start of the navigation
+        if tracing.enabled:
+            tracing.record('time-to-interactive', 0, tracing.now(), 'startup')
 
     # ----------------------------------------------------------------------
     @property
@@ -666,464 +636,1351 @@ class StylophoneAssistant(RadiantCore):
             A normalized string of tabs, free of comments, unwanted characters,
             and extra spaces.
         """
-        # Get tabs from the textarea and decompress multiline patterns
-        tabs = self.textarea_s1.value
-        tabs = decompress_multiline_text(tabs)
+        lines = iter_normalized_lines(self.textarea_s1.value.split('\n'))
+
+        # Return the cleaned-up and normalized tabs
+        return '\n'.join(lines).strip('\n')
+
+    # ----------------------------------------------------------------------
+    @property
+    def equivalence_table(self) -> dict:
+        """
+        Returns the appropriate note equivalence table based on the state
+        of the `switch_x1_8va`.
+
+        If the `switch_x1_8va` is checked, it uses `note_equivalence_mode2`.
+        Otherwise, it defaults to `note_equivalence_mode1`.
+
+        Returns
+        -------
+        dict
+            The selected note equivalence table (`note_equivalence_mode1` or
+            `note_equivalence_mode2`).
+        """
+        if self.switch_x1_8va.checked:
+            return note_equivalence_mode2
+        else:
+            return note_equivalence_mode1
+
+    # ----------------------------------------------------------------------
+    @trace()
+    def save_tabs(self, event=None):
+        """
+        Saves the current tabs and updates the UI elements accordingly.
+
+        If a custom song is selected in the `select_tab` widget, it schedules a
+        debounced save of the `textarea_s1` widget into the `storage`.
+        Resets counters for S-1 and X-1 tabs and starts compiling the tabs,
+        which updates the preview and the range of the progress bar as the
+        program grows.
+
+        Parameters
+        ----------
+        event : optional
+            The triggering event, if applicable. Defaults to None.
+
+        Returns
+        -------
+        None
+        """
+        if song := self.current_song:
+            self.schedule_save(song)
+
+        # Reset counters
+        self.counter_s1 = 0
+        self.counter_x1 = 0
+
+        # Compile the tabs in time slices
+        self.compile_tabs()
+
+    # ----------------------------------------------------------------------
+    def compile_tabs(self) -> None:
+        """
+        Starts compiling the current tabs into the S-1 and X-1 programs.
+
+        Long songs are compiled by the server, see `compile_remote`, or by
+        `POST /api/compile` when the WebSocket is not available, see
+        `compile_http`. The rest, and every song when there is no server,
+        are compiled in the browser, see `compile_local`. Any compilation in
+        progress is superseded.
+
+        Returns
+        -------
+        None
+        """
+        self.compile_id += 1
+        self.s1_tabs = []
+        self.x1_tabs = []
+        self.s1_preview = None
+        self.x1_preview = None
+        self.compiling = True
+
+        long_song = self.textarea_s1.value.count('\n') >= remote_compile_lines
+        if long_song and not self.remote_interpreter().closed:
+            self.compile_remote(self.compile_id)
+        elif long_song and self.http_compile:
+            self.compile_http(self.compile_id)
+        else:
+            self.compile_local(self.compile_id)
+
+    # ----------------------------------------------------------------------
+    def compile_local(self, compile_id: int) -> None:
+        """
+        Compiles the current tabs in the browser.
+
+        Compilation is cooperative: the input is processed in slices of at most
+        `compile_slice_ms` milliseconds, yielding to the event loop between
+        slices so the UI can repaint. The first slice runs immediately, so the
+        head of the program is playable while the tail is still being
+        processed.
+
+        Parameters
+        ----------
+        compile_id : int
+            The compilation to run.
+
+        Returns
+        -------
+        None
+        """
+        lines = self.textarea_s1.value.split('\n')
+        normalized = iter_normalized_lines(self.track_compile_progress(lines))
+        if self.switch_transpose.checked:
+            # Transposed in the same slices, shown once the compilation ends
+            self.compile_transposed = []
+            normalized = self.collect_transposed(
+                iter_transposed_lines(
+                    normalized,
+                    int(self.range_transpose.value),
+                    self.switch_transpose_model.checked,
+                )
+            )
+        else:
+            self.compile_transposed = None
+
+        self.compile_total = len(lines)
+        self.compile_position = 0
+        self.compile_tokens = iter_tabs_tokens(normalized)
+        self.compile_equivalence = self.equivalence_table
+        self.compile_modifier = '-1' if self.switch_x1_8va.checked else '0'
+
+        self.compile_slice(compile_id)
+
+    # ----------------------------------------------------------------------
+    def compile_remote(self, compile_id: int) -> None:
+        """
+        Sends the current tabs to the `compile` call of the server.
+
+        Parameters
+        ----------
+        compile_id : int
+            The compilation to run.
+
+        Returns
+        -------
+        None
+        """
+        self.range_progress.hint = 'Compiling tabs...'
+        self.remote_interpreter().compile(
+            self.textarea_s1.value, **self.compile_options()
+        )(lambda result: self.on_complete_compile_remote(compile_id, result))
+
+    # ----------------------------------------------------------------------
+    def compile_options(self) -> dict:
+        """
+        Returns the options of `compile_song` set in the panel.
+
+        Returns
+        -------
+        dict
+            The `x1_octave`, `transpose` and `x1_model` options.
+        """
+        if self.switch_transpose.checked:
+            transpose = int(self.range_transpose.value)
+        else:
+            transpose = None
+
+        return {
+            'x1_octave': self.switch_x1_8va.checked,
+            'transpose': transpose,
+            'x1_model': self.switch_transpose_model.checked,
+        }
+
+    # ----------------------------------------------------------------------
+    def on_complete_compile_remote(self, compile_id: int, result) -> None:
+        """
+        Takes the programs compiled by the server, or compiles the tabs in
+        the browser when the call failed.
+
+        Parameters
+        ----------
+        compile_id : int
+            The compilation the result belongs to. Results of superseded
+            compilations are discarded.
+        result : dict or RemoteError
+            The result of `compile_song`.
+
+        Returns
+        -------
+        None
+        """
+        if compile_id != self.compile_id:
+            return
 
-        # Remove comments from each line
-        tabs_decomented = []
-        for line in tabs.split('\n'):
-            if '#' in line:
-                tabs_decomented.append(line[: line.find('#')])  # Exclude comments
+        if isinstance(result, RemoteError):
+            window.console.warn(f'The server failed to compile the tabs: {result}')
+            if self.http_compile:
+                self.compile_http(compile_id)
             else:
-                tabs_decomented.append(line)
+                self.compile_local(compile_id)
+            return
+
+        self.apply_compiled(result)
+
+    # ----------------------------------------------------------------------
+    def compile_http(self, compile_id: int) -> None:
+        """
+        Sends the current tabs to `POST /api/compile`, see api.py.
+
+        Parameters
+        ----------
+        compile_id : int
+            The compilation to run.
+
+        Returns
+        -------
+        None
+        """
+        self.range_progress.hint = 'Compiling tabs...'
+        options = self.compile_options()
 
-        # Join lines with a consistent newline format
-        tabs = ' \n '.join(tabs_decomented)
+        req = ajax.ajax()
+        req.bind('complete', lambda req: self.on_complete_compile_http(compile_id, req))
+        req.open('POST', f'{domain}{compile_path}', True)
+        req.set_header('content-type', 'application/x-www-form-urlencoded')
+        req.send(
+            {
+                'tabs': self.textarea_s1.value,
+                'x1_octave': '1' if options['x1_octave'] else '0',
+                'transpose': '' if options['transpose'] is None else str(options['transpose']),
+                'x1_model': '1' if options['x1_model'] else '0',
+            }
+        )
 
-        # Remove unwanted characters defined in `ignore_chars`
-        for char in ignore_chars:
-            tabs = tabs.replace(char, ' ')
+    # ----------------------------------------------------------------------
+    def on_complete_compile_http(self, compile_id: int, req) -> None:
+        """
+        Takes the programs compiled by `POST /api/compile`, or compiles the
+        tabs in the browser when the request failed.
 
-        # Clean up extra spaces in each line
-        tabs_clear = []
-        for line in tabs.split('\n'):
-            tabs_clear.append(' '.join(line.split()))  # Normalize spaces
+        A failed request, as in the static export where there is no server,
+        disables `compile_http` for the rest of the session.
 
-        # Return the cleaned-up and normalized tabs
-        return '\n'.join(tabs_clear).strip('\n')
+        Parameters
+        ----------
+        compile_id : int
+            The compilation the response belongs to. Responses of superseded
+            compilations are discarded.
+        req : object
+            The AJAX response object.
+
+        Returns
+        -------
+        None
+        """
+        if compile_id != self.compile_id:
+            return
+
+        if req.status != 200:
+            window.console.warn(
+                f'Compiling in the browser, POST {compile_path} answered {req.status}'
+            )
+            self.http_compile = False
+            self.compile_local(compile_id)
+            return
+
+        self.apply_compiled(json.loads(req.text))
+
+    # ----------------------------------------------------------------------
+    def apply_compiled(self, result: dict) -> None:
+        """
+        Takes the programs compiled by the server.
+
+        Parameters
+        ----------
+        result : dict
+            The result of `compile_song`.
+
+        Returns
+        -------
+        None
+        """
+        if result['transposed'] is not None:
+            self.textarea_transpose.value = result['transposed']
+        self.s1_tabs = result['s1']
+        self.x1_tabs = result['x1']
+        self.finish_compile()
+
+    # ----------------------------------------------------------------------
+    def remote_interpreter(self) -> SocketInterpreter:
+        """
+        Returns the connection to the server calls, see api.py.
+
+        The connection is opened on the first call. Without a server, as in
+        the static export, it is closed and its calls fail at once.
+
+        Returns
+        -------
+        SocketInterpreter
+            The connection.
+        """
+        if self.remote is None:
+            self.remote = SocketInterpreter(f'{domain}{remote_path}')
+        return self.remote
+
+    # ----------------------------------------------------------------------
+    def track_compile_progress(self, lines: list):
+        """
+        Yields the raw lines of tabs while recording the compilation position.
+
+        Parameters
+        ----------
+        lines : list
+            The raw lines of tabs being compiled.
+
+        Yields
+        ------
+        str
+            The raw lines, unchanged.
+        """
+        for i, line in enumerate(lines):
+            self.compile_position = i
+            yield line
+
+    # ----------------------------------------------------------------------
+    def collect_transposed(self, lines):
+        """
+        Yields the transposed lines of tabs while collecting them for
+        `textarea_transpose`.
+
+        Parameters
+        ----------
+        lines : iterable of str
+            The transposed lines being compiled.
+
+        Yields
+        ------
+        str
+            The transposed lines, unchanged.
+        """
+        for line in lines:
+            self.compile_transposed.append(line)
+            yield line
+
+    # ----------------------------------------------------------------------
+    @trace()
+    def compile_slice(self, compile_id: int) -> None:
+        """
+        Compiles tab tokens until the time budget of the slice is exhausted.
+
+        Appends the compiled tokens to `s1_tabs` and `x1_tabs`, reports the
+        progress on `range_progress` and schedules the next slice, or finishes
+        the compilation when the input is exhausted.
+
+        Parameters
+        ----------
+        compile_id : int
+            The compilation this slice belongs to. Slices of superseded
+            compilations are discarded.
+
+        Returns
+        -------
+        None
+        """
+        if compile_id != self.compile_id:
+            return
+
+        deadline = window.performance.now() + compile_slice_ms
+        done = True
+        for tab in self.compile_tokens:
+            self.s1_tabs.append(tab)
+            self.x1_tabs.append(
+                convert_note(tab, self.compile_equivalence, self.compile_modifier)
+            )
+            if window.performance.now() >= deadline:
+                done = False
+                break
+
+        if done:
+            if self.compile_transposed is not None:
+                self.textarea_transpose.value = '\n'.join(self.compile_transposed).strip('\n')
+            self.finish_compile()
+        else:
+            self.update_progress_range()
+            progress = 100 * self.compile_position // max(1, self.compile_total)
+            self.range_progress.hint = f'Compiling tabs... {progress}%'
+            self.update_tabs_preview()
+            timer.set_timeout(lambda: self.compile_slice(compile_id), 0)
+
+    # ----------------------------------------------------------------------
+    def update_progress_range(self) -> None:
+        """
+        Adjusts the range of the progress bar to the compiled program.
+
+        Returns
+        -------
+        None
+        """
+        self.range_progress.min = 0
+        max_ = len(self.s1_tabs) - 1
+        if max_ > 0:
+            self.range_progress.max = max_
+        else:
+            self.range_progress.max = 100
+
+    # ----------------------------------------------------------------------
+    def finish_compile(self) -> None:
+        """
+        Completes a compilation once `s1_tabs` and `x1_tabs` hold the whole
+        program.
+
+        Returns
+        -------
+        None
+        """
+        self.update_progress_range()
+        self.compiling = False
+        self.s1_preview = build_preview(self.s1_tabs)
+        self.x1_preview = build_preview(self.x1_tabs)
+        self.range_progress.hint = ''
+        self.update_tabs_preview()
+        self.on_complete_compile_tabs()
+
+    # ----------------------------------------------------------------------
+    def on_complete_compile_tabs(self) -> None:
+        """
+        Handles the completion of the tabs compilation.
+
+        Publishes the song to the classroom when teaching, and dumps the input
+        and the compiled programs to the console when debug mode is enabled.
+
+        Returns
+        -------
+        None
+        """
+        if self.classroom and self.classroom.teacher:
+            self.classroom.publish_song()
+
+        if not self.debug:
+            return
+
+        # Debug information
+        print("Input tabs:", self.textarea_s1.value)
+        print("Normalized tabs:", self.normalized_tabs)
+        print('S-1 tabs:', ' '.join(self.s1_tabs))
+        print('X-1 tabs:', ' '.join(self.x1_tabs))
+
+    # ----------------------------------------------------------------------
+    def range_progress_change(self, event) -> None:
+        """
+        Handles the change event for the progress range slider.
+
+        Updates the `counter_s1` and `counter_x1` attributes based on the current
+        value of the slider, and refreshes the tabs preview accordingly.
+
+        Parameters
+        ----------
+        event : object
+            The event object containing the `target.value` attribute, which represents
+            the new slider position.
+
+        Returns
+        -------
+        None
+        """
+        # Update counters for S-1 and X-1 based on the slider's value
+        self.counter_s1 = event.target.value
+        self.counter_x1 = event.target.value
+
+        # The slider was moved outside of the renderer
+        self.renderer.forget('range_progress')
+
+        # Refresh the tabs preview
+        self.update_tabs_preview()
+
+    # ----------------------------------------------------------------------
+    @trace()
+    def update_tabs_preview(self) -> None:
+        """
+        Updates the preview of tabs based on the current state of switches,
+        counters, and user selections.
+
+        This method renders the preview content from the compiled S-1 and X-1
+        programs for the selected generator. It adjusts the pre-, current-, and
+        post-tab spans accordingly, through the frame renderer and from the
+        precomputed previews once the compilation is done.
+
+        Returns
+        -------
+        None
+        """
+        # Update tab spans based on the selected model
+        if self.select_gen.value == 's1':
+            tabs, preview, counter = self.s1_tabs, self.s1_preview, self.counter_s1
+        elif self.select_gen.value in ['both', 'x1']:
+            tabs, preview, counter = self.x1_tabs, self.x1_preview, self.counter_x1
+        else:
+            return
+
+        tab = tabs[counter] if counter < len(tabs) else ''
+        start = max(0, counter - max_tabs)
+        end = min(len(tabs), counter + max_tabs)
+
+        if preview:
+            # Slice the precomputed preview of the compiled program
+            pre = preview_window(preview, start, counter)
+            post = preview_window(preview, counter + 1, end)
+        else:
+            # The program is still being compiled
+            pre = ' - '.join(tabs[start:counter])
+            post = ' - '.join(tabs[counter + 1 : end])
+
+        self.renderer.text('span_tabs_pre', self.span_tabs_pre, pre)
+        self.renderer.text('span_tabs_current', self.span_tabs_current, f" {tab.strip('()')} ")
+        self.renderer.text('span_tabs_post', self.span_tabs_post, post)
+
+    # ----------------------------------------------------------------------
+    def start_animation(self, event) -> None:
+        """
+        Starts the animation based on the selected generator (S-1, X-1, or both).
+
+        This method initializes the animation by enabling/disabling buttons,
+        setting counters, updating the tab preview, and calling the appropriate
+        animation methods for the selected generator.
+
+        Parameters
+        ----------
+        event : object
+            The triggering event object, typically passed when the button is clicked.
+
+        Returns
+        -------
+        None
+        """
+        # Initialize the animation state
+        self.stop = False
+
+        # Disable the start button and enable the stop button
+        self.button_start.style.display = 'none'
+        self.button_stop.style.display = 'block'
+
+        # Set counters based on the current slider position
+        self.counter_s1 = self.range_progress.value
+        self.counter_x1 = self.range_progress.value
+
+        # Update the tab preview
+        self.update_tabs_preview()
+
+        # Start a new telemetry session, the first notes are due now
+        self.telemetry.start(float(self.select_delay.value))
+        self.scheduled_s1 = self.telemetry.schedule(0)
+        self.scheduled_x1 = self.scheduled_s1
+
+        # Start the animation based on the selected model
+        match self.select_gen.value:
+            case 's1':
+                self.animate_s1()
+            case 'x1':
+                self.animate_x1()
+            case 'both':
+                self.animate_s1()
+                self.animate_x1()
+
+    # ----------------------------------------------------------------------
+    def stop_animation(self, event) -> None:
+        """
+        Stops the currently running animation.
+
+        This method sets the `stop` attribute to `True` to signal the
+        termination of the animation. It disables the stop button and
+        re-enables the start button to allow restarting the animation.
+
+        Parameters
+        ----------
+        event : object
+            The triggering event object, typically passed when the button is clicked.
+
+        Returns
+        -------
+        None
+        """
+        # Set the stop flag to True
+        self.stop = True
+
+        # Disable the stop button and enable the start button
+        self.button_stop.style.display = 'none'
+        self.button_start.style.display = 'block'
+
+    # ----------------------------------------------------------------------
+    @trace()
+    def load_stylophone(
+        self, event=None, generation=None, style=None, x1_octave_modifier=None
+    ) -> None:
+        """
+        Loads the appropriate Stylophone SVG based on the selected generation, style,
+        and octave modifier.
+
+        This method constructs the URL for the Stylophone asset and sends an AJAX
+        GET request to fetch it. If the `event` parameter is provided, the method
+        will determine the generation, style, and octave modifier from the respective
+        UI elements.
+
+        Parameters
+        ----------
+        event : optional
+            The triggering event object, if applicable. Defaults to None.
+        generation : str, optional
+            The generation to load ('s1', 'x1', or 'both'). Defaults to the value
+            of `select_gen` if `event` is provided.
+        style : str, optional
+            The style of the Stylophone. Defaults to the value of `select_style`
+            if `event` is provided.
+        x1_octave_modifier : str, optional
+            The octave modifier for X-1. Defaults to '-1' if the switch is checked,
+            or an empty string otherwise.
+
+        Returns
+        -------
+        None
+        """
+        # Ignore changes of the controls before the application is initialized
+        if event and not self.loaded:
+            return
+
+        # Retrieve parameters from UI elements if an event is provided
+        if event:
+            generation = self.select_gen.value
+            style = self.select_style.value
+            x1_octave_modifier = '-1' if self.switch_x1_8va.checked else ''
+
+        # Override X-1 octave modifier if the generation is 's1'
+        if generation == 's1':
+            x1_octave_modifier = ''
+
+        # Construct and send the AJAX request
+        self.trace_load_stylophone = tracing.begin('GET stylophone')
+        req = ajax.ajax()
+        req.bind('complete', self.on_complete_load_stylophone)
+        req.open(
+            'GET',
+            asset_url(f'assets/stylophone_{generation}_{style}{x1_octave_modifier}.svg'),
+            True,
+        )
+        req.send()
+
+    # ----------------------------------------------------------------------
+    @trace()
+    def on_complete_load_stylophone(self, req) -> None:
+        """
+        Handles the completion of the AJAX request to load the Stylophone SVG.
+
+        This method processes the SVG response, updates the UI elements, adjusts
+        the SVG's attributes for proper scaling, and highlights specific buttons
+        if they exist. If the X-1 octave switch is active, additional adjustments
+        are applied. When the request fails the error is shown in place of the
+        SVG and the tabs are compiled anyway.
+
+        Parameters
+        ----------
+        req : object
+            The AJAX response object containing the HTTP status and response text.
+
+        Returns
+        -------
+        None
+        """
+        tracing.end(self.trace_load_stylophone)
+
+        if not self.loaded:
+            # Injected by `initialize` once the web components are ready
+            self.startup_stylophone = req
+            self.ready('stylophone')
+            return
+
+        if req.status == 200:
+            # Inject the SVG into the container, scaled to its width
+            self.svg_container.innerHTML = responsive_svg(req.responseText)
+            self.setup_stylophone()
+        else:
+            # The tabs are still compiled, the animation just has no keys
+            window.console.warn(f'The stylophone failed to load: HTTP {req.status}')
+            self.svg_container.text = f'The stylophone failed to load (HTTP {req.status})'
+            self.save_tabs()
+
+    # ----------------------------------------------------------------------
+    def setup_stylophone(self) -> None:
+        """
+        Sets up the stylophone SVG present in the container.
+
+        Highlights the octave modifier buttons, if they exist, and compiles
+        the tabs for the new stylophone.
+
+        Returns
+        -------
+        None
+        """
+        # The keys of the previous SVG are gone
+        self.renderer.forget('fill:')
+
+        # Highlight specific buttons if they exist
+        self.renderer.fill("tab_sm2", button_active)
+        self.renderer.fill("tab_xm1", button_active)
+
+        # Save tabs after successful SVG load
+        self.save_tabs()
+
+    # ----------------------------------------------------------------------
+    def load_tabs(self) -> None:
+        """
+        Initiates an AJAX request to load the catalog of the available tabs.
+
+        This method sends a GET request to fetch the `catalog.json` file from
+        the server, the names and the compatibility of the songs, without their
+        tabs. Upon completion, it triggers the `on_complete_load_tabs` method to
+        process the response.
+
+        Returns
+        -------
+        None
+        """
+        self.trace_load_tabs = tracing.begin('GET catalog.json')
+        req = ajax.ajax()
+        req.bind('complete', self.on_complete_load_tabs)
+        req.open('GET', asset_url('tabs/catalog.json'), True)
+        req.send()
+
+    # ----------------------------------------------------------------------
+    @trace()
+    def on_complete_load_tabs(self, req) -> None:
+        """
+        Processes the server's response to populate the tabs selection dropdown.
+
+        This method parses the JSON response containing the catalog, creates
+        `<option>` elements for each song, and appends them to the `select_tab`
+        element. The compatibility of every song is kept for `filter_library`.
+
+        Parameters
+        ----------
+        req : object
+            The AJAX response object containing the HTTP status and JSON data.
+
+        Returns
+        -------
+        None
+        """
+        tracing.end(self.trace_load_tabs)
+
+        if req.status == 200:
+            # Parse JSON response
+            catalog = req.json
+            fields = catalog['fields']
+
+            # Create and populate dropdown options
+            for i, tab in enumerate(catalog['songs']):
+                option = wa.option(
+                    tab.replace('.txt', ''),  # Remove the file extension for display
+                    value=f'tab-{i}',  # Unique value for each option
+                    id=f'id-tab-{i}',  # Unique ID for each option
+                )
+                option.attrs['file'] = tab  # Key of the tabs in `tabs.json`
+                self.select_tab <= option  # Append option to the dropdown
+                self.library_values[tab.replace('.txt', '')] = f'tab-{i}'
+                self.catalog[f'tab-{i}'] = dict(zip(fields, catalog['songs'][tab]))
+
+            self.filter_library()
+
+    # ----------------------------------------------------------------------
+    def filter_library(self, event=None) -> None:
+        """
+        Shows only the library songs that fit the device selected in
+        `select_fit`, as they are or transposed.
+
+        Parameters
+        ----------
+        event : object, optional
+            The triggering event object. Defaults to None.
+
+        Returns
+        -------
+        None
+        """
+        device = self.select_fit.value
+        for value, song in self.catalog.items():
+            fits = device == 'all' or song[f'{device}_shift'] != no_shift
+            document[f'id-{value}'].style.display = '' if fits else 'none'
+
+    # ----------------------------------------------------------------------
+    def load_library(self) -> None:
+        """
+        Initiates an AJAX request to load the tabs of the library songs.
+
+        Returns
+        -------
+        None
+        """
+        if self.trace_load_library is not None:
+            # Already loading
+            return
+        self.trace_load_library = tracing.begin('GET tabs.json')
+        req = ajax.ajax()
+        req.bind('complete', self.on_complete_load_library)
+        req.open('GET', asset_url('tabs/tabs.json'), True)
+        req.send()
+
+    # ----------------------------------------------------------------------
+    def on_complete_load_library(self, req) -> None:
+        """
+        Keeps the tabs of the library songs and loads the selected one.
+
+        Parameters
+        ----------
+        req : object
+            The AJAX response object containing the HTTP status and JSON data.
+
+        Returns
+        -------
+        None
+        """
+        tracing.end(self.trace_load_library)
+        self.trace_load_library = None
+
+        if req.status == 200:
+            self.library = req.json
+            if self.current_song is None:
+                self.load_tab_in_textarea()
+
+    # ----------------------------------------------------------------------
+    def search_melody(self, event=None) -> None:
+        """
+        Schedules a melody search with the fragment typed by the user.
+
+        Consecutive calls within `search_delay` milliseconds are coalesced into
+        a single search.
+
+        Parameters
+        ----------
+        event : object, optional
+            The triggering event object. Defaults to None.
+
+        Returns
+        -------
+        None
+        """
+        if self.search_timer is not None:
+            timer.clear_timeout(self.search_timer)
+        self.search_timer = timer.set_timeout(self.run_search, search_delay)
+
+    # ----------------------------------------------------------------------
+    def run_search(self) -> None:
+        """
+        Lists the library songs matching the fragment, in any key.
+
+        The search runs on the server, or in the browser once the search
+        index is loaded. The index is fetched when the server is not
+        available, and the search runs again once it is loaded.
+
+        Returns
+        -------
+        None
+        """
+        self.search_timer = None
+        fragment = self.textarea_search.value.strip()
+        if not fragment:
+            self.show_matches([])
+        elif self.search_index is not None:
+            self.show_matches(self.search_index.search(fragment))
+        elif self.remote_interpreter().closed:
+            self.load_search_index()
+        else:
+            self.remote_interpreter().search(fragment)(
+                lambda matches: self.on_complete_remote_search(fragment, matches)
+            )
+
+    # ----------------------------------------------------------------------
+    def on_complete_remote_search(self, fragment: str, matches) -> None:
+        """
+        Lists the matches found by the server, or searches in the browser
+        when the call failed.
+
+        Parameters
+        ----------
+        fragment : str
+            The searched fragment, results of outdated fragments are
+            discarded.
+        matches : list or RemoteError
+            The `(name, score)` pairs of the matches.
+
+        Returns
+        -------
+        None
+        """
+        if fragment != self.textarea_search.value.strip():
+            return
+        if isinstance(matches, RemoteError):
+            self.load_search_index()
+        else:
+            self.show_matches(matches)
+
+    # ----------------------------------------------------------------------
+    def show_matches(self, matches: list) -> None:
+        """
+        Lists the matching songs in `select_match`.
+
+        Parameters
+        ----------
+        matches : list
+            The `(name, score)` pairs of the matches.
+
+        Returns
+        -------
+        None
+        """
+        self.select_match.innerHTML = ''
+        for name, score in matches:
+            if name in self.library_values:
+                self.select_match <= wa.option(
+                    f'{name} ({score:.0%})',
+                    value=self.library_values[name],
+                )
+
+    # ----------------------------------------------------------------------
+    def load_search_index(self) -> None:
+        """
+        Initiates an AJAX request to load the melody search index.
+
+        Returns
+        -------
+        None
+        """
+        if self.trace_load_search is not None:
+            # Already loading
+            return
+        self.trace_load_search = tracing.begin('GET search.json')
+        req = ajax.ajax()
+        req.bind('complete', self.on_complete_load_search_index)
+        req.open('GET', asset_url('tabs/search.json'), True)
+        req.send()
+
+    # ----------------------------------------------------------------------
+    def on_complete_load_search_index(self, req) -> None:
+        """
+        Builds the search index from the server's response and runs the
+        pending search.
+
+        Parameters
+        ----------
+        req : object
+            The AJAX response object containing the HTTP status and JSON data.
+
+        Returns
+        -------
+        None
+        """
+        tracing.end(self.trace_load_search)
+        self.trace_load_search = None
+
+        if req.status == 200:
+            self.search_index = SearchIndex(req.json)
+            self.run_search()
 
     # ----------------------------------------------------------------------
-    @property
-    def equivalence_table(self) -> dict:
+    def load_match(self, event=None) -> None:
         """
-        Returns the appropriate note equivalence table based on the state
-        of the `switch_x1_8va`.
+        Loads the library song selected among the search matches.
 
-        If the `switch_x1_8va` is checked, it uses `note_equivalence_mode2`.
-        Otherwise, it defaults to `note_equivalence_mode1`.
+        Parameters
+        ----------
+        event : object, optional
+            The triggering event object. Defaults to None.
 
         Returns
         -------
-        dict
-            The selected note equivalence table (`note_equivalence_mode1` or
-            `note_equivalence_mode2`).
+        None
         """
-        if self.switch_x1_8va.checked:
-            return note_equivalence_mode2
-        else:
-            return note_equivalence_mode1
+        if self.select_match.value:
+            self.select_tab.value = self.select_match.value
+            self.load_tab_in_textarea()
 
     # ----------------------------------------------------------------------
-    def save_tabs(self, event=None):
+    def load_tab_in_textarea(self, event=None) -> None:
         """
-        Saves the current tabs and updates the UI elements accordingly.
+        Loads the selected tab content into the textarea for editing or display.
 
-        If the `select_tab` widget is set to 'custom', it saves the value from
-        the `textarea_s1` widget into the `storage` under the 'tabs' key.
-        Resets counters for S-1 and X-1 tabs, updates the tabs preview, and
-        adjusts the range of the progress bar.
+        This method determines the selected tab, retrieves its content, and
+        populates the `textarea_s1` element. If a custom song is selected, it
+        loads it from the storage, otherwise from the library, which is fetched
+        on the first selection. Any pending save of the previous song is
+        flushed first. Additionally, it compiles the current tab content,
+        transposed if required, and by the transposition that fits the song on
+        the device selected in `select_fit`.
 
         Parameters
         ----------
-        event : optional
-            The triggering event, if applicable. Defaults to None.
+        event : object, optional
+            The triggering event object. Defaults to None.
 
         Returns
         -------
         None
         """
-        if self.select_tab.value == 'custom':
-            storage['tabs'] = self.textarea_s1.value
-
-        # Reset counters
-        self.counter_s1 = 0
-        self.counter_x1 = 0
-
-        # Update the tabs preview
-        self.update_tabs_preview()
+        # Persist the song being edited before replacing it
+        self.flush_tabs()
 
-        # Adjust the progress bar range
-        self.range_progress.min = 0
-
-        max_ = len(self.normalized_tabs.split(' ')) - 1
-
-        if max_ > 0:
-            self.range_progress.max = max_
+        if song := self.current_song:
+            # Load custom tabs from storage or default value
+            self.textarea_s1.value = self.read_song(song)
+        elif self.library is None:
+            self.load_library()
+            return
         else:
-            self.range_progress.max = 100
-
-        # Debug information
-        print("Input tabs:", self.textarea_s1.value)
-        print("Normalized tabs:", self.normalized_tabs)
-        print('S-1 tabs:', ' '.join(self.s1_tabs))
-        print('X-1 tabs:', ' '.join(self.x1_tabs))
+            # Retrieve tab content from the library
+            option = document[f'id-{self.select_tab.value}']
+            self.textarea_s1.value = self.library[option.attrs['file']]
+
+            device = self.select_fit.value
+            if device != 'all':
+                shift = self.catalog[self.select_tab.value][f'{device}_shift']
+                if shift not in (0, no_shift):
+                    self.fit_transpose(shift, device != 's1')
+                    return
+
+        # Save and compile the current tab content, transposed if required
+        self.save_tabs()
 
     # ----------------------------------------------------------------------
-    def range_progress_change(self, event) -> None:
+    def fit_transpose(self, shift: int, x1_model: bool) -> None:
         """
-        Handles the change event for the progress range slider.
-
-        Updates the `counter_s1` and `counter_x1` attributes based on the current
-        value of the slider, and refreshes the tabs preview accordingly.
+        Transposes the tabs to fit them on a device, and compiles them.
 
         Parameters
         ----------
-        event : object
-            The event object containing the `target.value` attribute, which represents
-            the new slider position.
+        shift : int
+            The number of semitones.
+        x1_model : bool
+            Whether to transpose along the X-1 scale.
 
         Returns
         -------
         None
         """
-        # Update counters for S-1 and X-1 based on the slider's value
-        self.counter_s1 = event.target.value
-        self.counter_x1 = event.target.value
+        self.range_transpose.value = shift
+        self.switch_transpose_model.checked = x1_model
+        self.switch_transpose.checked = True
+        self.activate_transpose()
 
-        # Refresh the tabs preview
-        self.update_tabs_preview()
+    # ----------------------------------------------------------------------
+    @property
+    def current_song(self) -> Optional[str]:
+        """
+        Returns the name of the custom song selected in `select_tab`.
+
+        Returns
+        -------
+        Optional[str]
+            The name of the selected custom song, or None if a tab from the
+            library is selected.
+        """
+        value = self.select_tab.value
+        if value == 'custom' or value.startswith('custom-'):
+            return document[f'id-{value}'].attrs['song']
+        return None
 
     # ----------------------------------------------------------------------
-    def update_tabs_preview(self) -> None:
+    def load_songs(self) -> None:
         """
-        Updates the preview of tabs based on the current state of switches,
-        counters, and user selections.
+        Populates the tabs selection dropdown with the custom songs stored in
+        the local storage.
 
-        This method dynamically generates the preview content for both S-1
-        and X-1 tabs depending on the transpose switch, the equivalence table,
-        and the selected generator. It adjusts the pre-, current-, and post-tab
-        spans accordingly.
+        The songs are listed, one name per line, under the 'songs' key. Each
+        song is stored compressed under the 'song:<name>' key.
 
         Returns
         -------
         None
         """
-        if self.switch_transpose.checked:
-            # Update tabs with transpose applied
-            self.update_transposed_tabs()
-            self.s1_tabs = self.textarea_transpose.value.split(' ')
-            self.x1_tabs = convert_sequence(
-                self.textarea_transpose.value,
-                self.equivalence_table,
-                '-1' if self.switch_x1_8va.checked else '0',
-            ).split(' ')
-        else:
-            # Use normalized tabs without transpose
-            self.s1_tabs = self.normalized_tabs.split(' ')
-            self.x1_tabs = convert_sequence(
-                self.normalized_tabs,
-                self.equivalence_table,
-                '-1' if self.switch_x1_8va.checked else '0',
-            ).split(' ')
-
-        # Update tab spans based on the selected model
-        if self.select_gen.value == 's1':
-            tab = self.s1_tabs[self.counter_s1]
-            self.span_tabs_pre.text = ' - '.join(
-                self.s1_tabs[max(0, self.counter_s1 - max_tabs) : self.counter_s1]
-            )
-            self.span_tabs_current.text = f" {tab.strip('()')} "
-            self.span_tabs_post.text = ' - '.join(
-                self.s1_tabs[
-                    self.counter_s1
-                    + 1 : min(len(self.s1_tabs), self.counter_s1 + max_tabs)
-                ]
-            )
-        elif self.select_gen.value in ['both', 'x1']:
-            tab = self.x1_tabs[self.counter_x1]
-            self.span_tabs_pre.text = ' - '.join(
-                self.x1_tabs[max(0, self.counter_x1 - max_tabs) : self.counter_x1]
-            )
-            self.span_tabs_current.text = f" {tab.strip('()')} "
-            self.span_tabs_post.text = ' - '.join(
-                self.x1_tabs[
-                    self.counter_x1
-                    + 1 : min(len(self.x1_tabs), self.counter_x1 + max_tabs)
-                ]
-            )
+        for name in storage.get('songs', default_song).split('\n'):
+            if name and name != default_song:
+                self.add_song_option(name)
 
     # ----------------------------------------------------------------------
-    def start_animation(self, event) -> None:
+    def add_song_option(self, name: str) -> str:
         """
-        Starts the animation based on the selected generator (S-1, X-1, or both).
-
-        This method initializes the animation by enabling/disabling buttons,
-        setting counters, updating the tab preview, and calling the appropriate
-        animation methods for the selected generator.
+        Appends a custom song to the tabs selection dropdown.
 
         Parameters
         ----------
-        event : object
-            The triggering event object, typically passed when the button is clicked.
+        name : str
+            The name of the custom song.
 
         Returns
         -------
-        None
+        str
+            The value of the created option.
         """
-        # Initialize the animation state
-        self.stop = False
-
-        # Disable the start button and enable the stop button
-        self.button_start.style.display = 'none'
-        self.button_stop.style.display = 'block'
-
-        # Set counters based on the current slider position
-        self.counter_s1 = self.range_progress.value
-        self.counter_x1 = self.range_progress.value
-
-        # Update the tab preview
-        self.update_tabs_preview()
-
-        # Start the animation based on the selected model
-        match self.select_gen.value:
-            case 's1':
-                self.animate_s1()
-            case 'x1':
-                self.animate_x1()
-            case 'both':
-                self.animate_s1()
-                self.animate_x1()
+        self.songs_count = getattr(self, 'songs_count', 0) + 1
+        value = f'custom-{self.songs_count}'
+        option = wa.option(name, value=value, id=f'id-{value}')
+        option.attrs['song'] = name
+
+        # Custom songs are listed before the tabs library
+        library = document.select('wa-option[id^="id-tab-"]')
+        if library:
+            self.select_tab.insertBefore(option, library[0])
+        else:
+            self.select_tab <= option
+        return value
 
     # ----------------------------------------------------------------------
-    def stop_animation(self, event) -> None:
+    def read_song(self, name: str) -> str:
         """
-        Stops the currently running animation.
+        Reads a custom song from the local storage.
 
-        This method sets the `stop` attribute to `True` to signal the
-        termination of the animation. It disables the stop button and
-        re-enables the start button to allow restarting the animation.
+        The tabs stored by previous versions under the 'tabs' key are used for
+        the default song if it has not been saved yet.
 
         Parameters
         ----------
-        event : object
-            The triggering event object, typically passed when the button is clicked.
+        name : str
+            The name of the custom song.
 
         Returns
         -------
-        None
+        str
+            The tabs of the song, or `default_tabs` if it is not stored.
         """
-        # Set the stop flag to True
-        self.stop = True
-
-        # Disable the stop button and enable the start button
-        self.button_stop.style.display = 'none'
-        self.button_start.style.display = 'block'
+        data = storage.get(f'song:{name}', None)
+        if data is None and name == default_song:
+            data = storage.get('tabs', None)
+        if data is None:
+            return default_tabs
+        return decompress_text(data)
 
     # ----------------------------------------------------------------------
-    def load_stylophone(
-        self, event=None, generation=None, style=None, x1_octave_modifier=None
-    ) -> None:
+    def write_song(self, name: str, tabs: str) -> None:
         """
-        Loads the appropriate Stylophone SVG based on the selected generation, style,
-        and octave modifier.
-
-        This method constructs the URL for the Stylophone asset and sends an AJAX
-        GET request to fetch it. If the `event` parameter is provided, the method
-        will determine the generation, style, and octave modifier from the respective
-        UI elements.
+        Writes a compressed custom song to the local storage and registers it
+        in the songs index.
 
         Parameters
         ----------
-        event : optional
-            The triggering event object, if applicable. Defaults to None.
-        generation : str, optional
-            The generation to load ('s1', 'x1', or 'both'). Defaults to the value
-            of `select_gen` if `event` is provided.
-        style : str, optional
-            The style of the Stylophone. Defaults to the value of `select_style`
-            if `event` is provided.
-        x1_octave_modifier : str, optional
-            The octave modifier for X-1. Defaults to '-1' if the switch is checked,
-            or an empty string otherwise.
+        name : str
+            The name of the custom song.
+        tabs : str
+            The tabs of the song.
 
         Returns
         -------
         None
         """
-        if not self.loaded:
-            return
-
-        # Retrieve parameters from UI elements if an event is provided
-        if event:
-            generation = self.select_gen.value
-            style = self.select_style.value
-            x1_octave_modifier = '-1' if self.switch_x1_8va.checked else ''
+        storage[f'song:{name}'] = compress_text(tabs)
 
-        # Override X-1 octave modifier if the generation is 's1'
-        if generation == 's1':
-            x1_octave_modifier = ''
+        songs = storage.get('songs', default_song).split('\n')
+        if name not in songs:
+            storage['songs'] = '\n'.join(songs + [name])
 
-        # Construct and send the AJAX request
-        req = ajax.ajax()
-        req.bind('complete', self.on_complete_load_stylophone)
-        req.open(
-            'GET',
-            f'{domain}/root/assets/stylophone_{generation}_{style}{x1_octave_modifier}.svg',
-            True,
-        )
-        req.send()
+        # Drop the uncompressed tabs of previous versions once migrated
+        if name == default_song and 'tabs' in storage:
+            del storage['tabs']
 
     # ----------------------------------------------------------------------
-    def on_complete_load_stylophone(self, req) -> None:
+    def schedule_save(self, song: str) -> None:
         """
-        Handles the completion of the AJAX request to load the Stylophone SVG.
+        Schedules a debounced save of the textarea content.
 
-        This method processes the SVG response, updates the UI elements, adjusts
-        the SVG's attributes for proper scaling, and highlights specific buttons
-        if they exist. If the X-1 octave switch is active, additional adjustments
-        are applied.
+        Consecutive calls within `save_delay` milliseconds are coalesced into a
+        single write of the latest content.
 
         Parameters
         ----------
-        req : object
-            The AJAX response object containing the HTTP status and response text.
+        song : str
+            The name of the custom song being edited.
 
         Returns
         -------
         None
         """
-        if req.status == 200:
-            # Inject the SVG into the container
-            self.svg_container.innerHTML = req.responseText
-            self.svg_container.style.width = "100%"
-
-            # Adjust SVG attributes for responsive behavior
-            svg_element = document.select("svg")[0]
-            svg_element.setAttribute("width", "100%")
-            svg_element.setAttribute("preserveAspectRatio", "xMidYMid meet")
-
-            # Highlight specific buttons if they exist
-            try:
-                document["tab_sm2"].style.fill = button_active
-            except Exception:
-                pass
-
-            #if self.switch_x1_8va.checked:
-            try:
-                document["tab_xm1"].style.fill = button_active
-            except Exception:
-                pass
-
-            # Save tabs after successful SVG load
-            self.save_tabs()
+        if self.save_timer is not None:
+            timer.clear_timeout(self.save_timer)
+
+        self.save_song = song
+        self.save_timer = timer.set_timeout(self.flush_tabs, save_delay)
 
     # ----------------------------------------------------------------------
-    def load_tabs(self) -> None:
+    def flush_tabs(self, event=None) -> None:
         """
-        Initiates an AJAX request to load the available tabs from a JSON file.
+        Writes the pending save of the textarea content, if any.
 
-        This method sends a GET request to fetch the `tabs.json` file from the server.
-        Upon completion, it triggers the `on_complete_load_tabs` method to process
-        the response.
+        Parameters
+        ----------
+        event : optional
+            The triggering event, if applicable. Defaults to None.
 
         Returns
         -------
         None
         """
-        req = ajax.ajax()
-        req.bind('complete', self.on_complete_load_tabs)
-        req.open('GET', f'{domain}/root/tabs/tabs.json', True)
-        req.send()
+        if self.save_song is None:
+            return
+
+        if self.save_timer is not None:
+            timer.clear_timeout(self.save_timer)
+
+        self.write_song(self.save_song, self.textarea_s1.value)
+        self.save_timer = None
+        self.save_song = None
 
     # ----------------------------------------------------------------------
-    def on_complete_load_tabs(self, req) -> None:
+    def new_song(self, event=None) -> None:
         """
-        Processes the server's response to populate the tabs selection dropdown.
-
-        This method parses the JSON response containing tabs, creates `<option>`
-        elements for each tab, and appends them to the `select_tab` element.
+        Saves the textarea content as a new named custom song and selects it.
 
         Parameters
         ----------
-        req : object
-            The AJAX response object containing the HTTP status and JSON data.
+        event : optional
+            The triggering event, if applicable. Defaults to None.
 
         Returns
         -------
         None
         """
-        if req.status == 200:
-            # Parse JSON response
-            tabs = req.json
+        name = window.prompt('Song name')
+        if not name or not name.strip():
+            return
+        name = ' '.join(name.split())
 
-            # Create and populate dropdown options
-            for i, tab in enumerate(tabs):
-                option = wa.option(
-                    tab.replace('.txt', ''),  # Remove the file extension for display
-                    value=f'tab-{i}',  # Unique value for each option
-                    id=f'id-tab-{i}',  # Unique ID for each option
-                )
-                option.attrs['tabs'] = tabs[
-                    tab
-                ]  # Store tab content in the 'tabs' attribute
-                self.select_tab <= option  # Append option to the dropdown
+        self.flush_tabs()
+        if name == default_song:
+            value = 'custom'
+        else:
+            options = [
+                option
+                for option in document.select('wa-option[id^="id-custom-"]')
+                if option.attrs['song'] == name
+            ]
+            value = options[0].attrs['value'] if options else self.add_song_option(name)
+
+        self.write_song(name, self.textarea_s1.value)
+        self.select_tab.value = value
 
     # ----------------------------------------------------------------------
-    def load_tab_in_textarea(self, event) -> None:
+    def delete_song(self, event=None) -> None:
         """
-        Loads the selected tab content into the textarea for editing or display.
+        Deletes the selected custom song from the local storage.
 
-        This method determines the selected tab from the event, retrieves its
-        content, and populates the `textarea_s1` element. If the "custom" option
-        is selected, it loads stored custom tabs or a default value. Additionally,
-        it saves the current tab content and updates transposed tabs if required.
+        Deleting the default song resets it to `default_tabs`, other songs are
+        also removed from the tabs selection dropdown.
 
         Parameters
         ----------
-        event : object
-            The triggering event object, containing the selected tab value in
-            `event.target.value`.
+        event : optional
+            The triggering event, if applicable. Defaults to None.
 
         Returns
         -------
         None
         """
-        # Retrieve the selected tab value
-        tab = event.target.value
+        song = self.current_song
+        if song is None or not window.confirm(f'Delete "{song}"?'):
+            return
 
-        if tab == 'custom':
-            # Load custom tabs from storage or default value
-            self.textarea_s1.value = storage.get('tabs', default_tabs)
-        else:
-            # Retrieve tab content from the selected option
-            option = document[f'id-{tab}']
-            self.textarea_s1.value = option.attrs['tabs']
+        # Discard any pending save of the deleted song
+        if self.save_timer is not None:
+            timer.clear_timeout(self.save_timer)
+        self.save_timer = None
+        self.save_song = None
 
-        # Save the current tab content
-        self.save_tabs()
+        for key in [f'song:{song}'] + (['tabs'] if song == default_song else []):
+            if key in storage:
+                del storage[key]
 
-        # Update transposed tabs if the transpose switch is enabled
-        if self.switch_transpose.checked:
-            self.update_transposed_tabs()
+        if song != default_song:
+            songs = storage.get('songs', default_song).split('\n')
+            storage['songs'] = '\n'.join(name for name in songs if name != song)
+            document[f'id-{self.select_tab.value}'].remove()
+
+        self.select_tab.value = 'custom'
+        self.load_tab_in_textarea()
 
     # ----------------------------------------------------------------------
     def clear(self, tab: str) -> None:
         """
         Resets the style of the specified SVG element to its default state.
 
-        This method modifies the `fill` style of the SVG element identified by the
-        `tab` parameter, setting it to the base button color.
+        This method sets the `fill` style of the SVG element identified by the
+        `tab` parameter to the base button color on the next animation frame.
+
+        Parameters
+        ----------
+        tab : str
+            The identifier of the SVG element to reset.
+
+        Returns
+        -------
+        None
+        """
+        self.renderer.fill(tab, button_base)
+
+    # ----------------------------------------------------------------------
+    def release(self, tab: str, scheduled: Optional[float] = None) -> None:
+        """
+        Releases a highlighted key and records the release in the telemetry.
 
         Parameters
         ----------
         tab : str
             The identifier of the SVG element to reset.
+        scheduled : Optional[float], optional
+            The timestamp the release was scheduled for. Defaults to None.
+
+        Returns
+        -------
+        None
+        """
+        self.clear(tab)
+        if scheduled is not None:
+            # Measured once the release is actually committed to the DOM
+            self.renderer.after(lambda: self.telemetry.on_release(scheduled))
+
+    # ----------------------------------------------------------------------
+    def record_highlight(self, scheduled: Optional[float]) -> None:
+        """
+        Records the highlight of a note in the telemetry once it is committed
+        to the DOM, and in the classroom timeline when teaching.
+
+        Parameters
+        ----------
+        scheduled : Optional[float]
+            The timestamp the note was scheduled for.
 
         Returns
         -------
         None
         """
-        svg_element = document[tab]
-        svg_element.style.fill = button_base
+        if self.classroom:
+            self.classroom.on_highlight()
+
+        if scheduled is None:
+            return
+        gap = float(self.select_delay.value)
+        self.renderer.after(lambda: self.telemetry.on_highlight(scheduled, gap))
 
     # ----------------------------------------------------------------------
     def active(self, tab: str) -> None:
         """
         Sets the style of the specified SVG element to indicate an active state.
 
-        This method modifies the `fill` style of the SVG element identified by the
-        `tab` parameter, setting it to the active button color.
+        This method sets the `fill` style of the SVG element identified by the
+        `tab` parameter to the active button color on the next animation frame.
 
         Parameters
         ----------
@@ -1134,10 +1991,10 @@ class StylophoneAssistant(RadiantCore):
         -------
         None
         """
-        svg_element = document[tab]
-        svg_element.style.fill = button_active
+        self.renderer.fill(tab, button_active)
 
     # ----------------------------------------------------------------------
+    @trace()
     def animate_s1(self) -> None:
         """
         Animates the S-1 tabs sequence, highlighting and clearing each tab in turn.
@@ -1154,36 +2011,48 @@ class StylophoneAssistant(RadiantCore):
             # Retrieve the current tab based on the counter
             tab = self.s1_tabs[self.counter_s1]
         except IndexError:
+            # Wait for the tail of the program if it is still being compiled
+            if self.compiling and not self.stop:
+                self.scheduled_s1 = self.telemetry.schedule(float(self.select_delay.value))
+                timer.set_timeout(self.animate_s1, float(self.select_delay.value))
             # Stop animation if the counter exceeds the sequence length
             return
 
         # Update the tab preview
         self.update_tabs_preview()
         self.counter_s1 += 1
-        self.range_progress.value = self.counter_s1
+        self.renderer.value('range_progress', self.range_progress, self.counter_s1)
 
         # Check if the tab is a valid number, highlight it if so
         if tab.replace('.', '').isdigit():
-            svg_element = document[f"tab_s{tab.replace('.', '_')}"]
-            svg_element.style.fill = button_active
+            self.active(f"tab_s{tab.replace('.', '_')}")
         else:
             # Skip invalid tabs and recursively call the animation
             return self.animate_s1()
 
+        # With both generators the X-1 records the notes, see `animate_x1`
+        if self.select_gen.value == 's1':
+            self.record_highlight(self.scheduled_s1)
+            release_at = self.telemetry.schedule(float(self.select_delay.value) * 0.7)
+        else:
+            release_at = None
+
         # Schedule a timeout to clear the tab after a delay
         timer.set_timeout(
-            lambda: self.clear(f"tab_s{tab.replace('.', '_')}"),
+            lambda: self.release(f"tab_s{tab.replace('.', '_')}", release_at),
             float(self.select_delay.value) * 0.7,
         )
 
         # Continue animation if not stopped
         if not self.stop:
+            self.scheduled_s1 = self.telemetry.schedule(float(self.select_delay.value))
             timer.set_timeout(self.animate_s1, float(self.select_delay.value))
         else:
             # Reset the progress bar when animation stops
-            self.range_progress.value = 0
+            self.renderer.value('range_progress', self.range_progress, 0)
 
     # ----------------------------------------------------------------------
+    @trace()
     def animate_x1(self) -> None:
         """
         Animates the X-1 tabs sequence, highlighting and clearing each tab in turn.
@@ -1215,6 +2084,10 @@ class StylophoneAssistant(RadiantCore):
             # Retrieve the current tab based on the counter
             tab = self.x1_tabs[self.counter_x1]
         except IndexError:
+            # Wait for the tail of the program if it is still being compiled
+            if self.compiling and not self.stop:
+                self.scheduled_x1 = self.telemetry.schedule(float(self.select_delay.value))
+                timer.set_timeout(self.animate_x1, float(self.select_delay.value))
             # Stop animation if the counter exceeds the sequence length
             return
 
@@ -1222,7 +2095,7 @@ class StylophoneAssistant(RadiantCore):
         if self.select_gen.value == 'x1':
             self.update_tabs_preview()
             self.counter_x1 += 1
-            self.range_progress.value = self.counter_x1
+            self.renderer.value('range_progress', self.range_progress, self.counter_x1)
         else:
             self.counter_x1 += 1
 
@@ -1237,31 +2110,31 @@ class StylophoneAssistant(RadiantCore):
             if '-1' in tab:
                 # Handle octave -1
                 tab = tab.strip('()').replace('-1:', '')
-                svg_element = document[f"tab_x{tab.replace('.', '_')}"]
-                document["tab_xm1"].style.fill = button_active
+                self.active("tab_xm1")
                 self.clear("tab_xm2")
 
             elif '-2' in tab:
                 # Handle octave -2
                 tab = tab.strip('()').replace('-2:', '')
-                svg_element = document[f"tab_x{tab.replace('.', '_')}"]
-                document["tab_xm2"].style.fill = button_active
+                self.active("tab_xm2")
                 self.clear("tab_xm1")
 
             else:
                 # Handle normal tabs
                 tab = tab.strip('()')
-                svg_element = document[f"tab_x{tab.replace('.', '_')}"]
 
             # Highlight the current tab
-            svg_element.style.fill = button_active
+            self.active(f"tab_x{tab.replace('.', '_')}")
         else:
             # Skip invalid tabs and recursively call the animation
             return self.animate_x1()
 
+        self.record_highlight(self.scheduled_x1)
+
         # Schedule a timeout to clear the tab after a delay
+        release_at = self.telemetry.schedule(float(self.select_delay.value) * 0.7)
         timer.set_timeout(
-            lambda: self.clear(f"tab_x{tab.replace('.', '_')}"),
+            lambda: self.release(f"tab_x{tab.replace('.', '_')}", release_at),
             float(self.select_delay.value) * 0.7,
         )
 
@@ -1274,6 +2147,7 @@ class StylophoneAssistant(RadiantCore):
 
         # Continue animation if not stopped
         if not self.stop:
+            self.scheduled_x1 = self.telemetry.schedule(float(self.select_delay.value))
             timer.set_timeout(self.animate_x1, float(self.select_delay.value))
         else:
             pass
@@ -1286,20 +2160,19 @@ class StylophoneAssistant(RadiantCore):
         Toggles the visibility of transpose-related UI elements based on the state
         of the transpose switch.
 
-        If the `event.target.checked` is `False`, the transpose controls are hidden.
+        If the transpose switch is not checked, the transpose controls are hidden.
         Otherwise, they are displayed, and the transposed tabs are updated.
 
         Parameters
         ----------
         event : optional
-            The triggering event object, which determines the checked state of the
-            transpose switch. Defaults to None.
+            The triggering event object. Defaults to None.
 
         Returns
         -------
         None
         """
-        if not event.target.checked:
+        if not self.switch_transpose.checked:
             # Hide transpose controls
             self.range_transpose.style.display = 'none'
             self.textarea_transpose.style.display = 'none'
@@ -1309,7 +2182,9 @@ class StylophoneAssistant(RadiantCore):
             self.range_transpose.style.display = 'block'
             self.textarea_transpose.style.display = 'block'
             self.switch_transpose_model.style.display = 'block'
-            self.update_transposed_tabs()
+
+        # Recompile the tabs with or without transposition
+        self.save_tabs()
 
     # ----------------------------------------------------------------------
     def update_transposed_tabs(self, event=None) -> None:
@@ -1329,66 +2204,54 @@ class StylophoneAssistant(RadiantCore):
         -------
         None
         """
-        # Get the transpose value
-        value = self.range_transpose.value
-
-        # Select the appropriate scale based on the model switch
-        if self.switch_transpose_model.checked:
-            scale = "1 1.5 2 3 3.5 4 4.5 5 6 6.5 7 7.5 8 8.5 9 10 10.5 11 11.5 12 13 13.5 14 14.5 15 15.5 16".split()
-        else:
-            scale = (
-                "1 1.5 2 3 3.5 4 4.5 5 6 6.5 7 7.5 8 8.5 9 10 10.5 11 11.5 12".split()
-            )
-
-        # Split the normalized tabs into lines
-        tabs_lines = self.normalized_tabs.split('\n')
-        transposed_tabs = []
-
-        # Process each line of tabs
-        for line in tabs_lines:
-            for tab in line.split(' '):
-                if tab in scale:
-                    # Transpose the tab within the scale
-                    index = scale.index(tab) + value
-
-                    if index < 0:
-                        # Wrap to the next octave up
-                        new_tab = f'+1:{scale[index + 12]}'
-                    elif 0 <= index < len(scale):
-                        # Valid index within the scale
-                        new_tab = scale[index]
-                    else:
-                        # Wrap to the next octave down
-                        new_tab = f'-1:{scale[index - 12]}'
-
-                    transposed_tabs.append(new_tab)
-
-                elif tab:
-                    # Mark tabs outside the scale as errors
-                    transposed_tabs.append(f'E:{tab}')
-                else:
-                    # Preserve empty spaces
-                    transposed_tabs.append(tab)
-
-            # Add a line break after processing each line
-            transposed_tabs.append('\n')
-
-        # Clean up transposed tabs to remove extra spaces
-        tabs_clear = []
-        for line in (' '.join(transposed_tabs)).split('\n'):
-            tabs_clear.append(' '.join(line.split()))
-
-        # Update the textarea with the cleaned transposed tabs
-        self.textarea_transpose.value = '\n'.join(tabs_clear).strip('\n')
+        # Shift the tabs along the scale of the selected model
+        self.textarea_transpose.value = transpose_tabs(
+            self.normalized_tabs,
+            self.range_transpose.value,
+            self.switch_transpose_model.checked,
+        )
 
 if __name__ == '__main__':
-    load_tabs()
+    import argparse
+    from bundle import make_bundle
+    from vendor import is_vendored, webawesome_path, webawesome_components, icons_path, fonts_path
+    from shell import prerender_shell
+    from assets import build_assets
+    from serviceworker import make_service_worker, ServiceWorkerHandler, service_worker_file
+    from radiant.framework.server import DEFAULT_BRYTHON_VERSION
+    from api import api_handlers
+    from appserver import serve
+    from duplicates import report_duplicates
+    from library import load_tabs
+
+    parser = argparse.ArgumentParser(description='Stylophone Assistant server')
+    parser.add_argument('--port', default='5000')
+    parser.add_argument('--workers', type=int, default=1, help='processes serving requests')
+    parser.add_argument('--export', action='store_true', help='write the static app to docs/ instead of serving')
+    args = parser.parse_args()
+
+    library = load_tabs()
+    if library['changed']:
+        report_duplicates(library['intervals'])
+    make_bundle()
+    hashed_assets = build_assets()
+    icons = f'{domain}/root/{icons_path}'
+    vendored = is_vendored()
+    make_service_worker(
+        domain,
+        hashed_assets,
+        DEFAULT_BRYTHON_VERSION,
+        vendor=[fonts_path, icons_path] + ([webawesome_path] if vendored else []),
+    )
 
-    RadiantServer(
+    serve(
         'StylophoneAssistant',
         host='0.0.0.0',
+        port=args.port,
+        workers=args.workers,
         template='template.html',
         static_app='docs',
+        export=args.export,
         domain=domain,
 
         page_title="Stylophone Assistant",
@@ -1400,4 +2263,25 @@ if __name__ == '__main__':
         page_site="Stylophone Assistant",
         page_author="Yeison Cardona",
         #page_copyright="",
+
+        # Vendored offline by `python vendor.py`, the Web Awesome CDN is
+        # used until it is
+        environ={
+            'vendor': f'{domain}/root/{webawesome_path}' if vendored else '',
+            'vendor_components': webawesome_components,
+            'vendor_icons': icons,
+            'vendor_fonts': f'{domain}/root/{fonts_path}',
+        },
+        immutable_paths=['static/vendor/', 'static/assets/'],
+        template_variables={
+            'shell': prerender_shell(default_song, icons),
+            'assets': hashed_assets,
+        },
+        handlers=[
+            (rf'^{domain}/{service_worker_file}$', ServiceWorkerHandler),
+            *api_handlers(domain),
+        ],
+        export_files=[service_worker_file],
+        hot_assets=['assets/*.svg', 'tabs/*.json', 'static/assets/*'],
+        broadcast=broadcast_path,
     )
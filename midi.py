@@ -0,0 +1,565 @@
+"""
+MIDI
+====
+
+Import of Standard MIDI files as assistant tabs.
+
+The file is streamed: track chunks are read one at a time and their events
+decoded by a generator, only the tempo changes and the notes of the melody
+are kept. A first pass gathers the tempo map and the notes of every track
+and channel, and the melody is the busiest line among the highest ones:
+the (track, channel) with the highest median pitch among those with at
+least `min_melody_notes` notes, drums excluded. A second pass reduces the
+melody to a single voice, the skyline: notes starting together keep the
+highest, and a note starting under a higher one still sounding is dropped.
+
+The assistant plays one tab per gap, so the gap is the most frequent time
+between the notes, rounded to the `select_delay` steps, and notes are
+quantized to it. Longer silences start a new line, and longer ones a new
+paragraph.
+
+Pitches are mapped to tabs through the chromatic X-1 scale, `base_note`
+being the first tab of the S-1, and the melody is transposed to fit the
+selected stylophone, by octaves if possible so it keeps its key, see
+compatibility.py. The few notes still out of range are folded by octaves.
+
+`python midi.py song.mid` prints the tabs, and `python midi.py songs/ -o
+tabs` converts a whole directory on a process pool, adding the `.txt`
+files to the library without overwriting any song, and updates the
+catalog.
+"""
+
+import os
+import struct
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from compiler import x1_scale
+from compatibility import device_pitches, misfits
+from library import add_song, load_tabs, song_names
+
+base_note = 57  # A3, the first tab of the S-1
+drum_channel = 9
+default_tempo = 500000  # Microseconds per quarter note, 120 bpm
+min_melody_notes = 16
+gap_step = 100
+gap_range = (100, 3000)
+line_rest = 2  # Gaps of silence that start a new line
+paragraph_rest = 8
+max_line = 16
+
+# Data bytes of the channel messages, by status
+channel_data = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+
+
+########################################################################
+class MidiError(ValueError):
+    """Raised when a file is not a Standard MIDI file."""
+
+
+# ----------------------------------------------------------------------
+def read_chunks(file):
+    """
+    Iterates over the chunks of a Standard MIDI file.
+
+    Parameters
+    ----------
+    file :
+        The file, opened in binary mode.
+
+    Yields
+    ------
+    tuple
+        The type of every chunk and its data, read when the chunk is reached.
+
+    Raises
+    ------
+    MidiError
+        If the file ends within a chunk.
+    """
+    while header := file.read(8):
+        if len(header) < 8:
+            return
+        kind, length = struct.unpack('>4sI', header)
+        data = file.read(length)
+        if len(data) < length:
+            raise MidiError('Truncated chunk')
+        yield kind, data
+
+
+# ----------------------------------------------------------------------
+def read_varlen(data: bytes, position: int) -> tuple:
+    """Reads a variable length quantity, returns it and the next position."""
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, position
+
+
+# ----------------------------------------------------------------------
+def iter_track(data: bytes):
+    """
+    Decodes the note and tempo events of a track chunk.
+
+    Parameters
+    ----------
+    data : bytes
+        The data of the `MTrk` chunk.
+
+    Yields
+    ------
+    tuple
+        `(tick, channel, note, velocity)` for notes, a velocity of zero
+        being a note off, and `(tick, None, tempo, 0)` for tempo changes.
+    """
+    position = 0
+    tick = 0
+    status = 0
+    end = len(data)
+    while position < end:
+        delta, position = read_varlen(data, position)
+        tick += delta
+
+        if data[position] & 0x80:
+            status = data[position]
+            position += 1
+        # Otherwise running status, the byte is already data
+
+        if status == 0xFF:
+            kind = data[position]
+            length, position = read_varlen(data, position + 1)
+            if kind == 0x51 and length == 3:
+                yield tick, None, int.from_bytes(data[position : position + 3], 'big'), 0
+            elif kind == 0x2F:
+                return
+            position += length
+            status = 0
+        elif status in (0xF0, 0xF7):
+            length, position = read_varlen(data, position)
+            position += length
+            status = 0
+        else:
+            message = status & 0xF0
+            if message not in channel_data:
+                raise MidiError('Invalid event in track')
+            if message in (0x80, 0x90):
+                velocity = data[position + 1] if message == 0x90 else 0
+                yield tick, status & 0x0F, data[position], velocity
+            position += channel_data[message]
+
+
+########################################################################
+class TempoMap:
+    """Converts ticks to milliseconds."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, division: int, tempos: list):
+        """
+        Parameters
+        ----------
+        division :
+            The division of the header, ticks per quarter note, or SMPTE
+            frames per second and ticks per frame.
+        tempos :
+            The `(tick, tempo)` changes, in microseconds per quarter note.
+        """
+        self.changes = [(0, 0.0, default_tempo)]
+        if division & 0x8000:
+            fps = 256 - (division >> 8)
+            self.ms_per_tick = 1000 / (fps * (division & 0xFF))
+            return
+        self.ms_per_tick = None
+        self.division = division
+        for tick, tempo in sorted(tempos):
+            last_tick, last_ms, last_tempo = self.changes[-1]
+            ms = last_ms + (tick - last_tick) * last_tempo / division / 1000
+            if tick == last_tick:
+                self.changes[-1] = (tick, last_ms, tempo)
+            else:
+                self.changes.append((tick, ms, tempo))
+
+    # ----------------------------------------------------------------------
+    def ms(self, tick: int) -> float:
+        """"""
+        if self.ms_per_tick is not None:
+            return tick * self.ms_per_tick
+        for change_tick, change_ms, tempo in reversed(self.changes):
+            if tick >= change_tick:
+                return change_ms + (tick - change_tick) * tempo / self.division / 1000
+        return 0.0
+
+
+# ----------------------------------------------------------------------
+def read_header(file) -> tuple:
+    """
+    Reads the header chunk of a Standard MIDI file.
+
+    Returns
+    -------
+    tuple
+        The format, the number of tracks and the division.
+
+    Raises
+    ------
+    MidiError
+        If the file does not start with a header chunk.
+    """
+    kind, data = next(read_chunks(file), (None, b''))
+    if kind != b'MThd' or len(data) < 6:
+        raise MidiError('Not a Standard MIDI file')
+    return struct.unpack('>HHH', data[:6])
+
+
+# ----------------------------------------------------------------------
+def scan_tracks(file) -> tuple:
+    """
+    First pass: the tempo changes and the pitches of every line.
+
+    Returns
+    -------
+    tuple
+        The division, the `(tick, tempo)` changes, and the pitches of the
+        notes by `(track, channel)`.
+    """
+    file.seek(0)
+    _, _, division = read_header(file)
+    tempos = []
+    lines = {}
+    track = 0
+    for kind, data in read_chunks(file):
+        if kind != b'MTrk':
+            continue
+        for tick, channel, value, velocity in iter_track(data):
+            if channel is None:
+                tempos.append((tick, value))
+            elif velocity and channel != drum_channel:
+                lines.setdefault((track, channel), []).append(value)
+        track += 1
+    return division, tempos, lines
+
+
+# ----------------------------------------------------------------------
+def pick_melody(lines: dict):
+    """
+    Picks the melody among the lines of a file.
+
+    Parameters
+    ----------
+    lines : dict
+        The pitches of the notes, by `(track, channel)`.
+
+    Returns
+    -------
+    tuple or None
+        The `(track, channel)` of the melody, None if there are no notes.
+    """
+    if not lines:
+        return None
+    candidates = [line for line, notes in lines.items() if len(notes) >= min_melody_notes]
+    if not candidates:
+        return max(lines, key=lambda line: len(lines[line]))
+    return max(candidates, key=lambda line: (statistics.median(lines[line]), len(lines[line])))
+
+
+# ----------------------------------------------------------------------
+def skyline(file, melody: tuple) -> list:
+    """
+    Second pass: reduces the melody to its highest voice.
+
+    Parameters
+    ----------
+    file :
+        The file, opened in binary mode.
+    melody : tuple
+        The `(track, channel)` of the melody.
+
+    Returns
+    -------
+    list
+        The `[start, end, note]` of every note kept, in ticks, by start.
+    """
+    file.seek(0)
+    read_header(file)
+    melody_track, melody_channel = melody
+    notes = []
+    sounding = {}
+    track = 0
+    for kind, data in read_chunks(file):
+        if kind != b'MTrk':
+            continue
+        if track == melody_track:
+            for tick, channel, note, velocity in iter_track(data):
+                if channel != melody_channel:
+                    continue
+                if velocity:
+                    sounding[note] = len(notes)
+                    notes.append([tick, None, note])
+                elif note in sounding:
+                    notes[sounding.pop(note)][1] = tick
+            break
+        track += 1
+
+    line = []
+    for start, end, note in sorted(notes, key=lambda note: (note[0], -note[2])):
+        end = start if end is None else end
+        if line and line[-1][0] == start:
+            # Chord, the highest note was kept
+            continue
+        if line and line[-1][1] > start and line[-1][2] > note:
+            # Under a higher note still sounding
+            continue
+        if line and line[-1][1] > start:
+            line[-1][1] = start
+        line.append([start, end, note])
+    return line
+
+
+# ----------------------------------------------------------------------
+def melody_gap(onsets: list) -> int:
+    """
+    The most frequent time between notes, in `select_delay` steps.
+
+    Parameters
+    ----------
+    onsets : list
+        The start of every note, in milliseconds.
+
+    Returns
+    -------
+    int
+        The gap, in milliseconds.
+    """
+    steps = Counter(
+        round((later - earlier) / gap_step)
+        for earlier, later in zip(onsets, onsets[1:])
+        if later > earlier
+    )
+    step = steps.most_common(1)[0][0] if steps else 3
+    return min(max(step * gap_step, gap_range[0]), gap_range[1])
+
+
+# ----------------------------------------------------------------------
+def fit_shift(pitches: list, device: str) -> int:
+    """
+    The transposition that fits the most notes on a device, in semitones.
+
+    Shifts by whole octaves are preferred, as they keep the key.
+    """
+    notes = Counter(pitches)
+    return min(
+        range(-48, 49),
+        key=lambda shift: (misfits(notes, device, shift), shift % 12 != 0, abs(shift)),
+    )
+
+
+# ----------------------------------------------------------------------
+def fold(pitch: int, device: str) -> int:
+    """Moves a pitch by octaves into the range of a device."""
+    playable = device_pitches[device]
+    low, high = min(playable), max(playable)
+    while pitch < low:
+        pitch += 12
+    while pitch > high:
+        pitch -= 12
+    return pitch
+
+
+# ----------------------------------------------------------------------
+def midi_to_tabs(filename: str, device: str = 'x1', title: str = None) -> str:
+    """
+    Converts a Standard MIDI file into assistant tabs.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the MIDI file.
+    device : str, optional
+        The stylophone the tabs are fitted to, one of
+        `compatibility.devices`. Defaults to 'x1'.
+    title : str, optional
+        The title in the header comment, defaults to the name of the file.
+
+    Returns
+    -------
+    str
+        The tabs, with a header comment giving the gap to select.
+
+    Raises
+    ------
+    MidiError
+        If the file is not a Standard MIDI file or has no notes.
+    """
+    with open(filename, 'rb') as file:
+        division, tempos, lines = scan_tracks(file)
+        melody = pick_melody(lines)
+        if melody is None:
+            raise MidiError('No notes')
+        notes = skyline(file, melody)
+
+    tempo_map = TempoMap(division, tempos)
+    notes = [(tempo_map.ms(start), tempo_map.ms(end), note) for start, end, note in notes]
+    gap = melody_gap([start for start, end, note in notes])
+
+    # Quantized to the gap, the highest note of every slot is kept
+    slots = {}
+    for start, end, note in notes:
+        slot = round(start / gap)
+        end_slot = max(slot + 1, round(end / gap))
+        if slot not in slots or slots[slot][1] < note:
+            slots[slot] = (end_slot, note)
+
+    pitches = [note - base_note for end_slot, note in slots.values()]
+    shift = fit_shift(pitches, device)
+
+    lines = []
+    line = []
+    previous_end = None
+    for slot in sorted(slots):
+        end_slot, note = slots[slot]
+        rest = 0 if previous_end is None else slot - previous_end
+        if line and (rest >= line_rest or len(line) >= max_line):
+            lines.append(' '.join(line))
+            line = []
+            if rest >= paragraph_rest:
+                lines.append('')
+        line.append(x1_scale[fold(note - base_note + shift, device)])
+        previous_end = end_slot
+    if line:
+        lines.append(' '.join(line))
+
+    title = title or os.path.splitext(os.path.basename(filename))[0]
+    header = [f'# {title}, imported from {os.path.basename(filename)}']
+    header.append(f'# Gap: {gap / 1000:.1f} s' + (f', transposed {shift:+d} semitones' if shift else ''))
+    return '\n'.join(header + [''] + lines) + '\n'
+
+
+# ----------------------------------------------------------------------
+def convert_file(job: tuple) -> tuple:
+    """
+    Converts a MIDI file, in a worker of the pool.
+
+    Parameters
+    ----------
+    job : tuple
+        The path of the MIDI file and the device.
+
+    Returns
+    -------
+    tuple
+        The path of the MIDI file, its tabs and None, or None and the error.
+    """
+    filename, device = job
+    try:
+        return filename, midi_to_tabs(filename, device), None
+    except (MidiError, IndexError, OSError) as error:
+        return filename, None, f'error: {error or "invalid track"}'
+
+
+# ----------------------------------------------------------------------
+def convert_files(
+    filenames: list,
+    output: str,
+    device: str = 'x1',
+    workers: int = None,
+    build: bool = True,
+) -> list:
+    """
+    Converts MIDI files into new songs on a process pool.
+
+    Songs already in the output directory are never overwritten, see
+    `library.add_song`.
+
+    Parameters
+    ----------
+    filenames : list
+        The paths of the MIDI files.
+    output : str
+        The directory of the `.txt` files, such as `tabs`.
+    device : str, optional
+        See `midi_to_tabs`.
+    workers : int, optional
+        The processes of the pool, defaults to the number of CPUs.
+    build : bool, optional
+        Whether to update the catalog of the output directory afterwards.
+
+    Returns
+    -------
+    list
+        The path of every MIDI file and the written file, or the error.
+    """
+    os.makedirs(output, exist_ok=True)
+    names = song_names(output)
+    results = []
+    jobs = [(filename, device) for filename in filenames]
+    with ProcessPoolExecutor(workers) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        for filename, tabs, error in pool.map(convert_file, jobs, chunksize=chunksize):
+            if error:
+                results.append((filename, error))
+                continue
+            name = os.path.splitext(os.path.basename(filename))[0]
+            results.append((filename, add_song(output, name, tabs, names)))
+
+    if build:
+        load_tabs(output)
+    return results
+
+
+# ----------------------------------------------------------------------
+def convert_directory(
+    path: str,
+    output: str,
+    device: str = 'x1',
+    workers: int = None,
+    build: bool = True,
+) -> list:
+    """
+    Converts every MIDI file of a directory, see `convert_files`.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the `.mid` and `.midi` files.
+    output, device, workers, build
+        See `convert_files`.
+
+    Returns
+    -------
+    list
+        The results of `convert_files`.
+    """
+    filenames = [
+        os.path.join(path, name)
+        for name in sorted(os.listdir(path))
+        if name.lower().endswith(('.mid', '.midi'))
+    ]
+    return convert_files(filenames, output, device, workers, build)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Converts Standard MIDI files into assistant tabs.')
+    parser.add_argument('path', help='a MIDI file, or a directory of them')
+    parser.add_argument('-o', '--output', help='directory of the .txt files, such as tabs')
+    parser.add_argument('--device', default='x1', choices=sorted(device_pitches))
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--no-build', action='store_true', help='do not update the catalog')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.path):
+        results = convert_directory(
+            args.path, args.output or 'tabs', args.device, args.workers, not args.no_build
+        )
+    elif args.output:
+        results = convert_files([args.path], args.output, args.device, 1, not args.no_build)
+    else:
+        results = []
+        print(midi_to_tabs(args.path, args.device), end='')
+
+    for source, result in results:
+        print(f'{source}: {result}')
@@ -0,0 +1,353 @@
+"""
+Prefork
+=======
+
+Multi-process serving for `appserver.serve`.
+
+The listening sockets are bound in the parent process, which then forks
+`workers` processes accepting connections from them, each one with its own
+IOLoop. The parent only supervises:
+
+- Every worker reports a heartbeat, with the number of requests it served,
+  through a pipe. Workers that exit, or whose heartbeat stops because their
+  event loop is blocked, are replaced.
+- SIGHUP restarts the workers gracefully, one at a time: the replacement is
+  forked first, and once it is healthy the old worker stops accepting
+  connections and finishes its requests in flight.
+- SIGTERM and SIGINT shut down all the workers gracefully.
+- SIGUSR1 logs the health of every worker.
+"""
+
+import os
+import time
+import fcntl
+import select
+import signal
+import asyncio
+import logging
+
+from tornado.ioloop import IOLoop, PeriodicCallback
+from tornado.httpserver import HTTPServer
+from tornado.httputil import HTTPMessageDelegate
+
+heartbeat_interval = 1
+heartbeat_timeout = 10
+shutdown_timeout = 30
+respawn_delay = 1
+
+logger = logging.getLogger('prefork')
+
+
+########################################################################
+class RequestCounter(HTTPMessageDelegate):
+    """Counts a request as in flight once its headers are received."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, server, delegate):
+        """"""
+        self.server = server
+        self.delegate = delegate
+
+    # ----------------------------------------------------------------------
+    def headers_received(self, start_line, headers):
+        self.server.active += 1
+        return self.delegate.headers_received(start_line, headers)
+
+    # ----------------------------------------------------------------------
+    def data_received(self, chunk):
+        return self.delegate.data_received(chunk)
+
+    # ----------------------------------------------------------------------
+    def finish(self):
+        return self.delegate.finish()
+
+    # ----------------------------------------------------------------------
+    def on_connection_close(self):
+        return self.delegate.on_connection_close()
+
+
+########################################################################
+class WorkerHTTPServer(HTTPServer):
+    """HTTP server that counts the requests in flight."""
+
+    # ----------------------------------------------------------------------
+    def initialize(self, *args, **kwargs):
+        super().initialize(*args, **kwargs)
+        self.active = 0
+        self.served = 0
+
+    # ----------------------------------------------------------------------
+    def start_request(self, server_conn, request_conn):
+        # Called for every request a connection may receive, including the
+        # one a keep-alive connection is still waiting for
+        return RequestCounter(self, super().start_request(server_conn, request_conn))
+
+    # ----------------------------------------------------------------------
+    def on_request_finished(self, handler):
+        """Called once the response of a request is finished."""
+        self.active = max(0, self.active - 1)
+        self.served += 1
+
+
+# ----------------------------------------------------------------------
+def run_worker(application, sockets, callbacks, pipe):
+    """Serves requests in a forked process until it receives SIGTERM."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+
+    io_loop = IOLoop.current()
+    server = WorkerHTTPServer(application)
+
+    # Requests are finished from `Application.log_request`
+    log_request = application.log_request
+
+    def on_finish(handler):
+        server.on_request_finished(handler)
+        log_request(handler)
+
+    application.log_request = on_finish
+    server.add_sockets(sockets)
+
+    for callback in callbacks:
+        callback()
+
+    def heartbeat():
+        try:
+            os.write(pipe, f'{server.served}\n'.encode())
+        except BlockingIOError:
+            pass
+
+    PeriodicCallback(heartbeat, heartbeat_interval * 1000).start()
+    heartbeat()
+
+    async def shutdown():
+        # Stop accepting connections and let the requests in flight finish
+        server.stop()
+        deadline = time.monotonic() + shutdown_timeout
+        while server.active and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        io_loop.stop()
+
+    signal.signal(
+        signal.SIGTERM,
+        lambda signum, frame: io_loop.add_callback_from_signal(shutdown),
+    )
+    io_loop.start()
+
+
+########################################################################
+class Worker:
+    """A forked worker, as seen by the parent."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, index, pid, pipe):
+        """"""
+        self.index = index
+        self.pid = pid
+        self.pipe = pipe
+        self.started = time.monotonic()
+        self.heartbeat = self.started
+        self.healthy = False
+        self.stopping = None
+        self.served = 0
+        self.buffer = b''
+
+    # ----------------------------------------------------------------------
+    def read(self):
+        """Reads the pending heartbeats, returns False on end of file."""
+        try:
+            data = os.read(self.pipe, 4096)
+        except BlockingIOError:
+            return True
+        if not data:
+            return False
+
+        *lines, self.buffer = (self.buffer + data).split(b'\n')
+        if lines:
+            self.served = int(lines[-1])
+        self.heartbeat = time.monotonic()
+        self.healthy = True
+        return True
+
+    # ----------------------------------------------------------------------
+    def stop(self):
+        """Asks the worker to finish its requests and exit."""
+        if self.stopping is None:
+            self.stopping = time.monotonic()
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    # ----------------------------------------------------------------------
+    def health(self):
+        """The state of the worker."""
+        now = time.monotonic()
+        return {
+            'index': self.index,
+            'pid': self.pid,
+            'uptime': round(now - self.started, 1),
+            'heartbeat': round(now - self.heartbeat, 1),
+            'healthy': self.healthy,
+            'stopping': self.stopping is not None,
+            'served': self.served,
+        }
+
+
+########################################################################
+class Supervisor:
+    """Forks the workers and keeps them running."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, application, sockets, workers, callbacks=()):
+        """"""
+        self.application = application
+        self.sockets = sockets
+        self.size = workers
+        self.callbacks = list(callbacks)
+        self.workers = {}
+        self.respawn = {}
+        self.restarting = []
+        self.signals = []
+
+    # ----------------------------------------------------------------------
+    def spawn(self, index):
+        """Forks the worker `index`."""
+        read, write = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(read)
+            fcntl.fcntl(write, fcntl.F_SETFL, os.O_NONBLOCK)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+                signal.signal(signum, signal.SIG_DFL)
+            try:
+                run_worker(self.application, self.sockets, self.callbacks, write)
+            except Exception:
+                logger.exception('Worker %s failed', index)
+                os._exit(1)
+            os._exit(0)
+
+        os.close(write)
+        fcntl.fcntl(read, fcntl.F_SETFL, os.O_NONBLOCK)
+        worker = Worker(index, pid, read)
+        self.workers[pid] = worker
+        return worker
+
+    # ----------------------------------------------------------------------
+    def health(self):
+        """The state of every worker."""
+        return sorted(
+            (worker.health() for worker in self.workers.values()),
+            key=lambda health: (health['index'], health['uptime']),
+        )
+
+    # ----------------------------------------------------------------------
+    def run(self):
+        """Supervises the workers until they are all shut down."""
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, lambda signum, frame: self.signals.append(signum))
+
+        for index in range(self.size):
+            self.spawn(index)
+
+        shutdown = False
+        while self.workers:
+            pipes = {worker.pipe: worker for worker in self.workers.values()}
+            readable, _, _ = select.select(list(pipes), [], [], heartbeat_interval)
+            for pipe in readable:
+                pipes[pipe].read()
+
+            while self.signals:
+                signum = self.signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    shutdown = True
+                elif signum == signal.SIGHUP and not shutdown:
+                    logger.info('Restarting %s workers', len(self.workers))
+                    self.restarting = [
+                        worker for worker in self.workers.values() if worker.stopping is None
+                    ]
+                elif signum == signal.SIGUSR1:
+                    for health in self.health():
+                        logger.info('Worker %s', health)
+
+            self.reap(shutdown)
+            now = time.monotonic()
+
+            if shutdown:
+                self.restarting = []
+                for worker in self.workers.values():
+                    worker.stop()
+
+            for worker in list(self.workers.values()):
+                if worker.stopping is None and now - worker.heartbeat > heartbeat_timeout:
+                    logger.warning('Worker %s (%s) is not responding', worker.index, worker.pid)
+                    os.kill(worker.pid, signal.SIGKILL)
+                elif worker.stopping is not None and now - worker.stopping > shutdown_timeout:
+                    os.kill(worker.pid, signal.SIGKILL)
+
+            # Replaces the restarting workers one at a time
+            if self.restarting and all(
+                worker.healthy for worker in self.workers.values() if worker.stopping is None
+            ):
+                old = self.restarting.pop(0)
+                if old.pid in self.workers:
+                    self.spawn(old.index)
+                    old.stop()
+
+            for index, due in list(self.respawn.items()):
+                if shutdown:
+                    del self.respawn[index]
+                elif now >= due:
+                    del self.respawn[index]
+                    self.spawn(index)
+
+    # ----------------------------------------------------------------------
+    def reap(self, shutdown):
+        """Collects the exited workers and schedules their replacement."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.pipe)
+
+            if worker.stopping is None and not shutdown:
+                logger.warning(
+                    'Worker %s (%s) exited with status %s', worker.index, pid, status
+                )
+                # Workers failing on startup are not respawned in a tight loop
+                delay = respawn_delay if time.monotonic() - worker.started < respawn_delay else 0
+                self.respawn[worker.index] = time.monotonic() + delay
+
+
+# ----------------------------------------------------------------------
+def serve_workers(application, sockets, workers, callbacks=()):
+    """
+    Serves `application` from `workers` forked processes.
+
+    Parameters
+    ----------
+    application :
+        The Tornado application, created before forking.
+    sockets :
+        The listening sockets, bound before forking.
+    workers :
+        The number of worker processes.
+    callbacks :
+        Functions called in every worker once it is serving.
+    """
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('[%(levelname)1.1s %(asctime)s prefork] %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+    Supervisor(application, sockets, workers, callbacks).run()
@@ -0,0 +1,242 @@
+"""
+Render
+======
+
+Batched DOM writes for the player.
+
+Every write from Python to the DOM is a Brython to JavaScript crossing that
+can invalidate the layout. `FrameRenderer` records the desired state of each
+target instead, and once per animation frame applies only the values that
+differ from the last committed state.
+"""
+
+from browser import window, document
+
+missing = object()
+
+
+# ----------------------------------------------------------------------
+def build_preview(tabs: list) -> tuple:
+    """
+    Precomputes the preview string of a compiled program.
+
+    Parameters
+    ----------
+    tabs : list
+        The compiled tab tokens.
+
+    Returns
+    -------
+    tuple
+        The tokens joined with ' - ', and the start offset of every token in
+        that string followed by a sentinel offset for the end of the program.
+    """
+    starts = []
+    position = 0
+    for tab in tabs:
+        starts.append(position)
+        position += len(tab) + 3
+    starts.append(position)
+    return ' - '.join(tabs), starts
+
+
+# ----------------------------------------------------------------------
+def preview_window(preview: tuple, start: int, end: int) -> str:
+    """
+    Returns the preview of a window of tokens without joining them.
+
+    Equivalent to `' - '.join(tabs[start:end])`.
+
+    Parameters
+    ----------
+    preview : tuple
+        The preview string and offsets returned by `build_preview`.
+    start : int
+        The index of the first token of the window.
+    end : int
+        The index after the last token of the window.
+
+    Returns
+    -------
+    str
+        The joined tokens of the window.
+    """
+    joined, starts = preview
+    if end <= start:
+        return ''
+    return joined[starts[start] : starts[end] - 3]
+
+
+########################################################################
+class FrameRenderer:
+    """Coalesces DOM writes and commits them once per animation frame."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        """"""
+        self.pending = {}
+        self.committed = {}
+        self.callbacks = []
+        self.frame = None
+
+    # ----------------------------------------------------------------------
+    def write(self, key: str, apply, value) -> None:
+        """
+        Sets the desired value of a target, overriding any pending write.
+
+        Parameters
+        ----------
+        key : str
+            The unique identifier of the target.
+        apply : callable
+            The function that writes the value to the DOM.
+        value : object
+            The desired value.
+
+        Returns
+        -------
+        None
+        """
+        self.pending[key] = (apply, value)
+        self.request_frame()
+
+    # ----------------------------------------------------------------------
+    def text(self, key: str, element, value: str) -> None:
+        """
+        Sets the desired text of an element.
+
+        Parameters
+        ----------
+        key : str
+            The unique identifier of the element.
+        element : object
+            The element.
+        value : str
+            The desired text.
+
+        Returns
+        -------
+        None
+        """
+        self.write(key, lambda value: setattr(element, 'text', value), value)
+
+    # ----------------------------------------------------------------------
+    def value(self, key: str, element, value) -> None:
+        """
+        Sets the desired value of a form control.
+
+        Parameters
+        ----------
+        key : str
+            The unique identifier of the control.
+        element : object
+            The control.
+        value : object
+            The desired value.
+
+        Returns
+        -------
+        None
+        """
+        self.write(key, lambda value: setattr(element, 'value', value), value)
+
+    # ----------------------------------------------------------------------
+    def fill(self, element_id: str, color: str) -> None:
+        """
+        Sets the desired fill color of an SVG element.
+
+        Parameters
+        ----------
+        element_id : str
+            The identifier of the SVG element. Missing elements are ignored.
+        color : str
+            The desired fill color.
+
+        Returns
+        -------
+        None
+        """
+        def apply(value):
+            if element := document.getElementById(element_id):
+                element.style.fill = value
+
+        self.write(f'fill:{element_id}', apply, color)
+
+    # ----------------------------------------------------------------------
+    def after(self, callback) -> None:
+        """
+        Calls `callback` right after the next commit.
+
+        Parameters
+        ----------
+        callback : callable
+            The function to call, without arguments.
+
+        Returns
+        -------
+        None
+        """
+        self.callbacks.append(callback)
+        self.request_frame()
+
+    # ----------------------------------------------------------------------
+    def forget(self, prefix: str = '') -> None:
+        """
+        Forgets the committed state of the targets whose key starts with
+        `prefix`, so their next write is applied unconditionally.
+
+        Used when the DOM is changed outside of the renderer, for instance
+        when the SVG is replaced or a control is moved by the user.
+
+        Parameters
+        ----------
+        prefix : str, optional
+            The prefix of the keys to forget. Defaults to all of them.
+
+        Returns
+        -------
+        None
+        """
+        self.committed = {
+            key: value
+            for key, value in self.committed.items()
+            if not key.startswith(prefix)
+        }
+
+    # ----------------------------------------------------------------------
+    def request_frame(self) -> None:
+        """
+        Schedules a commit on the next animation frame, if not scheduled yet.
+
+        Returns
+        -------
+        None
+        """
+        if self.frame is None:
+            self.frame = window.requestAnimationFrame(self.commit)
+
+    # ----------------------------------------------------------------------
+    def commit(self, timestamp=None) -> None:
+        """
+        Applies the pending writes that differ from the committed state.
+
+        Parameters
+        ----------
+        timestamp : float, optional
+            The frame timestamp passed by `requestAnimationFrame`.
+
+        Returns
+        -------
+        None
+        """
+        self.frame = None
+        pending, self.pending = self.pending, {}
+        callbacks, self.callbacks = self.callbacks, []
+
+        for key, (apply, value) in pending.items():
+            if self.committed.get(key, missing) != value:
+                apply(value)
+                self.committed[key] = value
+
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,329 @@
+"""
+Search
+======
+
+Transposition-invariant melody search over the tabs library.
+
+Every song is reduced to the sequence of intervals between its notes, in
+semitones: the pitch of a tab is its position on the chromatic X-1 scale,
+shifted by the octave of the note equivalence table of the S-1, so S-1 tabs
+and X-1 tabs of the same note have the same pitch. A melody played in any
+key has the same intervals.
+
+The catalog build indexes the interval n-grams of every song in an inverted
+index, written next to `tabs.json` by the catalog build, see library.py. A query is reduced the
+same way, and the songs sharing its n-grams are ranked by the fraction of
+the query they cover, every n-gram weighted by its rarity in the library.
+Queries shorter than an n-gram match the n-grams they start, and every
+song containing them is a full match.
+
+The index is compact JSON, so the browser loads it as is:
+
+- `songs`: the names of the songs, their position is their id.
+- `grams`: every n-gram, one character per interval, mapped to its
+  postings, the ids of the songs containing it, delta encoded, and the
+  number of occurrences, written as variable length integers of
+  `digits`. Postings are only decoded for the n-grams of a query.
+
+This module has no browser imports, like compiler.py.
+"""
+
+import math
+from collections import Counter
+from bisect import bisect_left
+
+from compiler import x1_scale, note_equivalence_mode1, normalize_tabs
+
+index_version = 1
+ngram_size = 4
+max_interval = 24
+search_limit = 10
+
+# One character per interval, from -max_interval to +max_interval, none of
+# them escaped by JSON
+interval_chars = ''.join(
+    chr(code) for code in range(40, 127) if chr(code) != '\\'
+)[: 2 * max_interval + 1]
+
+# Variable length integers, the 32 first digits end a number
+digits = '0123456789abcdefghijklmnopqrstuvABCDEFGHIJKLMNOPQRSTUVWXYZ-_+*.~'
+digit_values = {digit: value for value, digit in enumerate(digits)}
+
+
+# ----------------------------------------------------------------------
+def tab_pitch(tab: str):
+    """
+    Returns the pitch of a tab, in semitones.
+
+    Parameters
+    ----------
+    tab : str
+        An S-1 or X-1 tab.
+
+    Returns
+    -------
+    int or None
+        The position of the note on the chromatic X-1 scale, relative to the
+        first tab of the S-1, or None if the tab is not a note.
+    """
+    if tab not in note_equivalence_mode1:
+        return None
+    position, octave = note_equivalence_mode1[tab]
+    return x1_scale.index(position) + 12 * int(octave)
+
+
+pitches = {tab: tab_pitch(tab) for tab in note_equivalence_mode1}
+interval_codes = {
+    interval: interval_chars[max(-max_interval, min(max_interval, interval)) + max_interval]
+    for interval in range(-len(x1_scale) - 12, len(x1_scale) + 13)
+}
+
+
+# ----------------------------------------------------------------------
+def token_pitch(tab: str):
+    """
+    Returns the pitch of a tab of the tabs, in semitones.
+
+    Unlike `tab_pitch`, the tab may carry the octave prefix of a
+    transposition, `+1:` for a tab shown one octave up and `-1:` for one
+    shown one octave down, see `compiler.transpose_tab`. `normalize_tabs`
+    drops the dashes, so `1:` is read as `-1:`.
+
+    Parameters
+    ----------
+    tab : str
+        A tab, possibly prefixed.
+
+    Returns
+    -------
+    int or None
+        The pitch of the note, or None if the tab is not a note.
+    """
+    octave = 0
+    prefix, colon, shown = tab.partition(':')
+    if colon and prefix in ('+1', '-1', '1'):
+        # Shown one octave up, or down, to stay on the scale
+        octave = -12 if prefix == '+1' else 12
+        tab = shown
+    if tab not in pitches:
+        return None
+    return pitches[tab] + octave
+
+
+# ----------------------------------------------------------------------
+def tabs_intervals(tabs: str) -> str:
+    """
+    Reduces raw tabs to their intervals.
+
+    Parameters
+    ----------
+    tabs : str
+        The raw tabs, repeats are expanded.
+
+    Returns
+    -------
+    str
+        One character of `interval_chars` per interval between consecutive
+        notes, clamped to `max_interval`.
+    """
+    # Line breaks are not notes, every token is split on whitespace
+    notes = [token_pitch(tab) for tab in normalize_tabs(tabs).split()]
+    notes = [pitch for pitch in notes if pitch is not None]
+    return ''.join(
+        interval_codes[pitch - previous] for previous, pitch in zip(notes, notes[1:])
+    )
+
+
+# ----------------------------------------------------------------------
+def encode_numbers(numbers) -> str:
+    """Writes non-negative integers as variable length integers."""
+    encoded = []
+    for number in numbers:
+        if number < 32:
+            encoded.append(digits[number])
+            continue
+        while number >= 32:
+            encoded.append(digits[32 + number % 32])
+            number //= 32
+        encoded.append(digits[number])
+    return ''.join(encoded)
+
+
+# ----------------------------------------------------------------------
+def decode_numbers(encoded: str) -> list:
+    """Reads the integers written by `encode_numbers`."""
+    numbers = []
+    number = 0
+    scale = 1
+    for digit in encoded:
+        value = digit_values[digit]
+        if value >= 32:
+            number += (value - 32) * scale
+            scale *= 32
+        else:
+            numbers.append(number + value * scale)
+            number = 0
+            scale = 1
+    return numbers
+
+
+# ----------------------------------------------------------------------
+def build_index(intervals: dict, size: int = ngram_size) -> dict:
+    """
+    Builds the search index of a library.
+
+    Parameters
+    ----------
+    intervals : dict
+        The intervals of every song, see `tabs_intervals`, by filename.
+    size : int, optional
+        The number of intervals of an n-gram.
+
+    Returns
+    -------
+    dict
+        The index, ready to be written as JSON.
+    """
+    postings = {}
+    songs = []
+    for song_id, (name, song) in enumerate(intervals.items()):
+        songs.append(name.removesuffix('.txt'))
+        counts = Counter(song[start : start + size] for start in range(len(song) - size + 1))
+        for gram, count in counts.items():
+            postings.setdefault(gram, []).append((song_id, count))
+
+    grams = {}
+    for gram in sorted(postings):
+        numbers = []
+        previous = 0
+        for song_id, count in postings[gram]:
+            numbers += [song_id - previous, count]
+            previous = song_id
+        grams[gram] = encode_numbers(numbers)
+
+    return {
+        'version': index_version,
+        'size': size,
+        'songs': songs,
+        'grams': grams,
+    }
+
+
+########################################################################
+class SearchIndex:
+    """Ranked queries over an index built by `build_index`."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self, index: dict):
+        """"""
+        self.size = index['size']
+        self.songs = index['songs']
+        self.grams = index['grams']
+        self.decoded = {}
+        self.keys = None
+
+    # ----------------------------------------------------------------------
+    def postings(self, gram: str) -> list:
+        """The songs containing an n-gram, as `(song_id, count)` pairs."""
+        if gram not in self.decoded:
+            numbers = decode_numbers(self.grams.get(gram, ''))
+            pairs = []
+            song_id = 0
+            for i in range(0, len(numbers), 2):
+                song_id += numbers[i]
+                pairs.append((song_id, numbers[i + 1]))
+            self.decoded[gram] = pairs
+        return self.decoded[gram]
+
+    # ----------------------------------------------------------------------
+    def prefixed(self, prefix: str) -> list:
+        """The n-grams starting with the intervals of a short query."""
+        if self.keys is None:
+            self.keys = sorted(self.grams)
+        grams = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            grams.append(self.keys[i])
+            i += 1
+        return grams
+
+    # ----------------------------------------------------------------------
+    def search(self, tabs: str, limit: int = search_limit) -> list:
+        """
+        Finds the songs containing a fragment, in any key.
+
+        Parameters
+        ----------
+        tabs : str
+            The fragment, as S-1 or X-1 tabs.
+        limit : int, optional
+            The maximum number of matches.
+
+        Returns
+        -------
+        list
+            `(name, score)` pairs by decreasing score, the score being the
+            weighted fraction of the n-grams of the fragment found in the
+            song, from 0 to 1.
+        """
+        intervals = tabs_intervals(tabs)
+        if not intervals:
+            return []
+
+        if len(intervals) < self.size:
+            return self.search_prefix(intervals, limit)
+
+        query = {}
+        for start in range(len(intervals) - self.size + 1):
+            gram = intervals[start : start + self.size]
+            query[gram] = query.get(gram, 0) + 1
+
+        scores = {}
+        best = 0
+        for gram, count in query.items():
+            weight = self.weight(gram)
+            best += weight * count
+            for song_id, occurrences in self.postings(gram):
+                scores[song_id] = scores.get(song_id, 0) + weight * min(count, occurrences)
+        if not best:
+            return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.songs[item[0]]))
+        return [(self.songs[song_id], min(1, score / best)) for song_id, score in ranked[:limit]]
+
+    # ----------------------------------------------------------------------
+    def search_prefix(self, intervals: str, limit: int = search_limit) -> list:
+        """
+        Finds the songs containing a fragment shorter than an n-gram.
+
+        Every song with an n-gram starting with the fragment contains the
+        whole fragment, so all of them score 1. The rarity of the rarest
+        n-gram matched in a song only breaks the ties, songs matched by
+        rarer n-grams come first.
+
+        Parameters
+        ----------
+        intervals : str
+            The intervals of the fragment, see `tabs_intervals`.
+        limit : int, optional
+            The maximum number of matches.
+
+        Returns
+        -------
+        list
+            `(name, 1)` pairs.
+        """
+        rarity = {}
+        for gram in self.prefixed(intervals):
+            weight = self.weight(gram)
+            for song_id, _ in self.postings(gram):
+                rarity[song_id] = max(rarity.get(song_id, 0), weight)
+
+        ranked = sorted(rarity.items(), key=lambda item: (-item[1], self.songs[item[0]]))
+        return [(self.songs[song_id], 1) for song_id, _ in ranked[:limit]]
+
+    # ----------------------------------------------------------------------
+    def weight(self, gram: str) -> float:
+        """The rarity of an n-gram in the library."""
+        postings = self.postings(gram)
+        return math.log(1 + len(self.songs) / len(postings)) if postings else 0
@@ -0,0 +1,180 @@
+"""
+Server Load
+===========
+
+Local load generator for the worker processes of `appserver.serve`.
+
+Concurrent clients post songs to `/api/compile` as fast as they are
+answered, every song made unique by a comment so the compile cache does not
+answer it. The report gives the throughput, the latency of the answers and
+their status, where 503 is a call rejected by a full executor, see
+executor.py.
+
+Starts a prefork server of the endpoints of api.py, see prefork.py, for
+every number of `--workers`, or runs against a running assistant with
+`--url http://localhost:5000/stylophone-assistant`.
+"""
+
+import os
+import glob
+import time
+import signal
+import asyncio
+import logging
+import argparse
+import statistics
+from collections import Counter
+from urllib.parse import urlencode
+
+from tornado.web import Application
+from tornado.netutil import bind_sockets
+from tornado.httpclient import AsyncHTTPClient
+
+from api import api_handlers, compile_path
+from library import tabs_path
+from prefork import serve_workers
+
+domain = '/stylophone-assistant'
+startup_timeout = 10
+
+
+# ----------------------------------------------------------------------
+def start_server(workers: int) -> tuple:
+    """
+    Forks a prefork server of the endpoints on a free local port.
+
+    Parameters
+    ----------
+    workers : int
+        The number of worker processes.
+
+    Returns
+    -------
+    tuple
+        The URL of the application and the pid of the supervisor.
+    """
+    sockets = bind_sockets(0, '127.0.0.1')
+    port = sockets[0].getsockname()[1]
+
+    pid = os.fork()
+    if pid == 0:
+        serve_workers(Application(api_handlers(domain)), sockets, workers)
+        os._exit(0)
+
+    for sock in sockets:
+        sock.close()
+    return f'http://127.0.0.1:{port}{domain}', pid
+
+
+# ----------------------------------------------------------------------
+def stop_server(pid: int) -> None:
+    """Shuts down the workers of `start_server` gracefully."""
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+# ----------------------------------------------------------------------
+async def wait_server(url: str) -> None:
+    """Waits for the server to answer."""
+    http = AsyncHTTPClient()
+    deadline = time.monotonic() + startup_timeout
+    while True:
+        try:
+            await http.fetch(f'{url}{compile_path}', method='POST', body='tabs=1')
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+# ----------------------------------------------------------------------
+async def client(url: str, song: str, stats: dict, deadline: float) -> None:
+    """
+    Posts songs until the deadline, recording the answers.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the application.
+    song : str
+        The raw tabs of the song.
+    stats : dict
+        Shared counters and latencies.
+    deadline : float
+        The `time.monotonic` to stop at.
+    """
+    http = AsyncHTTPClient()
+    while time.monotonic() < deadline:
+        stats['sent'] += 1
+        body = urlencode({'tabs': f"# {stats['sent']}\n{song}", 'transpose': '2'})
+        start = time.monotonic()
+        response = await http.fetch(
+            f'{url}{compile_path}', method='POST', body=body, raise_error=False
+        )
+        stats['latency'].append((time.monotonic() - start) * 1000)
+        stats['status'][response.code] += 1
+
+
+# ----------------------------------------------------------------------
+async def run(url: str, song: str, args) -> None:
+    """Runs the load test against `url` and prints the report."""
+    AsyncHTTPClient.configure(None, max_clients=args.clients)
+    await wait_server(url)
+
+    stats = {'sent': 0, 'status': Counter(), 'latency': []}
+    start = time.monotonic()
+    await asyncio.gather(
+        *(client(url, song, stats, start + args.duration) for _ in range(args.clients))
+    )
+    elapsed = time.monotonic() - start
+
+    latency = sorted(stats['latency'])
+    answered = stats['status'][200]
+    print(f'Requests: {len(latency)} in {elapsed:.1f} s, {answered / elapsed:.1f} compiled/s')
+    print(f"Status: {dict(sorted(stats['status'].items()))}")
+    if latency:
+        print(
+            'Latency (ms): '
+            f'p50 {statistics.median(latency):.1f}, '
+            f'p99 {latency[int(len(latency) * 0.99) - 1]:.1f}, '
+            f'max {latency[-1]:.1f}'
+        )
+
+
+# ----------------------------------------------------------------------
+def main() -> None:
+    """"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--url', help='URL of the application, prefork servers by default')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--song', help='tabs file, the longest song of the library by default')
+    parser.add_argument('--repeat', type=int, default=4, help='times the song is repeated')
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    args = parser.parse_args()
+
+    # 503 and 504 answers are reported, not logged
+    logging.getLogger('tornado.access').setLevel(logging.ERROR)
+
+    filename = args.song or max(glob.glob(f'{tabs_path}/*.txt'), key=os.path.getsize)
+    with open(filename, encoding='utf-8') as file:
+        song = '\n'.join([file.read()] * args.repeat)
+    print(f'Song: {os.path.basename(filename)}, {song.count(chr(10)) + 1} lines')
+    print(f'Clients: {args.clients}, CPUs: {os.cpu_count()}')
+
+    if args.url:
+        asyncio.run(run(args.url.rstrip('/'), song, args))
+        return
+
+    for workers in args.workers:
+        print(f'\nWorkers: {workers}')
+        url, pid = start_server(workers)
+        try:
+            asyncio.run(run(url, song, args))
+        finally:
+            stop_server(pid)
+
+
+if __name__ == '__main__':
+    main()
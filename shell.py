@@ -0,0 +1,275 @@
+"""
+Shell
+=====
+
+Static markup of the assistant page.
+
+The same markup is prerendered by the server into `index.html`, with the
+default X-1 stylophone inline, so the first paint does not wait for Brython
+to start. `StylophoneAssistant` then hydrates it: it looks the controls up by
+their `id` and binds the handlers to them instead of building them again.
+When the page is served without the prerendered shell, it is inserted from
+the browser before hydration.
+
+This module has no browser imports, so it runs under CPython and Brython.
+"""
+
+import re
+from typing import Optional
+
+default_stylophone = 'assets/stylophone_x1_tabs.svg'
+github_url = 'https://github.com/YeisonCardona/stylophone-assistant'
+# The tabs of the toolbar with a panel, the first one is the default
+panels = ('assistant', 'tunning')
+
+header_text = """
+<strong>Stylophone Assistant</strong> is your go-to platform for enhancing your <strong>Stylophone</strong> practice. This tool allows you to input <strong>tabs</strong> for your favorite melodies and generates a dynamic <strong>animation</strong> compatible with both the <strong>S-1</strong> and <strong>Gen X-1</strong> models. Whether you're a <strong>beginner</strong> or an <strong>experienced player</strong>, the interactive interface helps you <strong>visualize</strong> and follow along with ease. Practice at your own pace, toggle <strong>octaves</strong>, and refine your <strong>skills</strong> while having fun with your <strong>Stylophone</strong>.
+"""
+
+svg_prolog = re.compile(r'^\s*(<\?xml[^>]*\?>\s*)?(<!--.*?-->\s*)*', re.DOTALL)
+svg_tag = re.compile(r'<svg\b[^>]*>', re.DOTALL)
+svg_width = re.compile(r'\swidth="[^"]*"')
+
+
+# ----------------------------------------------------------------------
+def icon_source(name: str, icons: Optional[str] = None) -> str:
+    """
+    Returns the attributes that load an icon in a Web Awesome component.
+
+    Parameters
+    ----------
+    name : str
+        The name of the icon.
+    icons : str, optional
+        The URL of the self-hosted icons, see vendor.py.
+
+    Returns
+    -------
+    str
+        The `src` of the self-hosted icon, or the `name` of the icon in the
+        default library.
+    """
+    if icons:
+        return f'src="{icons}/{name}.svg"'
+    return f'name="{name}"'
+
+
+# ----------------------------------------------------------------------
+def responsive_svg(svg: str) -> str:
+    """
+    Prepares a stylophone SVG to be inlined in the page.
+
+    The XML prolog is dropped and the root element is scaled to the width
+    of its container, keeping its aspect ratio.
+
+    Parameters
+    ----------
+    svg : str
+        The content of the SVG file.
+
+    Returns
+    -------
+    str
+        The SVG markup.
+    """
+    svg = svg_prolog.sub('', svg, count=1)
+
+    def scale(match):
+        tag = svg_width.sub('', match.group(0), count=1)
+        return tag.replace(
+            '<svg', '<svg width="100%" preserveAspectRatio="xMidYMid meet"', 1
+        )
+
+    return svg_tag.sub(scale, svg, count=1)
+
+
+# ----------------------------------------------------------------------
+def build_shell(
+    song: str,
+    icons: Optional[str] = None,
+    stylophone: str = '',
+    tab: str = 'assistant',
+) -> str:
+    """
+    Builds the markup of the assistant page.
+
+    Parameters
+    ----------
+    song : str
+        The name of the default custom song.
+    icons : str, optional
+        The URL of the self-hosted icons, see vendor.py.
+    stylophone : str, optional
+        The SVG markup of the initial stylophone, as returned by
+        `responsive_svg`. Defaults to an empty container.
+    tab : str, optional
+        The initially active tab, one of `panels`. Defaults to 'assistant',
+        which also replaces any other value.
+
+    Returns
+    -------
+    str
+        The HTML of the header, the panels and the footer.
+    """
+    if tab not in panels:
+        tab = panels[0]
+
+    delays = ''.join(
+        f'<wa-option value="{i}">Gap: {i / 1000 :.1f} s</wa-option>'
+        for i in range(100, 3001, 100)
+    )
+
+    return f"""
+<div class="container-fluid" id="sa-header">
+  <div class="row sa-header">
+    <div class="col-sm-12"><h1 class="header-title">STYLOPHONE ASSISTANT</h1></div>
+    <div class="col-sm-12 sa-toolbar">
+      <wa-tab-group id="sa-toolbar" active="{tab}">
+        <wa-tab class="sa-auto-show" sa-tab-to-show="sa-tab-assistant" slot="nav" panel="assistant">Assistant</wa-tab>
+        <wa-tab class="sa-auto-show" sa-tab-to-show="sa-tab-tunning" slot="nav" panel="tunning">Tunning</wa-tab>
+        <wa-tab slot="nav"><a class="sa-tab-link" href="{github_url}">GitHub</a></wa-tab>
+      </wa-tab-group>
+    </div>
+  </div>
+</div>
+
+<div class="container sa-tabs sa-tab-tunning" id="sa-panel-tunning" style="display: none;"></div>
+
+<div class="container sa-tabs sa-tab-assistant">
+  <div class="row">
+    <div class="col-md-12">
+      <span class="sa-paragraph">{header_text}</span>
+      <hr>
+    </div>
+    <div class="col-md-4">
+      <wa-select id="sa-select-gen" label="Stylophone" value="x1" style="margin-top: 15px;">
+        <wa-option value="s1">Gen S-1</wa-option>
+        <wa-option value="x1">Gen X-1</wa-option>
+        <wa-option value="both">Both</wa-option>
+      </wa-select>
+    </div>
+    <div class="col-md-4">
+      <wa-select id="sa-select-style" label="Style" value="tabs" style="margin-top: 15px;">
+        <wa-option value="tabs">Tabs</wa-option>
+        <wa-option value="solfege">Solfège</wa-option>
+        <wa-option value="kids">American</wa-option>
+      </wa-select>
+    </div>
+  </div>
+
+  <div class="row">
+    <div class="col-md-4">
+      <wa-select id="sa-select-tab" label="Load tabs" value="custom" style="margin-top: 15px;">
+        <wa-option value="custom" id="id-custom" song="{song}">{song}</wa-option>
+      </wa-select>
+    </div>
+    <div class="col-md-4">
+      <wa-select id="sa-select-fit" label="Fits" value="all" style="margin-top: 15px;">
+        <wa-option value="all">Any stylophone</wa-option>
+        <wa-option value="s1">Gen S-1</wa-option>
+        <wa-option value="x1">Gen X-1</wa-option>
+        <wa-option value="x1_8va">Gen X-1 -1 Octave</wa-option>
+      </wa-select>
+    </div>
+    <div class="col-md-4" style="margin-top: 40px; display: flex;">
+      <wa-icon-button id="sa-button-new-song" {icon_source('plus', icons)} label="Save as new song"></wa-icon-button>
+      <wa-icon-button id="sa-button-delete-song" {icon_source('trash', icons)} label="Delete song"></wa-icon-button>
+    </div>
+  </div>
+
+  <div class="row">
+    <div class="col-md-8" style="margin-top: 15px;">
+      <wa-textarea id="sa-textarea-search" label="Find by melody" placeholder="Type a fragment in any key" rows="1" resize="none" spellcheck="false"></wa-textarea>
+    </div>
+    <div class="col-md-4" style="margin-top: 15px;">
+      <wa-select id="sa-select-match" label="Matches" placeholder="No matches"></wa-select>
+    </div>
+  </div>
+
+  <div class="row">
+    <div class="col-md-12" style="margin-top: 15px;">
+      <wa-textarea id="sa-textarea-tabs" label="Tabs" resize="auto" spellcheck="false"></wa-textarea>
+    </div>
+  </div>
+
+  <div class="row" style="margin-top: 20px;">
+    <div class="col-md-3" style="margin-top: 15px;">
+      <wa-switch id="sa-switch-transpose">Transpose Tabs (Chromatic)</wa-switch>
+    </div>
+    <div class="col-md-9" style="margin-top: -5px;">
+      <wa-range id="sa-range-transpose" min="-12" max="+12" step="1" value="0" style="--track-active-offset: 50%; margin-top: 20px; display: none;"></wa-range>
+    </div>
+    <div class="col-md-12" style="margin-top: 15px;">
+      <wa-textarea id="sa-textarea-transpose" label="Transposed Tabs" resize="auto" spellcheck="false" style="display: none;"></wa-textarea>
+      <wa-switch id="sa-switch-transpose-model" checked style="margin-top: 10px; display: none;">Transpose for X-1</wa-switch>
+      <hr>
+    </div>
+  </div>
+
+  <div class="row">
+    <div class="col-md-12" style="margin-top: 15px;">
+      <wa-switch id="sa-switch-x1-8va">Gen X-1 -1 Octave</wa-switch>
+    </div>
+    <div class="col-md-12" style="margin-top: 15px;">
+      <div id="sa-stylophone" style="width: 100%;">{stylophone}</div>
+    </div>
+  </div>
+
+  <div class="row tabs-line">
+    <div class="col-5" style="text-align: right; margin-top: 10px;">
+      <span id="sa-tabs-pre" class="--wa-font-sans" style="flex: none">...</span>
+    </div>
+    <div class="col-2" style="text-align: center;">
+      <span id="sa-tabs-current" class="--wa-font-sans" style="flex: none; color: var(--wa-color-primary-600); font-size: 2rem;">#</span>
+    </div>
+    <div class="col-5" style="text-align: left; margin-top: 10px;">
+      <span id="sa-tabs-post" class="--wa-font-sans" style="flex: none">...</span>
+    </div>
+  </div>
+
+  <div class="row sa-player" style="margin-top: 30px;">
+    <div class="col-2 col-sm-2 col-md-1 sa-icon-button" style="display: flex;">
+      <wa-icon-button id="sa-button-start" {icon_source('play', icons)} style="font-size: 3rem;"></wa-icon-button>
+      <wa-icon-button id="sa-button-stop" {icon_source('stop', icons)} style="font-size: 3rem; display: none"></wa-icon-button>
+    </div>
+    <div class="col-4 col-sm-7 col-md-9 sa-range-tabs">
+      <wa-range id="sa-range-progress" min="0" max="100" step="1" value="0"></wa-range>
+    </div>
+    <div class="col-6 col-sm-3 col-md-2 sa-gap" style="margin-top: 4px;">
+      <wa-select id="sa-select-delay" pill value="500">{delays}</wa-select>
+    </div>
+  </div>
+</div>
+
+<div class="container-fluid sa-footer">
+  <span>
+    Made with <wa-icon {icon_source('heart', icons)}></wa-icon> by <a href='https://dunderlab.com/'>DunderLab</a><br>
+    This site has been built using <a href='https://radiant-framework.readthedocs.io/en/latest/'>Radiant Framework</a> technology<br>
+    ©2024. Some rights reserved under the Creative Commons Attribution-ShareAlike 4.0 International License (CC BY-SA 4.0)
+  </span>
+</div>
+"""
+
+
+# ----------------------------------------------------------------------
+def prerender_shell(song: str, icons: Optional[str] = None) -> str:
+    """
+    Prerenders the page with the default stylophone inline.
+
+    Runs on the server, which reads the SVG from the application root.
+
+    Parameters
+    ----------
+    song : str
+        The name of the default custom song.
+    icons : str, optional
+        The URL of the self-hosted icons, see vendor.py.
+
+    Returns
+    -------
+    str
+        The HTML of the page.
+    """
+    with open(default_stylophone, 'r', encoding='utf-8') as file:
+        stylophone = responsive_svg(file.read())
+    return build_shell(song, icons, stylophone)
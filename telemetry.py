@@ -0,0 +1,306 @@
+"""
+Telemetry
+=========
+
+Playback jitter and missed-deadline telemetry.
+
+For every note the player records the time it was scheduled for against the
+time the highlight was actually applied, and the same for the release of the
+key. Jitter is accumulated in fixed-width histograms, so running percentiles
+cost constant memory regardless of the session length.
+
+Telemetry is enabled with `localStorage.telemetry = 'true'` and a page
+reload, which also shows an on-screen overlay with a link to download the
+session report.
+"""
+
+from browser import window, document
+from browser.local_storage import storage
+from radiant.framework import html
+import json
+
+try:
+    enabled = storage.get('telemetry', 'false') == 'true'
+except AttributeError:
+    # Fake browser modules, when imported by the server under CPython
+    enabled = False
+bin_ms = 1
+bins = 2000
+
+
+########################################################################
+class JitterHistogram:
+    """Histogram of jitter values with running percentiles."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        """"""
+        self.reset()
+
+    # ----------------------------------------------------------------------
+    def reset(self) -> None:
+        """
+        Discards all the recorded values.
+
+        Returns
+        -------
+        None
+        """
+        self.counts = [0] * (bins + 1)
+        self.count = 0
+        self.max = 0.0
+
+    # ----------------------------------------------------------------------
+    def add(self, value: float) -> None:
+        """
+        Records a jitter value.
+
+        Parameters
+        ----------
+        value : float
+            The jitter in milliseconds. Negative values (early callbacks) are
+            recorded as zero, values beyond the last bin in the overflow bin.
+
+        Returns
+        -------
+        None
+        """
+        value = max(0.0, value)
+        self.counts[min(bins, int(value / bin_ms))] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    # ----------------------------------------------------------------------
+    def percentile(self, p: float) -> float:
+        """
+        Returns the value below which `p` percent of the jitter values fall.
+
+        Parameters
+        ----------
+        p : float
+            The percentile, between 0 and 100.
+
+        Returns
+        -------
+        float
+            The upper bound of the bin containing the percentile, in
+            milliseconds, or 0 if nothing was recorded.
+        """
+        if not self.count:
+            return 0.0
+
+        target = p / 100 * self.count
+        accumulated = 0
+        for i, count in enumerate(self.counts):
+            accumulated += count
+            if accumulated >= target:
+                return min(self.max, (i + 1) * bin_ms)
+        return self.max
+
+    # ----------------------------------------------------------------------
+    def summary(self) -> dict:
+        """
+        Returns the percentiles of the recorded jitter.
+
+        Returns
+        -------
+        dict
+            The number of values, p50, p95, p99 and max jitter in milliseconds.
+        """
+        return {
+            'count': self.count,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+########################################################################
+class PlaybackTelemetry:
+    """Per-note scheduling telemetry of the player."""
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        """"""
+        self.highlight = JitterHistogram()
+        self.release = JitterHistogram()
+        self.dropped = 0
+        self.gap = 0.0
+        self.overlay = None
+
+        if enabled:
+            self.overlay = html.DIV(
+                style='position: fixed; bottom: 10px; right: 10px; z-index: 100; '
+                'padding: 10px; background-color: rgba(0, 0, 0, 0.8); color: white; '
+                'font-family: monospace; font-size: 12px; white-space: pre;'
+            )
+            self.overlay_text = html.SPAN()
+            self.overlay <= self.overlay_text
+            link = html.A('Download report', href='#', style='color: white;')
+            link.bind('click', self.download)
+            self.overlay <= html.BR()
+            self.overlay <= link
+            document.select_one('body') <= self.overlay
+            self.render()
+
+    # ----------------------------------------------------------------------
+    def start(self, gap: float) -> None:
+        """
+        Starts a new playback session.
+
+        Parameters
+        ----------
+        gap : float
+            The gap between notes in milliseconds.
+
+        Returns
+        -------
+        None
+        """
+        if not enabled:
+            return
+
+        self.highlight.reset()
+        self.release.reset()
+        self.dropped = 0
+        self.gap = gap
+        self.render()
+
+    # ----------------------------------------------------------------------
+    def schedule(self, delay: float):
+        """
+        Returns the time a callback scheduled now with `delay` is due.
+
+        Parameters
+        ----------
+        delay : float
+            The delay of the callback in milliseconds.
+
+        Returns
+        -------
+        float or None
+            The due timestamp in milliseconds, or None when disabled.
+        """
+        if not enabled:
+            return None
+        return window.performance.now() + delay
+
+    # ----------------------------------------------------------------------
+    def on_highlight(self, scheduled, gap: float) -> None:
+        """
+        Records the highlight of a note.
+
+        A note highlighted a full gap or more after its scheduled time is
+        counted as dropped, since its slot was taken by the next note.
+
+        Parameters
+        ----------
+        scheduled : float or None
+            The timestamp the note was scheduled for, as returned by
+            `schedule`.
+        gap : float
+            The gap between notes in milliseconds.
+
+        Returns
+        -------
+        None
+        """
+        if scheduled is None:
+            return
+
+        jitter = window.performance.now() - scheduled
+        self.highlight.add(jitter)
+        if jitter >= gap:
+            self.dropped += 1
+        self.render()
+
+    # ----------------------------------------------------------------------
+    def on_release(self, scheduled) -> None:
+        """
+        Records the release of a note.
+
+        Parameters
+        ----------
+        scheduled : float or None
+            The timestamp the release was scheduled for, as returned by
+            `schedule`.
+
+        Returns
+        -------
+        None
+        """
+        if scheduled is None:
+            return
+        self.release.add(window.performance.now() - scheduled)
+
+    # ----------------------------------------------------------------------
+    def render(self) -> None:
+        """
+        Updates the overlay with the current statistics.
+
+        Returns
+        -------
+        None
+        """
+        if self.overlay is None:
+            return
+
+        highlight = self.highlight.summary()
+        release = self.release.summary()
+        self.overlay_text.text = (
+            f"gap      {self.gap:.0f} ms\n"
+            f"notes    {highlight['count']}  dropped {self.dropped}\n"
+            f"jitter   p50 {highlight['p50']:.0f}  p95 {highlight['p95']:.0f}  "
+            f"max {highlight['max']:.1f} ms\n"
+            f"release  p50 {release['p50']:.0f}  p95 {release['p95']:.0f}  "
+            f"max {release['max']:.1f} ms"
+        )
+
+    # ----------------------------------------------------------------------
+    def report(self) -> dict:
+        """
+        Returns the report of the current session.
+
+        Returns
+        -------
+        dict
+            The device information, gap, dropped notes, and the jitter
+            percentiles and histograms of highlights and releases.
+        """
+        return {
+            'user_agent': window.navigator.userAgent,
+            'hardware_concurrency': window.navigator.hardwareConcurrency,
+            'gap': self.gap,
+            'dropped': self.dropped,
+            'bin_ms': bin_ms,
+            'highlight': self.highlight.summary(),
+            'release': self.release.summary(),
+            'highlight_histogram': self.highlight.counts,
+            'release_histogram': self.release.counts,
+        }
+
+    # ----------------------------------------------------------------------
+    def download(self, event=None) -> None:
+        """
+        Downloads the report of the current session as a JSON file.
+
+        Parameters
+        ----------
+        event : optional
+            The triggering event, if applicable. Defaults to None.
+
+        Returns
+        -------
+        None
+        """
+        if event:
+            event.preventDefault()
+
+        blob = window.Blob.new([json.dumps(self.report())], {'type': 'application/json'})
+        url = window.URL.createObjectURL(blob)
+        link = window.document.createElement('a')
+        link.href = url
+        link.download = 'stylophone-telemetry.json'
+        link.click()
+        window.URL.revokeObjectURL(url)
@@ -0,0 +1,112 @@
+"""
+The ABC corpus importer, see abcnotation.py.
+"""
+
+import io
+import json
+
+import pytest
+
+from abcnotation import abc_to_tabs, import_corpus, iter_tunes
+from compiler import normalize_tabs
+
+header = 'X:1\nT:Tune\nM:4/4\nL:1/4\nK:{key}\n'
+
+
+# ----------------------------------------------------------------------
+def tabs(body: str, key: str = 'C') -> list:
+    """The lines of tabs of a tune, without the header comments."""
+    title, content = abc_to_tabs(header.format(key=key) + body + '\n')
+    assert title == 'Tune'
+    return [line for line in content.split('\n') if line and not line.startswith('#')]
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize(
+    'body, expected',
+    [
+        # Back to the start of the tune
+        ('CDEF :| GABc |]', ['(3 4 5 6)x2', '7 8 9 10']),
+        ('|: CDEF :| GABc |]', ['(3 4 5 6)x2', '7 8 9 10']),
+        # `::` ends a repeat and starts the next one
+        ('|: CD :: EF :| G4 |]', ['(3 4)x2', '(5 6)x2', '7']),
+        ('CD | EF |: GA :|]', ['3 4 5 6', '(7 8)x2']),
+    ],
+)
+def test_repeats(body, expected):
+    """"""
+    assert tabs(body) == expected
+
+
+# ----------------------------------------------------------------------
+def test_expanded_repeats():
+    """"""
+    lines = tabs('|: CD :: EF :| G4 |]')
+    assert normalize_tabs('\n'.join(lines)).split() == '3 4 3 4 5 6 5 6 7'.split()
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize(
+    'body, expected',
+    [
+        ('|: CD |1 EF :|2 GA |]', ['3 4 5 6', '3 4 7 8']),
+        ('|: CD |1 EF :|2 GA | B4 |]', ['3 4 5 6', '3 4 7 8 9']),
+        ('CD |: EF |1 GA :|2 Bc |]', ['3 4 5 6 7 8', '5 6 9 10']),
+    ],
+)
+def test_endings(body, expected):
+    """"""
+    lines = tabs(body)
+    assert '(' not in ' '.join(lines)
+    assert lines == expected
+
+
+# ----------------------------------------------------------------------
+def test_notes():
+    """"""
+    # The key signature, and accidentals lasting until the bar line
+    assert tabs('GABc | dcBA | F=F F2 |]', 'G') == ['7 8 9 10 11 10 9 8 6.5 6 6']
+    assert tabs('^F F F2 | F4 |]') == ['6.5 6.5 6.5 6']
+    # Chords keep their highest note
+    assert tabs('[CEG] [DF] E2 | C4 |]') == ['7 6 5 3']
+
+
+# ----------------------------------------------------------------------
+def test_iter_tunes():
+    """"""
+    corpus = 'Free text\n\nX:1\nT:A\nK:C\nCDEF|\n\nNotes between tunes\nX:2\nT:B\nK:C\nGABc|\n'
+    assert list(iter_tunes(io.StringIO(corpus))) == [
+        'X:1\nT:A\nK:C\nCDEF|\n',
+        'X:2\nT:B\nK:C\nGABc|\n',
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_import_corpus(tmp_path):
+    """"""
+    corpus = tmp_path / 'corpus.abc'
+    tunes = [
+        'X:1\nT:Tetris Theme\nK:C\nCDEF GABc|\n',
+        'X:2\nT:tetris theme\nK:C\ncBAG FEDC|\n',
+        'X:3\nT:Too short\nK:C\nC|\n',
+        'X:4\nT:A/B: tune?\nK:C\nCEGc cGEC|\n',
+    ]
+    corpus.write_text('\n'.join(tunes))
+    output = tmp_path / 'tabs'
+    output.mkdir()
+    (output / 'Tetris Theme.txt').write_text('1 2 3')
+
+    result = import_corpus(str(corpus), str(output), workers=1)
+    assert result == {'imported': 3, 'skipped': 1}
+    # Never overwritten, even when the titles only differ in case
+    assert (output / 'Tetris Theme.txt').read_text() == '1 2 3'
+
+    with open(output / 'tabs.json', 'r') as file:
+        library = json.load(file)
+    assert sorted(library) == [
+        'A-B- tune-.txt',
+        'Tetris Theme (2).txt',
+        'Tetris Theme.txt',
+        'tetris theme (3).txt',
+    ]
+    assert library['Tetris Theme (2).txt'].startswith('# Tetris Theme')
@@ -0,0 +1,151 @@
+"""
+The compile endpoint and the server calls of the assistant, see api.py.
+"""
+
+import os
+import json
+from urllib.parse import urlencode
+
+import pytest
+
+pytest.importorskip('radiant.framework.server')
+
+from tornado.web import Application
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
+
+from api import CompileCache, api_handlers, compile_path, python_path, form_options
+from compiler import compile_song
+from executor import BoundedExecutor
+from search import SearchIndex
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+song = '# Test\n1 2 3 4\n5 6 7 8\n'
+# The opening of the Tetris Theme, in the catalog
+fragment = '12 9 10 11 10 9 8 8'
+
+
+# ----------------------------------------------------------------------
+def test_form_options():
+    """"""
+    assert form_options() == {'x1_octave': False, 'transpose': None, 'x1_model': True}
+    assert form_options('1', '-3', '0') == {
+        'x1_octave': True,
+        'transpose': -3,
+        'x1_model': False,
+    }
+    for transpose in ['99', '-13', 'up', '1.5']:
+        with pytest.raises(ValueError):
+            form_options(transpose=transpose)
+
+
+# ----------------------------------------------------------------------
+def test_compile_cache():
+    """"""
+    cache = CompileCache(size=2)
+    keys = [cache.key(f'{i}', {'transpose': None}) for i in range(3)]
+    assert len(set(keys)) == 3
+    assert cache.key('1', {'a': 1, 'b': 2}) == cache.key('1', {'b': 2, 'a': 1})
+
+    for key in keys:
+        cache.put(key, key)
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) == keys[1]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+########################################################################
+class TestEndpoints(AsyncHTTPTestCase):
+    """"""
+
+    # ----------------------------------------------------------------------
+    def get_app(self):
+        """"""
+        return Application(api_handlers(), executor=BoundedExecutor(2, 4, 10))
+
+    # ----------------------------------------------------------------------
+    def post(self, path: str, **data):
+        """"""
+        return self.fetch(path, method='POST', body=urlencode(data))
+
+    # ----------------------------------------------------------------------
+    def test_compile(self):
+        """"""
+        response = self.post(compile_path, tabs=song, x1_octave='1', transpose='2')
+        assert response.code == 200
+        assert json.loads(response.body) == json.loads(
+            json.dumps(compile_song(song, x1_octave=True, transpose=2))
+        )
+
+    # ----------------------------------------------------------------------
+    def test_compile_invalid(self):
+        """"""
+        assert self.post(compile_path, tabs=song, transpose='99').code == 400
+        assert self.post(compile_path, tabs=song, transpose='two').code == 400
+
+    # ----------------------------------------------------------------------
+    def test_python(self):
+        """"""
+        response = self.post(
+            python_path, name='compile', args=json.dumps([song]), kwargs='{}'
+        )
+        assert response.code == 200
+        assert json.loads(response.body)['__RDNT__']['s1'] == compile_song(song)['s1']
+
+        response = self.post(
+            python_path, name='compile', args=json.dumps([song]), kwargs='{"transpose": 99}'
+        )
+        assert response.code == 400
+        assert self.post(python_path, name='missing', args='[]', kwargs='{}').code == 404
+        assert self.post(python_path, name='_private', args='[]', kwargs='{}').code == 404
+
+    # ----------------------------------------------------------------------
+    def test_search(self):
+        """"""
+        with open(os.path.join(root, 'tabs', 'search.json'), 'r') as file:
+            expected = SearchIndex(json.load(file)).search(fragment)
+
+        response = self.post(
+            python_path, name='search', args=json.dumps([fragment]), kwargs='{}'
+        )
+        assert response.code == 200
+        assert expected[0] == ('Tetris Theme', 1)
+        assert json.loads(response.body)['__RDNT__'] == [list(match) for match in expected]
+
+        response = self.post(
+            python_path, name='search', args=json.dumps([fragment, 'ten']), kwargs='{}'
+        )
+        assert response.code == 400
+
+    # ----------------------------------------------------------------------
+    def test_batch(self):
+        """"""
+        calls = [
+            {'id': 1, 'name': 'compile', 'args': [song]},
+            {'id': 2, 'name': 'compile', 'args': [song], 'kwargs': {'transpose': 99}},
+        ]
+        response = self.post(python_path, batch=json.dumps(calls))
+        first, second = json.loads(response.body)['__RDNT__']
+        assert first['id'] == 1 and first['result']['s1'] == compile_song(song)['s1']
+        assert second['id'] == 2 and 'ValueError' in second['error']
+
+        assert self.post(python_path, batch='[1, 2]').code == 400
+        assert self.post(python_path, batch='{"id": 1}').code == 400
+
+    # ----------------------------------------------------------------------
+    @gen_test
+    async def test_websocket(self):
+        """"""
+        url = self.get_url(f'{python_path}/ws').replace('http', 'ws', 1)
+        connection = await websocket_connect(url)
+
+        connection.write_message(json.dumps({'id': 1, 'name': 'compile', 'args': [song]}))
+        response = json.loads(await connection.read_message())
+        assert response['id'] == 1
+        assert response['result']['s1'] == compile_song(song)['s1']
+
+        for message in ['42', 'null', '[1]', '{']:
+            connection.write_message(message)
+            response = json.loads(await connection.read_message())
+            assert response['id'] is None and response['error']
+        connection.close()
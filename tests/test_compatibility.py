@@ -0,0 +1,65 @@
+"""
+The device compatibility of the songs, see compatibility.py.
+"""
+
+from compiler import normalize_tabs, s1_scale, transpose_tabs
+from compatibility import build_catalog, catalog_fields, no_shift, song_compatibility
+from search import tab_pitch
+
+
+# ----------------------------------------------------------------------
+def values(tabs: str) -> dict:
+    """"""
+    return dict(zip(catalog_fields, song_compatibility(tabs)))
+
+
+# ----------------------------------------------------------------------
+def test_s1_scale():
+    """"""
+    song = values(' '.join(s1_scale))
+    assert (song['low'], song['high']) == (tab_pitch(s1_scale[0]), tab_pitch(s1_scale[-1]))
+    assert song['s1'] == song['invalid'] == 0
+    assert song['s1_shift'] == 0
+
+
+# ----------------------------------------------------------------------
+def test_invalid():
+    """"""
+    song = values('1 2 x 3\n# comment\n99')
+    assert song['invalid'] == 2
+    assert song['s1'] == 0
+
+
+# ----------------------------------------------------------------------
+def test_transposed():
+    """"""
+    melody = '1 2 3 4 5 6 7 8 9 10 11 12'
+    song = values(melody)
+    for shift in [-7, -1, 3, 12]:
+        transposed = values(transpose_tabs(normalize_tabs(melody), shift, x1_model=False))
+        assert transposed['invalid'] == 0
+        assert transposed['low'] == song['low'] + shift
+        assert transposed['high'] == song['high'] + shift
+
+
+# ----------------------------------------------------------------------
+def test_shift():
+    """"""
+    # The X-1 tabs above the S-1 fit the S-1 once transposed down
+    song = values('13 14 15 16')
+    assert song['s1'] == 4
+    assert song['s1_shift'] < 0
+    shifted = transpose_tabs('13 14 15 16', song['s1_shift'])
+    assert values(shifted)['s1'] == 0
+
+    # A range wider than the S-1 fits no transposition
+    assert values('1 16 +1:1')['s1_shift'] == no_shift
+
+
+# ----------------------------------------------------------------------
+def test_catalog():
+    """"""
+    songs = {'a.txt': song_compatibility('1 2 3'), 'b.txt': song_compatibility('')}
+    catalog = build_catalog(songs)
+    assert catalog == {'fields': catalog_fields, 'songs': songs}
+    assert catalog['songs']['b.txt'][catalog_fields.index('invalid')] == 0
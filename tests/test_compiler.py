@@ -0,0 +1,104 @@
+"""
+The server compilation, `compile_song`, against the sliced compilation of
+the browser, `StylophoneAssistant.compile_local`.
+"""
+
+import os
+import glob
+
+import pytest
+
+from compiler import (
+    compile_song,
+    convert_note,
+    iter_normalized_lines,
+    iter_tabs_tokens,
+    iter_transposed_lines,
+    note_equivalence_mode1,
+    note_equivalence_mode2,
+    transpose_range,
+)
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+songs = sorted(glob.glob(os.path.join(root, 'tabs', '*.txt')))
+
+
+# ----------------------------------------------------------------------
+def compile_local(tabs: str, x1_octave: bool, transpose, x1_model: bool) -> dict:
+    """The steps of `compile_local` and `compile_slice`, without slicing."""
+    normalized = iter_normalized_lines(tabs.split('\n'))
+    transposed = None
+    if transpose is not None:
+        transposed = []
+
+        def collect(lines):
+            for line in lines:
+                transposed.append(line)
+                yield line
+
+        normalized = collect(iter_transposed_lines(normalized, transpose, x1_model))
+
+    if x1_octave:
+        equivalence, modifier = note_equivalence_mode2, '-1'
+    else:
+        equivalence, modifier = note_equivalence_mode1, '0'
+
+    s1 = list(iter_tabs_tokens(normalized))
+    return {
+        'transposed': None if transposed is None else '\n'.join(transposed).strip('\n'),
+        's1': s1,
+        'x1': [convert_note(tab, equivalence, modifier) for tab in s1],
+    }
+
+
+# ----------------------------------------------------------------------
+def read(filename: str) -> str:
+    """"""
+    with open(filename, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+# ----------------------------------------------------------------------
+def test_songs():
+    """"""
+    assert songs
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('filename', songs, ids=os.path.basename)
+@pytest.mark.parametrize('x1_octave', [False, True])
+def test_compile_song(filename, x1_octave):
+    """"""
+    tabs = read(filename)
+    result = compile_song(tabs, x1_octave=x1_octave)
+    expected = compile_local(tabs, x1_octave, None, True)
+
+    assert result['transposed'] is None
+    assert result['s1'] == expected['s1']
+    assert result['x1'] == expected['x1']
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('filename', songs, ids=os.path.basename)
+@pytest.mark.parametrize('x1_model', [True, False])
+def test_compile_song_transposed(filename, x1_model):
+    """"""
+    tabs = read(filename)
+    for transpose in range(-transpose_range, transpose_range + 1):
+        result = compile_song(tabs, transpose=transpose, x1_model=x1_model)
+        expected = compile_local(tabs, False, transpose, x1_model)
+
+        assert result['transposed'] == expected['transposed']
+        assert result['s1'] == expected['s1']
+        assert result['x1'] == expected['x1']
+
+
+# ----------------------------------------------------------------------
+def test_transpositions():
+    """"""
+    result = compile_song('1 2 3\n4 5\n1')
+    tables = result['transpositions']
+
+    assert list(tables) == list(range(-transpose_range, transpose_range + 1))
+    assert tables[0] == {tab: tab for tab in ['1', '2', '3', '4', '5']}
+    assert result['normalized'] == '1 2 3\n4 5\n1'
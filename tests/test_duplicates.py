@@ -0,0 +1,93 @@
+"""
+The near-duplicate songs of the catalog, see duplicates.py.
+"""
+
+import os
+import glob
+
+import duplicates
+from compiler import normalize_tabs, transpose_tabs
+from duplicates import find_duplicates, jaccard, minhash, song_shingles
+from search import tabs_intervals
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ----------------------------------------------------------------------
+def read_library() -> dict:
+    """The tabs of the songs of the catalog, by filename."""
+    library = {}
+    for filename in sorted(glob.glob(os.path.join(root, 'tabs', '*.txt'))):
+        with open(filename, 'r', encoding='utf-8') as file:
+            library[os.path.basename(filename)] = file.read()
+    return library
+
+
+# ----------------------------------------------------------------------
+def intervals(library: dict) -> dict:
+    """"""
+    return {name: tabs_intervals(tabs) for name, tabs in library.items()}
+
+
+# ----------------------------------------------------------------------
+def test_minhash():
+    """"""
+    song = song_shingles(tabs_intervals(read_library()['Tetris Theme.txt']))
+    assert len(minhash(song)) == duplicates.signature_size
+    assert minhash(song) == minhash(set(song))
+    assert all(value < duplicates.empty_bin * duplicates.signature_size for value in minhash(song))
+
+
+# ----------------------------------------------------------------------
+def test_library():
+    """"""
+    assert find_duplicates(intervals(read_library())) == []
+
+
+# ----------------------------------------------------------------------
+def test_copies():
+    """"""
+    library = read_library()
+    tetris = library['Tetris Theme.txt']
+    tokens = normalize_tabs(tetris).split()
+    # Two notes changed
+    tokens[10], tokens[30] = '1', '2'
+
+    library['Tetris (transposed).txt'] = transpose_tabs(normalize_tabs(tetris), 3)
+    library['Tetris (edited).txt'] = ' '.join(tokens)
+
+    clusters = find_duplicates(intervals(library))
+    assert len(clusters) == 1
+    names = [name for name, _ in clusters[0]]
+    assert sorted(names) == ['Tetris (edited).txt', 'Tetris (transposed).txt', 'Tetris Theme.txt']
+
+
+# ----------------------------------------------------------------------
+def test_repeats():
+    """"""
+    compressed = '1 2 3 5\n(4 6 8 9 10 9 8 6)x3\n12 10 9 8 6 5 3 2 1'
+    expanded = normalize_tabs(compressed)
+
+    assert '(' not in expanded
+    songs = intervals({'compressed': compressed, 'expanded': expanded})
+    assert jaccard(song_shingles(songs['compressed']), song_shingles(songs['expanded'])) == 1
+    assert find_duplicates(songs) == [
+        [('compressed', 1.0), ('expanded', 1.0)]
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_bucket(monkeypatch):
+    """"""
+    # A single bucket: the last song is a copy of the first one, but not
+    # similar to the song between them
+    monkeypatch.setattr(duplicates, 'minhash', lambda shingles: (0,) * duplicates.signature_size)
+    library = read_library()
+    songs = {
+        'first': library['Tetris Theme.txt'],
+        'other': library['Rasputin.txt'],
+        'copy': transpose_tabs(normalize_tabs(library['Tetris Theme.txt']), -2),
+    }
+
+    clusters = find_duplicates(intervals(songs))
+    assert [[name for name, _ in cluster] for cluster in clusters] == [['first', 'copy']]
@@ -0,0 +1,106 @@
+"""
+The MIDI and MusicXML export, see export.py.
+"""
+
+import io
+import os
+import glob
+from xml.etree import ElementTree
+
+import pytest
+
+from compiler import compile_song
+from export import export_directory, export_file, song_gap, song_pitches, write_midi, write_musicxml
+from midi import midi_to_tabs
+from search import tabs_intervals
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+songs = sorted(glob.glob(os.path.join(root, 'tabs', '*.txt')))
+fixtures = os.path.join(root, 'tests', 'fixtures')
+# Exported with the default gap, and kept as regression fixtures
+fixture_songs = ['Rasputin', 'Tetris Theme', 'The Pink Panther']
+
+
+# ----------------------------------------------------------------------
+def read(filename: str) -> str:
+    """"""
+    with open(filename, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+# ----------------------------------------------------------------------
+def test_song_pitches():
+    """"""
+    tabs = '1 2 3\n4 5 6'
+    notes = song_pitches(compile_song(tabs))
+    assert len(notes) == 6
+
+    # Tabs wrapped to another octave by the transposition are moved back
+    for transpose in [-12, -5, 7, 12]:
+        song = compile_song(tabs, transpose=transpose)
+        assert song_pitches(song) == [pitch + transpose for pitch in notes]
+
+
+# ----------------------------------------------------------------------
+def test_song_gap():
+    """"""
+    assert song_gap('# Gap: 0.3 s\n1 2 3') == 300
+    assert song_gap('# Tetris, imported\n# Gap: 1.2 s, transposed +12 semitones') == 1200
+    assert song_gap('1 2 3') == 500
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('filename', songs, ids=os.path.basename)
+def test_midi_round_trip(filename, tmp_path):
+    """"""
+    tabs = read(filename)
+    exported = tmp_path / 'song.mid'
+    with open(exported, 'wb') as file:
+        write_midi(file, song_pitches(compile_song(tabs)), 300)
+
+    imported = midi_to_tabs(str(exported))
+    assert '# Gap: 0.3 s' in imported
+    assert tabs_intervals(imported) == tabs_intervals(tabs)
+
+
+# ----------------------------------------------------------------------
+def test_musicxml():
+    """"""
+    notes = song_pitches(compile_song('1 2 3 4 5'))
+    output = io.StringIO()
+    write_musicxml(output, notes, 250, 'Fragment & co')
+
+    score = ElementTree.fromstring(output.getvalue().split('\n', 2)[2])
+    assert score.find('work/work-title').text == 'Fragment & co'
+    assert score.find('.//sound').get('tempo') == '240'
+    measures = score.findall('part/measure')
+    assert len(measures) == 2
+    assert len(measures[0].findall('note/pitch')) == 4
+    assert len(measures[1].findall('note/pitch')) == 1
+    assert len(measures[1].findall('note/rest')) == 3
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('name', fixture_songs)
+def test_fixtures(name, tmp_path):
+    """"""
+    filename = os.path.join(root, 'tabs', f'{name}.txt')
+    _, written = export_file((filename, str(tmp_path), ('midi', 'musicxml'), None))
+    assert [os.path.basename(target) for target in written] == [f'{name}.mid', f'{name}.musicxml']
+
+    for target in written:
+        fixture = os.path.join(fixtures, os.path.basename(target))
+        with open(target, 'rb') as file, open(fixture, 'rb') as expected:
+            assert file.read() == expected.read()
+
+
+# ----------------------------------------------------------------------
+def test_export_directory(tmp_path):
+    """"""
+    results = export_directory(os.path.join(root, 'tabs'), str(tmp_path), ['midi'], workers=1, gap=300)
+    assert [source for source, _ in results] == songs
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(filename).replace('.txt', '.mid') for filename in songs
+    )
+    # The selected gap replaces the one of every song
+    assert '# Gap: 0.3 s' in midi_to_tabs(str(tmp_path / 'Tetris Theme.mid'))
@@ -0,0 +1,139 @@
+"""
+The incremental build of the catalog, see library.py.
+"""
+
+import os
+import json
+
+import pytest
+
+from compatibility import song_compatibility
+from library import load_tabs, manifest_name, output_names
+from search import tabs_intervals
+
+songs = {
+    'a.txt': '1 2 3 4 5 6 7 8',
+    'b.txt': '8 7 6 5 4 3 2 1',
+    'c.txt': '(1 3 5)x2\n8 5 3 1',
+}
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def path(tmp_path):
+    """"""
+    for name, tabs in songs.items():
+        (tmp_path / name).write_text(tabs)
+    return tmp_path
+
+
+# ----------------------------------------------------------------------
+def read(path, name: str):
+    """"""
+    with open(os.path.join(path, name), 'r') as file:
+        return json.load(file)
+
+
+# ----------------------------------------------------------------------
+def outputs(path) -> list:
+    """"""
+    return [read(path, name) for name in output_names]
+
+
+# ----------------------------------------------------------------------
+def test_build(path):
+    """"""
+    library = load_tabs(str(path))
+    assert library['changed']
+    assert library['processed'] == 3
+    assert library['intervals'] == {name: tabs_intervals(tabs) for name, tabs in songs.items()}
+
+    tabs, index, catalog = outputs(path)
+    assert tabs == songs
+    assert index['songs'] == ['a', 'b', 'c']
+    assert catalog['songs']['c.txt'] == song_compatibility(songs['c.txt'])
+    assert read(path, manifest_name)['songs'].keys() == songs.keys()
+
+
+# ----------------------------------------------------------------------
+def test_unchanged(path):
+    """"""
+    load_tabs(str(path))
+    modified = [os.path.getmtime(path / name) for name in output_names]
+
+    library = load_tabs(str(path))
+    assert not library['changed']
+    assert library['processed'] == 0
+    assert [os.path.getmtime(path / name) for name in output_names] == modified
+
+
+# ----------------------------------------------------------------------
+def test_touched(path):
+    """"""
+    load_tabs(str(path))
+    before = outputs(path)
+    stat = os.stat(path / 'a.txt')
+    os.utime(path / 'a.txt', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    # Read again, but not a change
+    library = load_tabs(str(path))
+    assert library['processed'] == 1
+    assert not library['changed']
+    assert outputs(path) == before
+
+    # The new modification time is recorded
+    assert load_tabs(str(path))['processed'] == 0
+
+
+# ----------------------------------------------------------------------
+def test_edited(path):
+    """"""
+    load_tabs(str(path))
+    (path / 'b.txt').write_text('8 8 8 1')
+    stat = os.stat(path / 'b.txt')
+    os.utime(path / 'b.txt', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    library = load_tabs(str(path))
+    assert library['changed']
+    assert library['processed'] == 1
+    assert library['intervals']['b.txt'] == tabs_intervals('8 8 8 1')
+
+    tabs, index, catalog = outputs(path)
+    assert tabs == dict(songs, **{'b.txt': '8 8 8 1'})
+    assert catalog['songs']['b.txt'] == song_compatibility('8 8 8 1')
+
+
+# ----------------------------------------------------------------------
+def test_removed(path):
+    """"""
+    load_tabs(str(path))
+    os.remove(path / 'a.txt')
+
+    library = load_tabs(str(path))
+    assert library['changed']
+    assert library['processed'] == 0
+
+    tabs, index, catalog = outputs(path)
+    assert list(tabs) == ['b.txt', 'c.txt']
+    assert index['songs'] == ['b', 'c']
+    assert list(catalog['songs']) == ['b.txt', 'c.txt']
+    assert list(read(path, manifest_name)['songs']) == ['b.txt', 'c.txt']
+
+
+# ----------------------------------------------------------------------
+def test_missing_output(path):
+    """"""
+    load_tabs(str(path))
+    os.remove(path / 'search.json')
+
+    assert not load_tabs(str(path))['changed']
+    assert read(path, 'search.json')['songs'] == ['a', 'b', 'c']
+
+
+# ----------------------------------------------------------------------
+def test_parallel(path, monkeypatch):
+    """"""
+    monkeypatch.setattr('library.parallel_threshold', 2)
+    library = load_tabs(str(path), workers=2)
+    assert library['processed'] == 3
+    assert outputs(path)[0] == songs
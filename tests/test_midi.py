@@ -0,0 +1,127 @@
+"""
+The MIDI importer, see midi.py.
+"""
+
+import os
+import json
+import struct
+
+import pytest
+
+from compiler import normalize_tabs
+from midi import MidiError, base_note, convert_directory, midi_to_tabs
+from search import tabs_intervals, token_pitch
+
+melody = '12 9 10 11 10 9 8 8 10 12 11 10 9 9 10 11 12 10 8 8'
+
+
+# ----------------------------------------------------------------------
+def varlen(value: int) -> bytes:
+    """"""
+    data = [value & 0x7F]
+    value >>= 7
+    while value:
+        data.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(data))
+
+
+# ----------------------------------------------------------------------
+def track(events: list) -> bytes:
+    """The `MTrk` chunk of `(tick, message)` events."""
+    data = b''
+    tick = 0
+    for event_tick, message in sorted(events, key=lambda event: event[0]):
+        data += varlen(event_tick - tick) + message
+        tick = event_tick
+    data += b'\x00\xff\x2f\x00'
+    return b'MTrk' + struct.pack('>I', len(data)) + data
+
+
+# ----------------------------------------------------------------------
+def notes(pitches: list, channel: int, length: int, start: int = 0) -> list:
+    """The note on and off events of consecutive notes."""
+    events = []
+    for i, pitch in enumerate(pitches):
+        events.append((start + i * length, bytes([0x90 | channel, pitch, 100])))
+        events.append((start + (i + 1) * length - 1, bytes([0x80 | channel, pitch, 0])))
+    return events
+
+
+# ----------------------------------------------------------------------
+def write_midi(filename, tabs: str = melody, division: int = 480) -> None:
+    """
+    Writes a format 1 file: a tempo track, the melody of `tabs` with the
+    third below every note, a bass line and drums.
+    """
+    pitches = [base_note + token_pitch(tab) for tab in normalize_tabs(tabs).split()]
+    # 100 bpm, an eighth note is 0.3 s
+    tempo = (0, b'\xff\x51\x03' + (600000).to_bytes(3, 'big'))
+    eighth = division // 2
+
+    chords = notes(pitches, 0, eighth) + notes([pitch - 4 for pitch in pitches], 0, eighth)
+    bass = notes([base_note - 12] * (len(pitches) // 2), 1, eighth * 2)
+    drums = notes([36] * len(pitches), 9, eighth)
+
+    header = b'MThd' + struct.pack('>IHHH', 6, 1, 4, division)
+    with open(filename, 'wb') as file:
+        file.write(header + track([tempo]) + track(chords) + track(bass) + track(drums))
+
+
+# ----------------------------------------------------------------------
+def test_midi_to_tabs(tmp_path):
+    """"""
+    filename = tmp_path / 'tetris.mid'
+    write_midi(filename)
+    tabs = midi_to_tabs(str(filename))
+
+    assert tabs.startswith('# tetris, imported from tetris.mid\n# Gap: 0.3 s')
+    assert tabs_intervals(tabs) == tabs_intervals(melody)
+
+
+# ----------------------------------------------------------------------
+def test_invalid(tmp_path):
+    """"""
+    filename = tmp_path / 'text.mid'
+    filename.write_bytes(b'Not a MIDI file')
+    with pytest.raises(MidiError):
+        midi_to_tabs(str(filename))
+
+    write_midi(filename)
+    filename.write_bytes(filename.read_bytes()[:-10])
+    with pytest.raises(MidiError):
+        midi_to_tabs(str(filename))
+
+
+# ----------------------------------------------------------------------
+def test_convert_directory(tmp_path):
+    """"""
+    source = tmp_path / 'midi'
+    output = tmp_path / 'tabs'
+    source.mkdir()
+    output.mkdir()
+    write_midi(source / 'song.mid')
+    (source / 'broken.mid').write_bytes(b'MThd')
+    (output / 'Song.txt').write_text('1 2 3')
+
+    results = dict(convert_directory(str(source), str(output), workers=1))
+    assert results[str(source / 'broken.mid')].startswith('error:')
+    # Never overwritten, even when the names only differ in case
+    assert results[str(source / 'song.mid')] == str(output / 'song (2).txt')
+    assert (output / 'Song.txt').read_text() == '1 2 3'
+
+    # The catalog is refreshed
+    with open(output / 'tabs.json', 'r') as file:
+        assert list(json.load(file)) == ['Song.txt', 'song (2).txt']
+
+    results = dict(convert_directory(str(source), str(output), workers=1))
+    assert results[str(source / 'song.mid')] == str(output / 'song (3).txt')
+    assert sorted(os.listdir(output)) == [
+        '.manifest.json',
+        'Song.txt',
+        'catalog.json',
+        'search.json',
+        'song (2).txt',
+        'song (3).txt',
+        'tabs.json',
+    ]
@@ -0,0 +1,95 @@
+"""
+The melody search index, see search.py.
+"""
+
+import json
+
+import pytest
+
+from compiler import normalize_tabs, transpose_range, transpose_tabs
+from search import (
+    SearchIndex,
+    build_index,
+    decode_numbers,
+    encode_numbers,
+    tabs_intervals,
+    token_pitch,
+)
+
+tabs = {
+    'ode.txt': '3 3 4 5 5 4 3 2 1 1 2 3 3 2 2',
+    'scale.txt': '1 2 3 4 5 6 7 8 9 10 11 12',
+    'twinkle.txt': '1 1 5 5 6 6 5\n4 4 3 3 2 2 1',
+    'comment.txt': '# Only a comment',
+}
+library = {name: tabs_intervals(content) for name, content in tabs.items()}
+
+
+# ----------------------------------------------------------------------
+def test_numbers():
+    """"""
+    numbers = [0, 1, 31, 32, 33, 1023, 1024, 123456789]
+    assert decode_numbers(encode_numbers(numbers)) == numbers
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize('x1_model', [True, False])
+def test_transposition_invariance(x1_model):
+    """"""
+    melody = tabs['ode.txt']
+    for transpose in range(-transpose_range, transpose_range + 1):
+        transposed = transpose_tabs(normalize_tabs(melody), transpose, x1_model)
+        assert tabs_intervals(transposed) == tabs_intervals(melody)
+
+
+# ----------------------------------------------------------------------
+def test_token_pitch():
+    """"""
+    assert token_pitch('+1:6') == token_pitch('6') - 12
+    assert token_pitch('-1:6') == token_pitch('6') + 12
+    assert token_pitch('1:6') == token_pitch('-1:6')
+    assert token_pitch('E:6') is None
+    assert token_pitch('x') is None
+
+
+# ----------------------------------------------------------------------
+def test_index_round_trip(tmp_path):
+    """"""
+    index = build_index(library)
+    filename = tmp_path / 'search.json'
+    with open(filename, 'w') as file:
+        json.dump(index, file, separators=(',', ':'))
+    with open(filename, 'r') as file:
+        loaded = json.load(file)
+
+    assert loaded == index
+    assert loaded['songs'] == ['ode', 'scale', 'twinkle', 'comment']
+    for query in ['3 3 4 5 5', '1 1 5', '5 6 7 8 9 10']:
+        assert SearchIndex(loaded).search(query) == SearchIndex(index).search(query)
+
+
+# ----------------------------------------------------------------------
+def test_search():
+    """"""
+    index = SearchIndex(build_index(library))
+
+    # Ode to Joy, a fifth up
+    transposed = transpose_tabs(normalize_tabs('3 3 4 5 5 4 3'), 7)
+    name, score = index.search(transposed)[0]
+    assert (name, score) == ('ode', 1)
+
+    assert index.search('') == []
+    assert index.search('1 # comment') == []
+    assert index.search('1 12 1 12 1 12') == []
+
+
+# ----------------------------------------------------------------------
+def test_search_prefix():
+    """"""
+    index = SearchIndex(build_index(library))
+
+    # Shorter than an n-gram, every song containing the fragment matches
+    matches = index.search('7 8')
+    assert sorted(matches) == [('ode', 1), ('scale', 1)]
+    assert all(score == 1 for _, score in index.search('1 1 5'))
+    assert index.search('1 12') == []